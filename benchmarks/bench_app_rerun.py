@@ -0,0 +1,169 @@
+"""
+⏱️ 앱 다시 그리기 벤치마크 (App Rerun Benchmark)
+app_unified.py에서 리그 예측 후 성장 가이드의 목표 티어를 바꾸는 상호작용 한 번의 비용을 잽니다.
+
+AppTest는 실행마다 fragment 저장소를 새로 만들어 fragment만 다시 실행할 수 없으므로,
+실제 `streamlit run` 서버를 띄우고 브라우저처럼 웹소켓으로 rerun 요청(BackMsg)을 보내
+요청 전송 ~ script_finished 수신까지의 벽시계 시간을 잽니다 (이전 / 현재 앱 모두 같은 방식).
+
+- interaction: 목표 티어 선택 한 번 (위젯이 fragment 안에 있으면 브라우저처럼 fragment_id를 붙여 보냄)
+- full rerun: 같은 위젯 상태로 스크립트 전체 실행 (fragment_id 없이)
+- 브라우저 렌더링 시간은 양쪽 모두 포함되지 않음
+- 실행 끝의 Streamlit gc.collect()가 다음 측정에 섞이지 않도록 상호작용 사이에 --pause초 쉼 (사람이 고르는 간격)
+- --app으로 이전 버전 파일을 주면 같은 상호작용을 같은 방식으로 측정 (fragment가 없으면 interaction = 전체 실행)
+
+실행 방법:
+    COC_MODEL_DIR=. python benchmarks/bench_app_rerun.py --rounds 20
+    git show HEAD~1:src/app_unified.py > /tmp/app_before.py
+    COC_MODEL_DIR=. python benchmarks/bench_app_rerun.py --app /tmp/app_before.py
+"""
+import argparse
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src')
+STARTUP_TIMEOUT = 60
+RUN_TIMEOUT = 300
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def start_server(app, port):
+    """헤드리스 streamlit 서버 (src를 PYTHONPATH에 넣어 다른 위치의 앱 파일도 같은 모듈을 import)"""
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [SRC_DIR, os.environ.get('PYTHONPATH')])))
+    cmd = [sys.executable, '-m', 'streamlit', 'run', os.path.abspath(app), '--server.headless', 'true',
+           '--server.port', str(port), '--server.fileWatcherType', 'none', '--browser.gatherUsageStats', 'false']
+    server = subprocess.Popen(cmd, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.time() + STARTUP_TIMEOUT
+    while time.time() < deadline:
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=1).close()
+            return server
+        except OSError:
+            time.sleep(0.2)
+    server.kill()
+    raise SystemExit("streamlit 서버가 시작되지 않았습니다.")
+
+
+class Session:
+    """브라우저 대신 위젯 상태를 들고 rerun 요청을 보내는 최소 클라이언트"""
+
+    def __init__(self, ws):
+        self.ws = ws
+        self.widgets = {}    # 위젯 id -> 이 위젯을 그린 fragment id ('' = 본문)
+        self.states = {}     # 위젯 id -> WidgetState (트리거 제외, 브라우저처럼 매번 전부 보냄)
+        self.options = {}    # selectbox 위젯 id -> 선택지
+
+    def widget_id(self, key):
+        for widget_id in self.widgets:
+            if widget_id.endswith(f'-{key}'):
+                return widget_id
+        raise SystemExit(f"위젯을 찾을 수 없습니다: {key}")
+
+    async def rerun(self, trigger=None, fragment_id=''):
+        """rerun 요청 -> script_finished까지 걸린 시간(초)"""
+        from streamlit.proto.BackMsg_pb2 import BackMsg
+        from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+
+        msg = BackMsg()
+        msg.rerun_script.fragment_id = fragment_id
+        msg.rerun_script.widget_states.widgets.extend(self.states.values())
+        if trigger is not None:
+            state = msg.rerun_script.widget_states.widgets.add()
+            state.id, state.trigger_value = trigger, True
+
+        start = time.perf_counter()
+        await self.ws.write_message(msg.SerializeToString(), binary=True)
+        while True:
+            raw = await asyncio.wait_for(self.ws.read_message(), RUN_TIMEOUT)
+            if raw is None:
+                raise SystemExit("서버 연결이 끊어졌습니다.")
+            forward = ForwardMsg()
+            forward.ParseFromString(raw)
+            kind = forward.WhichOneof('type')
+            if kind == 'script_finished':
+                return time.perf_counter() - start
+            if kind == 'session_event' and forward.session_event.WhichOneof('type') == 'script_compilation_exception':
+                raise SystemExit("앱 컴파일 오류")
+            if kind == 'delta' and forward.delta.WhichOneof('type') == 'new_element':
+                element = forward.delta.new_element
+                field = element.WhichOneof('type')
+                if field == 'exception':
+                    raise SystemExit(f"앱 실행 오류: {element.exception.message}")
+                widget_id = getattr(getattr(element, field), 'id', '') if field else ''
+                if widget_id:
+                    self.widgets[widget_id] = forward.delta.fragment_id
+                if field == 'selectbox':
+                    self.options[widget_id] = list(element.selectbox.options)
+
+    def select(self, key, value):
+        from streamlit.proto.WidgetStates_pb2 import WidgetState
+
+        widget_id = self.widget_id(key)
+        self.states[widget_id] = WidgetState(id=widget_id, string_value=value)
+        return self.widgets[widget_id]
+
+
+async def measure(app, rounds, port, pause):
+    from tornado.websocket import websocket_connect
+
+    server = start_server(app, port)
+    try:
+        ws = await websocket_connect(f'ws://127.0.0.1:{port}/_stcore/stream', subprotocols=['streamlit'])
+        session = Session(ws)
+        await session.rerun()
+        await session.rerun(trigger=session.widget_id('league_btn'))
+
+        tiers = session.options[session.widget_id('target_tier_select')]
+        # 티어마다 한 번씩 먼저 보여줘 모델/캐시 준비 (반사실 탐색 첫 계산 제외)
+        for tier in tiers:
+            fragment_id = session.select('target_tier_select', tier)
+            await session.rerun(fragment_id=fragment_id)
+
+        interaction, full = [], []
+        for i in range(rounds):
+            await asyncio.sleep(pause)
+            fragment_id = session.select('target_tier_select', tiers[i % len(tiers)])
+            interaction.append(await session.rerun(fragment_id=fragment_id))
+        for i in range(rounds):
+            await asyncio.sleep(pause)
+            session.select('target_tier_select', tiers[i % len(tiers)])
+            full.append(await session.rerun())
+        ws.close()
+        return tiers, bool(fragment_id), interaction, full
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='app_unified.py 목표 티어 변경 한 번의 다시 그리기 시간')
+    parser.add_argument('--app', default=os.path.join(SRC_DIR, 'app_unified.py'), help='측정할 앱 파일')
+    parser.add_argument('--rounds', type=int, default=20, help='목표 티어를 바꾸는 횟수')
+    parser.add_argument('--pause', type=float, default=0.5, help='상호작용 사이 대기 시간 (초)')
+    parser.add_argument('--port', type=int, default=None, help='서버 포트 (기본: 빈 포트)')
+    args = parser.parse_args()
+
+    tiers, in_fragment, interaction, full = asyncio.run(measure(args.app, args.rounds, args.port or free_port(),
+                                                                args.pause))
+    print(f"{os.path.basename(args.app)} | 목표 티어 변경 {args.rounds}회 (선택지 {len(tiers)}개), "
+          f"요청 ~ script_finished 벽시계 시간")
+    print(f"{'구간':<34} {'mean(ms)':>9} {'p50(ms)':>8}")
+    print("-" * 53)
+    label = 'interaction (fragment rerun)' if in_fragment else 'interaction (전체 실행)'
+    for name, times in [(label, interaction), ('full rerun', full)]:
+        print(f"{name:<34} {np.mean(times) * 1000:>9.1f} {np.median(times) * 1000:>8.1f}")
+
+
+if __name__ == '__main__':
+    main()
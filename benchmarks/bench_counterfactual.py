@@ -0,0 +1,70 @@
+"""
+⏱️ 반사실 성장 가이드 벤치마크 (Counterfactual Benchmark)
+실제 클랜 표본마다 "한 단계 위 티어"를 목표로 counterfactual.py 탐색을 실행해
+목표 도달률 / 클랜당 지연시간(p50, p95, 최대)을 측정하고,
+기존 방식(목표 티어 평균까지 올리기)이 실제로 목표 티어 예측으로 이어지는 비율과 비교합니다.
+
+실행 방법: python benchmarks/bench_counterfactual.py --model-dir . --csv coc_clans_dataset.csv
+"""
+import argparse
+import os
+import sys
+import warnings
+
+import numpy as np
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src')
+sys.path.insert(0, SRC_DIR)
+
+warnings.filterwarnings('ignore', message='X does not have valid feature names')
+
+TIER_ORDER = ['Bronze', 'Silver', 'Gold', 'Crystal', 'Master', 'Champion']
+
+
+def main():
+    parser = argparse.ArgumentParser(description='반사실 성장 가이드 도달률/지연시간 벤치마크')
+    parser.add_argument('--model-dir', default='.', help='*.pkl 모델 디렉토리')
+    parser.add_argument('--csv', required=True, help='클랜 표본을 뽑을 원천 CSV')
+    parser.add_argument('--sample', type=int, default=200, help='클랜 표본 수')
+    parser.add_argument('--time-budget-ms', type=float, default=150.0, help='클랜당 탐색 시간 예산')
+    parser.add_argument('--library', action='store_true', help='트리 엔진 대신 sklearn 래퍼/부스터로 평가')
+    args = parser.parse_args()
+
+    import artifacts
+    from counterfactual import league_search
+    from features import LEAGUE_FEATURES
+    from ingest import iter_clan_chunks
+
+    model, encoder, tier_standards, transform = artifacts.load_league_models(args.model_dir,
+                                                                             compiled=not args.library)
+    # app_unified.py 성장 가이드 / serve.py 코칭과 같은 탐색기 (features.py의 입력 범위 / 정수 피처)
+    search = league_search(model, tier_standards, time_budget_ms=args.time_budget_ms)
+
+    X = transform.transform(next(iter_clan_chunks(args.csv, chunksize=args.sample)))
+    predicted = encoder.inverse_transform(model.predict(X))
+
+    results, static_reached = [], []
+    for x, tier in zip(X, predicted):
+        if tier not in TIER_ORDER[:-1]:
+            continue
+        target = TIER_ORDER[TIER_ORDER.index(tier) + 1]
+        target_class = encoder.transform([target])[0]
+        results.append(search.search(x, target_class))
+
+        # 기존 방식: 목표 티어 평균보다 낮은 피처를 평균까지 올림
+        standard = tier_standards.loc[target, LEAGUE_FEATURES].to_numpy(dtype=np.float64)
+        static_x = np.maximum(x, standard)[None, :].astype(np.float32)
+        static_reached.append(model.predict(static_x)[0] == target_class)
+
+    ms = np.array([r['elapsed_ms'] for r in results])
+    print(f"{search} / 모델: {model!r}")
+    print(f"클랜 {len(results):,}개 (목표 = 한 단계 위 티어)")
+    print(f"  반사실 탐색: 도달률 {np.mean([r['reached'] for r in results]):.1%}, "
+          f"평균 변경 피처 {np.mean([len(r['changes']) for r in results]):.1f}개, "
+          f"평균 평가 후보 {np.mean([r['evaluated'] for r in results]):,.0f}개")
+    print(f"  지연시간: p50 {np.percentile(ms, 50):.1f}ms | p95 {np.percentile(ms, 95):.1f}ms | 최대 {ms.max():.1f}ms")
+    print(f"  기존 방식(티어 평균까지 올리기) 도달률: {np.mean(static_reached):.1%}")
+
+
+if __name__ == '__main__':
+    main()
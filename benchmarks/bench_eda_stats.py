@@ -0,0 +1,88 @@
+"""
+⏱️ EDA 집계 벤치마크 (EDA Stats Benchmark)
+노트북 01 방식(전체 DataFrame 로드 후 표마다 groupby / pd.cut 반복)과
+eda_stats.py 방식(한 번 스캔 + np.bincount, 캐시 재사용)의 요약 표 생성 시간을 비교합니다.
+
+실행 방법: python benchmarks/bench_eda_stats.py --store feature_store
+"""
+import argparse
+import os
+import sys
+import time
+import warnings
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src')
+sys.path.insert(0, SRC_DIR)
+
+warnings.filterwarnings('ignore')
+
+
+def run_notebook(store_dir):
+    """노트북 01의 집계 셀을 그대로 재현 (피처 스토어에서 전체 로드)"""
+    import pandas as pd
+
+    import eda_stats
+    from feature_store import load_features
+    from features import LEAGUE_FEATURES
+    from train import broad_tier, league_score
+
+    coc_df_clean = load_features(store_dir)
+    coc_df_active = coc_df_clean[coc_df_clean['is_ghost'] == False].copy()  # noqa: E712
+    coc_df_reliable = coc_df_active[coc_df_active['war_total'] >= 20].copy()
+
+    spec = {name: 'mean' for name in eda_stats.SPEC_COLUMNS}
+    coc_df_reliable.groupby('clan_war_league', observed=True).agg(spec)
+    coc_df_reliable.groupby('clan_type', observed=True).agg({**spec, 'mean_member_trophies': 'mean'})
+    coc_df_reliable.groupby('isFamilyFriendly').agg({**spec, 'mean_member_trophies': 'mean'})
+    coc_df_reliable['level_group'] = pd.cut(coc_df_reliable['clan_level'], bins=eda_stats.LEVEL_BINS,
+                                            labels=eda_stats.LEVEL_LABELS)
+    coc_df_reliable.groupby('level_group', observed=True).agg({name: 'mean' for name in eda_stats.LEVEL_COLUMNS})
+    coc_df_reliable['trophy_req_group'] = pd.cut(coc_df_reliable['required_trophies'], bins=eda_stats.TROPHY_BINS,
+                                                 labels=eda_stats.TROPHY_LABELS, include_lowest=True)
+    coc_df_reliable.groupby('trophy_req_group', observed=True)['clan_capital_points'].agg(['mean', 'median', 'count'])
+    league_map = {name: i for i, name in enumerate(eda_stats.LEAGUE_ORDER)}
+    coc_df_reliable['league_rank'] = coc_df_reliable['clan_war_league'].astype(str).map(league_map)
+    coc_df_reliable.groupby('trophy_req_group', observed=True)['league_rank'].mean()
+
+    death_valley = coc_df_clean.groupby('clan_level').agg(total_clans=('is_ghost', 'count'),
+                                                          ghost_clans=('is_ghost', 'sum'))
+    death_valley['ghost_ratio'] = death_valley['ghost_clans'] / death_valley['total_clans']
+    coc_df_active['at_risk'] = coc_df_active['num_members'] < 10
+    coc_df_active.groupby('clan_level').agg(at_risk_ratio=('at_risk', 'mean'))
+    coc_df_active['member_group'] = pd.cut(coc_df_active['num_members'], bins=eda_stats.MEMBER_BINS,
+                                           labels=eda_stats.MEMBER_LABELS)
+    coc_df_active.groupby('member_group', observed=False)['clan_capital_points'].apply(lambda x: (x > 0).mean())
+
+    # 노트북 02 tier_standards
+    score = league_score(coc_df_active['clan_war_league'])
+    ranked = coc_df_active[score > 0]
+    return ranked.groupby(broad_tier(score[score > 0]))[LEAGUE_FEATURES].mean()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='노트북 groupby vs 한 번 스캔 EDA 집계 비교')
+    parser.add_argument('--store', default='feature_store', help='피처 스토어 디렉토리')
+    args = parser.parse_args()
+
+    import eda_stats
+
+    start = time.perf_counter()
+    run_notebook(args.store)
+    notebook_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    stats = eda_stats.load_stats(args.store, force=True)
+    scan_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    eda_stats.load_stats(args.store)
+    cached_seconds = time.perf_counter() - start
+
+    print(f"{stats['rows']:,}행, 요약 표 {len(eda_stats.TABLES) + 2}개")
+    print(f"  노트북 방식 (전체 로드 + groupby 반복): {notebook_seconds:.2f}초")
+    print(f"  eda_stats 한 번 스캔:                  {scan_seconds:.2f}초 ({notebook_seconds / scan_seconds:.1f}배)")
+    print(f"  eda_stats 캐시 로드:                   {cached_seconds:.3f}초")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+"""
+⏱️ 범주 인코딩 벤치마크 (Category Encoding Benchmark)
+war_frequency / clan_type 인코딩을 세 방식으로 비교합니다.
+
+- label_encoder: 노트북/초기 앱 방식 (값마다 LabelEncoder.transform([값]) + try/except로 0)
+- per_unique: 고유값마다 transform 한 번 (이전 features.encode_labels)
+- table: features.CategoryTable (한 건은 dict 조회, 배열은 한 번에 벡터 연산)
+
+실행 방법: python benchmarks/bench_encoders.py --model-dir . --rows 1000000
+"""
+import argparse
+import os
+import sys
+import time
+import warnings
+
+import numpy as np
+import pandas as pd
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src')
+sys.path.insert(0, SRC_DIR)
+
+warnings.filterwarnings('ignore')
+
+
+def label_encoder_one(encoder, value):
+    try:
+        return encoder.transform([value])[0]
+    except ValueError:
+        return 0
+
+
+def per_unique(encoder, values):
+    values = np.asarray(values).astype(str)
+    uniques, inverse = np.unique(values, return_inverse=True)
+    codes = np.zeros(len(uniques), dtype=np.int64)
+    for i, value in enumerate(uniques):
+        codes[i] = label_encoder_one(encoder, value)
+    return codes[inverse.reshape(-1)]
+
+
+def timed(fn, n=1):
+    start = time.perf_counter()
+    for _ in range(n):
+        result = fn()
+    return (time.perf_counter() - start) / n, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='LabelEncoder vs CategoryTable 인코딩 비교')
+    parser.add_argument('--model-dir', default='.', help='*.pkl 모델 디렉토리')
+    parser.add_argument('--rows', type=int, default=1_000_000, help='배치 크기')
+    args = parser.parse_args()
+
+    import artifacts
+    from features import CategoryTable
+
+    encoder = artifacts.load_artifact('war_frequency_encoder', args.model_dir)
+    table = CategoryTable.from_encoder(encoder)
+
+    # 한 건 (앱 입력): 학습에 있던 값 / 없던 값
+    print(f"{'한 건':<14} {'known(us)':>10} {'unknown(us)':>12}")
+    print("-" * 38)
+    for name, fn in [('label_encoder', lambda v: label_encoder_one(encoder, v)),
+                     ('table', table.encode_one)]:
+        known, _ = timed(lambda: fn(str(encoder.classes_[0])), 2000)
+        unknown, _ = timed(lambda: fn('bogus'), 2000)
+        print(f"{name:<14} {known * 1e6:>10.1f} {unknown * 1e6:>12.1f}")
+
+    # 배치 (배치 스코어링): 문자열(object) 배열 / category 컬럼, 1%는 모르는 값
+    rng = np.random.default_rng(0)
+    values = rng.choice(np.append(encoder.classes_, 'bogus'), args.rows,
+                        p=[0.99 / len(encoder.classes_)] * len(encoder.classes_) + [0.01]).astype(object)
+    categorical = pd.Series(values).astype('category')
+    expected = per_unique(encoder, values)
+    print(f"\n{'배치 ' + format(args.rows, ','):<14} {'object(s)':>10} {'category(s)':>12}")
+    print("-" * 38)
+    for name, fn in [('per_unique', lambda v: per_unique(encoder, v)), ('table', table.encode)]:
+        obj_s, obj_codes = timed(lambda: fn(values))
+        cat_s, cat_codes = timed(lambda: fn(categorical))
+        assert (obj_codes == expected).all() and (cat_codes == expected).all()
+        print(f"{name:<14} {obj_s:>10.3f} {cat_s:>12.3f}")
+
+
+if __name__ == '__main__':
+    main()
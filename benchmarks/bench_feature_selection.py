@@ -0,0 +1,73 @@
+"""
+⏱️ 피처 선택 벤치마크 (Feature Selection Benchmark)
+같은 데이터로 노트북 02 방식(RFECV(LightGBM, step=2, cv=3) + RFE(step=2))과
+feature_selection.py 방식을 돌려 소요 시간 / 선택된 피처 / 선택 결과의 교차검증 정확도를 비교합니다.
+
+실행 방법: python benchmarks/bench_feature_selection.py --work-dir train_work --n-features 9 --sample 50000
+"""
+import argparse
+import os
+import sys
+import time
+import warnings
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src')
+sys.path.insert(0, SRC_DIR)
+
+warnings.filterwarnings('ignore')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='RFECV vs 중요도 기반 피처 선택 비교')
+    parser.add_argument('--work-dir', default='train_work', help='train.py 체크포인트 디렉토리')
+    parser.add_argument('--target', choices=['score', 'tier'], default='score')
+    parser.add_argument('--n-features', type=int, default=9)
+    parser.add_argument('--sample', type=int, default=None, help='행 표본 수 (기본: 전체, RFECV는 오래 걸림)')
+    parser.add_argument('--skip-rfecv', action='store_true', help='RFECV는 빼고 RFE만 실행')
+    args = parser.parse_args()
+
+    from lightgbm import LGBMClassifier
+    from sklearn.feature_selection import RFE, RFECV
+
+    from features import LEAGUE_FEATURES
+    from feature_selection import FoldCache, load_candidates, select_features
+
+    X, y = load_candidates(args.work_dir, args.target, args.sample)
+    print(f"후보 {X.shape[1]}개 / {len(y):,}행 / 클래스 {int(y.max()) + 1}개\n")
+
+    start = time.perf_counter()
+    result = select_features(X, y, args.n_features, log=lambda *a: None)
+    fast_seconds = time.perf_counter() - start
+
+    # 노트북 방식: RFECV로 개수 곡선, RFE로 같은 개수 선택 (둘 다 매 단계 전체 재학습)
+    lgbm = LGBMClassifier(n_estimators=100, random_state=42, n_jobs=-1, verbose=-1)
+    rfecv_seconds = None
+    if not args.skip_rfecv:
+        start = time.perf_counter()
+        rfecv = RFECV(estimator=lgbm, step=2, cv=3, scoring='accuracy', min_features_to_select=1, n_jobs=-1)
+        rfecv.fit(X, y)
+        rfecv_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    rfe = RFE(estimator=lgbm, n_features_to_select=args.n_features, step=2).fit(X, y)
+    rfe_seconds = time.perf_counter() - start
+    rfe_selected = list(X.columns[rfe.support_])
+
+    # 두 선택 결과를 같은 fold로 평가
+    cache = FoldCache(X, y)
+    rows = [
+        ('feature_selection.py', fast_seconds, result['selected']),
+        ('RFE (노트북)', rfe_seconds + (rfecv_seconds or 0), rfe_selected),
+        ('노트북 9개 (LEAGUE_FEATURES)', None, [name for name in LEAGUE_FEATURES if name in X.columns]),
+    ]
+    for name, seconds, selected in rows:
+        mean, std = cache.score(selected)
+        took = '-' if seconds is None else f"{seconds:.1f}초"
+        print(f"{name:<28} {took:>9} | CV 정확도 {mean:.4f} (±{std:.4f}) | {selected}")
+    if rfecv_seconds is not None:
+        print(f"\n노트북 방식 내역: RFECV {rfecv_seconds:.1f}초 (추천 개수 {rfecv.n_features_}개) + RFE {rfe_seconds:.1f}초")
+    overlap = set(result['selected']) & set(rfe_selected)
+    print(f"RFE 선택과 겹치는 피처: {len(overlap)}/{args.n_features}개 | 속도 {(rfe_seconds + (rfecv_seconds or 0)) / fast_seconds:.1f}배")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,118 @@
+"""
+⏱️ 불균형 보정 방식 벤치마크 (Imbalance Benchmark)
+train.py 분할 데이터로 리그(또는 코칭) 모델을 imbalance.py의 방식별로 학습해
+최대 메모리(peak RSS, 데이터 로드 후 증가분) / 학습 시간 / 테스트 세트 클래스별 F1을 표로 비교합니다.
+
+실행 방법: python benchmarks/bench_imbalance.py --work-dir train_work
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+import warnings
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src')
+sys.path.insert(0, SRC_DIR)
+
+warnings.filterwarnings('ignore')
+
+
+def peak_rss_mb():
+    # Linux ru_maxrss 단위는 KB
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def run_strategy(strategy, args):
+    """데이터 로드 -> 학습 -> 테스트 세트 평가 (별도 프로세스에서 실행)"""
+    import numpy as np
+    import pandas as pd
+    from sklearn.metrics import f1_score
+
+    import imbalance
+    from features import COACHING_FEATURES, LEAGUE_FEATURES
+    from train import COACHING_PARAMS, LEAGUE_PARAMS, TIER_ORDER, broad_tier
+
+    features, params = (LEAGUE_FEATURES, LEAGUE_PARAMS) if args.model == 'league' else \
+        (COACHING_FEATURES, COACHING_PARAMS)
+    df = pd.read_parquet(os.path.join(args.work_dir, 'features.parquet'),
+                         columns=list(dict.fromkeys(features + ['league_score'])))
+    split = np.load(os.path.join(args.work_dir, 'split.npz'))
+    train, test = df.iloc[split[f'{args.model}_train']], df.iloc[split[f'{args.model}_test']]
+    if args.sample:
+        train = train.sample(min(args.sample, len(train)), random_state=imbalance.RANDOM_STATE)
+    del df
+    y_train = broad_tier(train['league_score'].to_numpy())
+    y_test = broad_tier(test['league_score'].to_numpy())
+    X_train, X_test = train[features], test[features].to_numpy(dtype=np.float32)
+    loaded_mb = peak_rss_mb()
+
+    start = time.perf_counter()
+    model = imbalance.fit_lightgbm(X_train, y_train, params, strategy)
+    elapsed = time.perf_counter() - start
+    train_peak_mb = peak_rss_mb()
+
+    # SMOTE 계열은 합성 행까지 포함한 학습 행 수
+    fit_rows = len(y_train)
+    if strategy in ('smote', 'chunked_smote'):
+        fit_rows += sum(imbalance.smote_counts(y_train).values())
+    predicted = model.predict(X_test)
+    labels = np.unique(y_test)
+    f1 = f1_score(y_test, predicted, labels=labels, average=None, zero_division=0)
+    names = ['Unranked'] + TIER_ORDER
+    return {
+        'strategy': strategy, 'seconds': elapsed, 'peak_rss_mb': train_peak_mb,
+        'train_delta_mb': train_peak_mb - loaded_mb, 'rows': len(y_train), 'fit_rows': fit_rows,
+        'accuracy': float((predicted == y_test).mean()),
+        'f1': {names[c]: float(v) for c, v in zip(labels, f1)},
+    }
+
+
+def measure(strategy, args):
+    """별도 프로세스에서 실행해 peak RSS가 서로 섞이지 않게 측정"""
+    cmd = [sys.executable, os.path.abspath(__file__), '--work-dir', args.work_dir, '--model', args.model,
+           '--child', strategy]
+    if args.sample:
+        cmd += ['--sample', str(args.sample)]
+    proc = subprocess.run(cmd, capture_output=True, text=True)
+    if proc.returncode != 0:
+        return {'strategy': strategy, 'error': proc.stderr.strip().splitlines()[-1]}
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def main():
+    import imbalance
+
+    parser = argparse.ArgumentParser(description='불균형 보정 방식별 메모리/시간/F1 비교')
+    parser.add_argument('--work-dir', default='train_work', help='train.py 체크포인트 디렉토리')
+    parser.add_argument('--model', choices=['league', 'coaching'], default='league')
+    parser.add_argument('--sample', type=int, default=None, help='학습 행 표본 수 (기본: 전체)')
+    parser.add_argument('--strategies', nargs='+', default=list(imbalance.STRATEGIES), choices=imbalance.STRATEGIES)
+    parser.add_argument('--child', choices=imbalance.STRATEGIES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_strategy(args.child, args)))
+        return
+
+    results = [measure(strategy, args) for strategy in args.strategies]
+    done = [r for r in results if 'error' not in r]
+    classes = list(dict.fromkeys(name for r in done for name in r['f1']))
+    header = f"{'strategy':<17} {'fit rows':>11} {'train(s)':>9} {'peak(MB)':>9} {'+학습(MB)':>9} {'acc':>6} " + \
+        ' '.join(f"{name[:8]:>8}" for name in classes)
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        if 'error' in r:
+            print(f"{r['strategy']:<17} 건너뜀: {r['error']}")
+            continue
+        print(f"{r['strategy']:<17} {r['fit_rows']:>11,} {r['seconds']:>9.1f} {r['peak_rss_mb']:>9.0f} "
+              f"{r['train_delta_mb']:>9.0f} {r['accuracy']:>6.3f} " +
+              ' '.join(f"{r['f1'].get(name, float('nan')):>8.3f}" for name in classes))
+    print("\n+학습(MB): 데이터 로드 후 학습 중 늘어난 peak RSS / 클래스 열: 테스트 세트 F1")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,118 @@
+"""
+⏱️ 데이터 적재 벤치마크 (Ingestion Benchmark)
+노트북 방식(read_csv + copy + apply(axis=1))과 src/ingest.py 방식의
+실행 시간(wall time)과 최대 메모리(peak RSS)를 비교합니다.
+
+실행 방법: python benchmarks/bench_ingest.py --csv coc_clans_dataset.csv
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src')
+sys.path.insert(0, SRC_DIR)
+
+
+def run_notebook(csv_path):
+    """노트북 01/02의 적재 셀을 그대로 재현"""
+    import pandas as pd
+
+    coc_df = pd.read_csv(csv_path)
+    coc_df_clean = coc_df.copy()
+    coc_df_clean = coc_df_clean.drop(
+        columns=['clan_name', 'clan_description', 'clan_location', 'clan_badge_url'], errors='ignore'
+    )
+    coc_df_clean['war_total'] = coc_df_clean['war_wins'] + coc_df_clean['war_ties'] + coc_df_clean['war_losses']
+    coc_df_clean['win_rate'] = coc_df_clean.apply(
+        lambda row: row['war_wins'] / row['war_total'] if row['war_total'] > 0 else 0,
+        axis=1
+    )
+
+    def is_ghost(row):
+        if row['num_members'] < 5:
+            return True
+        if row['clan_level'] >= 2 and row['clan_capital_points'] == 0:
+            return True
+        if row['war_total'] == 0:
+            return True
+        return False
+
+    coc_df_clean['is_ghost'] = coc_df_clean.apply(is_ghost, axis=1)
+    coc_df_active = coc_df_clean[coc_df_clean['is_ghost'] == False].copy()
+    coc_df_active['activity_ratio'] = coc_df_active['mean_member_trophies'] / (coc_df_active['mean_member_level'] + 1)
+    coc_df_active['entry_gap'] = coc_df_active['mean_member_trophies'] - coc_df_active['required_trophies']
+    coc_df_active['points_per_member'] = coc_df_active['clan_points'] / coc_df_active['num_members']
+    return len(coc_df_clean), len(coc_df_active)
+
+
+def run_ingest(csv_path, chunksize):
+    """src/ingest.py 방식 (좁은 dtype + 청크 + 벡터 연산)"""
+    from ingest import load_clans
+
+    coc_df_clean = load_clans(csv_path, chunksize=chunksize)
+    coc_df_active = coc_df_clean[~coc_df_clean['is_ghost'].to_numpy()]
+    return len(coc_df_clean), len(coc_df_active)
+
+
+def run_ingest_active(csv_path, chunksize):
+    """활성 클랜만 스트리밍으로 남기는 방식 (청크마다 유령 클랜 제거)"""
+    from ingest import load_clans
+
+    coc_df_active = load_clans(csv_path, chunksize=chunksize, active_only=True)
+    return None, len(coc_df_active)
+
+
+MODES = {
+    'notebook': lambda args: run_notebook(args.csv),
+    'ingest': lambda args: run_ingest(args.csv, args.chunksize),
+    'ingest_active': lambda args: run_ingest_active(args.csv, args.chunksize),
+}
+
+
+def measure(mode, args):
+    """별도 프로세스에서 실행해 peak RSS가 서로 섞이지 않게 측정"""
+    cmd = [sys.executable, os.path.abspath(__file__), '--csv', args.csv,
+           '--chunksize', str(args.chunksize), '--child', mode]
+    output = subprocess.run(cmd, check=True, capture_output=True, text=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description='데이터 적재 벤치마크')
+    parser.add_argument('--csv', default='coc_clans_dataset.csv', help='원천 CSV 경로')
+    parser.add_argument('--chunksize', type=int, default=500_000, help='ingest 청크 크기')
+    parser.add_argument('--modes', nargs='+', default=list(MODES), choices=list(MODES))
+    parser.add_argument('--child', choices=list(MODES), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        start = time.perf_counter()
+        n_clean, n_active = MODES[args.child](args)
+        elapsed = time.perf_counter() - start
+        # Linux ru_maxrss 단위는 KB
+        peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+        print(json.dumps({'mode': args.child, 'seconds': elapsed, 'peak_rss_mb': peak_mb,
+                          'rows': n_clean, 'active_rows': n_active}))
+        return
+
+    print(f"{'mode':<15} {'wall(s)':>10} {'peak RSS(MB)':>14} {'active rows':>12}")
+    print("-" * 55)
+    results = [measure(mode, args) for mode in args.modes]
+    for r in results:
+        print(f"{r['mode']:<15} {r['seconds']:>10.2f} {r['peak_rss_mb']:>14.1f} {r['active_rows']:>12,}")
+
+    base = next((r for r in results if r['mode'] == 'notebook'), None)
+    if base:
+        print("-" * 55)
+        for r in results:
+            if r is not base:
+                print(f"{r['mode']}: {base['seconds'] / r['seconds']:.1f}x 빠름, "
+                      f"메모리 {r['peak_rss_mb'] / base['peak_rss_mb']:.0%}")
+
+
+if __name__ == '__main__':
+    main()
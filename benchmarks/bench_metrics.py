@@ -0,0 +1,75 @@
+"""
+⏱️ 계측 오버헤드 벤치마크 (Instrumentation Overhead Benchmark)
+metrics.timer() 한 구간의 비용을 계측 꺼짐 / 켜짐 / 계측 없음으로 비교하고,
+--model-dir을 주면 실제 한 건 예측(transform_one + predict_proba) 대비 비율도 출력합니다.
+
+실행 방법: python benchmarks/bench_metrics.py --model-dir .
+"""
+import argparse
+import os
+import sys
+import time
+import warnings
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src')
+sys.path.insert(0, SRC_DIR)
+
+warnings.filterwarnings('ignore')
+
+SURVIVAL_INPUT = {'mean_member_trophies': 1500, 'mean_member_level': 100, 'required_trophies': 800,
+                  'war_frequency': 'always', 'clan_type': 'inviteOnly', 'isFamilyFriendly': 1}
+
+
+def per_call_ns(fn, n):
+    start = time.perf_counter_ns()
+    fn(n)
+    return (time.perf_counter_ns() - start) / n
+
+
+def bare(n):
+    for _ in range(n):
+        pass
+
+
+def timed(n):
+    import metrics
+    for _ in range(n):
+        with metrics.timer('bench', 'stage'):
+            pass
+
+
+def main():
+    import metrics
+
+    parser = argparse.ArgumentParser(description='metrics.timer 오버헤드 측정')
+    parser.add_argument('--n', type=int, default=1_000_000, help='반복 횟수')
+    parser.add_argument('--model-dir', default=None, help='주면 생존 모델 한 건 예측 지연시간과 비교')
+    args = parser.parse_args()
+
+    base = per_call_ns(bare, args.n)
+    metrics.enable(False)
+    disabled = per_call_ns(timed, args.n) - base
+    metrics.enable(True)
+    enabled = per_call_ns(timed, args.n) - base
+    metrics.REGISTRY.reset()
+
+    print(f"{'mode':<10} {'구간당(ns)':>12}")
+    print("-" * 23)
+    print(f"{'disabled':<10} {disabled:>12.0f}")
+    print(f"{'enabled':<10} {enabled:>12.0f}")
+
+    if args.model_dir:
+        import artifacts
+        model, transform = artifacts.load_survival_models(args.model_dir, compiled=True)
+        n = 2000
+        start = time.perf_counter_ns()
+        for _ in range(n):
+            model.predict_proba(transform.transform_one(**SURVIVAL_INPUT))
+        predict_ns = (time.perf_counter_ns() - start) / n
+        # 앱 한 번 예측에 구간 3개(load / transform / predict_proba)
+        print(f"\n한 건 예측 {predict_ns / 1000:,.1f}us 대비 구간 3개 비용: "
+              f"꺼짐 {3 * disabled / predict_ns:.3%} / 켜짐 {3 * enabled / predict_ns:.3%}")
+
+
+if __name__ == '__main__':
+    main()
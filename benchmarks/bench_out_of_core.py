@@ -0,0 +1,158 @@
+"""
+⏱️ 대용량 학습 벤치마크 (Out-of-core Training Benchmark)
+같은 모델을 노트북 방식과 out_of_core.py로 학습해 peak RSS / 소요 시간 / 검증 정확도를 비교합니다.
+
+- notebook: pd.read_csv로 전체 로드 -> 파생변수 -> df_ml = copy() -> (df_clean) -> train_test_split -> LGBMClassifier.fit
+- out_of_core: 피처 스토어 -> 청크 단위 바이너리 Dataset(.bin) 생성 -> lgb.train
+- out_of_core (.bin 재사용): 저장된 Dataset으로 바로 학습 (원천을 읽지 않음)
+- ingest: 피처 스토어가 최신이 아니면 먼저 한 번 생성 (청크 단위 적재, 모델과 무관한 1회 비용)
+
+방식마다 별도 프로세스에서 실행해 peak RSS가 섞이지 않게 측정합니다.
+
+실행 방법: python benchmarks/bench_out_of_core.py --csv coc_clans_dataset.csv --store feature_store --task survival
+"""
+import argparse
+import json
+import os
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import warnings
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src')
+sys.path.insert(0, SRC_DIR)
+
+warnings.filterwarnings('ignore')
+
+METHODS = ['ingest', 'notebook', 'out_of_core', 'out_of_core_cached']
+
+
+def peak_rss_mb():
+    # Linux ru_maxrss 단위는 KB
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def run_notebook(args):
+    """노트북 02 흐름 (전체 DataFrame + 복사본 + train_test_split)"""
+    import numpy as np
+    import pandas as pd
+    from lightgbm import LGBMClassifier
+    from sklearn.model_selection import train_test_split
+    from sklearn.preprocessing import LabelEncoder
+
+    import out_of_core
+    from ingest import add_derived_features
+    from train import RANDOM_STATE, TEST_SIZE, broad_tier, league_score
+
+    task = out_of_core.TASKS[args.task]
+    start = time.perf_counter()
+    coc_df = pd.read_csv(args.csv)
+    add_derived_features(coc_df)
+    df_ml = (coc_df if task['all_clans'] else coc_df[~coc_df['is_ghost']]).copy()
+    df_ml['league_score'] = league_score(df_ml['clan_war_league'])
+    for source in ['war_frequency', 'clan_type']:
+        df_ml[f'{source}_code'] = LabelEncoder().fit_transform(df_ml[source].astype(str))
+    if args.task == 'survival':
+        y = (df_ml['clan_capital_points'] > 0).astype(int)
+    elif args.task == 'league':
+        df_ml = df_ml[df_ml['league_score'] > 0].copy()
+        y = LabelEncoder().fit_transform(np.array(out_of_core.TIER_ORDER)[broad_tier(df_ml['league_score']) - 1])
+    else:
+        y = broad_tier(df_ml['league_score'])
+    X = df_ml[task['features']]
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=TEST_SIZE, random_state=RANDOM_STATE,
+                                                        stratify=y)
+    loaded = time.perf_counter() - start
+
+    start = time.perf_counter()
+    if args.task == 'survival':
+        pos_weight = float((y_train == 0).sum() / max((y_train == 1).sum(), 1))
+        model = LGBMClassifier(**task['params'], scale_pos_weight=pos_weight)
+    else:
+        model = LGBMClassifier(**task['params'], class_weight='balanced')
+    model.fit(X_train, y_train)
+    trained = time.perf_counter() - start
+    return {'method': 'notebook', 'load_seconds': loaded, 'train_seconds': trained, 'rows': len(X_train),
+            'accuracy': float((model.predict(X_test) == y_test).mean()), 'peak_rss_mb': peak_rss_mb()}
+
+
+def run_out_of_core(args, rebuild):
+    import out_of_core
+
+    output_dir = tempfile.mkdtemp(prefix='ooc_models_')
+    try:
+        report = out_of_core.train_out_of_core(args.store, args.task, output_dir, args.work_dir, rebuild=rebuild,
+                                               log=lambda *a: None)
+    finally:
+        shutil.rmtree(output_dir, ignore_errors=True)
+    return {'method': 'out_of_core' if rebuild else 'out_of_core_cached',
+            'load_seconds': report['dataset_seconds'], 'train_seconds': report['train_seconds'],
+            'rows': report['rows']['train'], 'accuracy': report['accuracy'], 'peak_rss_mb': report['peak_rss_mb']}
+
+
+def run_ingest(args):
+    from feature_store import ensure_feature_store, is_fresh
+
+    start = time.perf_counter()
+    fresh = is_fresh(args.csv, args.store)
+    ensure_feature_store(args.csv, args.store)
+    return {'method': 'ingest' if not fresh else 'ingest (최신, 건너뜀)', 'load_seconds': time.perf_counter() - start,
+            'train_seconds': 0.0, 'rows': None, 'accuracy': None, 'peak_rss_mb': peak_rss_mb()}
+
+
+def run_method(method, args):
+    if method == 'ingest':
+        return run_ingest(args)
+    if method == 'notebook':
+        return run_notebook(args)
+    return run_out_of_core(args, rebuild=method == 'out_of_core')
+
+
+def measure(method, args):
+    """별도 프로세스에서 실행해 peak RSS가 서로 섞이지 않게 측정"""
+    cmd = [sys.executable, os.path.abspath(__file__), '--csv', args.csv, '--store', args.store,
+           '--work-dir', args.work_dir, '--task', args.task, '--child', method]
+    proc = subprocess.run(cmd, capture_output=True, text=True)
+    if proc.returncode != 0:
+        return {'method': method, 'error': proc.stderr.strip().splitlines()[-1]}
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def main():
+    import out_of_core
+
+    parser = argparse.ArgumentParser(description='노트북 방식 vs out-of-core 학습: peak RSS / 시간 / 정확도')
+    parser.add_argument('--csv', default='coc_clans_dataset.csv', help='원천 CSV 경로')
+    parser.add_argument('--store', default='feature_store', help='피처 스토어 디렉토리 (없으면 생성)')
+    parser.add_argument('--work-dir', default=out_of_core.DEFAULT_WORK_DIR, help='바이너리 Dataset(.bin) 디렉토리')
+    parser.add_argument('--task', choices=list(out_of_core.TASKS), default='survival')
+    parser.add_argument('--methods', nargs='+', default=METHODS, choices=METHODS)
+    parser.add_argument('--child', choices=METHODS, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_method(args.child, args)))
+        return
+
+    # .bin 재사용은 out_of_core가 만든 파일을 쓰므로 항상 그 뒤에 실행
+    methods = [method for method in METHODS if method in args.methods]
+    results = [measure(method, args) for method in methods]
+    print(f"{args.task} 모델 | {os.path.basename(args.csv)}")
+    print(f"{'method':<24} {'학습 행':>11} {'로드(s)':>8} {'학습(s)':>8} {'peak(MB)':>9} {'acc':>7}")
+    print("-" * 72)
+    for r in results:
+        if 'error' in r:
+            print(f"{r['method']:<24} 실패: {r['error']}")
+            continue
+        rows = f"{r['rows']:,}" if r['rows'] else '-'
+        accuracy = f"{r['accuracy']:.4f}" if r['accuracy'] is not None else '-'
+        print(f"{r['method']:<24} {rows:>11} {r['load_seconds']:>8.1f} {r['train_seconds']:>8.1f} "
+              f"{r['peak_rss_mb']:>9.0f} {accuracy:>7}")
+    print("\n로드(s): 노트북은 CSV 로드 ~ 분할, out_of_core는 바이너리 Dataset 생성(또는 .bin 로드)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,128 @@
+"""
+⏱️ 티어별 분위수 벤치마크 (Tier Quantile Benchmark)
+피처 스토어 활성 클랜의 티어 x 피처 분위수를 두 방식으로 계산해 시간 / peak 메모리 / 결과 크기 / 정확도를 비교합니다.
+
+- exact: 활성 클랜 전체를 DataFrame으로 읽어 groupby().quantile() (노트북 방식)
+- sketch: sketches.py 스트리밍 t-digest (배치 단위로 읽고 버림, --workers로 병렬 후 merge)
+
+실행 방법: python benchmarks/bench_sketches.py --store feature_store --workers 2
+"""
+import argparse
+import json
+import os
+import pickle
+import resource
+import subprocess
+import sys
+import time
+import warnings
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src')
+sys.path.insert(0, SRC_DIR)
+
+warnings.filterwarnings('ignore')
+
+QUANTILES = [0.01, 0.1, 0.25, 0.5, 0.75, 0.9, 0.99]
+
+
+def peak_rss_mb():
+    # Linux ru_maxrss 단위는 KB
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def run_method(method, args):
+    """한 방식으로 분위수 표 계산 (별도 프로세스에서 실행)"""
+    import numpy as np
+
+    import sketches
+    from feature_store import load_active
+    from train import TIER_ORDER, broad_tier, league_score
+
+    features = sketches.default_features()
+    base_mb = peak_rss_mb()
+    start = time.perf_counter()
+    if method == 'exact':
+        df = load_active(args.store, columns=['clan_war_league'] + features)
+        df['tier'] = broad_tier(league_score(df['clan_war_league']))
+        table = df.groupby('tier')[features].quantile(QUANTILES)
+        size = len(pickle.dumps(df[features + ['tier']]))
+    else:
+        sketch = sketches.build_sketches(args.store, features, workers=args.workers)
+        table = sketch.quantile_table(QUANTILES)
+        table.index = table.index.set_levels([sketch.labels.index(label) for label in table.index.levels[0]], level=0)
+        size = len(pickle.dumps(sketch))
+    elapsed = time.perf_counter() - start
+    labels = ['Unranked'] + TIER_ORDER
+    return {
+        'method': method, 'seconds': elapsed, 'peak_rss_mb': peak_rss_mb(), 'delta_mb': peak_rss_mb() - base_mb,
+        'size_kb': size / 1024,
+        'table': {f'{labels[int(t)]}|{q}': [float(v) for v in np.asarray(row)] for (t, q), row in table.iterrows()},
+    }
+
+
+def rank_errors(store, sketch_table):
+    """스케치 분위수가 실제 데이터에서 차지하는 순위와 요청 분위수의 차이 (같은 값이 여러 행이면 그 구간 안은 오차 0)"""
+    import numpy as np
+
+    import sketches
+    from feature_store import load_active
+    from train import TIER_ORDER, broad_tier, league_score
+
+    features = sketches.default_features()
+    df = load_active(store, columns=['clan_war_league'] + features)
+    tiers = broad_tier(league_score(df['clan_war_league']))
+    labels = ['Unranked'] + TIER_ORDER
+    errors = {}
+    for j, feature in enumerate(features):
+        worst = 0.0
+        for key, row in sketch_table.items():
+            label, q = key.split('|')
+            values = np.sort(df.loc[tiers == labels.index(label), feature].dropna().to_numpy(np.float64))
+            low = np.searchsorted(values, row[j], 'left') / len(values)
+            high = np.searchsorted(values, row[j], 'right') / len(values)
+            worst = max(worst, low - float(q), float(q) - high)
+        errors[feature] = max(worst, 0.0)
+    return errors
+
+
+def measure(method, args):
+    """별도 프로세스에서 실행해 peak RSS가 서로 섞이지 않게 측정"""
+    cmd = [sys.executable, os.path.abspath(__file__), '--store', args.store, '--workers', str(args.workers),
+           '--child', method]
+    proc = subprocess.run(cmd, capture_output=True, text=True)
+    if proc.returncode != 0:
+        return {'method': method, 'error': proc.stderr.strip().splitlines()[-1]}
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def main():
+    from feature_store import DEFAULT_STORE
+
+    parser = argparse.ArgumentParser(description='티어별 분위수: 전체 DataFrame vs 스트리밍 t-digest')
+    parser.add_argument('--store', default=DEFAULT_STORE, help='피처 스토어 디렉토리')
+    parser.add_argument('--workers', type=int, default=1, help='스케치 워커 프로세스 수')
+    parser.add_argument('--child', choices=['exact', 'sketch'], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_method(args.child, args)))
+        return
+
+    results = {method: measure(method, args) for method in ['exact', 'sketch']}
+    print(f"{'method':<8} {'time(s)':>8} {'peak(MB)':>9} {'+계산(MB)':>10} {'크기(KB)':>10}")
+    print("-" * 49)
+    for method, r in results.items():
+        if 'error' in r:
+            print(f"{method:<8} 건너뜀: {r['error']}")
+            continue
+        print(f"{method:<8} {r['seconds']:>8.2f} {r['peak_rss_mb']:>9.0f} {r['delta_mb']:>10.0f} {r['size_kb']:>10.1f}")
+
+    if 'error' not in results['sketch']:
+        print(f"\n[스케치 분위수 순위 오차 (최대, 분위수 {QUANTILES})]")
+        for feature, error in rank_errors(args.store, results['sketch']['table']).items():
+            print(f"  {feature:<25} {error:.4f}")
+    print("\n+계산(MB): 프로세스 시작 후 계산 중 늘어난 peak RSS / 크기: exact는 원본 열, sketch는 pkl")
+
+
+if __name__ == '__main__':
+    main()
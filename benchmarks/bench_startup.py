@@ -0,0 +1,148 @@
+"""
+⏱️ 모델 콜드 스타트 벤치마크 (Startup Benchmark)
+새 프로세스에서 모델을 로드하고 첫 예측까지 걸리는 시간과 상주 메모리(peak RSS)를 비교합니다.
+
+- eager:          기존 app_unified.py처럼 pkl 6개를 모두 joblib.load
+- lazy_survival:  생존 탭/엔드포인트만 사용 (artifacts.load_survival_models)
+- lazy_league:    리그 탭/엔드포인트만 사용 (artifacts.load_league_models)
+- native:         두 모델 모두, 네이티브 부스터 파일로 로드 (python src/artifacts.py로 먼저 내보내기)
+
+실행 방법: python benchmarks/bench_startup.py --model-dir .
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src')
+sys.path.insert(0, SRC_DIR)
+
+SURVIVAL_INPUT = {
+    'mean_member_trophies': 1500, 'mean_member_level': 100, 'required_trophies': 800,
+    'war_frequency': 'always', 'clan_type': 'inviteOnly', 'isFamilyFriendly': 1,
+}
+LEAGUE_INPUT = {
+    'clan_level': 10, 'clan_points': 20000, 'war_wins': 100, 'clan_capital_points': 5000,
+    'mean_member_level': 120, 'mean_member_trophies': 2000, 'activity_ratio': 15.0,
+    'entry_gap': 500, 'points_per_member': 500.0,
+}
+
+
+def run_eager(model_dir):
+    import joblib
+    from features import league_transform, survival_transform
+
+    def path(name):
+        return os.path.join(model_dir, name)
+
+    survival_model = joblib.load(path('clan_retention_model.pkl'))
+    survival = survival_transform(joblib.load(path('war_frequency_encoder.pkl')),
+                                  joblib.load(path('clan_type_encoder.pkl')))
+    league_model = joblib.load(path('league_prediction_model.pkl'))
+    joblib.load(path('league_label_encoder.pkl'))
+    joblib.load(path('tier_standards.pkl'))
+    return [(survival_model, survival, SURVIVAL_INPUT), (league_model, league_transform(), LEAGUE_INPUT)]
+
+
+def run_lazy_survival(model_dir, prefer_native=False):
+    import artifacts
+    from features import survival_transform
+
+    model = artifacts.load_model('survival_model', model_dir, prefer_native=prefer_native)
+    transform = survival_transform(artifacts.load_artifact('war_frequency_encoder', model_dir),
+                                   artifacts.load_artifact('clan_type_encoder', model_dir))
+    return [(model, transform, SURVIVAL_INPUT)]
+
+
+def run_lazy_league(model_dir, prefer_native=False):
+    import artifacts
+    from features import league_transform
+
+    model = artifacts.load_model('league_model', model_dir, prefer_native=prefer_native)
+    artifacts.load_artifact('league_encoder', model_dir)
+    artifacts.load_artifact('tier_standards', model_dir)
+    return [(model, league_transform(), LEAGUE_INPUT)]
+
+
+def run_native(model_dir):
+    import artifacts
+
+    bundles = run_lazy_survival(model_dir, prefer_native=True) + run_lazy_league(model_dir, prefer_native=True)
+    if not all(isinstance(model, artifacts.NativeClassifier) for model, _, _ in bundles):
+        raise SystemExit(f"네이티브 파일이 없습니다. python src/artifacts.py --model-dir {model_dir}")
+    return bundles
+
+
+MODES = {
+    'eager': run_eager,
+    'lazy_survival': run_lazy_survival,
+    'lazy_league': run_lazy_league,
+    'native': run_native,
+}
+
+
+def child(mode, model_dir):
+    start = time.perf_counter()
+    # 라이브러리 import 비용은 모든 모드에 공통이라 따로 기록 (lightgbm은 sklearn도 함께 import)
+    import joblib  # noqa: F401
+    import lightgbm  # noqa: F401
+    import numpy  # noqa: F401
+    import_sec = time.perf_counter() - start
+
+    bundles = MODES[mode](model_dir)
+    load_sec = time.perf_counter() - start - import_sec
+
+    for model, transform, values in bundles:
+        model.predict_proba(transform.transform_one(**values))
+    total_sec = time.perf_counter() - start
+
+    # Linux ru_maxrss 단위는 KB
+    peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    return {'mode': mode, 'import_sec': import_sec, 'load_sec': load_sec,
+            'first_predict_sec': total_sec - import_sec - load_sec, 'total_sec': total_sec, 'peak_rss_mb': peak_mb}
+
+
+def measure(mode, args):
+    """별도 프로세스에서 실행해 import 캐시 / peak RSS가 섞이지 않게 측정"""
+    cmd = [sys.executable, '-W', 'ignore', os.path.abspath(__file__), '--model-dir', args.model_dir, '--child', mode]
+    runs = []
+    for _ in range(args.repeat):
+        output = subprocess.run(cmd, check=True, capture_output=True, text=True).stdout
+        runs.append(json.loads(output.strip().splitlines()[-1]))
+    # 반복 중 가장 빠른 값 (디스크 캐시가 데워진 상태의 콜드 스타트)
+    return min(runs, key=lambda r: r['total_sec'])
+
+
+def main():
+    parser = argparse.ArgumentParser(description='모델 콜드 스타트 벤치마크')
+    parser.add_argument('--model-dir', default='.', help='*.pkl (및 네이티브 파일) 디렉토리')
+    parser.add_argument('--modes', nargs='+', default=list(MODES), choices=list(MODES))
+    parser.add_argument('--repeat', type=int, default=3, help='모드별 반복 횟수 (최솟값 사용)')
+    parser.add_argument('--child', choices=list(MODES), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(child(args.child, args.model_dir)))
+        return
+
+    print(f"{'mode':<15} {'import(s)':>10} {'load(s)':>9} {'1st pred(s)':>12} {'total(s)':>9} {'peak RSS(MB)':>13}")
+    print("-" * 73)
+    results = [measure(mode, args) for mode in args.modes]
+    for r in results:
+        print(f"{r['mode']:<15} {r['import_sec']:>10.2f} {r['load_sec']:>9.3f} {r['first_predict_sec']:>12.3f} "
+              f"{r['total_sec']:>9.2f} {r['peak_rss_mb']:>13.1f}")
+
+    base = next((r for r in results if r['mode'] == 'eager'), None)
+    if base:
+        print("-" * 73)
+        for r in results:
+            if r is not base:
+                print(f"{r['mode']}: 모델 로드 {base['load_sec'] / r['load_sec']:.1f}x 빠름, "
+                      f"메모리 {r['peak_rss_mb'] / base['peak_rss_mb']:.0%}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,84 @@
+"""
+⏱️ what-if 스윕 벤치마크 (Sensitivity Sweep Benchmark)
+app_unified.py의 what-if 곡선 하나(격자 수천 점)를 예측하는 시간을 두 방식으로 비교합니다.
+
+- batch: 격자 전체를 predict_proba 한 번 (TreeEnsemble / 원본 모델)
+- path: sweeps.py 기본 경로 (TreeEnsemble.predict_proba_path, 안쪽 피처 한 줄씩 행 구간 추론)
+- max_diff: 두 방식 확률의 최대 차이
+
+실행 방법: python benchmarks/bench_sweeps.py --model-dir . --points 3000
+"""
+import argparse
+import os
+import sys
+import time
+import warnings
+
+import numpy as np
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src')
+sys.path.insert(0, SRC_DIR)
+
+warnings.filterwarnings('ignore')
+
+WAR_FREQUENCIES = ['always', 'moreThanOncePerWeek', 'oncePerWeek', 'lessThanOncePerWeek', 'never', 'unknown']
+SURVIVAL_BASE = {
+    'mean_member_trophies': 1500, 'mean_member_level': 100, 'required_trophies': 800,
+    'war_frequency': 'always', 'clan_type': 'inviteOnly', 'isFamilyFriendly': 1
+}
+LEAGUE_BASE = {
+    'clan_level': 10, 'clan_points': 20000, 'war_wins': 100, 'clan_capital_points': 5000,
+    'mean_member_level': 120, 'mean_member_trophies': 2000, 'activity_ratio': 15.0,
+    'entry_gap': 500, 'points_per_member': 500.0
+}
+
+
+def timed(fn, n):
+    start = time.perf_counter()
+    for _ in range(n):
+        result = fn()
+    return (time.perf_counter() - start) / n, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='what-if 스윕: 배치 predict_proba vs 구간 추론')
+    parser.add_argument('--model-dir', default='.', help='*.pkl 모델 디렉토리')
+    parser.add_argument('--points', type=int, default=3000, help='곡선 하나의 격자 점 수')
+    parser.add_argument('--rounds', type=int, default=5, help='측정 반복 횟수')
+    args = parser.parse_args()
+
+    import artifacts
+    import sweeps
+    from tree_engine import TreeEnsemble
+
+    survival_model, survival_features = artifacts.load_survival_models(args.model_dir)
+    league_model, league_encoder, _, league_features = artifacts.load_league_models(args.model_dir)
+
+    inner = args.points // len(WAR_FREQUENCIES)
+    cases = [
+        ('survival required_trophies x war', survival_model, survival_features, SURVIVAL_BASE,
+         {'war_frequency': WAR_FREQUENCIES, 'required_trophies': np.linspace(0, 5500, inner)}),
+        ('survival mean_member_trophies', survival_model, survival_features, SURVIVAL_BASE,
+         {'mean_member_trophies': np.linspace(0, 6000, args.points)}),
+        ('league clan_points', league_model, league_features, LEAGUE_BASE,
+         {'clan_points': np.linspace(0, 100000, args.points)}),
+        ('league activity_ratio', league_model, league_features, LEAGUE_BASE,
+         {'activity_ratio': np.linspace(0, 100, args.points)}),
+    ]
+
+    print(f"{'곡선':<34} {'점':>6} {'model':>8} {'batch(ms)':>10} {'path(ms)':>9} {'max_diff':>9}")
+    print("-" * 82)
+    for name, model, transform, base, grid in cases:
+        _, columns = sweeps.build_grid(base, grid)
+        X = transform.transform(columns)
+        block = len(grid[list(grid)[-1]])
+        engine = TreeEnsemble.from_model(model)
+        for label, scorer in [('native', model), ('compiled', engine)]:
+            batch_s, expected = timed(lambda: scorer.predict_proba(X), args.rounds)
+            path_s, proba = timed(lambda: sweeps.predict_grid(engine, X, block), args.rounds)
+            print(f"{name:<34} {len(X):>6} {label:>8} {batch_s * 1000:>10.1f} {path_s * 1000:>9.1f} "
+                  f"{np.abs(proba - expected).max():>9.1e}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,100 @@
+"""
+⏱️ 트리 엔진 벤치마크 (Tree Engine Benchmark)
+src/tree_engine.py(NumPy 트리 순회)와 원본 모델(sklearn 래퍼 또는 네이티브 부스터)의
+예측 결과가 비트 단위로 같은지 확인하고, 1건 / 64건 / 10,000건 예측 지연시간을 비교합니다.
+
+실행 방법:
+    python benchmarks/bench_tree_engine.py --model-dir . --csv coc_clans_dataset.csv
+    (--csv가 없으면 앱 입력 범위 안의 무작위 값으로 측정)
+"""
+import argparse
+import os
+import sys
+import time
+import warnings
+
+import numpy as np
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src')
+sys.path.insert(0, SRC_DIR)
+
+warnings.filterwarnings('ignore', message='X does not have valid feature names')
+
+BATCH_SIZES = [1, 64, 10_000]
+
+
+def sample_inputs(args, survival_features, league_features):
+    """검증/측정용 입력 (CSV의 뒤쪽 청크 = 학습에 쓰지 않은 표본으로 간주)"""
+    if args.csv:
+        from ingest import iter_clan_chunks
+
+        chunk = None
+        for chunk in iter_clan_chunks(args.csv, chunksize=args.sample):
+            pass
+        return survival_features.transform(chunk), league_features.transform(chunk)
+
+    rng = np.random.default_rng(0)
+    n = args.sample
+    level = rng.integers(1, 300, n)
+    trophies = rng.integers(0, 6000, n)
+    data = {
+        'mean_member_trophies': trophies, 'mean_member_level': level,
+        'required_trophies': rng.integers(0, 5500, n),
+        'war_frequency': rng.choice(['always', 'moreThanOncePerWeek', 'oncePerWeek', 'never', 'unknown'], n),
+        'clan_type': rng.choice(['inviteOnly', 'open', 'closed'], n),
+        'isFamilyFriendly': rng.integers(0, 2, n),
+        'clan_level': rng.integers(1, 30, n), 'clan_points': rng.integers(0, 100000, n),
+        'war_wins': rng.integers(0, 2000, n), 'clan_capital_points': rng.integers(0, 100000, n),
+        'num_members': rng.integers(1, 50, n),
+    }
+    return survival_features.transform(data), league_features.transform(data)
+
+
+def latency_ms(func, X, min_seconds=0.5):
+    """여러 번 반복해 한 번 호출의 중앙값(ms)"""
+    func(X)
+    times = []
+    deadline = time.perf_counter() + min_seconds
+    while time.perf_counter() < deadline or len(times) < 3:
+        start = time.perf_counter()
+        func(X)
+        times.append(time.perf_counter() - start)
+    return float(np.median(times)) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description='트리 엔진 정확도/지연시간 벤치마크')
+    parser.add_argument('--model-dir', default='.', help='*.pkl 모델 디렉토리')
+    parser.add_argument('--csv', help='검증 표본을 뽑을 원천 CSV (없으면 무작위 입력)')
+    parser.add_argument('--sample', type=int, default=10_000, help='검증 표본 크기 (10k 측정에도 사용)')
+    args = parser.parse_args()
+
+    import artifacts
+    from tree_engine import TreeEnsemble
+
+    survival_model, survival_features = artifacts.load_survival_models(args.model_dir)
+    league_model, _, _, league_features = artifacts.load_league_models(args.model_dir)
+    X_survival, X_league = sample_inputs(args, survival_features, league_features)
+
+    for name, model, X in [('survival', survival_model, X_survival), ('league', league_model, X_league)]:
+        start = time.perf_counter()
+        engine = TreeEnsemble.from_model(model)
+        build_sec = time.perf_counter() - start
+
+        expected = model.predict_proba(X)
+        actual = engine.predict_proba(X)
+        print(f"\n[{name}] {engine} (변환 {build_sec:.2f}초)")
+        print(f"  비트 일치: {np.array_equal(actual, expected)} "
+              f"(최대 차이 {np.abs(actual - expected).max():.3g}, 예측 클래스 일치율 "
+              f"{(actual.argmax(axis=1) == expected.argmax(axis=1)).mean():.2%}, 표본 {len(X):,}건)")
+
+        print(f"  {'rows':>7} {'wrapper(ms)':>12} {'engine(ms)':>11} {'speedup':>8}")
+        for n in BATCH_SIZES:
+            batch = X[:n]
+            wrapper = latency_ms(model.predict_proba, batch)
+            compiled = latency_ms(engine.predict_proba, batch)
+            print(f"  {len(batch):>7,} {wrapper:>12.3f} {compiled:>11.3f} {wrapper / compiled:>7.2f}x")
+
+
+if __name__ == '__main__':
+    main()
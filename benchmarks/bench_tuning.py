@@ -0,0 +1,70 @@
+"""
+⏱️ 튜닝 방식 비교 벤치마크 (Tuning Benchmark)
+같은 trial 수로 노트북 방식(한 프로세스, 매 trial 전체 데이터, 프루닝 없음)과
+tuning.py 방식(병렬 워커 + 데이터 크기 단계 + 프루닝)을 돌려
+전체 소요 시간 / 목표 정확도 도달 시간 / 최고 검증 정확도를 비교합니다.
+
+실행 방법: python benchmarks/bench_tuning.py --csv coc_clans_dataset.csv --n-trials 20 --workers 4
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+import warnings
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src')
+sys.path.insert(0, SRC_DIR)
+
+warnings.filterwarnings('ignore')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='노트북 방식 vs 병렬/프루닝 튜닝 비교')
+    parser.add_argument('--csv', default=None, help='원천 CSV (주면 train.py ingest ~ split 먼저 실행)')
+    parser.add_argument('--work-dir', default='train_work', help='train.py 체크포인트 디렉토리')
+    parser.add_argument('--n-trials', type=int, default=20)
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--pruner', choices=['median', 'sha', 'hyperband'], default='median')
+    parser.add_argument('--target-accuracy', type=float, default=None, help='기본: tuning.TARGET_ACCURACY')
+    parser.add_argument('--target-within-1', type=float, default=None, help='기본: tuning.TARGET_WITHIN_1')
+    args = parser.parse_args()
+
+    import optuna
+    import tuning
+    from train import prepare_data
+
+    optuna.logging.set_verbosity(optuna.logging.WARNING)
+    if args.csv:
+        prepare_data(args.csv, args.work_dir, log=lambda *a: None)
+    target_accuracy = args.target_accuracy or tuning.TARGET_ACCURACY
+    target_within_1 = args.target_within_1 or tuning.TARGET_WITHIN_1
+
+    configs = [
+        ('노트북 방식 (직렬, 전체 데이터)', dict(workers=1, fractions=(1.0,), pruner='none', n_jobs=-1,
+                                                  early_stopping_rounds=0)),
+        (f'tuning.py ({args.workers} 워커, {args.pruner})', dict(workers=args.workers, pruner=args.pruner)),
+    ]
+    print(f"trial {args.n_trials}개 / 목표: 정확도 {target_accuracy:.0%}, ±1 티어 {target_within_1:.0%}")
+    baseline_best = None
+    with tempfile.TemporaryDirectory() as tmp:
+        for i, (name, config) in enumerate(configs):
+            start = time.perf_counter()
+            study = tuning.tune(args.work_dir, os.path.join(tmp, f'study{i}.journal'), n_trials=args.n_trials,
+                                **config)
+            elapsed = time.perf_counter() - start
+
+            summary = tuning.summarize(study, target_accuracy, target_within_1)
+            if baseline_best is None:
+                baseline_best = summary['best_accuracy']
+            reach = summary['time_to_target']
+            reach_baseline = tuning.time_to_target(study, baseline_best, 0.0)
+            print(f"  {name}")
+            print(f"    전체 {elapsed:.1f}초 | 완료 {summary['complete']} / 중단 {summary['pruned']} | "
+                  f"최고 정확도 {summary['best_accuracy']:.2%} (±1 티어 {summary['best_within_1']:.2%})")
+            print(f"    목표 도달: {'미도달' if reach is None else f'{reach:.1f}초'} | "
+                  f"노트북 방식 최고 정확도 도달: {'미도달' if reach_baseline is None else f'{reach_baseline:.1f}초'}")
+
+
+if __name__ == '__main__':
+    main()
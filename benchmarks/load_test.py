@@ -0,0 +1,205 @@
+"""
+🚦 예측 서버 부하 테스트 (Prediction Server Load Test)
+src/serve.py 서버에 keep-alive 연결 여러 개로 동시에 요청을 보내고
+지연시간(p50/p95/p99)과 초당 요청 수(RPS), 서버 측 평균 배치 크기를 출력합니다.
+
+실행 방법:
+    # 이미 떠 있는 서버에 요청
+    python benchmarks/load_test.py --endpoint league --concurrency 32 --requests 5000
+    # 서버를 직접 띄워서 측정 (종료 시 함께 정리)
+    python benchmarks/load_test.py --spawn --model-dir . --max-batch-size 64 --max-wait-ms 2
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+SERVER = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src', 'serve.py')
+
+WAR_FREQUENCIES = ['always', 'moreThanOncePerWeek', 'oncePerWeek', 'lessThanOncePerWeek', 'never', 'unknown']
+CLAN_TYPES = ['inviteOnly', 'open', 'closed']
+
+
+# ==========================================
+# 요청 본문 생성 (앱 입력 범위 안에서 무작위)
+# ==========================================
+def survival_payload(rng):
+    return {
+        'mean_member_trophies': rng.randint(0, 6000),
+        'mean_member_level': rng.randint(1, 300),
+        'required_trophies': rng.randint(0, 5500),
+        'war_frequency': rng.choice(WAR_FREQUENCIES),
+        'clan_type': rng.choice(CLAN_TYPES),
+        'isFamilyFriendly': rng.random() < 0.5,
+    }
+
+
+def league_payload(rng):
+    level = rng.randint(1, 300)
+    trophies = rng.randint(0, 6000)
+    return {
+        'clan_level': rng.randint(1, 30),
+        'clan_points': rng.randint(0, 100000),
+        'war_wins': rng.randint(0, 2000),
+        'clan_capital_points': rng.randint(0, 100000),
+        'mean_member_level': level,
+        'mean_member_trophies': trophies,
+        'activity_ratio': trophies / (level + 1),
+        'entry_gap': rng.randint(-5000, 5000),
+        'points_per_member': rng.uniform(0, 5000),
+    }
+
+
+PAYLOADS = {
+    'survival': survival_payload,
+    'league': league_payload,
+    'coaching': league_payload,
+}
+
+
+# ==========================================
+# 클라이언트
+# ==========================================
+async def _request(reader, writer, host, method, path, body=b''):
+    writer.write(
+        f'{method} {path} HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\n'
+        f'Content-Length: {len(body)}\r\n\r\n'.encode('latin-1') + body
+    )
+    await writer.drain()
+    status_line = await reader.readline()
+    if not status_line:
+        raise ConnectionError('서버가 연결을 닫았습니다.')
+    status = int(status_line.split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b''):
+            break
+        key, _, value = line.decode('latin-1').partition(':')
+        if key.strip().lower() == 'content-length':
+            length = int(value)
+    return status, await reader.readexactly(length)
+
+
+async def _worker(host, port, path, make_payload, counter, latencies, errors, seed):
+    rng = random.Random(seed)
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        while counter[0] > 0:
+            counter[0] -= 1
+            body = json.dumps(make_payload(rng)).encode('utf-8')
+            start = time.perf_counter()
+            status, _ = await _request(reader, writer, host, 'POST', path, body)
+            latencies.append(time.perf_counter() - start)
+            if status != 200:
+                errors.append(status)
+    finally:
+        writer.close()
+
+
+async def get_json(host, port, path):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        _, body = await _request(reader, writer, host, 'GET', path)
+        return json.loads(body)
+    finally:
+        writer.close()
+
+
+async def run_load(host, port, endpoint, concurrency, n_requests, warmup=50):
+    path = f'/predict/{endpoint}'
+    make_payload = PAYLOADS[endpoint]
+
+    # 워밍업 (스레드 풀 / 모델 첫 호출 비용 제외)
+    await asyncio.gather(*(_worker(host, port, path, make_payload, [warmup // concurrency + 1], [], [], -i)
+                           for i in range(concurrency)))
+    before = await get_json(host, port, '/health')
+
+    counter = [n_requests]
+    latencies, errors = [], []
+    start = time.perf_counter()
+    await asyncio.gather(*(_worker(host, port, path, make_payload, counter, latencies, errors, i)
+                           for i in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    after = await get_json(host, port, '/health')
+
+    model_key = 'survival' if endpoint == 'survival' else 'league'
+    batches = after[model_key]['batches'] - before[model_key]['batches']
+    rows = after[model_key]['rows'] - before[model_key]['rows']
+    latency_ms = np.asarray(latencies) * 1000
+    return {
+        'endpoint': endpoint,
+        'concurrency': concurrency,
+        'requests': len(latencies),
+        'errors': len(errors),
+        'seconds': round(elapsed, 3),
+        'rps': round(len(latencies) / elapsed, 1),
+        'p50_ms': round(float(np.percentile(latency_ms, 50)), 2),
+        'p95_ms': round(float(np.percentile(latency_ms, 95)), 2),
+        'p99_ms': round(float(np.percentile(latency_ms, 99)), 2),
+        'max_ms': round(float(latency_ms.max()), 2),
+        'mean_batch_size': round(rows / batches, 2) if batches else 0.0,
+    }
+
+
+# ==========================================
+# 서버 실행 (--spawn)
+# ==========================================
+def spawn_server(args):
+    command = [sys.executable, SERVER, '--model-dir', args.model_dir, '--host', args.host, '--port', str(args.port),
+               '--max-batch-size', str(args.max_batch_size), '--max-wait-ms', str(args.max_wait_ms)]
+    process = subprocess.Popen(command)
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError('서버 프로세스가 시작 중에 종료되었습니다.')
+        try:
+            asyncio.run(get_json(args.host, args.port, '/health'))
+            return process
+        except OSError:
+            time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError('서버가 60초 안에 준비되지 않았습니다.')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='예측 서버 부하 테스트')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--endpoint', choices=sorted(PAYLOADS), nargs='+', default=['survival', 'league', 'coaching'])
+    parser.add_argument('--concurrency', type=int, default=32, help='동시 연결 수')
+    parser.add_argument('--requests', type=int, default=2000, help='엔드포인트당 요청 수')
+    parser.add_argument('--spawn', action='store_true', help='서버를 직접 띄워서 측정')
+    parser.add_argument('--model-dir', default='.', help='--spawn 시 모델 디렉토리')
+    parser.add_argument('--max-batch-size', type=int, default=64, help='--spawn 시 서버 옵션')
+    parser.add_argument('--max-wait-ms', type=float, default=2.0, help='--spawn 시 서버 옵션')
+    parser.add_argument('--output', help='결과 JSON 저장 경로')
+    args = parser.parse_args()
+
+    process = spawn_server(args) if args.spawn else None
+    try:
+        results = []
+        for endpoint in args.endpoint:
+            result = asyncio.run(run_load(args.host, args.port, endpoint, args.concurrency, args.requests))
+            results.append(result)
+            print(f"{endpoint:>9} | {result['requests']:,}건 {result['seconds']:.1f}초 | "
+                  f"{result['rps']:,.0f} req/s | p50 {result['p50_ms']:.1f}ms p95 {result['p95_ms']:.1f}ms "
+                  f"p99 {result['p99_ms']:.1f}ms | 평균 배치 {result['mean_batch_size']:.1f} | 오류 {result['errors']}")
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait()
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2, ensure_ascii=False)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,363 @@
+"""
+🏁 벤치마크 스위트 (Benchmark Suite)
+적재 -> 학습 -> 추론 핫패스를 합성 데이터(synth_data.py)로 한 번에 측정하고,
+결과 JSON을 저장해 기준선(baseline)과 비교합니다. 원천 CSV 없이 오프라인으로 돌아갑니다.
+
+- 시나리오: CSV 적재 / 유령 필터 / 파생변수 / 모델 학습 3종 / 생존·리그 한 건·배치 예측 / 성장 가이드 / 모델 로드
+- 시나리오마다 별도 프로세스에서 실행 (peak RSS가 서로 섞이지 않게), 반복 중 최솟값을 기록
+- 모델은 --model-dir을 주지 않으면 같은 합성 CSV로 train.py 파이프라인을 돌려 만들고 재사용
+- 기준선보다 --threshold 이상 느려진 시나리오가 있으면 종료 코드 1
+
+실행 방법:
+    python benchmarks/run_suite.py --rows 10k --save-baseline   # 기준선 저장
+    python benchmarks/run_suite.py --rows 10k                   # 변경 후 비교
+    python benchmarks/run_suite.py --rows 1m --scenarios csv_load ghost_filter features
+"""
+import argparse
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import time
+import warnings
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+SRC_DIR = os.path.join(BENCH_DIR, '..', 'src')
+sys.path.insert(0, SRC_DIR)
+
+warnings.filterwarnings('ignore')
+
+DEFAULT_DATA_DIR = 'bench_data'
+DEFAULT_THRESHOLD = 0.25
+# 한 건 예측 / 성장 가이드 반복 횟수
+SINGLE_CALLS = 1000
+GUIDE_CLANS = 50
+# 한 번 측정의 최소 길이 (이보다 짧으면 여러 번 호출해 평균)
+MIN_SAMPLE_SECONDS = 0.2
+
+SURVIVAL_INPUT = {'mean_member_trophies': 1500, 'mean_member_level': 100, 'required_trophies': 800,
+                  'war_frequency': 'always', 'clan_type': 'inviteOnly', 'isFamilyFriendly': 1}
+
+
+def peak_rss_mb():
+    # Linux ru_maxrss 단위는 KB
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+# ==========================================
+# 시나리오 (준비는 시간 측정에서 제외, 반환한 함수만 반복 측정)
+# ==========================================
+def _load_raw(args):
+    from ingest import concat_chunks, iter_clan_chunks
+    return concat_chunks(iter_clan_chunks(args.csv, derive=False))
+
+
+def _load_active(args):
+    from ingest import load_clans
+    return load_clans(args.csv, active_only=True)
+
+
+def setup_csv_load(args):
+    from ingest import load_clans
+    rows = len(load_clans(args.csv, columns=['clan_level']))
+    return lambda: load_clans(args.csv), rows
+
+
+def setup_ghost_filter(args):
+    from ingest import ghost_mask, load_clans
+    df = load_clans(args.csv)
+    return lambda: df[~ghost_mask(df).to_numpy()], len(df)
+
+
+def setup_features(args):
+    from ingest import add_derived_features
+    df = _load_raw(args)
+    return lambda: add_derived_features(df), len(df)
+
+
+def _setup_train(args, name):
+    import numpy as np
+
+    import imbalance
+    import train
+
+    work = os.path.join(args.data_dir, f'train_work_{args.tag}')
+    features_path = os.path.join(work, 'features.parquet')
+    split_path = os.path.join(work, 'split.npz')
+    out = os.path.join(work, f'_bench_{name}.joblib')
+    runners = {
+        'survival': lambda: train.run_train_survival(features_path, split_path, out, train.SURVIVAL_PARAMS),
+        'league': lambda: train.run_train_league(features_path, split_path, out, train.LEAGUE_PARAMS,
+                                                 imbalance.DEFAULT_STRATEGY),
+        'coaching': lambda: train.run_train_coaching(features_path, split_path, out, train.COACHING_PARAMS,
+                                                     imbalance.DEFAULT_STRATEGY),
+    }
+    rows = int(np.load(split_path)[f'{name}_train'].shape[0])
+    return runners[name], rows
+
+
+def setup_survival_one(args):
+    import artifacts
+    model, transform = artifacts.load_survival_models(args.model_dir, compiled=True)
+
+    def run():
+        for _ in range(SINGLE_CALLS):
+            model.predict_proba(transform.transform_one(**SURVIVAL_INPUT))
+    return run, SINGLE_CALLS
+
+
+def setup_league_one(args):
+    import artifacts
+    from features import LEAGUE_FEATURES
+    model, _, _, transform = artifacts.load_league_models(args.model_dir, compiled=True)
+    row = _load_active(args).iloc[0]
+    values = {name: row[name] for name in LEAGUE_FEATURES}
+
+    def run():
+        for _ in range(SINGLE_CALLS):
+            model.predict_proba(transform.transform_one(**values))
+    return run, SINGLE_CALLS
+
+
+def setup_survival_batch(args):
+    import artifacts
+    model, transform = artifacts.load_survival_models(args.model_dir)
+    df = _load_active(args)
+    return lambda: model.predict_proba(transform.transform(df)), len(df)
+
+
+def setup_league_batch(args):
+    import artifacts
+    model, _, _, transform = artifacts.load_league_models(args.model_dir)
+    df = _load_active(args)
+    return lambda: model.predict_proba(transform.transform(df)), len(df)
+
+
+def setup_growth_guide(args):
+    """app_unified.py 성장 가이드: 예측 티어의 한 단계 위를 목표로 반사실 탐색"""
+    import artifacts
+    from bench_counterfactual import TIER_ORDER
+    from counterfactual import league_search
+
+    model, encoder, tier_standards, transform = artifacts.load_league_models(args.model_dir, compiled=True)
+    # 앱 성장 가이드 / serve.py 코칭과 같은 탐색기 (features.py의 입력 범위 / 정수 피처)
+    search = league_search(model, tier_standards)
+    X = transform.transform(_load_active(args))
+    predicted = encoder.inverse_transform(model.predict(X))
+    known = set(encoder.classes_)
+    cases = [(x, encoder.transform([TIER_ORDER[TIER_ORDER.index(tier) + 1]])[0])
+             for x, tier in zip(X, predicted)
+             if tier in TIER_ORDER[:-1] and TIER_ORDER[TIER_ORDER.index(tier) + 1] in known][:GUIDE_CLANS]
+
+    def run():
+        for x, target in cases:
+            search.search(x, target)
+    return run, len(cases)
+
+
+def setup_model_load(args):
+    """앱 세 개가 시작할 때 읽는 모델 (트리 엔진 포함)"""
+    import artifacts
+
+    def run():
+        artifacts.load_survival_models(args.model_dir, compiled=True)
+        artifacts.load_league_models(args.model_dir, compiled=True)
+        artifacts.load_model('coaching_model', args.model_dir, compiled=True)
+    return run, 3
+
+
+# 이름: (준비 함수, 단위, 최대 반복 횟수)
+SCENARIOS = {
+    'csv_load': (setup_csv_load, 'rows', None),
+    'ghost_filter': (setup_ghost_filter, 'rows', None),
+    'features': (setup_features, 'rows', None),
+    'train_survival': (lambda args: _setup_train(args, 'survival'), 'rows', 1),
+    'train_league': (lambda args: _setup_train(args, 'league'), 'rows', 1),
+    'train_coaching': (lambda args: _setup_train(args, 'coaching'), 'rows', 1),
+    'survival_one': (setup_survival_one, 'calls', None),
+    'survival_batch': (setup_survival_batch, 'rows', None),
+    'league_one': (setup_league_one, 'calls', None),
+    'league_batch': (setup_league_batch, 'rows', None),
+    'growth_guide': (setup_growth_guide, 'clans', None),
+    'model_load': (setup_model_load, 'models', None),
+}
+
+
+def _autorange(fn, max_number):
+    """한 번 측정이 MIN_SAMPLE_SECONDS 이상이 되도록 호출 횟수 결정 (timeit.autorange 방식, 짧은 시나리오 노이즈 완화)"""
+    number = 1
+    while number < max_number:
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        if time.perf_counter() - start >= MIN_SAMPLE_SECONDS:
+            break
+        number *= 10
+    return min(number, max_number)
+
+
+def run_scenario(name, args):
+    """한 시나리오 준비 후 반복 측정 (별도 프로세스에서 실행)"""
+    setup, unit, max_repeat = SCENARIOS[name]
+    fn, units = setup(args)
+    base_mb = peak_rss_mb()
+    # 학습처럼 반복 횟수가 1로 묶인 시나리오는 워밍업 / autorange 없이 한 번만
+    number = 1 if max_repeat == 1 else _autorange(fn, 1000)
+    times = []
+    for _ in range(min(args.repeat, max_repeat or args.repeat)):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        times.append((time.perf_counter() - start) / number)
+    best = min(times)
+    return {
+        'seconds': best, 'median_seconds': sorted(times)[len(times) // 2], 'repeat': len(times), 'number': number,
+        'units': units, 'unit': unit, 'us_per_unit': best / max(units, 1) * 1e6,
+        'peak_rss_mb': peak_rss_mb(), 'delta_mb': peak_rss_mb() - base_mb,
+    }
+
+
+def measure(name, args):
+    """별도 프로세스에서 실행해 peak RSS가 서로 섞이지 않게 측정"""
+    cmd = [sys.executable, os.path.abspath(__file__), '--csv', args.csv, '--rows', str(args.rows),
+           '--data-dir', args.data_dir, '--model-dir', args.model_dir, '--tag', args.tag,
+           '--repeat', str(args.repeat), '--child', name]
+    proc = subprocess.run(cmd, capture_output=True, text=True)
+    if proc.returncode != 0:
+        return {'error': (proc.stderr.strip().splitlines() or ['종료 코드 %d' % proc.returncode])[-1]}
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+# ==========================================
+# 준비 / 기준선 비교
+# ==========================================
+def _run_step(cmd):
+    """준비 단계도 별도 프로세스에서 (부모 프로세스가 커지면 시나리오 프로세스의 peak RSS에 섞임)"""
+    proc = subprocess.run(cmd, capture_output=True, text=True)
+    if proc.returncode != 0:
+        sys.exit(proc.stderr.strip())
+
+
+def prepare(args):
+    """합성 CSV와 (필요하면) 모델을 data_dir에 만들고 재사용"""
+    # --csv / --model-dir를 줘도 결과 JSON은 data_dir에 저장
+    os.makedirs(args.data_dir, exist_ok=True)
+    if args.csv is None:
+        args.csv = os.path.join(args.data_dir, f'synth_{args.rows}_{args.seed}.csv')
+        if not os.path.exists(args.csv):
+            start = time.perf_counter()
+            _run_step([sys.executable, os.path.join(BENCH_DIR, 'synth_data.py'), '--rows', str(args.rows),
+                       '--seed', str(args.seed), '--out', args.csv])
+            print(f"📄 데이터: {args.csv} ({time.perf_counter() - start:.1f}초)")
+    needs_training = any(name.startswith('train_') for name in args.scenarios)
+    if args.model_dir is None or needs_training:
+        # 학습 시나리오는 여기서 만든 features.parquet / split.npz를 사용 (--model-dir의 모델은 덮어쓰지 않음)
+        start = time.perf_counter()
+        output_dir = os.path.join(args.data_dir, f'models_{args.tag}')
+        _run_step([sys.executable, os.path.join(SRC_DIR, 'train.py'), '--csv', args.csv, '--output', output_dir,
+                   '--work-dir', os.path.join(args.data_dir, f'train_work_{args.tag}'), '--native'])
+        args.model_dir = args.model_dir or output_dir
+        print(f"🤖 모델: {args.model_dir} ({time.perf_counter() - start:.1f}초, 변경 없으면 재사용)")
+
+
+def environment():
+    import lightgbm
+    import numpy as np
+    import pandas as pd
+    return {
+        'python': platform.python_version(), 'platform': platform.platform(), 'cpus': os.cpu_count(),
+        'numpy': np.__version__, 'pandas': pd.__version__, 'lightgbm': lightgbm.__version__,
+    }
+
+
+def compare(results, baseline, threshold):
+    """시나리오별 (기준 초, 현재 초, 비율, 회귀 여부) 목록"""
+    rows = []
+    for name, current in results['scenarios'].items():
+        base = baseline.get('scenarios', {}).get(name)
+        if not base or 'error' in base or 'error' in current:
+            continue
+        ratio = current['seconds'] / max(base['seconds'], 1e-9)
+        rows.append((name, base['seconds'], current['seconds'], ratio, ratio > 1 + threshold))
+    return rows
+
+
+def main():
+    import synth_data
+
+    parser = argparse.ArgumentParser(description='적재/학습/추론 벤치마크 스위트 (합성 데이터, 기준선 비교)')
+    parser.add_argument('--rows', default='10k', help='합성 데이터 행 수 (10k / 1m / 3.5m)')
+    parser.add_argument('--seed', type=int, default=42, help='합성 데이터 시드')
+    parser.add_argument('--csv', default=None, help='합성 대신 쓸 CSV (예: 원천 coc_clans_dataset.csv)')
+    parser.add_argument('--data-dir', default=DEFAULT_DATA_DIR, help='합성 CSV / 학습 체크포인트 / 결과 디렉토리')
+    parser.add_argument('--model-dir', default=None, help='*.pkl 모델 디렉토리 (기본: 합성 데이터로 학습)')
+    parser.add_argument('--scenarios', nargs='+', default=list(SCENARIOS), choices=list(SCENARIOS))
+    parser.add_argument('--repeat', type=int, default=3, help='시나리오별 반복 횟수 (최솟값 기록, 학습은 1회)')
+    parser.add_argument('--output', default=None, help='결과 JSON (기본: <data-dir>/results_<행 수>_<시드>.json)')
+    parser.add_argument('--baseline', default=None, help='기준선 JSON (기본: <data-dir>/baseline_<행 수>_<시드>.json)')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD, help='회귀로 볼 느려짐 비율')
+    parser.add_argument('--save-baseline', action='store_true', help='이번 결과를 기준선으로 저장')
+    parser.add_argument('--tag', default=None, help=argparse.SUPPRESS)
+    parser.add_argument('--child', choices=list(SCENARIOS), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    args.rows = synth_data.parse_rows(args.rows)
+    # 합성 데이터는 행 수 + 시드, 직접 준 CSV는 파일 이름으로 체크포인트를 구분
+    args.tag = args.tag or (f'{args.rows}_{args.seed}' if args.csv is None
+                            else os.path.splitext(os.path.basename(args.csv))[0])
+
+    if args.child:
+        print(json.dumps(run_scenario(args.child, args)))
+        return
+
+    prepare(args)
+    results = {
+        'tag': args.tag, 'csv': os.path.abspath(args.csv), 'created': time.strftime('%Y-%m-%d %H:%M:%S'),
+        'scenarios': {},
+    }
+    print(f"\n{'scenario':<16} {'time(s)':>9} {'단위당(us)':>12} {'peak(MB)':>9} {'+측정(MB)':>10}")
+    print("-" * 60)
+    for name in args.scenarios:
+        r = measure(name, args)
+        results['scenarios'][name] = r
+        if 'error' in r:
+            print(f"{name:<16} 실패: {r['error']}")
+            continue
+        print(f"{name:<16} {r['seconds']:>9.3f} {r['us_per_unit']:>12,.2f} {r['peak_rss_mb']:>9.0f} {r['delta_mb']:>10.0f}")
+
+    # 버전 정보는 측정이 끝난 뒤에 (부모 프로세스에서 lightgbm을 미리 import하지 않게)
+    results['environment'] = environment()
+    output = args.output or os.path.join(args.data_dir, f'results_{args.tag}.json')
+    baseline_path = args.baseline or os.path.join(args.data_dir, f'baseline_{args.tag}.json')
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2, ensure_ascii=False)
+    print(f"\n💾 결과: {output}")
+
+    if args.save_baseline:
+        with open(baseline_path, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2, ensure_ascii=False)
+        print(f"📌 기준선 저장: {baseline_path}")
+        return
+    if not os.path.exists(baseline_path):
+        print(f"기준선 없음 ({baseline_path}): --save-baseline으로 먼저 저장하세요.")
+        return
+
+    with open(baseline_path, encoding='utf-8') as f:
+        baseline = json.load(f)
+    if baseline.get('tag') != args.tag:
+        print(f"⚠️ 기준선 데이터({baseline.get('tag')})가 이번 실행({args.tag})과 다릅니다.")
+    print(f"\n[기준선 비교: {baseline_path} ({baseline.get('created')}), 임계값 +{args.threshold:.0%}]")
+    regressions = []
+    for name, base_s, cur_s, ratio, regressed in compare(results, baseline, args.threshold):
+        mark = '❌ 회귀' if regressed else ('✅ 개선' if ratio < 1 - args.threshold else '')
+        print(f"  {name:<16} {base_s:>9.3f} -> {cur_s:>9.3f}s ({ratio - 1:+.1%}) {mark}")
+        if regressed:
+            regressions.append(name)
+    if regressions:
+        print(f"\n회귀 {len(regressions)}건: {', '.join(regressions)}")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,343 @@
+"""
+🧪 합성 클랜 데이터 (Synthetic Clan Data)
+coc_clans_dataset.csv와 같은 컬럼/순서의 CSV를 만들어 원천 데이터 없이도 벤치마크를 돌릴 수 있게 합니다.
+분포는 노트북 01/02 출력(전체 355만 행 기준)에 맞췄습니다.
+
+- 유령 클랜 90.5% (ingest.ghost_mask 규칙을 실제로 만족하도록 생성), 레벨 1 클랜이 전체의 약 69%
+- 활성 클랜: 레벨 중앙값 5, 멤버 5~50명, 캐피탈 보유 약 67%, 20판 이상 약 59%
+- 리그는 20판 이상 클랜의 실제 분포에서 뽑고 레벨 / 점수 / 트로피 / 캐피탈 홀이 리그를 따라 올라감
+- 0값 비율(캐피탈 93%, 무승부 92%, 가입 트로피 65% ...)과 문자열 컬럼 길이도 비슷하게 맞춤
+- 청크마다 시드를 따로 써서 행 수와 무관하게 같은 시드면 같은 파일
+
+실행 방법: python benchmarks/synth_data.py --rows 1000000 --out synth_1m.csv
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src')
+sys.path.insert(0, SRC_DIR)
+
+# 원천 CSV 컬럼 순서
+COLUMNS = [
+    'clan_tag', 'clan_name', 'clan_type', 'clan_description', 'clan_location', 'isFamilyFriendly',
+    'clan_badge_url', 'clan_level', 'clan_points', 'clan_builder_base_points', 'clan_versus_points',
+    'required_trophies', 'war_frequency', 'war_win_streak', 'war_wins', 'war_ties', 'war_losses',
+    'clan_war_league', 'num_members', 'required_builder_base_trophies', 'required_versus_trophies',
+    'required_townhall_level', 'clan_capital_hall_level', 'clan_capital_points', 'capital_league',
+    'mean_member_level', 'mean_member_trophies'
+]
+
+CHUNK_ROWS = 500_000
+ACTIVE_RATE = 0.095
+# 활성 클랜 중 20판 이상 (197,861 / 337,006)
+RELIABLE_RATE = 0.587
+
+# ==========================================
+# 노트북 출력 기준값
+# ==========================================
+# 20판 이상 클랜의 리그 분포 (노트북 01 셀 21)
+LEAGUE_COUNTS = {
+    'Unranked': 15508,
+    'Bronze League III': 95, 'Bronze League II': 361, 'Bronze League I': 1614,
+    'Silver League III': 7407, 'Silver League II': 12425, 'Silver League I': 18662,
+    'Gold League III': 22892, 'Gold League II': 23018, 'Gold League I': 20897,
+    'Crystal League III': 18987, 'Crystal League II': 17831, 'Crystal League I': 18550,
+    'Master League III': 9992, 'Master League II': 5126, 'Master League I': 2508,
+    'Champion League III': 1138, 'Champion League II': 481, 'Champion League I': 369,
+}
+LEAGUES = list(LEAGUE_COUNTS)
+# 리그별 평균 클랜 레벨 (같은 셀, 리그 점수 순서)
+LEAGUE_MEAN_LEVEL = np.array([4.6, 5.1, 5.9, 5.9, 6.0, 6.3, 7.0, 8.2, 9.9, 11.9,
+                              13.9, 16.0, 18.3, 20.3, 21.8, 22.9, 22.6, 22.5, 22.4])
+
+CLAN_TYPES = ['open', 'inviteOnly', 'closed']
+WAR_FREQUENCIES = ['always', 'moreThanOncePerWeek', 'oncePerWeek', 'lessThanOncePerWeek', 'never', 'unknown']
+CAPITAL_LEAGUES = ['Unranked'] + [f'{tier} League {rank}'
+                                  for tier in ['Bronze', 'Silver', 'Gold', 'Crystal', 'Master', 'Champion', 'Titan']
+                                  for rank in ['III', 'II', 'I']] + ['Legend League']
+LOCATIONS = ['International', 'United States', 'India', 'Indonesia', 'Brazil', 'Germany', 'Korea', 'Japan',
+             'Russia', 'Turkey', 'Vietnam', 'Philippines', 'United Kingdom', 'France', 'Mexico', 'Iran']
+TAG_ALPHABET = np.array(list('0289CGJLPQRUVY'))
+BADGE_URL = 'https://api-assets.clashofclans.com/badges/200/'
+
+NAME_WORDS = ['dragon', 'war', 'legends', 'clash', 'kings', 'elite', 'warriors', 'family', 'united', 'army',
+              'titans', 'shadow', 'phoenix', 'royal', 'storm', '전사들', '용사', '클랜', '레전드', '가족']
+DESCRIPTION_WORDS = ['active', 'war', 'clan', 'donate', 'friendly', 'rules:', 'no', 'rush', 'CWL', 'every',
+                     'week,', 'respect', 'leaders', 'games', 'capital', 'raids', 'chill', '"welcome"', 'all', 'TH']
+
+
+def _pool(rng, words, size, low, high):
+    """단어를 이어 붙인 문자열 풀 (행마다 새로 만들지 않고 인덱스로 뽑음)"""
+    lengths = rng.integers(low, high + 1, size)
+    return np.array([' '.join(rng.choice(words, n)) for n in lengths], dtype=object)
+
+
+def _lognormal_int(rng, median, sigma, n, upper):
+    return np.minimum(np.round(median * rng.lognormal(0.0, sigma, n)), upper).astype(np.int64)
+
+
+def _round_hundreds(values):
+    return (np.round(values / 100) * 100).astype(np.int64)
+
+
+def _builder_points(rng, clan_points, zero_rate):
+    """빌더 기지 점수 (클랜 점수와 비슷한 크기, zero_rate 비율은 0)"""
+    n = len(clan_points)
+    values = np.clip(np.round(clan_points * rng.lognormal(0, 0.3, n)), 0, 51686)
+    return np.where(rng.random(n) < zero_rate, 0, values)
+
+
+def _builder_required(rng, n, zero_rate):
+    """빌더 기지 가입 트로피 (100 단위)"""
+    return np.where(rng.random(n) < zero_rate, 0, np.minimum(_round_hundreds(1200 * rng.lognormal(0, 0.8, n)), 5500))
+
+
+# ==========================================
+# 구간별 생성
+# ==========================================
+def _active_block(rng, n):
+    """활성 클랜 n개 (ghost_mask 세 조건을 모두 피하도록)"""
+    reliable = rng.random(n) < RELIABLE_RATE
+    weights = np.array(list(LEAGUE_COUNTS.values()), dtype=np.float64)
+    score = rng.choice(len(LEAGUES), n, p=weights / weights.sum())
+    # 20판 미만 클랜은 대부분 Unranked / 하위 리그
+    low = rng.choice(7, n, p=[0.75, 0.01, 0.02, 0.04, 0.05, 0.06, 0.07])
+    score = np.where(reliable, score, low)
+
+    level = np.round(LEAGUE_MEAN_LEVEL[score] + rng.normal(0, 3.5, n))
+    level = np.where(reliable, level, np.where(rng.random(n) < 0.6, 1, rng.geometric(0.3, n)))
+    level = np.clip(level, 1, 36).astype(np.int64)
+
+    war_total = np.where(
+        reliable,
+        np.minimum(20 + _lognormal_int(rng, 6 * level + 40, 0.9, n, 1545), 1565),
+        rng.geometric(0.25, n).clip(1, 19),
+    )
+    win_p = np.where(reliable, rng.beta(4, 2, n), rng.beta(2, 1.5, n))
+    wins = rng.binomial(war_total, win_p)
+    ties = np.minimum(rng.binomial(war_total, 0.004), war_total - wins)
+    losses = war_total - wins - ties
+    streak = np.where(rng.random(n) < 0.3, rng.geometric(0.45, n), 0)
+    streak = np.minimum(streak, wins)
+
+    members = np.where(reliable, np.round(rng.normal(28, 13, n)), 4 + rng.geometric(0.12, n))
+    members = np.clip(members, 5, 50).astype(np.int64)
+
+    # 레벨 1 활성 클랜은 대부분 캐피탈 0 (레벨 2 이상 + 캐피탈 0이면 유령)
+    has_capital = (level >= 2) | (rng.random(n) < 0.02)
+    capital = np.where(has_capital, np.maximum(_lognormal_int(rng, 110 * level, 0.8, n, 40000), 1), 0)
+    capital_hall = np.where(has_capital, np.clip(np.round(level * 0.38 + rng.normal(0.8, 1.2, n)), 1, 10), 0)
+
+    points = np.clip(np.round(1350 * level + 1600 * score / 3 + rng.normal(0, 3500, n)), 0, 54721)
+    trophies = np.clip(np.round(800 + 140 * score + 25 * level + rng.normal(0, 450, n)), 0, 6000)
+    required = np.where(rng.random(n) < 0.3, 0, np.minimum(_round_hundreds(900 * rng.lognormal(0, 1.6, n)), 5500))
+    return {
+        'clan_type': rng.choice(3, n, p=[0.576, 0.356, 0.068]),
+        'war_frequency': rng.choice(6, n, p=[0.45, 0.15, 0.1, 0.05, 0.05, 0.2]),
+        'isFamilyFriendly': rng.random(n) < 0.415,
+        'clan_level': level,
+        'clan_points': points,
+        'clan_builder_base_points': _builder_points(rng, points, 0.03),
+        'required_trophies': required,
+        'required_builder_base_trophies': _builder_required(rng, n, 0.7),
+        'war_win_streak': streak,
+        'war_wins': wins,
+        'war_ties': ties,
+        'war_losses': losses,
+        'league_score': score,
+        'num_members': members,
+        'required_townhall_level': np.where(rng.random(n) < 0.35, 1, rng.integers(2, 15, n)),
+        'clan_capital_hall_level': capital_hall,
+        'clan_capital_points': capital,
+        'mean_member_trophies': trophies,
+    }
+
+
+def _ghost_block(rng, n):
+    """유령 클랜 n개 (멤버 5명 미만 / 레벨 2 이상 + 캐피탈 0 / 전쟁 0판 중 하나 이상)"""
+    level = rng.choice([1, 2, 3, 0], n, p=[0.726, 0.107, 0.052, 0.115])
+    level = np.where(level == 0, np.minimum(4 + rng.geometric(0.18, n) - 1, 36), level)
+
+    members = np.where(rng.random(n) < 0.45, rng.integers(1, 5, n), 4 + rng.geometric(0.15, n))
+    members = np.where(rng.random(n) < 0.0025, 0, np.minimum(members, 50))
+
+    warred = rng.random(n) < 0.45
+    war_total = np.where(warred, rng.geometric(0.06, n), 0)
+    wins = rng.binomial(war_total, rng.beta(2, 2, n))
+    ties = np.where(rng.random(n) < 0.3, rng.binomial(war_total - wins, 0.05), 0)
+    losses = war_total - wins - ties
+    streak = np.where(rng.random(n) < 0.2, rng.geometric(0.5, n), 0)
+    streak = np.minimum(streak, wins)
+
+    capital = np.where(rng.random(n) < 0.003, _lognormal_int(rng, 150, 1.0, n, 20000) + 1, 0)
+    capital_hall = np.where(rng.random(n) < 0.14, rng.integers(1, 6, n), 0)
+
+    # 규칙에 안 걸리는 행(멤버 5명 이상 + 전쟁 기록 + (레벨 1 또는 캐피탈 있음))은 멤버 5명 미만으로
+    survivor = (members >= 5) & (war_total > 0) & ((level < 2) | (capital > 0))
+    members = np.where(survivor, rng.integers(1, 5, n), members)
+
+    score = np.where(rng.random(n) < 0.9, 0, rng.integers(1, 10, n))
+    points = np.clip(np.round(rng.lognormal(np.log(500 * level + 300), 0.9, n)), 0, 54721)
+    trophies = np.where(members == 0, 0, np.clip(np.round(rng.lognormal(np.log(900), 0.6, n)), 0, 6000))
+    required = np.where(rng.random(n) < 0.68, 0, np.minimum(_round_hundreds(600 * rng.lognormal(0, 1.2, n)), 5500))
+    return {
+        'clan_type': rng.choice(3, n, p=[0.6, 0.3, 0.1]),
+        'war_frequency': rng.choice(6, n, p=[0.15, 0.05, 0.05, 0.05, 0.2, 0.5]),
+        'isFamilyFriendly': rng.random(n) < 0.32,
+        'clan_level': level,
+        'clan_points': points,
+        'clan_builder_base_points': _builder_points(rng, points, 0.12),
+        'required_trophies': required,
+        'required_builder_base_trophies': _builder_required(rng, n, 0.81),
+        'war_win_streak': streak,
+        'war_wins': wins,
+        'war_ties': ties,
+        'war_losses': losses,
+        'league_score': score,
+        'num_members': members,
+        'required_townhall_level': np.where(rng.random(n) < 0.5, 1, rng.integers(2, 15, n)),
+        'clan_capital_hall_level': capital_hall,
+        'clan_capital_points': capital,
+        'mean_member_trophies': trophies,
+    }
+
+
+def _merge_blocks(active_mask, active, ghost):
+    merged = {}
+    for key, value in active.items():
+        out = np.empty(len(active_mask), dtype=np.result_type(value, ghost[key]))
+        out[active_mask] = value
+        out[~active_mask] = ghost[key]
+        merged[key] = out
+    return merged
+
+
+def _clan_tags(start, n):
+    """#으로 시작하는 9자리 태그 (행 번호를 태그 알파벳 진법으로, 파일 전체에서 유일)"""
+    ids = np.arange(start, start + n, dtype=np.int64) * 7919 + 104729
+    digits = np.empty((n, 9), dtype=np.int64)
+    for j in range(8, -1, -1):
+        ids, digits[:, j] = np.divmod(ids, len(TAG_ALPHABET))
+    chars = np.concatenate([np.full((n, 1), '#'), TAG_ALPHABET[digits]], axis=1)
+    return chars.view('<U10').ravel()
+
+
+def generate_chunk(n, seed=42, chunk_index=0, start=0):
+    """합성 클랜 n행 DataFrame (원천 CSV 컬럼 순서)"""
+    rng = np.random.default_rng([seed, chunk_index])
+    # 문자열 풀은 청크와 무관하게 시드로만 결정
+    strings = np.random.default_rng([seed, 1 << 20])
+    names = _pool(strings, NAME_WORDS, 5000, 1, 3)
+    descriptions = _pool(strings, DESCRIPTION_WORDS, 2000, 0, 40)
+    badges = np.array([BADGE_URL + ''.join(strings.choice(list('abcdefghijklmnopqrstuvwxyz0123456789_-'), 43))
+                       + '.png' for _ in range(3000)], dtype=object)
+
+    active_mask = rng.random(n) < ACTIVE_RATE
+    n_active = int(active_mask.sum())
+    active = _active_block(rng, n_active)
+    ghost = _ghost_block(rng, n - n_active)
+    cols = _merge_blocks(active_mask, active, ghost)
+
+    builder = cols['clan_builder_base_points'].astype(np.int64)
+    builder_required = cols['required_builder_base_trophies']
+    members = cols['num_members']
+    trophies = cols['mean_member_trophies']
+    member_level = np.where(members == 0, 0, np.clip(np.round(20 + 0.045 * trophies + rng.normal(0, 15, n)), 1, 300))
+
+    capital = cols['clan_capital_points']
+    capital_league = np.where(capital > 0, np.clip(np.log2(np.maximum(capital, 1) / 40) * 2.2, 1, 22), 0)
+
+    description = descriptions[rng.integers(0, len(descriptions), n)]
+    description = np.where(rng.random(n) < 0.3, None, description)
+    location = np.array(LOCATIONS, dtype=object)[rng.integers(0, len(LOCATIONS), n)]
+    location = np.where(rng.random(n) < 0.4, None, location)
+
+    return pd.DataFrame({
+        'clan_tag': _clan_tags(start, n),
+        'clan_name': names[rng.integers(0, len(names), n)],
+        'clan_type': np.array(CLAN_TYPES)[cols['clan_type']],
+        'clan_description': description,
+        'clan_location': location,
+        'isFamilyFriendly': cols['isFamilyFriendly'],
+        'clan_badge_url': badges[rng.integers(0, len(badges), n)],
+        'clan_level': cols['clan_level'],
+        'clan_points': cols['clan_points'].astype(np.int64),
+        'clan_builder_base_points': builder,
+        'clan_versus_points': builder,
+        'required_trophies': cols['required_trophies'],
+        'war_frequency': np.array(WAR_FREQUENCIES)[cols['war_frequency']],
+        'war_win_streak': cols['war_win_streak'],
+        'war_wins': cols['war_wins'],
+        'war_ties': cols['war_ties'],
+        'war_losses': cols['war_losses'],
+        'clan_war_league': np.array(LEAGUES)[cols['league_score']],
+        'num_members': members,
+        'required_builder_base_trophies': builder_required,
+        'required_versus_trophies': builder_required,
+        'required_townhall_level': cols['required_townhall_level'],
+        'clan_capital_hall_level': cols['clan_capital_hall_level'].astype(np.int64),
+        'clan_capital_points': capital,
+        'capital_league': np.array(CAPITAL_LEAGUES)[capital_league.astype(np.int64)],
+        'mean_member_level': member_level.astype(np.int64),
+        'mean_member_trophies': trophies.astype(np.int64),
+    }, columns=COLUMNS)
+
+
+def write_csv(path, rows, seed=42, chunk_rows=CHUNK_ROWS):
+    """rows행 합성 CSV를 chunk_rows행씩 만들어 이어 쓰기 (메모리는 청크 하나 분량만 사용)"""
+    tmp_path = f'{path}.tmp'
+    for index, start in enumerate(range(0, rows, chunk_rows)):
+        chunk = generate_chunk(min(chunk_rows, rows - start), seed, index, start)
+        chunk.to_csv(tmp_path, mode='w' if index == 0 else 'a', header=index == 0, index=False)
+    os.replace(tmp_path, path)
+    return path
+
+
+def parse_rows(text):
+    """'10k' / '1m' / '3.5m' / '10000' -> 행 수"""
+    text = str(text).strip().lower().replace('_', '').replace(',', '')
+    scale = {'k': 1_000, 'm': 1_000_000}.get(text[-1:], 1)
+    return int(float(text[:-1] if scale > 1 else text) * scale)
+
+
+def summarize(path):
+    """생성한 CSV의 주요 분포 (노트북 기준값과 비교용)"""
+    from ingest import load_clans
+
+    df = load_clans(path)
+    active = df[~df['is_ghost']]
+    reliable = active[active['war_total'] >= 20]
+    zero_cols = ['clan_capital_points', 'war_ties', 'war_win_streak', 'clan_capital_hall_level',
+                 'required_builder_base_trophies', 'required_trophies', 'war_losses', 'war_wins']
+    print(f"행 {len(df):,}개 / 유령 {df['is_ghost'].mean():.1%} (노트북 90.5%) / 레벨 1 {(df['clan_level'] == 1).mean():.1%} (68.8%)")
+    print(f"활성 {len(active):,}개: 레벨 중앙값 {active['clan_level'].median():.0f} (5), "
+          f"멤버 중앙값 {active['num_members'].median():.0f} (18), "
+          f"캐피탈 보유 {(active['clan_capital_points'] > 0).mean():.1%} (67.4%), "
+          f"20판 이상 {len(reliable) / max(len(active), 1):.1%} (58.7%)")
+    print("0값 비율: " + ', '.join(f"{col} {(df[col] == 0).mean():.1%}" for col in zero_cols))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='coc_clans_dataset.csv 형식의 합성 CSV 생성')
+    parser.add_argument('--rows', default='10k', help='행 수 (예: 10k, 1m, 3.5m)')
+    parser.add_argument('--out', required=True, help='출력 CSV 경로')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--summary', action='store_true', help='생성 후 주요 분포 출력')
+    args = parser.parse_args()
+
+    rows = parse_rows(args.rows)
+    start = time.perf_counter()
+    write_csv(args.out, rows, args.seed)
+    size_mb = os.path.getsize(args.out) / 1024 / 1024
+    print(f"{args.out}: {rows:,}행, {size_mb:,.1f}MB ({time.perf_counter() - start:.1f}초)")
+    if args.summary:
+        summarize(args.out)
+
+
+if __name__ == '__main__':
+    main()
@@ -5,8 +5,11 @@ Clash of Clans 클랜의 앞으로의 생존 확률을 예측하고 방향성을
 실행 방법: streamlit run app.py
 """
 import streamlit as st
-import joblib
-import numpy as np
+
+import artifacts
+import metrics
+from features import SURVIVAL_FEATURES
+from prediction_cache import PredictionCache
 
 # 페이지 설정
 st.set_page_config(
@@ -15,15 +18,20 @@ st.set_page_config(
     layout="centered"
 )
 
-# 모델 및 인코더 로드
-@st.cache_resource
-def load_models():
-    model = joblib.load('clan_retention_model.pkl')
-    war_freq_encoder = joblib.load('war_frequency_encoder.pkl')
-    clan_type_encoder = joblib.load('clan_type_encoder.pkl')
-    return model, war_freq_encoder, clan_type_encoder
+# 단계별 지연시간 계측 (COC_METRICS=1일 때만, metrics.py) - 스크립트 한 번 실행 = 화면 다시 그리기 1회
+metrics.start_exporters()
+rerun_timer = metrics.span('survival', 'rerun')
+rerun_profile = metrics.profile('survival').start()
+
+# 모델 및 인코더 로드 (같은 입력으로 다시 누르면 캐시된 예측 사용, 모든 세션이 공유)
+# release: incremental.py가 새 아티팩트를 게시하면 바뀌는 id -> 캐시 키가 달라져 다시 로드
+@st.cache_resource(max_entries=1)
+def load_models(release=None):
+    model, survival_features = artifacts.load_survival_models(compiled=True)
+    return PredictionCache(model), survival_features
 
-model, war_freq_encoder, clan_type_encoder = load_models()
+with metrics.timer('survival', 'load'):
+    model, survival_features = load_models(artifacts.release_id())
 
 # 헤더
 st.title("클랜 생존 예측기")
@@ -80,35 +88,26 @@ st.markdown("---")
 # 예측 버튼
 if st.button("생존 확률 확인", type="primary", use_container_width=True):
     
-    # 1. 파생변수 계산
-    activity_ratio = mean_member_trophies / (mean_member_level + 1)
-    entry_gap = mean_member_trophies - required_trophies
-    
-    # 2. 인코딩
-    try:
-        war_freq_code = war_freq_encoder.transform([war_frequency])[0]
-    except:
-        war_freq_code = 0  # 알 수 없는 값이면 기본값
-    
-    try:
-        clan_type_code = clan_type_encoder.transform([clan_type])[0]
-    except:
-        clan_type_code = 0
-    
-    is_family_friendly_code = 1 if is_family_friendly else 0
-    
-    # 3. 모델 입력 준비 (순서 중요!)
-    # engineered_features_v2 = ['activity_ratio', 'entry_gap', 'war_frequency_code', 'isFamilyFriendly', 'clan_type_code']
-    X_input = np.array([[
-        activity_ratio,
-        entry_gap,
-        war_freq_code,
-        is_family_friendly_code,
-        clan_type_code
-    ]])
+    # 1~3. 파생변수 계산 + 인코딩 + 모델 입력 준비 (features.py, 순서 보장)
+    metrics.count('survival', 'requests')
+    with metrics.timer('survival', 'transform'):
+        X_input = survival_features.transform_one(
+            mean_member_trophies=mean_member_trophies,
+            mean_member_level=mean_member_level,
+            required_trophies=required_trophies,
+            war_frequency=war_frequency,
+            clan_type=clan_type,
+            isFamilyFriendly=1 if is_family_friendly else 0
+        )
+    inputs = dict(zip(SURVIVAL_FEATURES, X_input[0]))
+    activity_ratio = inputs['activity_ratio']
+    entry_gap = inputs['entry_gap']
+    war_freq_code = int(inputs['war_frequency_code'])
+    clan_type_code = int(inputs['clan_type_code'])
     
     # 4. 예측
-    survival_prob = model.predict_proba(X_input)[0][1]
+    with metrics.timer('survival', 'predict_proba'):
+        survival_prob = model.predict_proba(X_input)[0][1]
     
     # 5. 결과 표시
     st.markdown("---")
@@ -140,7 +139,7 @@ if st.button("생존 확률 확인", type="primary", use_container_width=True):
     # 세부 분석
     with st.expander("세부 분석 보기"):
         st.write(f"- **활동 효율성** (Activity Ratio): {activity_ratio:.2f}")
-        st.write(f"- **진입 장벽 격차** (Entry Gap): {entry_gap:,}")
+        st.write(f"- **진입 장벽 격차** (Entry Gap): {entry_gap:,.0f}")
         st.write(f"- **전쟁 빈도 코드**: {war_freq_code}")
         st.write(f"- **클랜 유형 코드**: {clan_type_code}")
         
@@ -152,3 +151,7 @@ if st.button("생존 확률 확인", type="primary", use_container_width=True):
 # 푸터
 st.markdown("---")
 st.caption("Made with by ML Team | Data: Clash of Clans API")
+
+rerun_profile.stop()
+rerun_timer.stop()
+metrics.flush()
@@ -5,9 +5,11 @@
 실행 방법: uv run streamlit run app_coaching.py
 """
 import streamlit as st
-import joblib
-import numpy as np
-import pandas as pd
+
+import artifacts
+import metrics
+from counterfactual import CounterfactualSearch
+from features import COACHING_FEATURES, coaching_transform
 
 # 페이지 설정
 st.set_page_config(
@@ -16,11 +18,16 @@ st.set_page_config(
     layout="centered"
 )
 
-# 모델 로드
-@st.cache_resource
-def load_models():
+# 단계별 지연시간 계측 (COC_METRICS=1일 때만, metrics.py) - 스크립트 한 번 실행 = 화면 다시 그리기 1회
+metrics.start_exporters()
+rerun_timer = metrics.span('coaching', 'rerun')
+rerun_profile = metrics.profile('coaching').start()
+
+# 모델 로드 (release: incremental.py가 새 아티팩트를 게시하면 바뀌는 id -> 다시 로드)
+@st.cache_resource(max_entries=1)
+def load_models(release=None):
     try:
-        model = joblib.load('clan_league_model.pkl')
+        model = artifacts.load_model('coaching_model', compiled=True)
         return model
     except FileNotFoundError:
         st.error("⚠️ 모델 파일(clan_league_model.pkl)을 찾을 수 없습니다. 노트북에서 먼저 저장해주세요.")
@@ -38,6 +45,30 @@ TIER_STANDARDS = {
     6: {'clan_level': 22.43, 'clan_points': 36027, 'clan_capital_points': 3226, 'num_members': 32, 'required_townhall_level': 12, 'required_trophies': 2248, 'mean_member_level': 203},
 }
 
+# incremental.py가 스냅샷으로 갱신한 티어별 평균이 있으면 그 값을 우선 사용
+@st.cache_resource(max_entries=1)
+def load_tier_standards(release=None):
+    try:
+        return {**TIER_STANDARDS, **artifacts.load_artifact('coaching_standards')}
+    except FileNotFoundError:
+        return TIER_STANDARDS
+
+# 티어별 분포 스케치 (sketches.py, 없으면 백분위 표시 생략)
+@st.cache_resource(max_entries=1)
+def load_tier_sketches(release=None):
+    try:
+        return artifacts.load_artifact('tier_sketches')
+    except FileNotFoundError:
+        return None
+
+# 비슷한 클랜 인덱스 (neighbors.py, 없으면 비슷한 클랜 표시 생략)
+@st.cache_resource(max_entries=1)
+def load_similar_clans(release=None):
+    try:
+        return artifacts.load_artifact('similar_clans')
+    except FileNotFoundError:
+        return None
+
 TIER_NAMES = {
     0: "언랭크 (Unranked)",
     1: "브론즈 (Bronze)", 
@@ -58,7 +89,18 @@ FEATURE_NAMES_KR = {
     'mean_member_level': '멤버 평균 레벨'
 }
 
-model = load_models()
+# 입력 범위 (성장 코칭 탐색 범위, 아래 입력 위젯과 동일)
+COACHING_INPUT_LOWER = {'clan_level': 1, 'clan_points': 0, 'clan_capital_points': 0, 'num_members': 1,
+                        'required_townhall_level': 1, 'required_trophies': 0, 'mean_member_level': 1}
+COACHING_INPUT_UPPER = {'clan_level': 30, 'clan_points': 100000, 'clan_capital_points': 50000, 'num_members': 50,
+                        'required_townhall_level': 16, 'required_trophies': 5500, 'mean_member_level': 300}
+
+with metrics.timer('coaching', 'load'):
+    model = load_models(artifacts.release_id())
+    tier_standards = load_tier_standards(artifacts.release_id())
+    tier_sketches = load_tier_sketches(artifacts.release_id())
+    similar_clans = load_similar_clans(artifacts.release_id())
+coaching_features = coaching_transform()
 
 # 헤더
 st.title("📈 클랜 성장 코칭")
@@ -129,26 +171,28 @@ if st.button("🔮 성장 코칭 받기", type="primary", use_container_width=Tr
     if model is None:
         st.error("모델이 로드되지 않았습니다.")
     else:
-        # 입력 데이터 준비
-        features = ['clan_level', 'clan_points', 'clan_capital_points', 'num_members', 
-                   'required_townhall_level', 'required_trophies', 'mean_member_level']
-        
-        X_input = np.array([[
-            clan_level,
-            clan_points,
-            clan_capital_points,
-            num_members,
-            required_townhall_level,
-            required_trophies,
-            mean_member_level
-        ]])
+        # 입력 데이터 준비 (features.COACHING_FEATURES 순서)
+        current_values = {
+            'clan_level': clan_level,
+            'clan_points': clan_points,
+            'clan_capital_points': clan_capital_points,
+            'num_members': num_members,
+            'required_townhall_level': required_townhall_level,
+            'required_trophies': required_trophies,
+            'mean_member_level': mean_member_level
+        }
+        metrics.count('coaching', 'requests')
+        with metrics.timer('coaching', 'transform'):
+            X_input = coaching_features.transform_one(**current_values)
         
         # 예측
-        predicted_tier = int(model.predict(X_input)[0])
+        with metrics.timer('coaching', 'predict'):
+            predicted_tier = int(model.predict(X_input)[0])
         
         # 예측 확률 (있는 경우)
         try:
-            proba = model.predict_proba(X_input)[0]
+            with metrics.timer('coaching', 'predict_proba'):
+                proba = model.predict_proba(X_input)[0]
             confidence = proba[predicted_tier] * 100
         except:
             confidence = None
@@ -179,40 +223,78 @@ if st.button("🔮 성장 코칭 받기", type="primary", use_container_width=Tr
         else:
             goal_tier = target_tier
         
+        # 목표 티어 클랜 분포에서 현재 값의 위치
+        if tier_sketches is not None and tier_sketches.count(goal_tier) > 0:
+            with st.expander(f"📍 {TIER_NAMES.get(goal_tier)} 클랜 중 내 위치"):
+                for feature in COACHING_FEATURES:
+                    pct = tier_sketches.percentile(goal_tier, feature, current_values[feature])
+                    median = tier_sketches.quantile(goal_tier, feature, 0.5)
+                    st.write(f"- **{FEATURE_NAMES_KR[feature]}**: {pct:.0f}번째 백분위 (중앙값 {median:,.0f})")
+        
+        # 목표 티어에 도달한 클랜 중 지금 내 클랜과 가장 비슷한 클랜 (neighbors.py)
+        if similar_clans is not None and similar_clans.count(goal_tier) > 0:
+            with metrics.timer('coaching', 'neighbors'):
+                neighbors = similar_clans.search(current_values, goal_tier, space='coaching')
+            with st.expander(f"👥 {TIER_NAMES.get(goal_tier)} 클랜 중 나와 비슷한 클랜"):
+                st.dataframe([{'클랜 태그': clan['clan_tag'],
+                               **{FEATURE_NAMES_KR[feature]: int(clan[feature]) for feature in COACHING_FEATURES}}
+                              for clan in neighbors], hide_index=True)
+        
         # 개선점 분석
         if goal_tier > predicted_tier:
             st.markdown("---")
             st.subheader(f"🚀 {TIER_NAMES.get(goal_tier, f'Tier {goal_tier}')} 달성을 위한 개선점")
             
-            current_values = {
-                'clan_level': clan_level,
-                'clan_points': clan_points,
-                'clan_capital_points': clan_capital_points,
-                'num_members': num_members,
-                'required_townhall_level': required_townhall_level,
-                'required_trophies': required_trophies,
-                'mean_member_level': mean_member_level
-            }
+            goal_standards = tier_standards.get(goal_tier, tier_standards[4])
+            if tier_sketches is not None and tier_sketches.count(goal_tier) > 0:
+                # 스케치가 있으면 평균 대신 중앙값 (이상치 영향이 적음)
+                goal_standards = {feature: tier_sketches.quantile(goal_tier, feature, 0.5)
+                                  for feature in COACHING_FEATURES}
             
-            goal_standards = TIER_STANDARDS.get(goal_tier, TIER_STANDARDS[4])
+            # 모델이 실제로 목표 티어를 예측하게 되는 최소 변경 탐색 (counterfactual.py)
+            # 가입 조건(타운홀/트로피)은 낮추는 것도 허용
+            guide = None
+            if goal_tier in model.classes_:
+                with metrics.timer('coaching', 'counterfactual'):
+                    search = CounterfactualSearch.from_tier_standards(
+                        model, COACHING_FEATURES, tier_standards,
+                        lower=COACHING_INPUT_LOWER, upper=COACHING_INPUT_UPPER,
+                        direction={'required_townhall_level': 0, 'required_trophies': 0},
+                        integer={name: True for name in COACHING_FEATURES}
+                    )
+                    guide = search.search(X_input[0], goal_tier)
             
             improvements = []
-            for feature, current in current_values.items():
-                target = goal_standards[feature]
-                gap = target - current
-                if gap > 0:  # 부족한 항목만
-                    gap_pct = (gap / target) * 100 if target > 0 else 0
+            if guide is not None and guide['reached']:
+                st.caption(f"아래 항목만 바꾸면 모델이 {TIER_NAMES.get(goal_tier)}(으)로 예측합니다 "
+                           f"(목표 티어 확률 {guide['target_proba']:.1%})")
+                for item in guide['changes']:
                     improvements.append({
-                        'feature': feature,
-                        'feature_kr': FEATURE_NAMES_KR[feature],
-                        'current': current,
-                        'target': target,
-                        'gap': gap,
-                        'gap_pct': gap_pct
+                        'feature': item['feature'],
+                        'feature_kr': FEATURE_NAMES_KR[item['feature']],
+                        'current': current_values[item['feature']],
+                        'target': int(item['target']),
+                        'gap': item['diff']
                     })
-            
-            # 개선폭이 큰 순으로 정렬
-            improvements.sort(key=lambda x: x['gap_pct'], reverse=True)
+            else:
+                if guide is not None:
+                    st.caption("모델 기준 경로를 찾지 못해 목표 티어 평균과의 차이를 보여드립니다.")
+                for feature, current in current_values.items():
+                    target = goal_standards[feature]
+                    gap = target - current
+                    if gap > 0:  # 부족한 항목만
+                        gap_pct = (gap / target) * 100 if target > 0 else 0
+                        improvements.append({
+                            'feature': feature,
+                            'feature_kr': FEATURE_NAMES_KR[feature],
+                            'current': current,
+                            'target': target,
+                            'gap': gap,
+                            'gap_pct': gap_pct
+                        })
+                
+                # 개선폭이 큰 순으로 정렬
+                improvements.sort(key=lambda x: x['gap_pct'], reverse=True)
             
             if improvements:
                 for i, item in enumerate(improvements[:5], 1):
@@ -225,6 +307,8 @@ if st.button("🔮 성장 코칭 받기", type="primary", use_container_width=Tr
                         with col_c:
                             if item['gap'] > 0:
                                 st.write(f"목표: {item['target']:,} (+{item['gap']:,.0f})")
+                            elif item['gap'] < 0:  # 가입 조건 완화
+                                st.write(f"목표: {item['target']:,} ({item['gap']:,.0f})")
                             else:
                                 st.write(f"✅ 달성!")
                     
@@ -244,3 +328,7 @@ if st.button("🔮 성장 코칭 받기", type="primary", use_container_width=Tr
 # 푸터
 st.markdown("---")
 st.caption("Made with ❤️ by ML Team | Clan Growth Coaching System")
+
+rerun_profile.stop()
+rerun_timer.stop()
+metrics.flush()
@@ -4,9 +4,19 @@ Clash of Clans 클랜의 생존 확률과 리그 등급을 예측하는 통합 
 
 실행 방법: streamlit run app_unified.py
 """
+import functools
+import gc
+
 import streamlit as st
-import joblib
-import numpy as np
+
+import artifacts
+import clan_index
+import metrics
+import sweeps
+from counterfactual import league_search
+from features import (LEAGUE_FEATURES, LEAGUE_INPUT_LOWER, LEAGUE_INPUT_UPPER, LEAGUE_INTEGER_FEATURES,
+                      SURVIVAL_FEATURES)
+from prediction_cache import PredictionCache
 
 # 페이지 설정
 st.set_page_config(
@@ -15,28 +25,214 @@ st.set_page_config(
     layout="centered"
 )
 
+# 단계별 지연시간 계측 (COC_METRICS=1일 때만, metrics.py) - 스크립트 한 번 실행 = 화면 다시 그리기 1회
+metrics.start_exporters()
+rerun_timer = metrics.span('unified', 'rerun')
+rerun_profile = metrics.profile('unified').start()
+
 # ==========================================
-# 모델 로드
+# 오래 사는 객체는 GC 대상에서 제외
+# Streamlit은 스크립트(또는 fragment)를 한 번 실행할 때마다 gc.collect(2)로 힙 전체를 훑고
+# (runner.postScriptGC), 그동안 화면 변경 전송이 밀립니다. import한 모듈과 로드한 모델은
+# 프로세스가 끝날 때까지 살아 있으므로 freeze해 두면 실행마다 새로 생긴 객체만 훑습니다.
 # ==========================================
+def freeze_heap():
+    """지금까지 살아 있는 객체를 영구 세대로 옮김 (로드 중 생긴 순환 쓰레기는 먼저 수거)
+
+    먼저 unfreeze해서 캐시에서 밀려난 이전 릴리스의 모델 / 인덱스(순환 참조 포함)도 이때 함께 수거
+    (로더는 max_entries=1이라 새 릴리스를 로드하면 이전 항목이 빠짐)
+    """
+    gc.unfreeze()
+    gc.collect()
+    gc.freeze()
+
 @st.cache_resource
-def load_survival_models():
+def freeze_imports():
+    """streamlit/pandas/altair 등 import된 모듈 (프로세스당 한 번)"""
+    freeze_heap()
+
+freeze_imports()
+
+# ==========================================
+# 모델 로드 (탭에서 처음 필요할 때 한 번만, 로드 후 freeze_heap)
+# 예측은 PredictionCache로 감싸 같은 입력이면 다시 계산하지 않음 (모든 세션이 공유)
+# release: incremental.py가 새 아티팩트를 게시하면 바뀌는 id -> 캐시 키가 달라져 다시 로드
+# (max_entries=1: 릴리스가 바뀌면 이전 릴리스 항목은 캐시에서 빠져 메모리가 계속 늘지 않음)
+# ==========================================
+@st.cache_resource(max_entries=1)
+def load_survival_models(release=None):
     """클랜 생존 예측 모델 로드"""
-    model = joblib.load('clan_retention_model.pkl')
-    war_freq_encoder = joblib.load('war_frequency_encoder.pkl')
-    clan_type_encoder = joblib.load('clan_type_encoder.pkl')
-    return model, war_freq_encoder, clan_type_encoder
+    model, survival_features = artifacts.load_survival_models(compiled=True)
+    freeze_heap()
+    return PredictionCache(model), survival_features
 
-@st.cache_resource
-def load_league_models():
+@st.cache_resource(max_entries=1)
+def load_league_models(release=None):
     """리그 등급 예측 모델 로드"""
-    model = joblib.load('league_prediction_model.pkl')
-    label_encoder = joblib.load('league_label_encoder.pkl')
-    tier_standards = joblib.load('tier_standards.pkl')
-    return model, label_encoder, tier_standards
+    model, league_encoder, tier_standards, league_features = artifacts.load_league_models(compiled=True)
+    freeze_heap()
+    return PredictionCache(model), league_encoder, tier_standards, league_features
+
+@st.cache_resource(max_entries=1)
+def load_tier_sketches(release=None):
+    """티어별 분포 스케치 (sketches.py, 없으면 None)"""
+    try:
+        sketches = artifacts.load_artifact('tier_sketches')
+    except FileNotFoundError:
+        return None
+    freeze_heap()
+    return sketches
+
+@st.cache_resource(max_entries=1)
+def load_similar_clans(release=None):
+    """비슷한 클랜 인덱스 (neighbors.py, 없으면 None)"""
+    try:
+        similar = artifacts.load_artifact('similar_clans')
+    except FileNotFoundError:
+        return None
+    freeze_heap()
+    return similar
+
+@st.cache_resource(max_entries=1)
+def load_clan_index(release=None):
+    """미리 스코어링한 클랜 태그 인덱스 (clan_index.py, 없으면 None)"""
+    try:
+        index = clan_index.load_index()
+    except FileNotFoundError:
+        return None
+    freeze_heap()
+    return index
+
+# 생존 예측 선택지 / what-if 스윕 항목 (피처 -> (이름, 최솟값, 최댓값), 위 number_input과 동일)
+WAR_FREQUENCY_OPTIONS = ['always', 'moreThanOncePerWeek', 'oncePerWeek', 'lessThanOncePerWeek', 'never', 'unknown']
+SURVIVAL_SWEEPS = {
+    'required_trophies': ('가입 조건 트로피', 0, 5500),
+    'mean_member_trophies': ('멤버 평균 트로피', 0, 6000),
+    'mean_member_level': ('멤버 평균 레벨', 1, 300),
+}
+
+# 리그 표시용 상수 (다시 그릴 때마다 만들지 않도록 모듈에 한 번)
+TIER_ORDER = ['Bronze', 'Silver', 'Gold', 'Crystal', 'Master', 'Champion']
+LEAGUE_EMOJI = {
+    'Bronze': '🥉', 'Silver': '🥈', 'Gold': '🥇',
+    'Crystal': '💎', 'Master': '🔥', 'Champion': '👑'
+}
+FEATURE_NAMES_KO = {
+    'clan_level': '클랜 레벨',
+    'clan_points': '클랜 포인트',
+    'war_wins': '클랜전 승리 수',
+    'clan_capital_points': '캐피탈 포인트',
+    'mean_member_level': '멤버 평균 레벨',
+    'mean_member_trophies': '멤버 평균 트로피',
+    'activity_ratio': '활동성 지수',
+    'entry_gap': '진입 장벽 격차',
+    'points_per_member': '멤버당 포인트'
+}
+
+
+def survival_status(survival_prob):
+    """생존 확률 -> (상태, 안내 문구)"""
+    if survival_prob >= 0.85:
+        return "🟢 안전", "이 클랜은 매우 안전합니다! 오래 유지될 가능성이 높습니다."
+    if survival_prob >= 0.6:
+        return "🟡 보통", "그럭저럭 안정적입니다. 활동성을 높이면 좀 더 좋아질 수 있어요."
+    return "🔴 위험", "이탈 위험이 있습니다! 클랜 관리에 신경 좀 쓰세요."
+
+
+# ==========================================
+# fragment: 섹션마다 따로 다시 실행 (st.fragment)
+# 입력은 st.form으로 묶어 제출할 때만 해당 섹션이 다시 실행되고, 다른 탭은 그대로 둠
+# 계측: 전체 실행은 'unified/rerun', fragment만 다시 실행될 때는 'unified/fragment_<이름>'
+# ==========================================
+def timed_fragment(name):
+    def decorator(func):
+        @functools.wraps(func)
+        def run(*args, **kwargs):
+            with metrics.timer('unified', f'fragment_{name}'):
+                func(*args, **kwargs)
+            metrics.flush()
+        return st.fragment(run)
+    return decorator
+
+
+# ==========================================
+# 성장 가이드 (예측 한 번에 목표 티어별로 미리 계산)
+# ==========================================
+def tier_gaps(current_values, target_standards, limit=5):
+    """목표 티어 평균 대비 부족한 항목 (차이 큰 순, 미미한 차이는 제외)"""
+    improvements = []
+    for feature, current in current_values.items():
+        if feature in target_standards.index:
+            target = target_standards[feature]
+            diff = target - current
+            if diff > 0.01:
+                improvements.append({
+                    'feature': FEATURE_NAMES_KO.get(feature, feature),
+                    'current': current,
+                    'target': target,
+                    'diff': diff
+                })
+    improvements.sort(key=lambda x: x['diff'], reverse=True)
+    return improvements[:limit]
+
+
+def tier_positions(tier_sketches, target_tier, current_values):
+    """목표 티어 클랜 분포에서 현재 값의 위치 (스케치가 없으면 빈 리스트)"""
+    if tier_sketches is None or tier_sketches.count(target_tier) == 0:
+        return []
+    return [
+        (FEATURE_NAMES_KO.get(feature, feature),
+         tier_sketches.percentile(target_tier, feature, current),
+         tier_sketches.quantile(target_tier, feature, 0.5))
+        for feature, current in current_values.items() if feature in tier_sketches.features
+    ]
+
+
+def similar_clans_in(similar_clans, target_tier, current_values):
+    """목표 티어에 있는 비슷한 클랜 (표시용 행 리스트, 인덱스가 없으면 빈 리스트)"""
+    if similar_clans is None or similar_clans.count(target_tier) == 0:
+        return []
+    with metrics.timer('league', 'neighbors'):
+        neighbors = similar_clans.search(current_values, target_tier, space='league')
+    return [{'클랜 태그': clan['clan_tag'], '거리': round(clan['distance'], 2),
+             **{FEATURE_NAMES_KO[feature]: int(clan[feature]) if feature in LEAGUE_INTEGER_FEATURES
+                else round(clan[feature], 1) for feature in LEAGUE_FEATURES}}
+            for clan in neighbors]
+
+
+def tier_guides(pred_league, current_values):
+    """예측 티어보다 높은 티어마다 {'gaps', 'positions', 'neighbors'} (목표 티어를 바꿔도 다시 계산하지 않음)
+
+    반사실 탐색('counterfactual')은 비용이 커서 해당 티어를 처음 볼 때 계산해 같은 dict에 저장합니다.
+    """
+    current_idx = TIER_ORDER.index(pred_league) if pred_league in TIER_ORDER else 0
+    tier_standards = load_league_models(artifacts.release_id())[2]
+    with metrics.timer('league', 'sketches'):
+        tier_sketches = load_tier_sketches(artifacts.release_id())
+    similar_clans = load_similar_clans(artifacts.release_id())
+    guides = {}
+    with metrics.timer('league', 'tier_standards'):
+        for tier in TIER_ORDER[current_idx + 1:]:
+            if tier in tier_standards.index:
+                guides[tier] = {
+                    'gaps': tier_gaps(current_values, tier_standards.loc[tier]),
+                    'positions': tier_positions(tier_sketches, tier, current_values),
+                    'neighbors': similar_clans_in(similar_clans, tier, current_values)
+                }
+            else:
+                guides[tier] = None
+    return guides
+
+
+def counterfactual_guide(current_values, target_tier):
+    """모델이 실제로 목표 티어를 예측하게 되는 최소 변경 탐색 (counterfactual.py)"""
+    league_model, league_encoder, tier_standards, league_features = load_league_models(artifacts.release_id())
+    with metrics.timer('league', 'counterfactual'):
+        # 후보 행은 한 번만 쓰이므로 PredictionCache를 거치지 않고 감싼 모델로 바로 예측 (캐시 오염 방지)
+        search = league_search(getattr(league_model, 'model', league_model), tier_standards)
+        return search.search(league_features.transform_one(**current_values)[0],
+                             league_encoder.transform([target_tier])[0])
 
-# 모델 로드
-survival_model, war_freq_encoder, clan_type_encoder = load_survival_models()
-league_model, league_encoder, tier_standards = load_league_models()
 
 # ==========================================
 # 메인 헤더
@@ -45,357 +241,498 @@ st.title("⚔️ 클랜 종합 분석기")
 st.markdown("**Clash of Clans 클랜의 생존 확률과 리그 등급을 예측합니다**")
 st.markdown("---")
 
-# ==========================================
-# 탭 구성
-# ==========================================
-tab1, tab2 = st.tabs(["🛡️ 클랜 생존 예측", "🏆 리그 등급 예측"])
-
 # ==========================================
 # 탭 1: 클랜 생존 예측
 # ==========================================
-with tab1:
+@timed_fragment('survival')
+def survival_section():
     st.subheader("🛡️ 클랜 생존 예측기")
     st.markdown("당신의 클랜은 앞으로도 살아남을 수 있을까요?")
-    
-    col1, col2 = st.columns(2)
-    
-    with col1:
-        mean_member_trophies = st.number_input(
-            "멤버 평균 트로피",
-            min_value=0, max_value=6000, value=1500,
-            help="클랜원들의 평균 트로피 점수",
-            key="survival_trophies"
-        )
-        
-        mean_member_level = st.number_input(
-            "멤버 평균 레벨",
-            min_value=1, max_value=300, value=100,
-            help="클랜원들의 평균 경험치 레벨",
-            key="survival_level"
-        )
-        
-        required_trophies = st.number_input(
-            "가입 조건 트로피",
-            min_value=0, max_value=5500, value=800,
-            help="클랜 가입에 필요한 최소 트로피",
-            key="survival_required"
-        )
-    
-    with col2:
-        war_frequency = st.selectbox(
-            "전쟁 빈도 설정",
-            options=['always', 'moreThanOncePerWeek', 'oncePerWeek', 'lessThanOncePerWeek', 'never', 'unknown'],
-            index=0,
-            help="클랜의 전쟁 빈도 설정값",
-            key="survival_war_freq"
-        )
-        
-        clan_type = st.selectbox(
-            "클랜 공개 설정",
-            options=['inviteOnly', 'open', 'closed'],
-            index=0,
-            help="클랜의 가입 방식",
-            key="survival_clan_type"
-        )
-        
-        is_family_friendly = st.checkbox(
-            "가족 친화 모드",
-            value=True,
-            help="가족 친화 설정 여부",
-            key="survival_family"
-        )
-    
-    if st.button("🔍 생존 확률 확인", type="primary", use_container_width=True, key="survival_btn"):
-        # 파생변수 계산
-        activity_ratio = mean_member_trophies / (mean_member_level + 1)
-        entry_gap = mean_member_trophies - required_trophies
-        
-        # 인코딩
-        try:
-            war_freq_code = war_freq_encoder.transform([war_frequency])[0]
-        except:
-            war_freq_code = 0
-        
-        try:
-            clan_type_code = clan_type_encoder.transform([clan_type])[0]
-        except:
-            clan_type_code = 0
-        
-        is_family_friendly_code = 1 if is_family_friendly else 0
-        
-        # 모델 입력
-        X_input = np.array([[
-            activity_ratio,
-            entry_gap,
-            war_freq_code,
-            is_family_friendly_code,
-            clan_type_code
-        ]])
-        
+
+    with st.form("survival_form", border=False):
+        col1, col2 = st.columns(2)
+
+        with col1:
+            mean_member_trophies = st.number_input(
+                "멤버 평균 트로피",
+                min_value=0, max_value=6000, value=1500,
+                help="클랜원들의 평균 트로피 점수",
+                key="survival_trophies"
+            )
+
+            mean_member_level = st.number_input(
+                "멤버 평균 레벨",
+                min_value=1, max_value=300, value=100,
+                help="클랜원들의 평균 경험치 레벨",
+                key="survival_level"
+            )
+
+            required_trophies = st.number_input(
+                "가입 조건 트로피",
+                min_value=0, max_value=5500, value=800,
+                help="클랜 가입에 필요한 최소 트로피",
+                key="survival_required"
+            )
+
+        with col2:
+            war_frequency = st.selectbox(
+                "전쟁 빈도 설정",
+                options=WAR_FREQUENCY_OPTIONS,
+                index=0,
+                help="클랜의 전쟁 빈도 설정값",
+                key="survival_war_freq"
+            )
+
+            clan_type = st.selectbox(
+                "클랜 공개 설정",
+                options=['inviteOnly', 'open', 'closed'],
+                index=0,
+                help="클랜의 가입 방식",
+                key="survival_clan_type"
+            )
+
+            is_family_friendly = st.checkbox(
+                "가족 친화 모드",
+                value=True,
+                help="가족 친화 설정 여부",
+                key="survival_family"
+            )
+
+        submitted = st.form_submit_button("🔍 생존 확률 확인", type="primary", use_container_width=True,
+                                          key="survival_btn")
+
+    if submitted:
+        metrics.count('survival', 'requests')
+        with metrics.timer('survival', 'load'):
+            survival_model, survival_features = load_survival_models(artifacts.release_id())
+
+        # 파생변수 계산 + 인코딩 + 모델 입력 (features.py)
+        input_values = {
+            'mean_member_trophies': mean_member_trophies,
+            'mean_member_level': mean_member_level,
+            'required_trophies': required_trophies,
+            'war_frequency': war_frequency,
+            'clan_type': clan_type,
+            'isFamilyFriendly': 1 if is_family_friendly else 0
+        }
+        with metrics.timer('survival', 'transform'):
+            X_input = survival_features.transform_one(**input_values)
+        inputs = dict(zip(SURVIVAL_FEATURES, X_input[0]))
+
         # 예측
-        survival_prob = survival_model.predict_proba(X_input)[0][1]
-        
-        # 결과 표시
-        st.markdown("---")
-        st.subheader("📊 진단 결과")
-        
-        if survival_prob >= 0.85:
-            status = "🟢 안전"
-            message = "이 클랜은 매우 안전합니다! 오래 유지될 가능성이 높습니다."
-        elif survival_prob >= 0.6:
-            status = "🟡 보통"
-            message = "그럭저럭 안정적입니다. 활동성을 높이면 좀 더 좋아질 수 있어요."
-        else:
-            status = "🔴 위험"
-            message = "이탈 위험이 있습니다! 클랜 관리에 신경 좀 쓰세요."
-        
-        st.metric(label="생존 확률", value=f"{survival_prob:.1%}", delta=status)
-        st.markdown(f"### {message}")
-        
-        with st.expander("세부 분석 보기"):
-            st.write(f"- **활동 효율성** (Activity Ratio): {activity_ratio:.2f}")
-            st.write(f"- **진입 장벽 격차** (Entry Gap): {entry_gap:,}")
-            if activity_ratio < 15:
-                st.warning("⚠️ 활동 효율성이 낮습니다. 멤버들의 트로피 활동을 장려하세요!")
-            if entry_gap < 500:
-                st.warning("⚠️ 진입 장벽이 너무 낮습니다. 가입 조건을 조정해 보세요!")
+        with metrics.timer('survival', 'predict_proba'):
+            survival_prob = survival_model.predict_proba(X_input)[0][1]
+
+        # session_state에 결과 저장 (what-if 곡선은 처음 볼 때 계산해 'sweeps'에 저장)
+        st.session_state['survival_result'] = {
+            'survival_prob': survival_prob,
+            'activity_ratio': inputs['activity_ratio'],
+            'entry_gap': inputs['entry_gap'],
+            'input_values': input_values,
+            'sweeps': {}
+        }
+
+    # session_state에 결과가 있으면 표시
+    if 'survival_result' in st.session_state:
+        result = st.session_state['survival_result']
+        show_survival_result(result)
+        survival_whatif_section(result)
+
+
+def show_survival_result(result):
+    survival_prob = result['survival_prob']
+    activity_ratio = result['activity_ratio']
+    entry_gap = result['entry_gap']
+
+    # 결과 표시
+    st.markdown("---")
+    st.subheader("📊 진단 결과")
+
+    status, message = survival_status(survival_prob)
+    st.metric(label="생존 확률", value=f"{survival_prob:.1%}", delta=status)
+    st.markdown(f"### {message}")
+
+    with st.expander("세부 분석 보기"):
+        st.write(f"- **활동 효율성** (Activity Ratio): {activity_ratio:.2f}")
+        st.write(f"- **진입 장벽 격차** (Entry Gap): {entry_gap:,.0f}")
+        if activity_ratio < 15:
+            st.warning("⚠️ 활동 효율성이 낮습니다. 멤버들의 트로피 활동을 장려하세요!")
+        if entry_gap < 500:
+            st.warning("⚠️ 진입 장벽이 너무 낮습니다. 가입 조건을 조정해 보세요!")
+
+
+# ==========================================
+# what-if 곡선 (항목을 바꾸면 이 fragment만 다시 실행, 곡선은 sweeps.py로 격자 전체를 한 번에 예측)
+# ==========================================
+@timed_fragment('survival_whatif')
+def survival_whatif_section(result):
+    st.markdown("---")
+    st.subheader("📉 설정을 바꾸면?")
+
+    feature = st.selectbox(
+        "바꿔 볼 항목",
+        options=list(SURVIVAL_SWEEPS),
+        format_func=lambda name: SURVIVAL_SWEEPS[name][0],
+        key="survival_sweep_feature"
+    )
+    by_war_frequency = st.checkbox("전쟁 빈도 설정별로 비교", value=True, key="survival_sweep_war")
+
+    key = (feature, by_war_frequency)
+    if key not in result['sweeps']:
+        survival_model, survival_features = load_survival_models(artifacts.release_id())
+        label, lower, upper = SURVIVAL_SWEEPS[feature]
+        grid = {feature: sweeps.value_range(lower, upper, integer=True)}
+        if by_war_frequency:
+            grid = {'war_frequency': WAR_FREQUENCY_OPTIONS, **grid}
+        with metrics.timer('survival', 'sweep'):
+            result['sweeps'][key] = sweeps.survival_curve(
+                survival_model, survival_features, result['input_values'], grid)
+    curve = result['sweeps'][key]
+
+    if by_war_frequency:
+        chart = curve.pivot(index=feature, columns='war_frequency', values='survival_prob')[WAR_FREQUENCY_OPTIONS]
+    else:
+        chart = curve.set_index(feature)['survival_prob']
+    st.line_chart(chart, x_label=SURVIVAL_SWEEPS[feature][0], y_label="생존 확률")
+    st.caption(f"현재 값: {result['input_values'][feature]:,} / 다른 입력은 그대로 두고 {len(curve):,}개 조합을 예측")
 
 # ==========================================
 # 탭 2: 리그 등급 예측
 # ==========================================
-with tab2:
+@timed_fragment('league')
+def league_section():
     st.subheader("🏆 리그 등급 예측기")
     st.markdown("클랜의 현재 상태로 어느 리그까지 올라갈 수 있을지 예측합니다")
-    
-    col1, col2 = st.columns(2)
-    
-    with col1:
-        clan_level = st.number_input(
-            "클랜 레벨",
-            min_value=1, max_value=30, value=10,
-            help="현재 클랜 레벨",
-            key="league_clan_level"
-        )
-        
-        clan_points = st.number_input(
-            "클랜 포인트",
-            min_value=0, max_value=100000, value=20000,
-            help="클랜 총 포인트",
-            key="league_clan_points"
-        )
-        
-        war_wins = st.number_input(
-            "클랜전 승리 수",
-            min_value=0, max_value=2000, value=100,
-            help="총 클랜전 승리 횟수",
-            key="league_war_wins"
-        )
-        
-        clan_capital_points = st.number_input(
-            "클랜 캐피탈 포인트",
-            min_value=0, max_value=100000, value=5000,
-            help="클랜 캐피탈 총 포인트",
-            key="league_capital_points"
-        )
-        
-        mean_level = st.number_input(
-            "멤버 평균 레벨",
-            min_value=1, max_value=300, value=120,
-            help="클랜원들의 평균 경험치 레벨",
-            key="league_mean_level"
-        )
-    
-    with col2:
-        mean_trophies = st.number_input(
-            "멤버 평균 트로피",
-            min_value=0, max_value=6000, value=2000,
-            help="클랜원들의 평균 트로피",
-            key="league_mean_trophies"
-        )
-        
-        activity_ratio_input = st.number_input(
-            "활동성 지수",
-            min_value=0.0, max_value=100.0, value=15.0,
-            help="트로피 / (레벨 + 1)",
-            key="league_activity"
-        )
-        
-        entry_gap_input = st.number_input(
-            "진입 장벽 격차",
-            min_value=-5000, max_value=5000, value=500,
-            help="평균 트로피 - 가입 조건 트로피",
-            key="league_entry_gap"
-        )
-        
-        points_per_member = st.number_input(
-            "멤버당 포인트",
-            min_value=0.0, max_value=5000.0, value=500.0,
-            help="클랜 포인트 / 멤버 수",
-            key="league_points_per_member"
-        )
-    
-    if st.button("🔍 리그 등급 예측", type="primary", use_container_width=True, key="league_btn"):
-        # 모델 입력 (9개 변수)
-        X_input = np.array([[
-            clan_level,
-            clan_points,
-            war_wins,
-            clan_capital_points,
-            mean_level,
-            mean_trophies,
-            activity_ratio_input,
-            entry_gap_input,
-            points_per_member
-        ]])
-        
+
+    with st.form("league_form", border=False):
+        col1, col2 = st.columns(2)
+
+        with col1:
+            clan_level = st.number_input(
+                "클랜 레벨",
+                min_value=1, max_value=30, value=10,
+                help="현재 클랜 레벨",
+                key="league_clan_level"
+            )
+
+            clan_points = st.number_input(
+                "클랜 포인트",
+                min_value=0, max_value=100000, value=20000,
+                help="클랜 총 포인트",
+                key="league_clan_points"
+            )
+
+            war_wins = st.number_input(
+                "클랜전 승리 수",
+                min_value=0, max_value=2000, value=100,
+                help="총 클랜전 승리 횟수",
+                key="league_war_wins"
+            )
+
+            clan_capital_points = st.number_input(
+                "클랜 캐피탈 포인트",
+                min_value=0, max_value=100000, value=5000,
+                help="클랜 캐피탈 총 포인트",
+                key="league_capital_points"
+            )
+
+            mean_level = st.number_input(
+                "멤버 평균 레벨",
+                min_value=1, max_value=300, value=120,
+                help="클랜원들의 평균 경험치 레벨",
+                key="league_mean_level"
+            )
+
+        with col2:
+            mean_trophies = st.number_input(
+                "멤버 평균 트로피",
+                min_value=0, max_value=6000, value=2000,
+                help="클랜원들의 평균 트로피",
+                key="league_mean_trophies"
+            )
+
+            activity_ratio_input = st.number_input(
+                "활동성 지수",
+                min_value=0.0, max_value=100.0, value=15.0,
+                help="트로피 / (레벨 + 1)",
+                key="league_activity"
+            )
+
+            entry_gap_input = st.number_input(
+                "진입 장벽 격차",
+                min_value=-5000, max_value=5000, value=500,
+                help="평균 트로피 - 가입 조건 트로피",
+                key="league_entry_gap"
+            )
+
+            points_per_member = st.number_input(
+                "멤버당 포인트",
+                min_value=0.0, max_value=5000.0, value=500.0,
+                help="클랜 포인트 / 멤버 수",
+                key="league_points_per_member"
+            )
+
+        submitted = st.form_submit_button("🔍 리그 등급 예측", type="primary", use_container_width=True,
+                                          key="league_btn")
+
+    if submitted:
+        metrics.count('league', 'requests')
+        with metrics.timer('league', 'load'):
+            league_model, league_encoder, _, league_features = load_league_models(artifacts.release_id())
+
+        # 모델 입력 (9개 변수, features.LEAGUE_FEATURES 순서)
+        input_values = {
+            'clan_level': clan_level,
+            'clan_points': clan_points,
+            'war_wins': war_wins,
+            'clan_capital_points': clan_capital_points,
+            'mean_member_level': mean_level,
+            'mean_member_trophies': mean_trophies,
+            'activity_ratio': activity_ratio_input,
+            'entry_gap': entry_gap_input,
+            'points_per_member': points_per_member
+        }
+        with metrics.timer('league', 'transform'):
+            X_input = league_features.transform_one(**input_values)
+
         # 예측
-        pred_encoded = league_model.predict(X_input)[0]
-        pred_league = league_encoder.inverse_transform([pred_encoded])[0]
-        
+        with metrics.timer('league', 'predict'):
+            pred_encoded = league_model.predict(X_input)[0]
+        with metrics.timer('league', 'encoder'):
+            pred_league = league_encoder.inverse_transform([pred_encoded])[0]
+
         # 확률 분포 (가능하면)
         try:
-            proba = league_model.predict_proba(X_input)[0]
+            with metrics.timer('league', 'predict_proba'):
+                proba = league_model.predict_proba(X_input)[0]
             classes = league_encoder.classes_
         except:
             proba = None
             classes = None
-        
-        # session_state에 결과 저장
+
+        # session_state에 결과 + 목표 티어별 성장 가이드 저장 (what-if 곡선은 처음 볼 때 'sweeps'에 저장)
         st.session_state['league_result'] = {
             'pred_league': pred_league,
             'proba': proba,
             'classes': classes,
-            'input_values': {
-                'clan_level': clan_level,
-                'clan_points': clan_points,
-                'war_wins': war_wins,
-                'clan_capital_points': clan_capital_points,
-                'mean_member_level': mean_level,
-                'mean_member_trophies': mean_trophies,
-                'activity_ratio': activity_ratio_input,
-                'entry_gap': entry_gap_input,
-                'points_per_member': points_per_member
-            }
+            'input_values': input_values,
+            'guides': tier_guides(pred_league, input_values),
+            'sweeps': {}
         }
-    
+
     # session_state에 결과가 있으면 표시
     if 'league_result' in st.session_state:
         result = st.session_state['league_result']
-        pred_league = result['pred_league']
-        proba = result['proba']
-        classes = result['classes']
-        current_values = result['input_values']
-        
-        # 결과 표시
-        st.markdown("---")
-        st.subheader("📊 예측 결과")
-        
-        # 리그별 이모지
-        league_emoji = {
-            'Bronze': '🥉', 'Silver': '🥈', 'Gold': '🥇',
-            'Crystal': '💎', 'Master': '🔥', 'Champion': '👑'
-        }
-        
-        emoji = league_emoji.get(pred_league, '🏆')
-        st.metric(label="예측 리그", value=f"{emoji} {pred_league}")
-        
-        # 확률 분포 표시
-        if proba is not None:
-            st.markdown("### 📈 리그별 확률 분포")
-            
-            # 순서대로 정렬
-            tier_order = ['Bronze', 'Silver', 'Gold', 'Crystal', 'Master', 'Champion']
-            sorted_data = []
-            for tier in tier_order:
-                if tier in classes:
-                    idx = list(classes).index(tier)
-                    sorted_data.append((tier, proba[idx]))
-            
-            for tier, prob in sorted_data:
-                emoji_tier = league_emoji.get(tier, '')
-                st.write(f"{emoji_tier} **{tier}**: {prob:.1%}")
-        
-        # ±1 티어 설명
-        with st.expander("ℹ️ 예측 정확도 안내"):
-            st.info("""
-            **모델 정확도**: 약 65%  
-            **±1 티어 허용 시**: 약 98%
-            
-            예를 들어 Gold로 예측했다면, 실제 리그가 Silver~Crystal 범위일 확률이 98%입니다!
-            """)
-        
-        # ==========================================
-        # 성장 가이드
-        # ==========================================
-        st.markdown("---")
-        st.subheader("📈 성장 가이드")
-        
-        tier_order = ['Bronze', 'Silver', 'Gold', 'Crystal', 'Master', 'Champion']
-        current_idx = tier_order.index(pred_league) if pred_league in tier_order else 0
-        
-        # 현재 티어보다 높은 티어만 선택 가능
-        available_tiers = tier_order[current_idx + 1:] if current_idx < len(tier_order) - 1 else []
-        
-        if not available_tiers:
-            st.success("🎉 축하합니다! 이미 최고 티어(Champion)입니다!")
+        show_league_result(result)
+        league_whatif_section(result)
+        growth_guide_section(result)
+
+
+def show_league_result(result):
+    pred_league = result['pred_league']
+    proba = result['proba']
+    classes = result['classes']
+
+    # 결과 표시
+    st.markdown("---")
+    st.subheader("📊 예측 결과")
+
+    emoji = LEAGUE_EMOJI.get(pred_league, '🏆')
+    st.metric(label="예측 리그", value=f"{emoji} {pred_league}")
+
+    # 확률 분포 표시 (티어 순서대로)
+    if proba is not None:
+        st.markdown("### 📈 리그별 확률 분포")
+        class_list = list(classes)
+        for tier in TIER_ORDER:
+            if tier in class_list:
+                st.write(f"{LEAGUE_EMOJI.get(tier, '')} **{tier}**: {proba[class_list.index(tier)]:.1%}")
+
+    # ±1 티어 설명
+    with st.expander("ℹ️ 예측 정확도 안내"):
+        st.info("""
+        **모델 정확도**: 약 65%
+        **±1 티어 허용 시**: 약 98%
+
+        예를 들어 Gold로 예측했다면, 실제 리그가 Silver~Crystal 범위일 확률이 98%입니다!
+        """)
+
+
+@timed_fragment('league_whatif')
+def league_whatif_section(result):
+    st.markdown("---")
+    st.subheader("📉 항목 하나를 바꾸면?")
+
+    feature = st.selectbox(
+        "바꿔 볼 항목",
+        options=LEAGUE_FEATURES,
+        format_func=lambda name: FEATURE_NAMES_KO.get(name, name),
+        key="league_sweep_feature"
+    )
+
+    if feature not in result['sweeps']:
+        league_model, league_encoder, _, league_features = load_league_models(artifacts.release_id())
+        values = sweeps.value_range(LEAGUE_INPUT_LOWER.get(feature, 0), LEAGUE_INPUT_UPPER[feature],
+                                    integer=feature in LEAGUE_INTEGER_FEATURES)
+        with metrics.timer('league', 'sweep'):
+            result['sweeps'][feature] = sweeps.league_curve(
+                league_model, league_features, league_encoder, result['input_values'], {feature: values})
+    curve = result['sweeps'][feature]
+
+    tiers = [tier for tier in TIER_ORDER if tier in curve.columns]
+    st.area_chart(curve.set_index(feature)[tiers], x_label=FEATURE_NAMES_KO.get(feature, feature), y_label="리그별 확률")
+    st.caption(f"현재 값: {result['input_values'][feature]:,} / 다른 입력은 그대로 두고 {len(curve):,}개 값을 예측")
+
+
+# ==========================================
+# 성장 가이드 (목표 티어를 바꾸면 이 fragment만 다시 실행, 미리 계산한 결과를 그대로 표시)
+# ==========================================
+@timed_fragment('growth_guide')
+def growth_guide_section(result):
+    pred_league = result['pred_league']
+    guides = result['guides']
+
+    st.markdown("---")
+    st.subheader("📈 성장 가이드")
+
+    # 현재 티어보다 높은 티어만 선택 가능
+    available_tiers = list(guides)
+
+    if not available_tiers:
+        st.success("🎉 축하합니다! 이미 최고 티어(Champion)입니다!")
+        return
+
+    # 목표 티어 선택
+    target_tier = st.selectbox(
+        "🎯 목표 티어 선택",
+        options=available_tiers,
+        index=0,
+        help="도달하고 싶은 목표 티어를 선택하세요",
+        key="target_tier_select"
+    )
+
+    target_emoji = LEAGUE_EMOJI.get(target_tier, '🏆')
+    st.markdown(f"**현재 티어**: {LEAGUE_EMOJI.get(pred_league, '')} {pred_league} → **목표 티어**: {target_emoji} {target_tier}")
+
+    guide = guides[target_tier]
+    if guide is None:
+        st.warning("티어 기준 데이터를 찾을 수 없습니다.")
+        return
+
+    # 목표 티어 클랜 분포에서 현재 값의 위치
+    if guide['positions']:
+        with st.expander(f"📍 {target_tier} 클랜 중 내 위치"):
+            for feature, pct, median in guide['positions']:
+                st.write(f"- **{feature}**: {pct:.0f}번째 백분위 (중앙값 {median:,.1f})")
+
+    # 목표 티어에 도달한 클랜 중 지금 내 클랜과 가장 비슷한 클랜 (neighbors.py)
+    if guide['neighbors']:
+        with st.expander(f"👥 {target_tier} 클랜 중 나와 비슷한 클랜"):
+            st.dataframe(guide['neighbors'], hide_index=True)
+
+    st.markdown("#### 🎯 개선이 필요한 항목")
+
+    # 반사실 탐색은 티어마다 처음 볼 때 한 번만
+    if 'counterfactual' not in guide:
+        guide['counterfactual'] = counterfactual_guide(result['input_values'], target_tier)
+    counterfactual = guide['counterfactual']
+
+    if counterfactual['reached']:
+        st.caption(f"아래 항목만 바꾸면 모델이 {target_tier}(으)로 예측합니다 "
+                   f"(목표 티어 확률 {counterfactual['target_proba']:.1%})")
+        for item in counterfactual['changes'][:5]:
+            arrow = "📈 +" if item['diff'] > 0 else "📉 "
+            st.write(f"- **{FEATURE_NAMES_KO.get(item['feature'], item['feature'])}**: "
+                     f"현재 {item['current']:,.1f} → 목표 {item['target']:,.1f} ({arrow}{item['diff']:,.1f})")
+    else:
+        st.caption(f"모델 기준 경로를 찾지 못해 {target_tier} 티어 평균과의 차이를 보여드립니다.")
+        if guide['gaps']:
+            for item in guide['gaps']:
+                st.write(f"- **{item['feature']}**: 현재 {item['current']:,.1f} → 목표 {item['target']:,.1f} (📈 +{item['diff']:,.1f})")
         else:
-            # 목표 티어 선택
-            target_tier = st.selectbox(
-                "🎯 목표 티어 선택",
-                options=available_tiers,
-                index=0,
-                help="도달하고 싶은 목표 티어를 선택하세요",
-                key="target_tier_select"
-            )
-            
-            target_emoji = league_emoji.get(target_tier, '🏆')
-            st.markdown(f"**현재 티어**: {league_emoji.get(pred_league, '')} {pred_league} → **목표 티어**: {target_emoji} {target_tier}")
-            
-            # 목표 티어 기준값
-            if target_tier in tier_standards.index:
-                target_standards = tier_standards.loc[target_tier]
-                
-                st.markdown("#### 🎯 개선이 필요한 항목")
-                
-                feature_names_ko = {
-                    'clan_level': '클랜 레벨',
-                    'clan_points': '클랜 포인트',
-                    'war_wins': '클랜전 승리 수',
-                    'clan_capital_points': '캐피탈 포인트',
-                    'mean_member_level': '멤버 평균 레벨',
-                    'mean_member_trophies': '멤버 평균 트로피',
-                    'activity_ratio': '활동성 지수',
-                    'entry_gap': '진입 장벽 격차',
-                    'points_per_member': '멤버당 포인트'
-                }
-                
-                improvements = []
-                for feature, current in current_values.items():
-                    if feature in target_standards.index:
-                        target = target_standards[feature]
-                        diff = target - current
-                        if diff > 0:
-                            improvements.append({
-                                'feature': feature_names_ko.get(feature, feature),
-                                'current': current,
-                                'target': target,
-                                'diff': diff
-                            })
-                
-                if improvements:
-                    # 중요도 순으로 정렬 (diff 크기 기준)
-                    improvements.sort(key=lambda x: x['diff'], reverse=True)
-                    
-                    for item in improvements[:5]:  # 상위 5개만 표시
-                        if item['diff'] > 0.01:  # 미미한 차이는 제외
-                            st.write(f"- **{item['feature']}**: 현재 {item['current']:,.1f} → 목표 {item['target']:,.1f} (📈 +{item['diff']:,.1f})")
-                else:
-                    st.success(f"👍 모든 수치가 {target_tier} 티어 기준을 충족합니다! 조금만 더 노력하세요!")
-            else:
-                st.warning("티어 기준 데이터를 찾을 수 없습니다.")
+            st.success(f"👍 모든 수치가 {target_tier} 티어 기준을 충족합니다! 조금만 더 노력하세요!")
+
+# ==========================================
+# 탭 3: 클랜 태그 조회 (미리 스코어링한 결과, 모델 호출 없음)
+# ==========================================
+@timed_fragment('clan_lookup')
+def clan_lookup_section():
+    st.subheader("🔎 클랜 태그 조회")
+    st.markdown("미리 분석해 둔 클랜이라면 태그만으로 바로 결과를 보여드립니다")
+
+    with metrics.timer('clan', 'load'):
+        index = load_clan_index(artifacts.release_id())
+
+    if index is None:
+        st.info("클랜 인덱스가 없습니다. `python src/clan_index.py --input coc_clans_dataset.csv` 로 먼저 만들어 주세요.")
+        return
+
+    with st.form("lookup_form", border=False):
+        lookup_tag = st.text_input(
+            "클랜 태그",
+            placeholder="#2QC9Y0CQU",
+            help="게임의 클랜 정보 화면에 있는 태그 ('#'은 생략 가능)",
+            key="lookup_tag"
+        )
+        submitted = st.form_submit_button("🔎 조회", type="primary", use_container_width=True, key="lookup_btn")
+
+    if not submitted:
+        return
+
+    metrics.count('clan', 'requests')
+    with metrics.timer('clan', 'lookup'):
+        clan = index.get(lookup_tag)
+
+    if clan is None:
+        st.warning(f"인덱스에 없는 태그입니다: {lookup_tag} (직접 입력은 다른 탭을 이용하세요)")
+        return
+
+    st.markdown("---")
+    st.subheader(f"📊 {clan['clan_tag']} 분석 결과")
+
+    status, _ = survival_status(clan['survival_prob'])
+    pred_league = clan['predicted_league']
+
+    col1, col2 = st.columns(2)
+    with col1:
+        st.metric(label="생존 확률", value=f"{clan['survival_prob']:.1%}", delta=status)
+    with col2:
+        st.metric(label="예측 리그", value=f"{LEAGUE_EMOJI.get(pred_league, '🏆')} {pred_league}")
+
+    st.markdown("### 📈 리그별 확률 분포")
+    for tier, prob in clan['probabilities'].items():
+        st.write(f"{LEAGUE_EMOJI.get(tier, '')} **{tier}**: {prob:.1%}")
+
+    with st.expander("클랜 정보 / 모델 입력값 보기"):
+        st.write(f"- **클랜 레벨**: {clan['clan_level']} | **멤버 수**: {clan['num_members']}")
+        st.write(f"- **전쟁 빈도**: {clan['war_frequency']} | **공개 설정**: {clan['clan_type']}")
+        for feature, value in clan_index.league_inputs(clan).items():
+            st.write(f"- {feature}: {value:,.2f}")
+        if clan['is_ghost']:
+            st.warning("⚠️ 유령 클랜 조건(멤버 5명 미만 / 캐피탈 0 / 전쟁 기록 없음)에 해당합니다.")
+
+    st.caption(f"인덱스 빌드: {index.meta.get('built_at')} | 성장 가이드는 🏆 리그 등급 예측 탭에서 확인하세요")
+
+# ==========================================
+# 탭 구성 (탭마다 fragment 하나 -> 한 탭의 입력/선택이 다른 탭을 다시 실행하지 않음)
+# ==========================================
+tab1, tab2, tab3 = st.tabs(["🛡️ 클랜 생존 예측", "🏆 리그 등급 예측", "🔎 클랜 태그 조회"])
+
+with tab1:
+    survival_section()
+
+with tab2:
+    league_section()
+
+with tab3:
+    clan_lookup_section()
 
 # ==========================================
 # 푸터
 # ==========================================
 st.markdown("---")
 st.caption("Made with ❤️ by ML Team | Data: Clash of Clans API")
+
+rerun_profile.stop()
+rerun_timer.stop()
+metrics.flush()
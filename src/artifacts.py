@@ -0,0 +1,364 @@
+"""
+📦 모델 아티팩트 (Model Artifacts)
+노트북이 저장한 *.pkl 모델/인코더/tier_standards를 필요할 때 한 번씩만 로드하고,
+트리 앙상블을 네이티브 포맷(LightGBM 텍스트 / XGBoost UBJSON)으로 내보내
+sklearn 래퍼를 거치지 않고 불러올 수 있게 합니다.
+
+- 모델 디렉토리: 인자로 주지 않으면 환경변수 COC_MODEL_DIR (기본값: 현재 디렉토리)
+- 네이티브 파일(<이름>.lgb.txt / <이름>.xgb.ubj + <이름>.native.json)이 있으면 pkl보다 우선
+  (pkl이 더 최근에 바뀌었으면 네이티브 파일은 무시)
+- 앱은 compiled=True로 펼친 트리 배열(<이름>.trees.npz, tree_engine.py)을 사용
+- publish_artifacts(여러 파일) / publish_artifact(객체 하나)로 파일을 교체하면 릴리스 파일(_release.json)이 바뀌고, 앱은 release_id()를 캐시 키로 써서 다시 로드
+
+실행 방법 (네이티브 포맷 내보내기):
+    python src/artifacts.py --model-dir .
+"""
+import argparse
+import json
+import os
+import shutil
+import tempfile
+import time
+import warnings
+
+import joblib
+import numpy as np
+
+from features import CategoryTable, league_transform, survival_transform
+from tree_engine import TreeEnsemble
+
+MODEL_FILES = {
+    'survival_model': 'clan_retention_model.pkl',
+    'war_frequency_encoder': 'war_frequency_encoder.pkl',
+    'clan_type_encoder': 'clan_type_encoder.pkl',
+    'league_model': 'league_prediction_model.pkl',
+    'league_encoder': 'league_label_encoder.pkl',
+    'tier_standards': 'tier_standards.pkl',
+    'coaching_model': 'clan_league_model.pkl',
+}
+
+# 없어도 되는 아티팩트 (incremental.py / sketches.py / neighbors.py가 만듦, 없으면 앱 기본값 사용)
+OPTIONAL_FILES = {
+    'coaching_standards': 'coaching_tier_standards.pkl',
+    'tier_sketches': 'tier_sketches.pkl',
+    'similar_clans': 'similar_clans.pkl',
+}
+
+# 네이티브 포맷으로 내보낼 트리 앙상블
+TREE_MODELS = ['survival_model', 'league_model', 'coaching_model']
+
+NATIVE_META_SUFFIX = '.native.json'
+ENGINE_SUFFIX = '.trees.npz'
+RELEASE_FILE = '_release.json'
+
+
+def model_dir_or_default(model_dir=None):
+    return model_dir if model_dir is not None else os.environ.get('COC_MODEL_DIR', '.')
+
+
+def artifact_path(key, model_dir=None):
+    name = MODEL_FILES[key] if key in MODEL_FILES else OPTIONAL_FILES[key]
+    return os.path.join(model_dir_or_default(model_dir), name)
+
+
+# ==========================================
+# 아티팩트 교체 (실행 중인 앱이 반쯤 바뀐 파일을 읽지 않도록)
+# ==========================================
+def release_id(model_dir=None):
+    """현재 릴리스 id (publish_artifacts로 교체한 적이 없으면 None). 앱의 st.cache_resource 키로 사용"""
+    try:
+        with open(os.path.join(model_dir_or_default(model_dir), RELEASE_FILE), encoding='utf-8') as f:
+            return json.load(f).get('id')
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+def _publish_order(name):
+    # pkl -> 네이티브 부스터/트리 배열 -> 메타(json) 순서로 교체
+    # pkl이 먼저 바뀌면 이전 메타는 source 서명이 안 맞아 무시되므로 중간 상태에서도 새 pkl을 읽음
+    if name.endswith(NATIVE_META_SUFFIX):
+        return 2
+    return 0 if name.endswith('.pkl') else 1
+
+
+def publish_artifacts(staging_dir, model_dir=None, info=None):
+    """staging_dir의 파일을 모델 디렉토리로 옮기고(os.replace, 파일마다 원자적) 릴리스 id를 올림
+
+    staging_dir은 모델 디렉토리와 같은 파일 시스템에 있어야 합니다. 반환값은 새 릴리스 id.
+    """
+    model_dir = model_dir_or_default(model_dir)
+    names = sorted(os.listdir(staging_dir), key=lambda name: (_publish_order(name), name))
+    for name in names:
+        os.replace(os.path.join(staging_dir, name), os.path.join(model_dir, name))
+
+    release = {'id': f"{time.time_ns():x}", 'files': names, **(info or {})}
+    tmp_path = os.path.join(model_dir, RELEASE_FILE + '.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(release, f, indent=2)
+    os.replace(tmp_path, os.path.join(model_dir, RELEASE_FILE))
+    return release['id']
+
+
+def publish_artifact(key, obj, model_dir=None, info=None):
+    """객체 하나를 <key>.pkl로 저장해 게시 (모델 디렉토리 안 임시 폴더에 쓴 뒤 publish_artifacts). 반환값은 새 릴리스 id"""
+    model_dir = model_dir_or_default(model_dir)
+    staging = tempfile.mkdtemp(prefix='.staging-', dir=model_dir)
+    try:
+        joblib.dump(obj, artifact_path(key, staging))
+        return publish_artifacts(staging, model_dir, info)
+    finally:
+        shutil.rmtree(staging, ignore_errors=True)
+
+
+# ==========================================
+# joblib 로드 (mmap)
+# ==========================================
+def load_artifact(key, model_dir=None):
+    """pkl 아티팩트 로드. 압축되지 않은 numpy 배열은 메모리 맵으로 읽어 복사/상주 메모리를 줄임"""
+    with warnings.catch_warnings():
+        # 압축 pkl은 mmap이 불가능해 joblib이 경고 후 일반 로드로 처리함
+        warnings.filterwarnings('ignore', message='.*mmap_mode.*')
+        return joblib.load(artifact_path(key, model_dir), mmap_mode='r')
+
+
+def predict_proba(model, X):
+    """model.predict_proba(X) - DataFrame으로 학습된 모델에 행렬을 넣을 때 나는 피처 이름 경고는 이 호출 안에서만 무시"""
+    with warnings.catch_warnings():
+        warnings.filterwarnings('ignore', message='X does not have valid feature names')
+        return model.predict_proba(X)
+
+
+# ==========================================
+# 네이티브 부스터 (sklearn 래퍼 없이 예측)
+# ==========================================
+class NativeClassifier:
+    """LightGBM/XGBoost 부스터를 predict / predict_proba로 감싼 최소 분류기
+
+    classes_, n_features_in_, feature_name_이 sklearn 래퍼와 같아
+    앱/서버/배치 스코어링 코드에서 그대로 바꿔 쓸 수 있습니다.
+    """
+
+    def __init__(self, booster, library, classes, feature_names):
+        self.booster = booster
+        self.library = library
+        self.classes_ = np.asarray(classes)
+        self.feature_name_ = list(feature_names)
+        self.n_features_in_ = len(self.feature_name_)
+        self.n_jobs = None
+
+    def __repr__(self):
+        return f"NativeClassifier({self.library}, classes={len(self.classes_)}, features={self.n_features_in_})"
+
+    def get_params(self):
+        return {'n_jobs': self.n_jobs}
+
+    def set_params(self, n_jobs=None):
+        """예측 스레드 수 (sklearn 래퍼의 n_jobs와 같은 의미)"""
+        self.n_jobs = n_jobs
+        if self.library == 'xgboost' and n_jobs:
+            self.booster.set_param({'nthread': n_jobs})
+        return self
+
+    def predict_proba(self, X):
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        if self.library == 'lightgbm':
+            raw = self.booster.predict(X, num_threads=self.n_jobs) if self.n_jobs else self.booster.predict(X)
+        else:
+            raw = self.booster.inplace_predict(X)
+        raw = np.asarray(raw, dtype=np.float64)
+        if raw.ndim == 1:  # 이진 분류는 양성 확률만 반환됨
+            return np.column_stack([1.0 - raw, raw])
+        return raw
+
+    def predict(self, X):
+        return self.classes_[self.predict_proba(X).argmax(axis=1)]
+
+
+def _native_paths(key, model_dir):
+    stem = os.path.splitext(artifact_path(key, model_dir))[0]
+    return stem + NATIVE_META_SUFFIX, stem
+
+
+def source_signature(path):
+    stat = os.stat(path)
+    return {'size': stat.st_size, 'mtime': stat.st_mtime}
+
+
+def check_engine(engine, model, X=None):
+    """펼친 트리 엔진이 model.predict_proba와 비트 단위로 같은지 -> (다른 원소 수, 최대 차이)
+
+    X가 없으면 분기 경계 / 0 / NaN을 섞은 검증 입력(TreeEnsemble.probe_inputs)을 사용합니다.
+    """
+    X = engine.probe_inputs() if X is None else np.ascontiguousarray(X, dtype=np.float32)
+    expected = np.asarray(predict_proba(model, X))
+    actual = engine.predict_proba(X)
+    if expected.shape != actual.shape:
+        return expected.size, float('inf')
+    differ = actual != expected
+    return int(differ.sum()), float(np.abs(actual - expected).max()) if differ.any() else 0.0
+
+
+def export_native(key, model_dir=None, sample=None):
+    """pkl 모델을 네이티브 포맷으로 저장하고 저장된 부스터 파일 경로를 반환
+
+    펼친 트리 배열은 sample(없으면 검증 입력)에서 원본 예측과 비트 단위로 같을 때만 저장하고,
+    다르면 아무 파일도 쓰지 않고 ValueError를 냅니다.
+    """
+    source = artifact_path(key, model_dir)
+    model = joblib.load(source)
+    meta_path, stem = _native_paths(key, model_dir)
+
+    if hasattr(model, 'booster_'):  # LightGBM sklearn 래퍼
+        library, booster_path = 'lightgbm', stem + '.lgb.txt'
+        booster = model.booster_
+        feature_names = booster.feature_name()
+    elif hasattr(model, 'get_booster'):  # XGBoost sklearn 래퍼
+        library, booster_path = 'xgboost', stem + '.xgb.ubj'
+        booster = model.get_booster()
+        feature_names = booster.feature_names or [f'f{i}' for i in range(model.n_features_in_)]
+    elif isinstance(model, NativeClassifier):  # imbalance.py의 lgb.train 학습 결과
+        library = model.library
+        booster_path = stem + ('.lgb.txt' if library == 'lightgbm' else '.xgb.ubj')
+        booster = model.booster
+        feature_names = model.feature_name_
+    else:
+        raise TypeError(f"{key}: 네이티브 포맷으로 내보낼 수 없는 모델입니다 ({type(model).__name__})")
+
+    # 펼친 트리 배열 (tree_engine.TreeEnsemble, 앱의 한 건 예측용) - 원본과 다르면 내보내지 않음
+    engine = TreeEnsemble.from_model(model)
+    n_diff, max_diff = check_engine(engine, model, sample)
+    if n_diff:
+        raise ValueError(f"{key}: 트리 엔진 예측이 원본과 다릅니다 ({n_diff}개 원소, 최대 차이 {max_diff:.3g}). "
+                         f"{ENGINE_SUFFIX}를 저장하지 않습니다.")
+    booster.save_model(booster_path)
+    engine_path = stem + ENGINE_SUFFIX
+    engine.save(engine_path)
+
+    meta = {
+        'library': library,
+        'booster': os.path.basename(booster_path),
+        'engine': os.path.basename(engine_path),
+        'classes': np.asarray(model.classes_).tolist(),
+        'feature_names': list(feature_names),
+        'source': source_signature(source),
+    }
+    with open(meta_path, 'w', encoding='utf-8') as f:
+        json.dump(meta, f, indent=2)
+    return booster_path
+
+
+def _read_native_meta(key, model_dir):
+    """네이티브 메타(json) / 파일이 없거나 pkl보다 오래됐으면 None"""
+    meta_path, _ = _native_paths(key, model_dir)
+    if not os.path.exists(meta_path):
+        return None
+    with open(meta_path, encoding='utf-8') as f:
+        meta = json.load(f)
+
+    source = artifact_path(key, model_dir)
+    if os.path.exists(source) and source_signature(source) != meta['source']:
+        warnings.warn(f"{os.path.basename(source)}이 네이티브 파일보다 최근에 바뀌어 pkl을 사용합니다. "
+                      "python src/artifacts.py 로 다시 내보내세요.")
+        return None
+    meta['dir'] = os.path.dirname(meta_path)
+    return meta
+
+
+def load_native(key, model_dir=None):
+    """네이티브 부스터 로드 / 파일이 없거나 pkl보다 오래됐으면 None"""
+    meta = _read_native_meta(key, model_dir)
+    if meta is None:
+        return None
+
+    booster_path = os.path.join(meta['dir'], meta['booster'])
+    if meta['library'] == 'lightgbm':
+        import lightgbm as lgb
+        booster = lgb.Booster(model_file=booster_path)
+    else:
+        import xgboost as xgb
+        booster = xgb.Booster(model_file=booster_path)
+    return NativeClassifier(booster, meta['library'], meta['classes'], meta['feature_names'])
+
+
+def load_compiled(key, model_dir=None):
+    """tree_engine.TreeEnsemble로 로드 (내보낸 .trees.npz가 있으면 변환 없이 바로 사용)
+
+    .trees.npz가 없거나 오래됐으면 그 자리에서 변환하고 export_native처럼 원본과 비교합니다.
+    변환할 수 없거나(지원하지 않는 분기/목적 함수) 예측이 다르면 경고 후 원본 모델(네이티브/pkl)을 반환합니다.
+    """
+    meta = _read_native_meta(key, model_dir)
+    if meta is not None and meta.get('engine'):
+        return TreeEnsemble.load(os.path.join(meta['dir'], meta['engine']))
+
+    model = load_model(key, model_dir)
+    try:
+        engine = TreeEnsemble.from_model(model)
+    except NotImplementedError as error:
+        warnings.warn(f"{key}: 트리 엔진으로 변환할 수 없어 원본 모델을 사용합니다 ({error})")
+        return model
+    n_diff, max_diff = check_engine(engine, model)
+    if n_diff:
+        warnings.warn(f"{key}: 트리 엔진 예측이 원본과 달라 ({n_diff}개 원소, 최대 차이 {max_diff:.3g}) "
+                      "원본 모델을 사용합니다.")
+        return model
+    return engine
+
+
+def load_model(key, model_dir=None, prefer_native=True, compiled=False):
+    """트리 모델 로드 (네이티브 파일 우선, 없으면 pkl)
+
+    compiled=True면 sklearn/부스터 대신 NumPy 트리 엔진으로 예측합니다 (한 건 ~ 수십 건 예측에 유리).
+    """
+    if compiled:
+        return load_compiled(key, model_dir)
+    if prefer_native:
+        model = load_native(key, model_dir)
+        if model is not None:
+            return model
+    return load_artifact(key, model_dir)
+
+
+# ==========================================
+# 앱/서버용 번들 (필요한 모델만 로드)
+# ==========================================
+def load_survival_transform(model_dir=None):
+    """클랜 생존 예측 피처 변환기 (war_frequency / clan_type 인코더 포함)"""
+    return survival_transform(
+        load_artifact('war_frequency_encoder', model_dir),
+        load_artifact('clan_type_encoder', model_dir)
+    )
+
+
+def load_survival_models(model_dir=None, compiled=False):
+    """클랜 생존 예측: (모델, 피처 변환기)"""
+    model = load_model('survival_model', model_dir, compiled=compiled)
+    return model, load_survival_transform(model_dir)
+
+
+def load_league_models(model_dir=None, compiled=False):
+    """리그 등급 예측: (모델, 라벨 인코더, tier_standards, 피처 변환기)"""
+    model = load_model('league_model', model_dir, compiled=compiled)
+    # 리그 라벨은 모르는 값이면 오류 (LabelEncoder와 같은 동작, 조회만 표로)
+    label_encoder = CategoryTable.from_encoder(load_artifact('league_encoder', model_dir), unknown_code=None)
+    tier_standards = load_artifact('tier_standards', model_dir)
+    return model, label_encoder, tier_standards, league_transform()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='트리 모델을 네이티브 포맷으로 내보내기')
+    parser.add_argument('--model-dir', default=None, help='*.pkl 모델 디렉토리 (기본: COC_MODEL_DIR 또는 현재 디렉토리)')
+    parser.add_argument('--models', nargs='+', default=TREE_MODELS, choices=TREE_MODELS)
+    args = parser.parse_args()
+
+    for key in args.models:
+        source = artifact_path(key, args.model_dir)
+        if not os.path.exists(source):
+            print(f"⏭️ {MODEL_FILES[key]} 없음, 건너뜀")
+            continue
+        path = export_native(key, args.model_dir)
+        print(f"✅ {MODEL_FILES[key]} -> {os.path.basename(path)} "
+              f"({os.path.getsize(source) / 1024:,.0f}KB -> {os.path.getsize(path) / 1024:,.0f}KB)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,196 @@
+"""
+📦 배치 스코어링 (Batch Scoring CLI)
+클랜 테이블(CSV / Parquet) 전체를 큰 배치 단위로 읽어 생존 모델과 리그 모델로 예측하고,
+생존 확률 / 예측 리그 / 리그별 확률을 Parquet으로 저장합니다.
+
+실행 방법:
+    python src/batch_score.py --input coc_clans_dataset.csv --output scores.parquet \\
+        --model-dir models --batch-size 200000 --workers 4 --cache-size 500000
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from artifacts import load_league_models, load_survival_models, predict_proba
+from ingest import iter_clan_chunks
+from prediction_cache import PredictionCache
+
+DEFAULT_BATCH_SIZE = 200_000
+
+# 두 모델 입력을 만드는 데 필요한 원본 컬럼 (+ 있으면 그대로 쓰는 파생 컬럼)
+INPUT_COLUMNS = [
+    'clan_tag', 'clan_type', 'war_frequency', 'isFamilyFriendly',
+    'clan_level', 'clan_points', 'war_wins', 'clan_capital_points', 'num_members',
+    'required_trophies', 'mean_member_level', 'mean_member_trophies',
+    'activity_ratio', 'entry_gap', 'points_per_member'
+]
+
+TIER_ORDER = ['Bronze', 'Silver', 'Gold', 'Crystal', 'Master', 'Champion']
+
+# ==========================================
+# 모델 로드 (워커 프로세스마다 한 번)
+# ==========================================
+def load_models(model_dir=None, n_threads=None, cache_size=0):
+    """배치 스코어링에 필요한 모델/인코더 로드 (artifacts.py, 네이티브 포맷 우선)
+
+    cache_size > 0이면 두 모델을 PredictionCache로 감싸 이미 본 클랜(같은 입력)은 다시 예측하지 않습니다.
+    """
+    survival_model, survival_features = load_survival_models(model_dir)
+    league_model, league_encoder, _, league_features = load_league_models(model_dir)
+    if n_threads:
+        for model in (survival_model, league_model):
+            if 'n_jobs' in model.get_params():
+                model.set_params(n_jobs=n_threads)
+    if cache_size:
+        survival_model = PredictionCache(survival_model, maxsize=cache_size)
+        league_model = PredictionCache(league_model, maxsize=cache_size)
+    return {
+        'survival_model': survival_model,
+        'survival_features': survival_features,
+        'league_model': league_model,
+        'league_encoder': league_encoder,
+        'league_features': league_features,
+    }
+
+
+_models = None
+
+
+def _init_worker(model_dir, n_threads, cache_size):
+    global _models
+    _models = load_models(model_dir, n_threads, cache_size)
+
+
+def league_class_names(league_model, league_encoder):
+    """predict_proba 컬럼 순서대로의 리그 이름"""
+    return list(league_encoder.inverse_transform(np.asarray(league_model.classes_)))
+
+
+def score_frame(df, models):
+    """DataFrame 한 배치 -> 예측 결과 DataFrame"""
+    X_survival = models['survival_features'].transform(df)
+    X_league = models['league_features'].transform(df)
+
+    survival_prob = predict_proba(models['survival_model'], X_survival)[:, 1]
+    league_proba = predict_proba(models['league_model'], X_league)
+    class_names = league_class_names(models['league_model'], models['league_encoder'])
+
+    result = pd.DataFrame({
+        'clan_tag': df['clan_tag'].to_numpy() if 'clan_tag' in df else np.arange(len(df)),
+        'survival_prob': survival_prob.astype(np.float32),
+        'predicted_league': np.asarray(class_names, dtype=object)[league_proba.argmax(axis=1)],
+    })
+    # 리그별 확률은 티어 순서(Bronze -> Champion)로 저장
+    order = sorted(range(len(class_names)),
+                   key=lambda i: TIER_ORDER.index(class_names[i]) if class_names[i] in TIER_ORDER else len(TIER_ORDER))
+    for i in order:
+        result[f'league_proba_{class_names[i]}'] = league_proba[:, i].astype(np.float32)
+    return result
+
+
+def _score_batch(df):
+    return score_frame(df, _models)
+
+
+# ==========================================
+# 입력 스트리밍
+# ==========================================
+def iter_input_batches(path, batch_size, columns=INPUT_COLUMNS):
+    """CSV 또는 Parquet(파일/디렉토리)을 batch_size 행씩 읽기 (columns 중 있는 컬럼만)"""
+    if os.path.isfile(path) and path.lower().endswith('.csv'):
+        yield from iter_clan_chunks(path, chunksize=batch_size, columns=columns)
+        return
+
+    dataset = ds.dataset(path, format='parquet', partitioning='hive')
+    columns = [col for col in columns if col in dataset.schema.names]
+    for batch in dataset.to_batches(columns=columns, batch_size=batch_size):
+        if batch.num_rows:
+            yield batch.to_pandas()
+
+
+def cache_stats(models):
+    """캐시를 켠 경우 모델별 적중 통계"""
+    return {key: models[key].stats() for key in ('survival_model', 'league_model')
+            if isinstance(models[key], PredictionCache)}
+
+
+def run(input_path, output_path, model_dir=None, batch_size=DEFAULT_BATCH_SIZE, workers=1, cache_size=0,
+        log=sys.stdout):
+    """입력 전체를 스코어링해 output_path(Parquet)에 저장하고 요약 통계를 반환
+
+    cache_size는 워커 프로세스마다 따로 적용됩니다 (워커 간 캐시 공유 없음).
+    """
+    start = time.perf_counter()
+    n_rows = 0
+    writer = None
+    stats = {}
+
+    def write(result):
+        nonlocal writer, n_rows
+        table = pa.Table.from_pandas(result, preserve_index=False)
+        if writer is None:
+            writer = pq.ParquetWriter(output_path, table.schema)
+        writer.write_table(table)
+        n_rows += len(result)
+        elapsed = time.perf_counter() - start
+        print(f"  {n_rows:>12,}행 처리 | {elapsed:7.1f}초 | {n_rows / elapsed:,.0f} rows/s", file=log, flush=True)
+
+    batches = iter_input_batches(input_path, batch_size)
+    try:
+        if workers <= 1:
+            models = load_models(model_dir, cache_size=cache_size)
+            for df in batches:
+                write(score_frame(df, models))
+            stats['cache'] = cache_stats(models)
+        else:
+            # 워커마다 스레드를 나눠 LightGBM/XGBoost 스레드 과다 생성 방지
+            n_threads = max(1, (os.cpu_count() or 1) // workers)
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                     initargs=(model_dir, n_threads, cache_size)) as pool:
+                # 메모리 상한: 동시에 처리 중인 배치는 workers * 2개까지
+                pending = []
+                for df in batches:
+                    pending.append(pool.submit(_score_batch, df))
+                    if len(pending) >= workers * 2:
+                        write(pending.pop(0).result())
+                for future in pending:
+                    write(future.result())
+    finally:
+        if writer is not None:
+            writer.close()
+
+    elapsed = time.perf_counter() - start
+    stats.update({'rows': n_rows, 'seconds': elapsed, 'rows_per_sec': n_rows / elapsed if elapsed else 0.0})
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description='클랜 생존/리그 배치 스코어링')
+    parser.add_argument('--input', required=True, help='입력 CSV 또는 Parquet 파일/디렉토리 (피처 스토어 가능)')
+    parser.add_argument('--output', default='clan_scores.parquet', help='결과 Parquet 경로')
+    parser.add_argument('--model-dir', default=None, help='*.pkl 모델 디렉토리 (기본: COC_MODEL_DIR 또는 현재 디렉토리)')
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE, help='배치 크기 (행)')
+    parser.add_argument('--workers', type=int, default=1, help='워커 프로세스 수')
+    parser.add_argument('--cache-size', type=int, default=0,
+                        help='모델별 예측 캐시 크기 (0 = 끔, 같은 입력의 클랜은 한 번만 예측)')
+    args = parser.parse_args()
+
+    print(f"📦 배치 스코어링 시작: {args.input} -> {args.output} "
+          f"(batch={args.batch_size:,}, workers={args.workers})")
+    stats = run(args.input, args.output, args.model_dir, args.batch_size, args.workers, args.cache_size)
+    print(f"✅ 완료: {stats['rows']:,}행, {stats['seconds']:.1f}초, {stats['rows_per_sec']:,.0f} rows/s")
+    for key, cache in stats.get('cache', {}).items():
+        print(f"   {key} 캐시: 적중률 {cache['hit_rate']:.1%} "
+              f"(hit {cache['hits']:,} / miss {cache['misses']:,} / evict {cache['evictions']:,})")
+
+
+if __name__ == '__main__':
+    main()
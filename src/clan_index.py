@@ -0,0 +1,345 @@
+"""
+🔎 클랜 태그 예측 인덱스 (Clan Tag Prediction Index)
+클랜 테이블 전체를 한 번 배치 스코어링해, 클랜 태그 -> 고정 길이 레코드(원본 피처 + 생존 확률 +
+예측 리그 + 리그별 확률)를 태그 순으로 정렬한 메모리 맵 배열로 저장합니다.
+조회는 정렬된 태그 배열에 이진 탐색 한 번(O(log n))이라 pandas도 모델도 필요 없습니다.
+
+- clan_index.npy: 레코드 (numpy 구조체 배열, 태그 순)
+- clan_index.tags.npy: 태그만 모은 연속 배열 (searchsorted 대상, 356만 개 = 약 43MB)
+- clan_index.npy.json: 메타 (리그/범주 이름, 행 수, 빌드 때 모델 서명)
+- 태그는 '#' 없이 대문자로 정규화 (O -> 0, 게임 태그에는 O가 없음). 같은 태그가 여러 번 나오면 마지막 행
+- 빌드는 배치마다 레코드를 임시 파일에 붙인 뒤 태그만 메모리에 올려 정렬 -> 입력 전체를 메모리에 올리지 않음
+- 모델을 다시 학습하면 인덱스 값은 이전 모델 기준 -> 로드할 때 경고, 다시 빌드
+
+실행 방법:
+    python src/clan_index.py --input coc_clans_dataset.csv --model-dir .     # 빌드 + 조회 지연시간 보고
+    python src/clan_index.py --model-dir . --lookup "#2QC9Y0CQU"              # 태그 조회
+    python src/serve.py --model-dir . --clan-index clan_index.npy              # GET /clan/<태그>
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import warnings
+
+import numpy as np
+
+import artifacts
+from features import CategoryTable, activity_ratio, entry_gap, points_per_member
+
+INDEX_FILE = 'clan_index.npy'
+TAGS_SUFFIX = '.tags.npy'
+META_SUFFIX = '.json'
+
+DEFAULT_BATCH_SIZE = 200_000
+# 정렬 결과를 레코드 파일에 옮겨 쓰는 단위
+COPY_BLOCK = 1_000_000
+
+# 정규화한 태그 최대 길이 (게임 태그는 '#' 포함 10자 안팎)
+TAG_BYTES = 12
+
+# 레코드에 그대로 담는 원본 피처 (좁은 dtype, ingest.DTYPES와 같은 범위)
+RECORD_COLUMNS = [
+    ('clan_level', '<i2'),
+    ('clan_points', '<i4'),
+    ('war_wins', '<i4'),
+    ('clan_capital_points', '<i4'),
+    ('num_members', '<i2'),
+    ('required_trophies', '<i2'),
+    ('required_townhall_level', '<i2'),
+    ('mean_member_level', '<i2'),
+    ('mean_member_trophies', '<i2'),
+    ('isFamilyFriendly', 'u1'),
+    ('is_ghost', 'u1'),
+]
+# 문자열 컬럼은 메타의 이름 목록에 대한 코드로 저장
+CATEGORY_COLUMNS = ['war_frequency', 'clan_type']
+
+# 빌드 입력 (배치 스코어링 입력 + 레코드용 컬럼, ghost 판정용 전쟁 기록)
+INDEX_INPUT_COLUMNS = [
+    'clan_tag', 'clan_type', 'war_frequency', 'isFamilyFriendly',
+    'clan_level', 'clan_points', 'war_wins', 'clan_capital_points', 'num_members',
+    'required_trophies', 'required_townhall_level', 'mean_member_level', 'mean_member_trophies',
+    'activity_ratio', 'entry_gap', 'points_per_member', 'is_ghost'
+]
+
+
+def index_path(model_dir=None):
+    return os.path.join(artifacts.model_dir_or_default(model_dir), INDEX_FILE)
+
+
+def tags_path(path):
+    return os.path.splitext(path)[0] + TAGS_SUFFIX
+
+
+def record_dtype(n_leagues):
+    """태그 + 원본 피처 + 예측값 레코드 (리그 6개면 69바이트)"""
+    return np.dtype(
+        [('tag', f'S{TAG_BYTES}')]
+        + RECORD_COLUMNS
+        + [(name, 'u1') for name in CATEGORY_COLUMNS]
+        + [('survival_prob', '<f4'), ('league', 'u1'), ('league_proba', '<f4', (n_leagues,))]
+    )
+
+
+def normalize_tag(tag):
+    """'#2qc9y0cqu' / '2QC9Y0CQU' -> b'2QC9Y0CQU' (형식이 맞지 않으면 None)"""
+    key = str(tag).strip().upper().lstrip('#').replace('O', '0')
+    if not key or len(key) > TAG_BYTES or not key.isascii():
+        return None
+    return key.encode('ascii')
+
+
+def normalize_tags(tags):
+    """태그 Series -> S12 배열 (배치 빌드용)"""
+    keys = tags.astype(str).str.strip().str.upper().str.lstrip('#').str.replace('O', '0', regex=False)
+    too_long = keys.str.len() > TAG_BYTES
+    if too_long.any():
+        raise ValueError(f"{TAG_BYTES}자를 넘는 클랜 태그: {keys[too_long].head(3).tolist()}")
+    return keys.to_numpy().astype(f'S{TAG_BYTES}')
+
+
+# ==========================================
+# 빌드 (오프라인, 배치 스코어링 한 번)
+# ==========================================
+def _category_codes(values, names):
+    """문자열 컬럼 -> names 목록의 코드 (처음 보는 값은 names에 추가)"""
+    values = np.asarray(values, dtype=object).astype(str)
+    for value in np.unique(values).tolist():
+        if value not in names:
+            names.append(value)
+    if len(names) > 255:
+        raise ValueError(f"범주가 너무 많습니다 (255개 초과): {names[:5]}...")
+    return CategoryTable(names, unknown_code=None).encode(values)
+
+
+def _batch_records(df, scores, dtype, leagues, categories):
+    records = np.zeros(len(df), dtype=dtype)
+    records['tag'] = normalize_tags(df['clan_tag'])
+    for name, _ in RECORD_COLUMNS:
+        if name in df:
+            records[name] = df[name].to_numpy()
+    for name in CATEGORY_COLUMNS:
+        if name in df:
+            records[name] = _category_codes(df[name], categories[name])
+    records['survival_prob'] = scores['survival_prob'].to_numpy()
+    records['league'] = CategoryTable(leagues, unknown_code=None).encode(scores['predicted_league'].to_numpy())
+    records['league_proba'] = scores[[f'league_proba_{name}' for name in leagues]].to_numpy()
+    return records
+
+
+def build(input_path, path=None, model_dir=None, batch_size=DEFAULT_BATCH_SIZE, log=sys.stdout):
+    """입력 전체를 스코어링해 path(.npy) + 태그 배열 + 메타를 만들고 ClanIndex로 반환"""
+    from batch_score import iter_input_batches, load_models, score_frame
+
+    path = path or index_path(model_dir)
+    out_dir = os.path.dirname(os.path.abspath(path))
+    os.makedirs(out_dir, exist_ok=True)
+    models = load_models(model_dir)
+    leagues = None
+    categories = {name: [] for name in CATEGORY_COLUMNS}
+
+    start = time.perf_counter()
+    n_rows = 0
+    raw = tempfile.NamedTemporaryFile(prefix='.clan_index-', suffix='.raw', dir=out_dir, delete=False)
+    try:
+        # 1) 배치마다 스코어링 -> 레코드를 임시 파일 끝에 붙임 (입력 순서)
+        with raw:
+            for df in iter_input_batches(input_path, batch_size, columns=INDEX_INPUT_COLUMNS):
+                scores = score_frame(df, models)
+                if leagues is None:
+                    leagues = [col[len('league_proba_'):] for col in scores.columns if col.startswith('league_proba_')]
+                    dtype = record_dtype(len(leagues))
+                _batch_records(df, scores, dtype, leagues, categories).tofile(raw)
+                n_rows += len(df)
+                print(f"  {n_rows:>12,}행 스코어링 | {time.perf_counter() - start:7.1f}초", file=log, flush=True)
+        if not n_rows:
+            raise ValueError(f"입력에 행이 없습니다: {input_path}")
+
+        # 2) 태그만 메모리에 올려 정렬 (같은 태그는 입력에서 마지막 행만 남김)
+        records = np.memmap(raw.name, dtype=dtype, mode='r')
+        tags = np.array(records['tag'])
+        order = np.argsort(tags, kind='stable')
+        tags = tags[order]
+        last = np.append(tags[1:] != tags[:-1], True)
+        order, tags = order[last], tags[last]
+
+        # 3) 정렬 순서로 레코드를 옮겨 쓰고, 세 파일을 다 쓴 뒤 한꺼번에 교체
+        tmp_records, tmp_tags, tmp_meta = (f'{name}.tmp' for name in (path, tags_path(path), path + META_SUFFIX))
+        out = np.lib.format.open_memmap(tmp_records, mode='w+', dtype=dtype, shape=(len(order),))
+        for i in range(0, len(order), COPY_BLOCK):
+            out[i:i + COPY_BLOCK] = records[order[i:i + COPY_BLOCK]]
+        out.flush()
+        del out, records
+        with open(tmp_tags, 'wb') as f:
+            np.save(f, tags)
+        meta = {
+            'rows': int(len(tags)),
+            'input_rows': n_rows,
+            'leagues': leagues,
+            'categories': categories,
+            'input': os.path.abspath(input_path),
+            'built_at': time.strftime('%Y-%m-%d %H:%M:%S'),
+            'source': model_sources(model_dir),
+        }
+        with open(tmp_meta, 'w', encoding='utf-8') as f:
+            json.dump(meta, f, indent=2, ensure_ascii=False)
+        for tmp in (tmp_tags, tmp_records, tmp_meta):
+            os.replace(tmp, tmp[:-len('.tmp')])
+    finally:
+        os.unlink(raw.name)
+
+    print(f"  정렬/저장 완료: {len(tags):,}개 태그 (중복 {n_rows - len(tags):,}행 제외) | "
+          f"{time.perf_counter() - start:7.1f}초", file=log, flush=True)
+    return ClanIndex.load(path)
+
+
+def model_sources(model_dir=None):
+    """인덱스를 만든 생존/리그 모델 pkl 서명 (다시 학습했는지 확인용)"""
+    return {key: artifacts.source_signature(artifacts.artifact_path(key, model_dir))
+            for key in ('survival_model', 'league_model')}
+
+
+# ==========================================
+# 조회 (O(log n), pandas 없음)
+# ==========================================
+class ClanIndex:
+    """태그 -> 레코드 조회기
+
+    tags(연속 S12 배열)에 searchsorted로 위치를 찾고, 레코드는 메모리 맵에서 그 행만 읽습니다.
+    """
+
+    def __init__(self, tags, records, meta):
+        if not (len(tags) == len(records) == meta['rows']):
+            raise ValueError("클랜 인덱스 파일의 행 수가 서로 다릅니다. python src/clan_index.py 로 다시 빌드하세요.")
+        self.tags = tags
+        self.records = records
+        self.meta = meta
+        self.leagues = meta['leagues']
+        self.categories = meta['categories']
+        self._fields = records.dtype.names
+
+    def __repr__(self):
+        return f"ClanIndex({len(self):,} clans, leagues={self.leagues})"
+
+    def __len__(self):
+        return len(self.tags)
+
+    def __contains__(self, tag):
+        return self.position(tag) >= 0
+
+    @classmethod
+    def load(cls, path):
+        with open(path + META_SUFFIX, encoding='utf-8') as f:
+            meta = json.load(f)
+        return cls(np.load(tags_path(path), mmap_mode='r'), np.load(path, mmap_mode='r'), meta)
+
+    def position(self, tag):
+        """태그의 레코드 위치 (없으면 -1)"""
+        key = normalize_tag(tag)
+        if key is None:
+            return -1
+        i = int(self.tags.searchsorted(key))
+        return i if i < len(self.tags) and self.tags[i] == key else -1
+
+    def positions(self, tags):
+        """태그 여러 개 -> 위치 배열 (없으면 -1)"""
+        keys = np.array([normalize_tag(tag) or b'' for tag in tags], dtype=self.tags.dtype)
+        pos = np.minimum(self.tags.searchsorted(keys), len(self.tags) - 1)
+        return np.where((self.tags[pos] == keys) & (keys != b''), pos, -1)
+
+    def record(self, i):
+        """위치 -> 응답용 dict (JSON으로 바로 직렬화 가능한 파이썬 값)"""
+        values = dict(zip(self._fields, self.records[i].item()))
+        clan = {'clan_tag': '#' + values.pop('tag').decode('ascii')}
+        for name, _ in RECORD_COLUMNS:
+            clan[name] = values[name]
+        clan['isFamilyFriendly'] = bool(clan['isFamilyFriendly'])
+        clan['is_ghost'] = bool(clan['is_ghost'])
+        for name in CATEGORY_COLUMNS:
+            names = self.categories[name]
+            clan[name] = names[values[name]] if values[name] < len(names) else None
+        clan['survival_prob'] = values['survival_prob']
+        clan['predicted_league'] = self.leagues[values['league']]
+        clan['probabilities'] = dict(zip(self.leagues, np.asarray(values['league_proba']).tolist()))
+        return clan
+
+    def get(self, tag):
+        """태그 -> 레코드 dict (없으면 None)"""
+        i = self.position(tag)
+        return self.record(i) if i >= 0 else None
+
+
+def load_index(path=None, model_dir=None):
+    """인덱스 로드 (생존/리그 pkl이 인덱스 빌드 뒤에 바뀌었으면 경고)"""
+    path = path or index_path(model_dir)
+    index = ClanIndex.load(path)
+    source = index.meta.get('source') or {}
+    for key, signature in source.items():
+        model_path = artifacts.artifact_path(key, model_dir)
+        if os.path.exists(model_path) and artifacts.source_signature(model_path) != signature:
+            warnings.warn(f"{os.path.basename(model_path)}이 클랜 인덱스보다 최근에 바뀌었습니다. "
+                          "python src/clan_index.py 로 다시 빌드하세요.")
+    return index
+
+
+def league_inputs(clan):
+    """레코드 dict -> 리그 모델 입력 9개 (features.LEAGUE_FEATURES, 앱 성장 가이드용)"""
+    return {
+        'clan_level': clan['clan_level'],
+        'clan_points': clan['clan_points'],
+        'war_wins': clan['war_wins'],
+        'clan_capital_points': clan['clan_capital_points'],
+        'mean_member_level': clan['mean_member_level'],
+        'mean_member_trophies': clan['mean_member_trophies'],
+        'activity_ratio': float(activity_ratio(clan['mean_member_trophies'], clan['mean_member_level'])),
+        'entry_gap': float(entry_gap(clan['mean_member_trophies'], clan['required_trophies'])),
+        'points_per_member': float(points_per_member(clan['clan_points'], clan['num_members'])),
+    }
+
+
+# ==========================================
+# 조회 지연시간
+# ==========================================
+def lookup_us(index, tags, n=20_000):
+    """태그 조회(get) 한 건 평균 지연시간 (마이크로초)"""
+    tags = [tags[i % len(tags)] for i in range(n)]
+    start = time.perf_counter()
+    for tag in tags:
+        index.get(tag)
+    return (time.perf_counter() - start) / n * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description='클랜 태그 예측 인덱스 빌드 / 조회')
+    parser.add_argument('--input', default=None, help='빌드할 클랜 CSV 또는 Parquet 파일/디렉토리 (피처 스토어 가능)')
+    parser.add_argument('--model-dir', default=None, help='*.pkl 모델 디렉토리 (기본: COC_MODEL_DIR 또는 현재 디렉토리)')
+    parser.add_argument('--output', default=None, help=f'인덱스 경로 (기본: <model-dir>/{INDEX_FILE})')
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE, help='스코어링 배치 크기 (행)')
+    parser.add_argument('--lookup', nargs='+', default=None, help='빌드 없이 태그 조회 (여러 개 가능)')
+    args = parser.parse_args()
+
+    path = args.output or index_path(args.model_dir)
+    if args.lookup:
+        index = load_index(path, args.model_dir)
+        for tag in args.lookup:
+            print(json.dumps(index.get(tag) or {'clan_tag': tag, 'error': '인덱스에 없는 태그'}, ensure_ascii=False))
+        return
+    if args.input is None:
+        parser.error('--input(빌드) 또는 --lookup(조회)이 필요합니다.')
+
+    print(f"🔎 클랜 인덱스 빌드: {args.input} -> {path} (batch={args.batch_size:,})")
+    index = build(args.input, path, args.model_dir, args.batch_size)
+    size = os.path.getsize(path) + os.path.getsize(tags_path(path))
+    print(f"✅ 저장: {path} ({len(index):,}개 클랜, {size / 1024 ** 2:,.1f}MB)")
+
+    rng = np.random.default_rng(0)
+    known = ['#' + index.tags[i].decode('ascii') for i in rng.integers(0, len(index), 1000)]
+    unknown = [tag + 'X' for tag in known]
+    print(f"  한 건 조회: 있는 태그 {lookup_us(index, known):.1f}us | 없는 태그 {lookup_us(index, unknown):.1f}us")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,210 @@
+"""
+🧭 반사실 성장 가이드 (Counterfactual Growth Guide)
+"목표 티어 평균 - 현재 값"을 정렬하는 대신, 모델이 실제로 목표 티어를 예측하게 되는
+최소한의 피처 변경을 찾습니다.
+
+- 빔 탐색: 매 반복마다 빔의 각 후보에서 (피처 x 이동 폭) 후보를 한꺼번에 만들고
+  predict_proba 한 번으로 평가 -> 목표 클래스 마진이 큰 후보를 다음 빔으로
+- 목표 클래스에 도달하면 바꾼 피처를 원래 값 쪽으로 되돌려 보며(역시 배치 평가) 변경량을 줄임
+- 비용: 피처별 스케일(티어 평균의 크기)로 정규화한 L1 거리 + 바꾼 피처 수
+- 조기 종료: 목표 도달 후 더 줄일 수 없을 때 / 마진이 patience회 연속 개선되지 않을 때 /
+  time_budget_ms 초과 시 그때까지의 최선 결과 반환
+
+사용 예시:
+    search = CounterfactualSearch.from_tier_standards(model, LEAGUE_FEATURES, tier_standards, upper=...)
+    result = search.search(X_input[0], target_class)
+    result['changes']  # [{'feature', 'current', 'target', 'diff'}, ...]
+    search = league_search(model, tier_standards)  # 리그 모델 (앱 입력 범위 / 정수 피처 포함)
+"""
+import time
+
+import numpy as np
+
+from features import LEAGUE_FEATURES, LEAGUE_INPUT_LOWER, LEAGUE_INPUT_UPPER, LEAGUE_INTEGER_FEATURES
+
+DEFAULT_TIME_BUDGET_MS = 150.0
+DEFAULT_BEAM_WIDTH = 3
+DEFAULT_MAX_ITER = 30
+# 한 번에 움직이는 폭 (피처 스케일의 배수)
+DEFAULT_STEP_MULTIPLIERS = (0.1, 0.3, 1.0)
+# 되돌리기 단계에서 시도하는 비율 (0 = 원래 값)
+SHRINK_FRACTIONS = (0.0, 0.25, 0.5, 0.75)
+# 비용 = 정규화 L1 + SPARSITY_COST * 바꾼 피처 수
+SPARSITY_COST = 0.1
+
+
+class CounterfactualSearch:
+    """model을 target_class로 예측하게 만드는 최소 변경 탐색기
+
+    direction: 피처별 허용 방향 (+1 증가만, -1 감소만, 0 양방향)
+    lower / upper: 피처별 값 범위 (앱 입력 범위), integer: 정수 피처 여부
+    """
+
+    def __init__(self, model, feature_names, scales, direction=None, lower=None, upper=None, integer=None,
+                 step_multipliers=DEFAULT_STEP_MULTIPLIERS, beam_width=DEFAULT_BEAM_WIDTH,
+                 max_iter=DEFAULT_MAX_ITER, patience=3, time_budget_ms=DEFAULT_TIME_BUDGET_MS):
+        n = len(feature_names)
+        self.model = model
+        self.feature_names = list(feature_names)
+        self.scales = np.maximum(np.asarray(scales, dtype=np.float64), 1e-6)
+        self.direction = np.ones(n) if direction is None else np.asarray(direction, dtype=np.float64)
+        self.lower = np.full(n, -np.inf) if lower is None else np.asarray(lower, dtype=np.float64)
+        self.upper = np.full(n, np.inf) if upper is None else np.asarray(upper, dtype=np.float64)
+        self.integer = np.zeros(n, dtype=bool) if integer is None else np.asarray(integer, dtype=bool)
+        self.step_multipliers = np.asarray(step_multipliers, dtype=np.float64)
+        self.beam_width = beam_width
+        self.max_iter = max_iter
+        self.patience = patience
+        self.time_budget_ms = time_budget_ms
+
+    def __repr__(self):
+        return f"CounterfactualSearch(features={len(self.feature_names)}, beam={self.beam_width})"
+
+    @classmethod
+    def from_tier_standards(cls, model, feature_names, tier_standards, **kwargs):
+        """티어별 평균값 표(행=티어, 열=피처)의 평균 크기를 피처 스케일로 사용
+
+        tier_standards는 DataFrame(tier_standards.pkl) 또는 {티어: {피처: 값}} dict.
+        kwargs의 lower / upper / direction / integer는 {피처: 값} dict로도 받습니다.
+        """
+        if isinstance(tier_standards, dict):
+            rows = list(tier_standards.values())
+        else:
+            rows = [row for _, row in tier_standards.iterrows()]
+        table = np.array([[float(row[name]) for name in feature_names] for row in rows])
+        scales = np.abs(table).mean(axis=0)
+        defaults = {'lower': -np.inf, 'upper': np.inf, 'direction': 1, 'integer': False}
+        for key, default in defaults.items():
+            if isinstance(kwargs.get(key), dict):
+                kwargs[key] = [kwargs[key].get(name, default) for name in feature_names]
+        return cls(model, feature_names, scales, **kwargs)
+
+    # ==========================================
+    # 후보 생성 / 평가
+    # ==========================================
+    def _clip(self, X, x0):
+        low = np.where(self.direction > 0, np.maximum(self.lower, x0), self.lower)
+        high = np.where(self.direction < 0, np.minimum(self.upper, x0), self.upper)
+        X = np.clip(X, low, high)
+        # 정수 피처는 움직인 방향으로 올림/내림 (작은 이동이 반올림으로 사라지지 않게)
+        rounded = np.where(X >= x0, np.ceil(X), np.floor(X))
+        return np.where(self.integer, rounded, X)
+
+    def _neighbors(self, beam, x0):
+        """빔 (B, F) -> 피처 하나를 한 폭만큼 움직인 후보 (B * F * M * 방향, F)"""
+        n_features = len(self.feature_names)
+        moves = []
+        for sign in (1.0, -1.0):
+            allowed = (self.direction == 0) | (self.direction == sign)
+            # (F, M) 이동량: 피처 k를 sign * scale_k * m 만큼
+            delta = sign * self.scales[:, None] * self.step_multipliers[None, :] * allowed[:, None]
+            eye = np.eye(n_features)[:, None, :] * delta[:, :, None]  # (F, M, F)
+            moves.append(eye.reshape(-1, n_features))
+        moves = np.concatenate(moves)
+        moves = moves[np.abs(moves).sum(axis=1) > 0]
+        candidates = (beam[:, None, :] + moves[None, :, :]).reshape(-1, n_features)
+        candidates = self._clip(candidates, x0)
+        return np.unique(candidates, axis=0)
+
+    def _cost(self, X, x0):
+        changed = np.abs(X - x0) > 1e-9
+        return (np.abs(X - x0) / self.scales).sum(axis=1) + SPARSITY_COST * changed.sum(axis=1)
+
+    def _margin(self, X, target_index):
+        """목표 클래스 확률 - 나머지 중 최대 확률 (> 0이면 목표 클래스로 예측)"""
+        proba = np.asarray(self.model.predict_proba(X.astype(np.float32)))
+        target = proba[:, target_index]
+        others = np.delete(proba, target_index, axis=1).max(axis=1)
+        return target - others, proba
+
+    # ==========================================
+    # 탐색
+    # ==========================================
+    def search(self, x0, target_class):
+        """x0 (F,)에서 target_class(model.classes_의 값)로 가는 최소 변경 탐색"""
+        start = time.perf_counter()
+        deadline = start + self.time_budget_ms / 1000
+        x0 = np.asarray(x0, dtype=np.float64).reshape(-1)
+        target_index = list(np.asarray(self.model.classes_)).index(target_class)
+
+        margin, proba = self._margin(x0[None, :], target_index)
+        best = {'x': x0, 'margin': margin[0], 'proba': proba[0], 'cost': 0.0}
+        beam = x0[None, :]
+        n_evaluated, iterations, stale = 1, 0, 0
+
+        # 1) 목표 클래스에 도달할 때까지 빔 탐색
+        while best['margin'] <= 0 and iterations < self.max_iter and time.perf_counter() < deadline:
+            iterations += 1
+            candidates = self._neighbors(beam, x0)
+            margin, proba = self._margin(candidates, target_index)
+            n_evaluated += len(candidates)
+            cost = self._cost(candidates, x0)
+
+            reached = margin > 0
+            if reached.any():
+                i = np.flatnonzero(reached)[np.argmin(cost[reached])]
+            else:
+                i = int(np.argmax(margin))
+            if margin[i] > best['margin']:
+                best = {'x': candidates[i], 'margin': margin[i], 'proba': proba[i], 'cost': cost[i]}
+                stale = 0
+            else:
+                stale += 1
+                if stale >= self.patience:
+                    break
+            # 마진이 큰 순 (같으면 비용이 작은 순)
+            order = np.lexsort((cost, -margin))[:self.beam_width]
+            beam = candidates[order]
+
+        # 2) 도달했다면 바꾼 피처를 원래 값 쪽으로 되돌려 변경량 줄이기
+        while best['margin'] > 0 and time.perf_counter() < deadline:
+            changed = np.flatnonzero(np.abs(best['x'] - x0) > 1e-9)
+            if not len(changed):
+                break
+            shrunk = np.repeat(best['x'][None, :], len(changed) * len(SHRINK_FRACTIONS), axis=0)
+            rows = np.arange(len(shrunk))
+            cols = np.repeat(changed, len(SHRINK_FRACTIONS))
+            fractions = np.tile(SHRINK_FRACTIONS, len(changed))
+            shrunk[rows, cols] = x0[cols] + fractions * (best['x'][cols] - x0[cols])
+            shrunk = self._clip(shrunk, x0)
+            margin, proba = self._margin(shrunk, target_index)
+            n_evaluated += len(shrunk)
+            cost = self._cost(shrunk, x0)
+            ok = (margin > 0) & (cost < best['cost'] - 1e-9)
+            if not ok.any():
+                break
+            i = np.flatnonzero(ok)[np.argmin(cost[ok])]
+            best = {'x': shrunk[i], 'margin': margin[i], 'proba': proba[i], 'cost': cost[i]}
+
+        return self._result(best, x0, target_index, iterations, n_evaluated, start)
+
+    def _result(self, best, x0, target_index, iterations, n_evaluated, start):
+        changes = []
+        for k in np.flatnonzero(np.abs(best['x'] - x0) > 1e-9):
+            changes.append({'feature': self.feature_names[k], 'current': float(x0[k]),
+                            'target': float(best['x'][k]), 'diff': float(best['x'][k] - x0[k])})
+        # 정규화 변경량이 큰 순
+        changes.sort(key=lambda item: abs(item['diff']) / self.scales[self.feature_names.index(item['feature'])],
+                     reverse=True)
+        return {
+            'reached': bool(best['margin'] > 0),
+            'changes': changes,
+            'target_proba': float(best['proba'][target_index]),
+            'cost': float(best['cost']),
+            'iterations': iterations,
+            'evaluated': n_evaluated,
+            'elapsed_ms': (time.perf_counter() - start) * 1000,
+        }
+
+
+def league_search(model, tier_standards, **kwargs):
+    """리그 모델용 탐색기 (app_unified.py 성장 가이드 / serve.py 코칭이 같은 범위로 탐색)
+
+    entry_gap은 가입 조건을 낮춰도 되므로 양방향, 나머지는 증가만 허용합니다.
+    model은 PredictionCache로 감싸지 않은 모델을 넘기세요 (후보 행은 한 번만 쓰임).
+    """
+    return CounterfactualSearch.from_tier_standards(
+        model, LEAGUE_FEATURES, tier_standards,
+        lower=LEAGUE_INPUT_LOWER, upper=LEAGUE_INPUT_UPPER,
+        direction={'entry_gap': 0}, integer=LEAGUE_INTEGER_FEATURES, **kwargs
+    )
@@ -0,0 +1,270 @@
+"""
+📊 EDA 집계 엔진 (EDA Aggregation Engine)
+노트북 01이 활성 클랜 DataFrame을 매번 다시 훑으며 만들던 요약 표를 피처 스토어 한 번 스캔으로 모두 계산합니다.
+
+- 그룹 키를 정수 코드로 바꾸고(리그/가입 유형/가족 친화/레벨/트로피/멤버 구간) np.bincount로 개수와 합계를 누적
+- 표: 리그별 / 가입 유형별 / 가족 친화 여부별 평균 스펙, 레벨 구간별 스펙, 요구 트로피 구간별 캐피탈 점수와 리그 랭킹,
+  Death Valley(레벨별 유령 비율 / 활성 클랜 위험군 비율), 멤버 규모별 생존율, 티어별 평균값(tier_standards)
+- 결과는 작은 묶음 하나로 피처 스토어 안(_eda_stats.joblib)에 캐시하고, 원천 CSV 해시가 바뀌면 다시 계산
+
+실행 방법: python src/eda_stats.py --store feature_store
+"""
+import argparse
+import os
+import time
+
+import joblib
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from feature_store import DEFAULT_STORE, FEATURE_VERSION, open_store, read_manifest
+from features import LEAGUE_FEATURES
+from ingest import MIN_WARS
+from train import LEAGUE_MAP, TIER_ORDER
+
+# 집계 로직이 바뀌면 올려서 기존 캐시를 무효화
+EDA_VERSION = 1
+CACHE_NAME = '_eda_stats.joblib'
+BATCH_SIZE = 1_000_000
+
+# 노트북 01 구간 (pd.cut: 오른쪽 닫힌 구간)
+LEVEL_BINS = [0, 5, 10, 15, 20, 40]
+LEVEL_LABELS = ['1-5', '6-10', '11-15', '16-20', '21+']
+TROPHY_BINS = [0, 1000, 2000, 3000, 4000, 6000]
+TROPHY_LABELS = ['0-1k', '1k-2k', '2k-3k', '3k-4k', '4k+']
+MEMBER_BINS = [0, 5, 10, 15, 20, 50]
+MEMBER_LABELS = ['1-5', '6-10', '11-15', '16-20', '21+']
+# 활성 클랜 "위험 징후" (노트북 관점 B)
+AT_RISK_MEMBERS = 10
+
+SPEC_COLUMNS = ['clan_level', 'clan_points', 'num_members', 'clan_capital_hall_level']
+LEVEL_COLUMNS = ['clan_points', 'clan_capital_points', 'mean_member_trophies']
+LEAGUE_ORDER = list(LEAGUE_MAP)
+
+SCAN_COLUMNS = list(dict.fromkeys(
+    ['is_ghost', 'clan_war_league', 'clan_type', 'isFamilyFriendly', 'war_total', 'required_trophies']
+    + SPEC_COLUMNS + LEVEL_COLUMNS + LEAGUE_FEATURES
+))
+
+
+def cut_codes(values, bins, include_lowest=False):
+    """pd.cut과 같은 구간 코드 (구간 밖은 -1)"""
+    codes = np.searchsorted(bins, values, side='left') - 1
+    if include_lowest:
+        codes[values == bins[0]] = 0
+    codes[(codes < 0) | (codes >= len(bins) - 1)] = -1
+    return codes
+
+
+class CategoryCodes:
+    """문자열 컬럼 -> 배치가 바뀌어도 유지되는 전역 정수 코드 (처음 본 순서대로 번호)"""
+
+    def __init__(self, labels=()):
+        self.index = {label: i for i, label in enumerate(labels)}
+
+    @property
+    def labels(self):
+        return list(self.index)
+
+    def encode(self, column):
+        if not pa.types.is_dictionary(column.type):
+            column = pc.dictionary_encode(column)
+        if isinstance(column, pa.ChunkedArray):
+            column = column.combine_chunks()
+        remap = np.array([self.index.setdefault(label, len(self.index))
+                          for label in column.dictionary.to_pylist()] + [-1], dtype=np.int64)
+        # null은 마지막 자리(-1)로
+        indices = column.indices.fill_null(len(remap) - 1).to_numpy(zero_copy_only=False)
+        return remap[indices]
+
+
+class GroupStats:
+    """그룹 코드별 행 수 / 컬럼 합계를 np.bincount로 누적 (코드 -1 행은 제외)"""
+
+    def __init__(self, columns, labels=None):
+        self.columns = list(columns)
+        self.fixed_labels = labels
+        n = len(labels) if labels is not None else 0
+        self.count = np.zeros(n)
+        self.sums = np.zeros((len(self.columns), n))
+
+    def add(self, codes, values, mask=None):
+        keep = codes >= 0 if mask is None else mask & (codes >= 0)
+        codes = codes[keep]
+        n = max(len(self.count), int(codes.max()) + 1 if len(codes) else 0)
+        if n > len(self.count):  # 새 범주가 나오면 늘림
+            self.count = np.pad(self.count, (0, n - len(self.count)))
+            self.sums = np.pad(self.sums, ((0, 0), (0, n - self.sums.shape[1])))
+        self.count += np.bincount(codes, minlength=n)
+        for i, name in enumerate(self.columns):
+            self.sums[i] += np.bincount(codes, weights=values[name][keep], minlength=n)
+
+    def frame(self, labels=None, name=None):
+        """그룹별 평균 DataFrame (행이 없는 그룹 제외) + count 컬럼"""
+        labels = self.fixed_labels if self.fixed_labels is not None else labels
+        with np.errstate(invalid='ignore', divide='ignore'):
+            means = self.sums / self.count
+        df = pd.DataFrame(means.T, index=pd.Index(labels[:len(self.count)], name=name), columns=self.columns)
+        df['count'] = self.count.astype(np.int64)
+        return df[df['count'] > 0]
+
+
+def _batch_values(batch):
+    values = {}
+    for name in SCAN_COLUMNS:
+        column = batch.column(name)
+        if name in ('clan_war_league', 'clan_type'):
+            continue
+        values[name] = column.to_numpy(zero_copy_only=False).astype(np.float64)
+    return values
+
+
+def compute_stats(store_dir=DEFAULT_STORE, batch_size=BATCH_SIZE):
+    """피처 스토어를 한 번 스캔해 EDA 요약 표 묶음(dict)을 계산"""
+    leagues = CategoryCodes(LEAGUE_ORDER)
+    clan_types = CategoryCodes()
+    league_stats = GroupStats(SPEC_COLUMNS)
+    type_stats = GroupStats(SPEC_COLUMNS + ['mean_member_trophies'])
+    family_stats = GroupStats(SPEC_COLUMNS + ['mean_member_trophies'], ['False', 'True'])
+    level_stats = GroupStats(LEVEL_COLUMNS, LEVEL_LABELS)
+    req_stats = GroupStats(['clan_capital_points', 'league_rank'], TROPHY_LABELS)
+    survival_by_size = GroupStats(['retained'], MEMBER_LABELS)
+    tier_standards = GroupStats(LEAGUE_FEATURES, [''] + TIER_ORDER)
+    ghosts_by_level = GroupStats(['is_ghost'])
+    at_risk_by_level = GroupStats(['at_risk'])
+    # 구간별 중앙값은 bincount로 못 구하므로 해당 컬럼 하나만 모아둠
+    req_codes, req_capital = [], []
+
+    rank_of = np.array([LEAGUE_MAP[label] for label in LEAGUE_ORDER], dtype=np.float64)
+    scanner = open_store(store_dir).scanner(columns=SCAN_COLUMNS, batch_size=batch_size)
+    rows = 0
+    for batch in scanner.to_batches():
+        if batch.num_rows == 0:
+            continue
+        rows += batch.num_rows
+        values = _batch_values(batch)
+        league = leagues.encode(batch.column('clan_war_league'))
+        clan_type = clan_types.encode(batch.column('clan_type'))
+
+        ghost = values['is_ghost'] > 0
+        active = ~ghost
+        reliable = active & (values['war_total'] >= MIN_WARS)
+
+        # 노트북 league_map에 없는 리그는 랭킹 평균에서 제외 / tier_standards는 train.league_score처럼 0(Unranked) 처리
+        known = (league >= 0) & (league < len(rank_of))
+        values['league_rank'] = np.where(known, rank_of[np.clip(league, 0, len(rank_of) - 1)], np.nan)
+        score = np.where(known, values['league_rank'], 0)
+        tier = np.ceil(score / 3).astype(np.int64)
+
+        level = values['clan_level'].astype(np.int64)
+        trophy_group = cut_codes(values['required_trophies'], TROPHY_BINS, include_lowest=True)
+        values['retained'] = (values['clan_capital_points'] > 0).astype(np.float64)
+        values['at_risk'] = (values['num_members'] < AT_RISK_MEMBERS).astype(np.float64)
+
+        league_stats.add(league, values, reliable)
+        type_stats.add(clan_type, values, reliable)
+        family_stats.add(values['isFamilyFriendly'].astype(np.int64), values, reliable)
+        level_stats.add(cut_codes(values['clan_level'], LEVEL_BINS), values, reliable)
+        req_stats.add(trophy_group, values, reliable & known)
+        survival_by_size.add(cut_codes(values['num_members'], MEMBER_BINS), values, active)
+        tier_standards.add(tier, values, active & (tier > 0))
+        ghosts_by_level.add(level, values)
+        at_risk_by_level.add(level, values, active)
+
+        keep = reliable & (trophy_group >= 0)
+        req_codes.append(trophy_group[keep].astype(np.int8))
+        req_capital.append(values['clan_capital_points'][keep])
+
+    # 요구 트로피 구간별 캐피탈 점수 평균 / 중앙값 / 개수 (노트북 req_stats) + 평균 리그 랭킹
+    req_codes, req_capital = np.concatenate(req_codes), np.concatenate(req_capital)
+    capital = GroupStats(['clan_capital_points'], TROPHY_LABELS)
+    capital.add(req_codes.astype(np.int64), {'clan_capital_points': req_capital})
+    req_table = capital.frame(name='trophy_req_group').rename(columns={'clan_capital_points': 'mean'})
+    req_table.insert(1, 'median', [float(np.median(req_capital[req_codes == TROPHY_LABELS.index(label)]))
+                                   for label in req_table.index])
+    req_table['league_rank'] = req_stats.frame(name='trophy_req_group')['league_rank']
+
+    death_valley = ghosts_by_level.frame(list(range(len(ghosts_by_level.count))), 'clan_level')
+    death_valley = pd.DataFrame({
+        'total_clans': death_valley['count'],
+        'ghost_clans': (death_valley['is_ghost'] * death_valley['count']).round().astype(np.int64),
+        'ghost_ratio': death_valley['is_ghost'],
+    })
+    at_risk = at_risk_by_level.frame(list(range(len(at_risk_by_level.count))), 'clan_level')
+    standards = tier_standards.frame(name=None)
+
+    return {
+        'rows': rows,
+        'league_stats': league_stats.frame(leagues.labels, 'clan_war_league'),
+        'type_stats': type_stats.frame(clan_types.labels, 'clan_type'),
+        'family_stats': family_stats.frame(name='isFamilyFriendly'),
+        'level_stats': level_stats.frame(name='level_group'),
+        'req_stats': req_table,
+        'death_valley': death_valley,
+        'death_valley_active': at_risk.rename(columns={'at_risk': 'at_risk_ratio'}),
+        'survival_by_size': survival_by_size.frame(name='member_group')['retained'],
+        'tier_standards': standards[LEAGUE_FEATURES],
+    }
+
+
+def _source_key(store_dir):
+    manifest = read_manifest(store_dir) or {}
+    return {'source_sha256': manifest.get('source_sha256'), 'feature_version': FEATURE_VERSION,
+            'eda_version': EDA_VERSION}
+
+
+def load_stats(store_dir=DEFAULT_STORE, force=False):
+    """캐시된 요약 표 묶음 반환 (없거나 원천이 바뀌었으면 다시 계산해서 저장)"""
+    cache_path = os.path.join(store_dir, CACHE_NAME)
+    key = _source_key(store_dir)
+    if not force and os.path.exists(cache_path):
+        bundle = joblib.load(cache_path)
+        if bundle.get('source') == key:
+            return bundle
+    bundle = compute_stats(store_dir)
+    bundle['source'] = key
+    joblib.dump(bundle, cache_path, compress=3)
+    return bundle
+
+
+TABLES = [
+    ('league_stats', '리그별 평균 스펙 (20판 이상)', 1),
+    ('type_stats', '가입 유형별 평균 스펙', 1),
+    ('family_stats', '가족 친화 여부별 평균 스펙', 1),
+    ('level_stats', '클랜 레벨 구간별 스펙', 0),
+    ('req_stats', '요구 트로피 구간별 캐피탈 점수 / 평균 리그 랭킹', 1),
+    ('survival_by_size', '멤버 규모별 실제 생존율 (Capital Points > 0)', 3),
+    ('tier_standards', '티어별 평균값 (tier_standards)', 1),
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='피처 스토어 한 번 스캔으로 노트북 EDA 요약 표 계산')
+    parser.add_argument('--store', default=DEFAULT_STORE, help='피처 스토어 디렉토리')
+    parser.add_argument('--force', action='store_true', help='캐시가 최신이어도 다시 계산')
+    parser.add_argument('--tier-standards', default=None, help='tier_standards를 pkl로 저장할 경로')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    stats = load_stats(args.store, force=args.force)
+    elapsed = time.perf_counter() - start
+
+    with pd.option_context('display.width', 160, 'display.max_columns', 20):
+        for key, title, digits in TABLES:
+            print(f"\n[{title}]")
+            print(stats[key].round(digits))
+        print("\n[Death Valley: 레벨별 유령 비율 상위 10]")
+        print(stats['death_valley'].sort_values('ghost_ratio', ascending=False).head(10).round(3))
+        print("\n[활성 클랜 레벨별 위험군 비율 상위 5]")
+        print(stats['death_valley_active'].sort_values('at_risk_ratio', ascending=False).head().round(3))
+
+    if args.tier_standards:
+        joblib.dump(stats['tier_standards'], args.tier_standards)
+        print(f"\n💾 tier_standards 저장: {args.tier_standards}")
+    print(f"\n⏱️ {stats['rows']:,}행 요약 완료: {elapsed:.2f}초")
+
+
+if __name__ == '__main__':
+    main()
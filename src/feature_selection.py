@@ -0,0 +1,261 @@
+"""
+🔎 피처 선택 (Feature Selection)
+노트북 02의 RFE / RFECV(LightGBM, step=2, cv=3)는 제거 단계마다 전체 데이터로 모델을 새로 학습합니다.
+여기서는 부스터 한 번의 중요도로 순위를 정하고, 순위 상위 k개 조합만 교차검증으로 평가합니다.
+
+- 순위: 부스터 1개의 gain / split 중요도 + 검증 표본의 순열 중요도(permutation importance)의 평균 순위
+- 중복 제거: 이미 고른 피처와 상관이 높은 피처 / 신뢰도가 낮은 피처(win_rate) 제외
+- 교차검증: 전체 데이터를 LightGBM Dataset으로 한 번만 binning하고 fold는 subset으로 공유,
+  피처 조합은 다시 만들지 않고 interaction_constraints로 사용할 피처만 제한, fold 검증 세트로 조기 종료
+- 개수를 정하면 그 개수와 전체 피처만 교차검증 (--curve로 RFECV처럼 개수별 정확도 곡선)
+
+실행 방법: python src/feature_selection.py --work-dir train_work --n-features 9
+"""
+import argparse
+import json
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from train import DEFAULT_WORK_DIR, RANDOM_STATE, broad_tier
+
+# 후보에서 뺄 컬럼 (타깃 / 상수 / 식별자)
+CANDIDATE_EXCLUDE = ['is_ghost', 'league_score', 'is_retained']
+# 노트북 3-2: 전쟁 1~3판만 치른 클랜의 100% 승률 허수 -> 순위와 관계없이 제외
+UNRELIABLE_FEATURES = ['win_rate']
+CORR_THRESHOLD = 0.9
+N_FOLDS = 3
+# 노트북 RFE / RFECV 추정기 (LGBMClassifier(n_estimators=100))와 같은 설정
+LGB_PARAMS = {'learning_rate': 0.1, 'num_leaves': 31, 'verbose': -1, 'seed': RANDOM_STATE}
+NUM_BOOST_ROUND = 100
+# fold 검증 정확도가 이 라운드 동안 나아지지 않으면 종료 (다중 클래스 100라운드 전체 학습이 대부분의 시간)
+EARLY_STOPPING_ROUNDS = 10
+# 순열 중요도를 계산할 검증 표본 최대 행 수
+PERMUTATION_ROWS = 10_000
+
+
+def load_candidates(work_dir=DEFAULT_WORK_DIR, target='score', sample=None, seed=RANDOM_STATE):
+    """train.py 체크포인트에서 (후보 피처 DataFrame, 타깃) 로드
+
+    target='score'면 노트북 RFE와 같은 리그 점수 0~18 (Unranked 포함),
+    'tier'면 리그 모델과 같은 6대 리그 (Unranked 제외).
+    """
+    active = pd.read_parquet(os.path.join(work_dir, 'active.parquet'))
+    features = pd.read_parquet(os.path.join(work_dir, 'features.parquet'),
+                               columns=['war_frequency_code', 'league_score'])
+    X = active.select_dtypes(include=['number', 'bool']).drop(columns=CANDIDATE_EXCLUDE, errors='ignore')
+    X['war_frequency_code'] = features['war_frequency_code'].to_numpy()
+    X = X.loc[:, X.nunique() > 1].astype(np.float32)
+    y = features['league_score'].to_numpy()
+
+    if target == 'tier':
+        keep = y > 0
+        X, y = X[keep], broad_tier(y[keep]) - 1
+    if sample is not None and sample < len(y):
+        rows = np.sort(np.random.default_rng(seed).choice(len(y), sample, replace=False))
+        X, y = X.iloc[rows], y[rows]
+    # 클래스 번호를 0부터 연속으로
+    _, y = np.unique(y, return_inverse=True)
+    return X.reset_index(drop=True), y
+
+
+# ==========================================
+# fold 캐시
+# ==========================================
+class FoldCache:
+    """binning을 한 번만 한 LightGBM Dataset과 층화 fold subset 묶음
+
+    score(features)는 같은 Dataset에서 interaction_constraints로 사용할 피처만 제한해 학습하므로
+    피처 조합마다 Dataset을 다시 만들지 않습니다. 조기 종료는 fold 검증 세트 기준이라
+    점수가 약간 낙관적이지만 모든 조합에 똑같이 적용됩니다.
+    """
+
+    def __init__(self, X, y, n_folds=N_FOLDS, params=None, num_boost_round=NUM_BOOST_ROUND,
+                 early_stopping_rounds=EARLY_STOPPING_ROUNDS, seed=RANDOM_STATE):
+        import lightgbm as lgb
+        from sklearn.model_selection import StratifiedKFold
+
+        self.feature_names = list(X.columns)
+        self.y = np.asarray(y)
+        self.n_classes = int(self.y.max()) + 1
+        self.params = dict(LGB_PARAMS, **(params or {}))
+        self.params.update(objective='multiclass', num_class=self.n_classes, metric='multi_error')
+        self.num_boost_round = num_boost_round
+        self.early_stopping_rounds = early_stopping_rounds
+
+        start = time.perf_counter()
+        self.dataset = lgb.Dataset(X.to_numpy(dtype=np.float32), self.y, feature_name=self.feature_names,
+                                   free_raw_data=False, params={'verbose': -1}).construct()
+        self.folds = []
+        for train, valid in StratifiedKFold(n_folds, shuffle=True, random_state=seed).split(X, self.y):
+            self.folds.append((self.dataset.subset(train).construct(), self.dataset.subset(valid).construct(),
+                               valid))
+        self.build_seconds = time.perf_counter() - start
+        self.n_fits = 0
+
+    def __repr__(self):
+        return f"FoldCache(rows={len(self.y):,}, features={len(self.feature_names)}, folds={len(self.folds)})"
+
+    def train(self, features, fold=0):
+        """fold의 학습 subset으로 features만 쓰는 부스터 학습"""
+        import lightgbm as lgb
+
+        params = dict(self.params)
+        if len(features) < len(self.feature_names):
+            params['interaction_constraints'] = [[self.feature_names.index(name) for name in features]]
+        self.n_fits += 1
+        train, valid, _ = self.folds[fold]
+        callbacks = []
+        if self.early_stopping_rounds:
+            callbacks.append(lgb.early_stopping(self.early_stopping_rounds, verbose=False))
+        return lgb.train(params, train, num_boost_round=self.num_boost_round, valid_sets=[valid],
+                         callbacks=callbacks)
+
+    def score(self, features):
+        """fold별 정확도 (평균, 표준편차)"""
+        scores = []
+        for fold, (_, _, valid_rows) in enumerate(self.folds):
+            booster = self.train(features, fold)
+            proba = booster.predict(self.dataset.get_data()[valid_rows], num_iteration=booster.best_iteration)
+            scores.append(float((proba.argmax(axis=1) == self.y[valid_rows]).mean()))
+        return float(np.mean(scores)), float(np.std(scores))
+
+
+# ==========================================
+# 순위 / 선택
+# ==========================================
+def permutation_importance(booster, X, y, n_repeats=3, seed=RANDOM_STATE):
+    """컬럼을 하나씩 섞었을 때 정확도 감소량 (평균, 표준편차)"""
+    rng = np.random.default_rng(seed)
+
+    def accuracy(data):
+        return float((booster.predict(data, num_iteration=booster.best_iteration).argmax(axis=1) == y).mean())
+
+    base = accuracy(X)
+    means, stds = [], []
+    for j in range(X.shape[1]):
+        drops = []
+        for _ in range(n_repeats):
+            shuffled = X.copy()
+            shuffled[:, j] = X[rng.permutation(len(X)), j]
+            drops.append(base - accuracy(shuffled))
+        means.append(np.mean(drops))
+        stds.append(np.std(drops))
+    return np.array(means), np.array(stds)
+
+
+def importance_ranking(cache, n_repeats=3, max_rows=PERMUTATION_ROWS, seed=RANDOM_STATE):
+    """fold 0 부스터 1개의 gain / split 중요도와 검증 fold 순열 중요도로 피처 순위 DataFrame 생성"""
+    booster = cache.train(cache.feature_names, fold=0)
+    _, _, valid_rows = cache.folds[0]
+    if len(valid_rows) > max_rows:
+        valid_rows = np.random.default_rng(seed).choice(valid_rows, max_rows, replace=False)
+    X_valid = np.asarray(cache.dataset.get_data()[valid_rows])
+    perm_mean, perm_std = permutation_importance(booster, X_valid, cache.y[valid_rows], n_repeats, seed)
+
+    gain = booster.feature_importance('gain')
+    ranking = pd.DataFrame({
+        'permutation': perm_mean,
+        'permutation_std': perm_std,
+        'gain': gain / gain.sum(),
+        'split': booster.feature_importance('split'),
+    }, index=cache.feature_names)
+    # 세 중요도의 평균 순위 (RFE가 쓰는 split 중요도와 크게 어긋나지 않으면서 순열 중요도의 잡음을 줄임)
+    ranking['rank'] = ranking[['permutation', 'gain', 'split']].rank(ascending=False).mean(axis=1)
+    return ranking.sort_values(['rank', 'permutation'], ascending=[True, False])
+
+
+def prune_redundant(order, X, threshold=CORR_THRESHOLD, exclude=UNRELIABLE_FEATURES):
+    """순위대로 보면서 이미 고른 피처와 |상관계수| > threshold인 피처 / exclude를 제외
+
+    반환: (남은 순서, {뺀 피처: 사유})
+    """
+    corr = X[order].corr().abs()
+    kept, dropped = [], {}
+    for name in order:
+        if name in exclude:
+            dropped[name] = '신뢰도 낮음'
+            continue
+        similar = [other for other in kept if corr.loc[name, other] > threshold]
+        if similar:
+            dropped[name] = f"{similar[0]}와 상관 {corr.loc[name, similar[0]]:.2f}"
+            continue
+        kept.append(name)
+    return kept, dropped
+
+
+def select_features(X, y, n_features=None, k_values=None, n_folds=N_FOLDS, threshold=CORR_THRESHOLD,
+                    exclude=UNRELIABLE_FEATURES, n_repeats=3, seed=RANDOM_STATE, log=print):
+    """중요도 순위 + 상위 k개 교차검증으로 피처 선택
+
+    n_features를 주면 그 개수 (k_values가 없으면 n_features와 전체만 평가),
+    없으면 상위 1, 3, 5, ...개 곡선에서 최고 정확도와 표준편차 1개 이내인 가장 작은 k (1-SE 규칙).
+    """
+    timings = {}
+    start = time.perf_counter()
+    cache = FoldCache(X, y, n_folds=n_folds, seed=seed)
+    timings['fold_cache'] = cache.build_seconds
+
+    start = time.perf_counter()
+    ranking = importance_ranking(cache, n_repeats=n_repeats, seed=seed)
+    order, dropped = prune_redundant(list(ranking.index), X, threshold, exclude)
+    timings['ranking'] = time.perf_counter() - start
+    log(f"중요도 순위 ({timings['ranking']:.1f}초), 중복/제외 {len(dropped)}개: {dropped}")
+
+    start = time.perf_counter()
+    if k_values is None:
+        k_values = [n_features, len(order)] if n_features else range(1, len(order) + 1, 2)
+    k_values = sorted(set(k_values) | {len(order)})
+    curve = {}
+    for k in k_values:
+        if k <= len(order):
+            curve[k] = cache.score(order[:k])
+            log(f"  상위 {k:>2}개: 정확도 {curve[k][0]:.4f} (±{curve[k][1]:.4f})")
+    timings['curve'] = time.perf_counter() - start
+
+    if n_features is None:
+        best_mean, best_std = max(curve.values())
+        n_features = min(k for k, (mean, _) in curve.items() if mean >= best_mean - best_std)
+    return {
+        'selected': order[:n_features],
+        'ranking': ranking,
+        'dropped': dropped,
+        'curve': curve,
+        'timings': timings,
+        'n_fits': cache.n_fits,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='부스터 중요도 + 순열 중요도 기반 피처 선택')
+    parser.add_argument('--work-dir', default=DEFAULT_WORK_DIR, help='train.py 체크포인트 디렉토리')
+    parser.add_argument('--target', choices=['score', 'tier'], default='score',
+                        help='score: 리그 점수 0~18 (노트북 RFE), tier: 6대 리그')
+    parser.add_argument('--n-features', type=int, default=None, help='선택할 개수 (기본: 1-SE 규칙)')
+    parser.add_argument('--sample', type=int, default=None, help='행 표본 수 (기본: 전체)')
+    parser.add_argument('--corr-threshold', type=float, default=CORR_THRESHOLD)
+    parser.add_argument('--curve', action='store_true', help='개수를 정해도 1, 3, 5, ...개 곡선 전체 평가')
+    parser.add_argument('--output', default=None, help='선택 결과 JSON 저장 경로')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    X, y = load_candidates(args.work_dir, args.target, args.sample)
+    print(f"후보 {X.shape[1]}개 / {len(y):,}행 / 클래스 {int(y.max()) + 1}개")
+    k_values = range(1, X.shape[1] + 1, 2) if args.curve else None
+    result = select_features(X, y, args.n_features, k_values, threshold=args.corr_threshold)
+
+    print(result['ranking'].round(4).to_string())
+    print(f"\n✅ 선택된 피처 {len(result['selected'])}개: {result['selected']}")
+    print(f"학습 {result['n_fits']}회, 전체 {time.perf_counter() - start:.1f}초 "
+          f"({', '.join(f'{k} {v:.1f}초' for k, v in result['timings'].items())})")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({'selected': result['selected'], 'dropped': result['dropped'],
+                       'curve': {str(k): v for k, v in result['curve'].items()}}, f, indent=2, ensure_ascii=False)
+
+
+if __name__ == '__main__':
+    main()
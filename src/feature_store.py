@@ -0,0 +1,184 @@
+"""
+🗄️ 피처 스토어 (Parquet Feature Store)
+원천 CSV를 한 번만 파싱해 파생변수까지 포함한 파티션 Parquet으로 저장하고,
+이후에는 컬럼 선택(projection)과 조건 필터(predicate pushdown)로 필요한 부분만 읽습니다.
+원천 파일의 해시가 바뀌면 자동으로 다시 만듭니다.
+
+실행 방법: python src/feature_store.py --csv coc_clans_dataset.csv --store feature_store
+
+사용 예시:
+    from feature_store import ensure_feature_store, load_reliable
+    store = ensure_feature_store('coc_clans_dataset.csv')
+    coc_df_reliable = load_reliable(store)
+"""
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import time
+
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from ingest import CHUNK_SIZE, MIN_WARS, iter_clan_chunks
+
+# 파생변수 계산 로직이 바뀌면 올려서 기존 스토어를 무효화
+FEATURE_VERSION = 1
+MANIFEST_NAME = '_manifest.json'
+DEFAULT_STORE = 'feature_store'
+DEFAULT_PARTITIONS = ('is_ghost',)
+
+# 파티션 컬럼의 타입 (디렉토리 이름 -> 값 파싱용)
+PARTITION_TYPES = {
+    'is_ghost': pa.bool_(),
+    'clan_war_league': pa.string(),
+    'clan_type': pa.string(),
+    'war_frequency': pa.string(),
+}
+
+
+def file_hash(path, block_size=8 * 1024 * 1024):
+    """원천 파일 sha256"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def read_manifest(store_dir):
+    path = os.path.join(store_dir, MANIFEST_NAME)
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def is_fresh(csv_path, store_dir=DEFAULT_STORE, partition_cols=DEFAULT_PARTITIONS):
+    """스토어가 현재 원천 파일로 만들어졌는지 확인
+
+    크기/수정시각이 같으면 저장된 해시를 그대로 믿고, 다르면 해시를 다시 계산합니다.
+    (파일을 touch만 한 경우에는 재생성하지 않음)
+    """
+    manifest = read_manifest(store_dir)
+    if manifest is None:
+        return False
+    if manifest['feature_version'] != FEATURE_VERSION or manifest['partition_cols'] != list(partition_cols):
+        return False
+    stat = os.stat(csv_path)
+    if stat.st_size != manifest['source_size']:
+        return False
+    if stat.st_mtime_ns == manifest['source_mtime_ns']:
+        return True
+    if file_hash(csv_path) != manifest['source_sha256']:
+        return False
+    # 내용은 같으니 수정시각만 갱신해 다음번 해시 계산을 생략
+    manifest['source_mtime_ns'] = stat.st_mtime_ns
+    with open(os.path.join(store_dir, MANIFEST_NAME), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+    return True
+
+
+def build_feature_store(csv_path, store_dir=DEFAULT_STORE, partition_cols=DEFAULT_PARTITIONS, chunksize=CHUNK_SIZE):
+    """CSV -> 파생변수 포함 파티션 Parquet 변환 (임시 디렉토리에 만든 뒤 교체)"""
+    start = time.perf_counter()
+    partition_cols = list(partition_cols)
+    tmp_dir = store_dir.rstrip('/\\') + '.tmp'
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    n_rows = 0
+    for i, chunk in enumerate(iter_clan_chunks(csv_path, chunksize=chunksize)):
+        table = pa.Table.from_pandas(chunk, preserve_index=False)
+        pq.write_to_dataset(
+            table,
+            root_path=tmp_dir,
+            partition_cols=partition_cols,
+            basename_template=f'part-{i:05d}-{{i}}.parquet',
+        )
+        n_rows += len(chunk)
+
+    stat = os.stat(csv_path)
+    manifest = {
+        'source_path': os.path.abspath(csv_path),
+        'source_size': stat.st_size,
+        'source_mtime_ns': stat.st_mtime_ns,
+        'source_sha256': file_hash(csv_path),
+        'feature_version': FEATURE_VERSION,
+        'partition_cols': partition_cols,
+        'rows': n_rows,
+        'build_seconds': round(time.perf_counter() - start, 2),
+    }
+    with open(os.path.join(tmp_dir, MANIFEST_NAME), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+
+    shutil.rmtree(store_dir, ignore_errors=True)
+    os.replace(tmp_dir, store_dir)
+    return manifest
+
+
+def ensure_feature_store(csv_path, store_dir=DEFAULT_STORE, partition_cols=DEFAULT_PARTITIONS, chunksize=CHUNK_SIZE):
+    """스토어가 최신이 아니면 다시 만들고 스토어 경로를 반환"""
+    if not is_fresh(csv_path, store_dir, partition_cols):
+        build_feature_store(csv_path, store_dir, partition_cols, chunksize)
+    return store_dir
+
+
+def open_store(store_dir=DEFAULT_STORE):
+    """pyarrow Dataset으로 열기 (실제 읽기는 to_table 시점)"""
+    manifest = read_manifest(store_dir)
+    if manifest is None:
+        raise FileNotFoundError(f"피처 스토어가 없습니다: {store_dir} (build_feature_store 먼저 실행)")
+    schema = pa.schema([(col, PARTITION_TYPES.get(col, pa.string())) for col in manifest['partition_cols']])
+    return ds.dataset(store_dir, format='parquet', partitioning=ds.partitioning(schema, flavor='hive'))
+
+
+def load_features(store_dir=DEFAULT_STORE, columns=None, filter=None):
+    """필요한 컬럼/행만 pandas로 읽기
+
+    filter는 pyarrow 표현식입니다. 예: ds.field('war_total') >= 20
+    파티션 컬럼 조건은 디렉토리 단위로, 나머지는 row group 통계로 건너뜁니다.
+    """
+    table = open_store(store_dir).to_table(columns=columns, filter=filter)
+    return table.to_pandas()
+
+
+def active_filter():
+    return ds.field('is_ghost') == False  # noqa: E712 (pyarrow 표현식)
+
+
+def load_active(store_dir=DEFAULT_STORE, columns=None):
+    """coc_df_active (유령 클랜 제외)"""
+    return load_features(store_dir, columns=columns, filter=active_filter())
+
+
+def load_reliable(store_dir=DEFAULT_STORE, columns=None, min_wars=MIN_WARS):
+    """coc_df_reliable (활성 클랜 중 전쟁 min_wars판 이상)"""
+    return load_features(store_dir, columns=columns,
+                         filter=active_filter() & (ds.field('war_total') >= min_wars))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='원천 CSV를 파티션 Parquet 피처 스토어로 변환')
+    parser.add_argument('--csv', default='coc_clans_dataset.csv', help='원천 CSV 경로')
+    parser.add_argument('--store', default=DEFAULT_STORE, help='피처 스토어 디렉토리')
+    parser.add_argument('--partition', nargs='+', default=list(DEFAULT_PARTITIONS),
+                        choices=list(PARTITION_TYPES), help='파티션 컬럼')
+    parser.add_argument('--chunksize', type=int, default=CHUNK_SIZE)
+    parser.add_argument('--force', action='store_true', help='최신이어도 다시 생성')
+    args = parser.parse_args()
+
+    if not args.force and is_fresh(args.csv, args.store, args.partition):
+        print(f"✅ 피처 스토어가 최신입니다: {args.store}")
+    else:
+        manifest = build_feature_store(args.csv, args.store, args.partition, args.chunksize)
+        print(f"✅ 피처 스토어 생성 완료: {args.store} ({manifest['rows']:,}행, {manifest['build_seconds']}초)")
+
+    start = time.perf_counter()
+    reliable = load_reliable(args.store)
+    print(f"coc_df_reliable 로드: {len(reliable):,}행, {time.perf_counter() - start:.3f}초")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,249 @@
+"""
+🧮 피처 변환 (Feature Transform)
+세 앱(app.py / app_unified.py / app_coaching.py)과 학습/배치 스코어링이 함께 쓰는
+피처 계산 로직입니다. DataFrame 또는 배열 dict를 받아 모델이 기대하는 컬럼 순서의
+연속(C-contiguous) float32 행렬을 돌려줍니다.
+
+사용 예시:
+    transform = survival_transform(war_freq_encoder, clan_type_encoder)
+    X_input = transform.transform_one(mean_member_trophies=1500, mean_member_level=100, ...)
+    X_batch = transform.transform(df)
+    war_code = CategoryTable.from_encoder(war_freq_encoder).encode(df['war_frequency'])
+"""
+import numpy as np
+
+# ==========================================
+# 모델별 입력 컬럼 (순서 중요!)
+# ==========================================
+# 모델 A: 클랜 생존 예측 (노트북 01 engineered_features_v2)
+SURVIVAL_FEATURES = [
+    'activity_ratio',
+    'entry_gap',
+    'war_frequency_code',
+    'isFamilyFriendly',
+    'clan_type_code'
+]
+
+# 모델 B: 리그 등급 예측 (노트북 02 selected_features)
+LEAGUE_FEATURES = [
+    'clan_level',
+    'clan_points',
+    'war_wins',
+    'clan_capital_points',
+    'mean_member_level',
+    'mean_member_trophies',
+    'activity_ratio',
+    'entry_gap',
+    'points_per_member'
+]
+
+# 모델 B 입력 범위 (app_unified.py number_input / 성장 가이드 탐색 범위, 없으면 하한 0)
+LEAGUE_INPUT_LOWER = {'entry_gap': -5000}
+LEAGUE_INPUT_UPPER = {
+    'clan_level': 30, 'clan_points': 100000, 'war_wins': 2000, 'clan_capital_points': 100000,
+    'mean_member_level': 300, 'mean_member_trophies': 6000, 'activity_ratio': 100.0,
+    'entry_gap': 5000, 'points_per_member': 5000.0
+}
+LEAGUE_INTEGER_FEATURES = {name: True for name in [
+    'clan_level', 'clan_points', 'war_wins', 'clan_capital_points',
+    'mean_member_level', 'mean_member_trophies', 'entry_gap'
+]}
+
+# 성장 코칭 모델 (app_coaching.py)
+COACHING_FEATURES = [
+    'clan_level',
+    'clan_points',
+    'clan_capital_points',
+    'num_members',
+    'required_townhall_level',
+    'required_trophies',
+    'mean_member_level'
+]
+
+
+# ==========================================
+# 파생변수 공식
+# ==========================================
+def activity_ratio(mean_member_trophies, mean_member_level):
+    """활동 효율성: 평균 트로피 / (평균 레벨 + 1)"""
+    return mean_member_trophies / (mean_member_level + 1)
+
+
+def entry_gap(mean_member_trophies, required_trophies):
+    """진입 장벽 격차: 평균 트로피 - 가입 조건 트로피"""
+    return mean_member_trophies - required_trophies
+
+
+def points_per_member(clan_points, num_members):
+    """멤버당 포인트: 클랜 포인트 / 멤버 수 (멤버 0명이면 0)"""
+    clan_points = np.asarray(clan_points, dtype=np.float64)
+    num_members = np.asarray(num_members, dtype=np.float64)
+    return np.divide(clan_points, num_members, out=np.zeros(np.broadcast(clan_points, num_members).shape),
+                     where=num_members > 0)
+
+
+# 파생 컬럼 -> (필요한 원본 컬럼, 계산 함수)
+DERIVED_FEATURES = {
+    'activity_ratio': (('mean_member_trophies', 'mean_member_level'), activity_ratio),
+    'entry_gap': (('mean_member_trophies', 'required_trophies'), entry_gap),
+    'points_per_member': (('clan_points', 'num_members'), points_per_member),
+}
+
+# 인코딩 컬럼 -> 원본 문자열 컬럼
+ENCODED_FEATURES = {
+    'war_frequency_code': 'war_frequency',
+    'clan_type_code': 'clan_type',
+}
+
+
+# ==========================================
+# 범주 인코딩 표
+# ==========================================
+class CategoryTable:
+    """LabelEncoder.classes_로 만든 문자열 -> 코드 표 (로드할 때 한 번 생성)
+
+    LabelEncoder.transform은 호출마다 검증 + searchsorted를 거치고, 모르는 값이 하나라도 있으면
+    배열 전체가 실패합니다. 이 표는
+    - 한 건: dict 조회
+    - 배열: 정렬된 classes_에 searchsorted 한 번 + 일치 확인
+    - category 컬럼: 카테고리(몇 개)만 인코딩해 행 코드로 펼침
+    으로 인코딩하고, 모르는 값(결측 포함)은 unknown_code로 바꿉니다 (None이면 LabelEncoder처럼 ValueError).
+    transform / inverse_transform / classes_가 LabelEncoder와 같아 그대로 바꿔 쓸 수 있습니다.
+    """
+
+    def __init__(self, classes, unknown_code=0):
+        self.classes_ = np.asarray(classes)
+        self.unknown_code = unknown_code
+        keys = self.classes_.astype(str)
+        self._order = np.argsort(keys, kind='stable')
+        self._sorted = keys[self._order]
+        self._index = {key: code for code, key in enumerate(keys.tolist())}
+
+    def __repr__(self):
+        return f"CategoryTable({self.classes_.tolist()}, unknown_code={self.unknown_code})"
+
+    @classmethod
+    def from_encoder(cls, encoder, unknown_code=0):
+        """LabelEncoder(또는 classes_가 있는 객체) -> CategoryTable"""
+        if isinstance(encoder, cls) and encoder.unknown_code == unknown_code:
+            return encoder
+        return cls(encoder.classes_, unknown_code)
+
+    def _unknown(self, values):
+        if self.unknown_code is None:
+            raise ValueError(f"y contains previously unseen labels: {list(values)[:5]}")
+        return self.unknown_code
+
+    def encode_one(self, value):
+        """값 하나 -> 코드"""
+        code = self._index.get(str(value))
+        return self._unknown([value]) if code is None else code
+
+    def _encode_array(self, values):
+        values = np.asarray(values).reshape(-1)
+        if len(values) == 1:
+            return np.array([self.encode_one(values[0])], dtype=np.int64)
+        if values.dtype == object:
+            # 파이썬 문자열 배열은 str 배열로 바꿔 searchsorted 하는 것보다 dict 조회가 빠름
+            codes = np.frompyfunc(self._index.get, 2, 1)(values, -1).astype(np.int64)
+            found = codes >= 0
+        else:
+            values = values.astype(str)
+            pos = np.minimum(np.searchsorted(self._sorted, values), len(self._sorted) - 1)
+            found = self._sorted[pos] == values
+            codes = self._order[pos]
+        if found.all():
+            return codes
+        return np.where(found, codes, self._unknown(np.unique(values[~found].astype(str)).tolist()))
+
+    def encode(self, values):
+        """문자열 배열 / Series / Categorical -> int64 코드 배열"""
+        if hasattr(values, 'cat'):
+            values = values.array
+        if hasattr(values, 'categories') and hasattr(values, 'codes'):
+            codes = np.asarray(values.codes)
+            lookup = self._encode_array(np.asarray(values.categories))
+            if (codes < 0).any():
+                # 결측(-1)은 lookup 마지막 칸
+                lookup = np.append(lookup, self._unknown([None]))
+            return lookup[codes]
+        return self._encode_array(values)
+
+    # LabelEncoder 호환
+    transform = encode
+
+    def inverse_transform(self, codes):
+        codes = np.asarray(codes, dtype=np.int64)
+        invalid = (codes < 0) | (codes >= len(self.classes_))
+        if invalid.any():
+            raise ValueError(f"y contains previously unseen labels: {np.unique(codes[invalid]).tolist()}")
+        return self.classes_[codes]
+
+
+class FeatureTransform:
+    """입력(DataFrame / 배열 dict) -> 모델 입력 float32 행렬
+
+    컬럼마다 다음 순서로 값을 찾습니다.
+    1) 입력에 같은 이름의 컬럼이 있으면 그대로 사용 (예: 앱에서 직접 입력한 activity_ratio)
+    2) 파생 컬럼이면 원본 컬럼으로 계산
+    3) 인코딩 컬럼이면 원본 문자열을 encoders(CategoryTable)로 변환
+    """
+
+    def __init__(self, columns, encoders=None):
+        self.columns = list(columns)
+        # LabelEncoder를 받아도 CategoryTable로 바꿔 둠 (모르는 값은 0, 기존 앱의 except 폴백과 같음)
+        self.encoders = {name: CategoryTable.from_encoder(encoder) for name, encoder in (encoders or {}).items()}
+
+    def __repr__(self):
+        return f"FeatureTransform({self.columns})"
+
+    @property
+    def n_features(self):
+        return len(self.columns)
+
+    def _column(self, data, name):
+        if name in data:
+            return data[name]
+        if name in DERIVED_FEATURES:
+            sources, func = DERIVED_FEATURES[name]
+            args = [np.asarray(self._column(data, src), dtype=np.float64) for src in sources]
+            return func(*args)
+        if name in ENCODED_FEATURES and name in self.encoders:
+            return self.encoders[name].encode(self._column(data, ENCODED_FEATURES[name]))
+        raise KeyError(f"입력에 '{name}' 컬럼이 없고 계산할 수도 없습니다.")
+
+    def transform(self, data):
+        """(n_rows, n_features) float32 C-contiguous 행렬 반환"""
+        # 행 수는 실제로 필요한 첫 컬럼에서 (빈 입력이면 여기서 KeyError)
+        first = self._column(data, self.columns[0])
+        n_rows = len(data) if hasattr(data, 'columns') else np.size(first)
+        X = np.empty((n_rows, len(self.columns)), dtype=np.float32, order='C')
+        X[:, 0] = np.asarray(first, dtype=np.float32)
+        for j, name in enumerate(self.columns[1:], start=1):
+            values = self._column(data, name)
+            X[:, j] = np.asarray(values, dtype=np.float32)
+        return X
+
+    __call__ = transform
+
+    def transform_one(self, **values):
+        """단일 클랜 입력 (앱의 폼 값) -> (1, n_features) 행렬"""
+        return self.transform({key: np.atleast_1d(value) for key, value in values.items()})
+
+
+def survival_transform(war_freq_encoder, clan_type_encoder):
+    """모델 A 입력 변환기 (war_frequency/clan_type 인코더 포함)"""
+    return FeatureTransform(SURVIVAL_FEATURES, encoders={
+        'war_frequency_code': war_freq_encoder,
+        'clan_type_code': clan_type_encoder,
+    })
+
+
+def league_transform():
+    """모델 B 입력 변환기"""
+    return FeatureTransform(LEAGUE_FEATURES)
+
+
+def coaching_transform():
+    """성장 코칭 모델 입력 변환기"""
+    return FeatureTransform(COACHING_FEATURES)
@@ -0,0 +1,192 @@
+"""
+⚖️ 클래스 불균형 보정 (Class Imbalance Handling)
+리그/코칭 모델의 소수 티어(Master, Champion 등) 보정을 SMOTE로 학습 데이터를 통째로 불리지 않고 처리합니다.
+
+- class_weight: compute_sample_weight('balanced')로 행 가중치만 추가 (노트북 02가 import하던 방식, 추가 메모리 = 행당 float 1개)
+- balanced_batches: 매번 클래스별로 같은 수의 행을 뽑은 미니배치로 부스팅 라운드를 이어서 학습 (메모리 = 배치 1개)
+- chunked_smote: SMOTE와 같은 방식(같은 클래스 k-최근접 이웃 사이 보간)으로 합성 행을 청크 단위로 만들어
+  LightGBM Dataset에 바로 밀어 넣음 -> 늘어난 float 행렬을 만들지 않고 binning된 값(피처당 1바이트)만 보관
+- smote: 노트북과 같은 imbalanced-learn SMOTE (늘어난 행렬을 그대로 만듦, 비교용)
+
+balanced_batches / chunked_smote는 lgb.train으로 학습하므로 artifacts.NativeClassifier를 반환합니다
+(predict / predict_proba / classes_가 sklearn 래퍼와 같아 앱/배치 스코어링/네이티브 export에서 그대로 사용).
+
+실행 방법: python benchmarks/bench_imbalance.py --work-dir train_work
+"""
+import lightgbm as lgb
+import numpy as np
+
+STRATEGIES = ('chunked_smote', 'class_weight', 'balanced_batches', 'smote')
+DEFAULT_STRATEGY = 'chunked_smote'
+RANDOM_STATE = 42
+
+# SMOTE 이웃 수 (imbalanced-learn 기본값과 같음)
+SMOTE_K = 5
+# 합성 행을 한 번에 만드는 크기 (= LightGBM이 Dataset에 한 번에 밀어 넣는 행 수)
+CHUNK_SIZE = 50_000
+# 미니배치 하나에 클래스별로 뽑는 행 수 / 배치 하나로 학습하는 부스팅 라운드 수
+BATCH_PER_CLASS = 2048
+ROUNDS_PER_BATCH = 10
+
+# sklearn 래퍼 파라미터 중 lgb.train에 넘기지 않는 것
+_WRAPPER_ONLY = ('n_estimators', 'class_weight', 'importance_type')
+
+
+def class_sample_weight(y):
+    """클래스 빈도에 반비례하는 행 가중치 (class_weight='balanced'와 같은 값)"""
+    from sklearn.utils.class_weight import compute_sample_weight
+    return compute_sample_weight('balanced', y)
+
+
+def smote_counts(y):
+    """클래스별로 만들 합성 행 수 (imbalanced-learn 'auto'와 같이 모든 클래스를 최다 클래스 수에 맞춤)"""
+    classes, counts = np.unique(y, return_counts=True)
+    return {int(c): int(counts.max() - n) for c, n in zip(classes, counts)}
+
+
+def balanced_batches(y, per_class=BATCH_PER_CLASS, seed=RANDOM_STATE):
+    """클래스별 per_class개씩 뽑은 행 인덱스 배치를 끝없이 생성 (행이 모자란 클래스는 복원 추출)"""
+    rng = np.random.default_rng(seed)
+    members = [np.flatnonzero(y == c) for c in np.unique(y)]
+    while True:
+        batch = [rng.choice(rows, per_class, replace=len(rows) < per_class) for rows in members]
+        yield np.concatenate(batch)
+
+
+# ==========================================
+# 청크 단위 SMOTE (lgb.Sequence)
+# ==========================================
+class _ArraySequence(lgb.Sequence):
+    """원본 행렬을 복사 없이 Dataset 입력 목록에 넣기 위한 래퍼"""
+
+    def __init__(self, X, batch_size=CHUNK_SIZE):
+        self.X = X
+        self.batch_size = batch_size
+
+    def __len__(self):
+        return len(self.X)
+
+    def __getitem__(self, idx):
+        return self.X[idx]
+
+
+class SmoteSequence(lgb.Sequence):
+    """한 클래스의 합성 행 n_synthetic개를 청크 단위로 만들어 돌려주는 lgb.Sequence
+
+    청크 c는 (seed, c)로 고정된 난수로 만들기 때문에 몇 번을 읽어도 같은 행이 나오고,
+    메모리에는 마지막으로 읽은 청크 하나만 남습니다.
+    """
+
+    def __init__(self, X_class, n_synthetic, k=SMOTE_K, chunk_size=CHUNK_SIZE, seed=RANDOM_STATE):
+        from sklearn.neighbors import NearestNeighbors
+
+        self.X = np.asarray(X_class, dtype=np.float64)
+        self.n_synthetic = int(n_synthetic)
+        self.k = min(k, len(self.X) - 1)
+        self.batch_size = chunk_size
+        self.seed = seed
+        self.nn = NearestNeighbors(n_neighbors=self.k + 1).fit(self.X) if self.k > 0 else None
+        self._cached = (None, None)
+
+    def __len__(self):
+        return self.n_synthetic
+
+    def chunk(self, c):
+        if self._cached[0] == c:
+            return self._cached[1]
+        size = min(self.batch_size, self.n_synthetic - c * self.batch_size)
+        rng = np.random.default_rng([self.seed, c])
+        base = rng.integers(len(self.X), size=size)
+        if self.nn is None:  # 행이 1개뿐인 클래스는 복제
+            rows = self.X[base]
+        else:
+            # 자기 자신(첫 번째 이웃)을 빼고 k개 중 하나와 보간
+            neighbors = self.nn.kneighbors(self.X[base], return_distance=False)[:, 1:]
+            pick = neighbors[np.arange(size), rng.integers(self.k, size=size)]
+            gap = rng.random((size, 1))
+            rows = self.X[base] + gap * (self.X[pick] - self.X[base])
+        self._cached = (c, rows)
+        return rows
+
+    def __getitem__(self, idx):
+        if isinstance(idx, slice):
+            start, stop, _ = idx.indices(self.n_synthetic)
+            first, last = start // self.batch_size, (stop - 1) // self.batch_size
+            rows = np.concatenate([self.chunk(c) for c in range(first, last + 1)])
+            offset = first * self.batch_size
+            return rows[start - offset:stop - offset]
+        idx = int(idx) + (self.n_synthetic if idx < 0 else 0)
+        return self.chunk(idx // self.batch_size)[idx % self.batch_size]
+
+
+def smote_sequences(X, y, k=SMOTE_K, chunk_size=CHUNK_SIZE, seed=RANDOM_STATE):
+    """원본 + 클래스별 합성 행 Sequence 목록과 전체 라벨 (라벨만 합성 행 수만큼 늘어남)"""
+    X = np.asarray(X, dtype=np.float64)
+    seqs, labels = [_ArraySequence(X, chunk_size)], [np.asarray(y)]
+    for c, n_synthetic in smote_counts(y).items():
+        if n_synthetic == 0:
+            continue
+        seqs.append(SmoteSequence(X[y == c], n_synthetic, k, chunk_size, seed + c))
+        labels.append(np.full(n_synthetic, c, dtype=labels[0].dtype))
+    return seqs, np.concatenate(labels)
+
+
+# ==========================================
+# 학습
+# ==========================================
+def lgb_train_params(params, n_classes):
+    """LGBMClassifier 파라미터 -> lgb.train 파라미터 (별칭은 LightGBM이 그대로 인식)"""
+    train_params = {key: value for key, value in params.items() if key not in _WRAPPER_ONLY}
+    if n_classes > 2:
+        train_params.update(objective='multiclass', num_class=n_classes)
+    else:
+        train_params.update(objective='binary')
+    return train_params, int(params.get('n_estimators', 100))
+
+
+def _native(booster, classes, feature_names):
+    from artifacts import NativeClassifier
+    return NativeClassifier(booster, 'lightgbm', classes, feature_names)
+
+
+def fit_lightgbm(X, y, params, strategy=DEFAULT_STRATEGY, seed=RANDOM_STATE):
+    """불균형 보정 방식별 LightGBM 분류기 학습
+
+    X는 DataFrame(피처 이름 유지) 또는 2차원 배열, params는 LGBMClassifier 파라미터.
+    smote / class_weight는 LGBMClassifier, balanced_batches / chunked_smote는 NativeClassifier 반환.
+    """
+    if strategy not in STRATEGIES:
+        raise ValueError(f"알 수 없는 불균형 보정 방식: {strategy} (가능: {', '.join(STRATEGIES)})")
+    feature_names = list(X.columns) if hasattr(X, 'columns') else [f'Column_{i}' for i in range(X.shape[1])]
+    y = np.asarray(y)
+
+    if strategy == 'smote':
+        from imblearn.over_sampling import SMOTE
+        X_res, y_res = SMOTE(random_state=seed).fit_resample(X, y)
+        return lgb.LGBMClassifier(**params).fit(X_res, y_res)
+    if strategy == 'class_weight':
+        return lgb.LGBMClassifier(**params).fit(X, y, sample_weight=class_sample_weight(y))
+
+    # lgb.train은 라벨이 0 ~ K-1이어야 하므로 classes_로 되돌릴 수 있게 인코딩
+    classes, codes = np.unique(y, return_inverse=True)
+    train_params, n_rounds = lgb_train_params(params, len(classes))
+    X = np.asarray(X, dtype=np.float64)
+
+    if strategy == 'chunked_smote':
+        seqs, labels = smote_sequences(X, codes, seed=seed)
+        dataset = lgb.Dataset(seqs, labels, feature_name=feature_names, free_raw_data=True)
+        booster = lgb.train(train_params, dataset, num_boost_round=n_rounds)
+        return _native(booster, classes, feature_names)
+
+    # balanced_batches: 구간(bin) 경계는 원본 전체로 한 번 정하고, 부스터 하나의 학습 데이터를
+    # ROUNDS_PER_BATCH 라운드마다 새 균형 배치로 바꿈 (같은 bin 경계라 LightGBM이 기존 트리 점수를 이어서 계산)
+    reference = lgb.Dataset(X, codes, feature_name=feature_names, params=train_params, free_raw_data=False).construct()
+    booster, batches = None, balanced_batches(codes, seed=seed)
+    for start in range(0, n_rounds, ROUNDS_PER_BATCH):
+        rows = next(batches)
+        batch = lgb.Dataset(X[rows], codes[rows], reference=reference, feature_name=feature_names)
+        if booster is None:
+            booster = lgb.Booster(train_params, batch)
+        for _ in range(min(ROUNDS_PER_BATCH, n_rounds - start)):
+            booster.update(train_set=batch)
+    return _native(booster, classes, feature_names)
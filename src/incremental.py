@@ -0,0 +1,369 @@
+"""
+🔄 증분 갱신 (Incremental Refresh)
+매일 들어오는 클랜 스냅샷(새로 생기거나 바뀐 클랜만 담긴 CSV)으로 tier_standards와 모델을
+전체 재학습 없이 갱신합니다.
+
+- 상태 파일(SQLite): 클랜별 마지막 티어/피처 값 + 티어별 행 수 / 합계 / 히스토그램(분위수용)
+  -> 바뀐 클랜은 이전 값을 빼고 새 값을 더하므로 갱신 비용은 스냅샷 크기에 비례 (O(delta))
+- 출력: tier_standards.pkl(리그 6티어 평균) + coaching_tier_standards.pkl(코칭 0~6단계 평균, app_coaching.py)
+- 리그/코칭 모델은 스냅샷 행으로 부스팅을 이어서 학습(init_model)하고, 스냅샷 검증 표본 정확도가
+  MAX_ACCURACY_DROP보다 떨어지면 기존 모델 유지
+- 새 파일은 모델 디렉토리 안 임시 폴더에서 만든 뒤 artifacts.publish_artifacts로 교체 (앱은 릴리스 id가 바뀌면 다시 로드)
+
+실행 방법: python src/incremental.py --delta clans_snapshot.csv --model-dir . --store feature_store
+    (상태 파일이 없으면 --store의 피처 스토어 전체로 먼저 만듦)
+"""
+import argparse
+import io
+import os
+import shutil
+import sqlite3
+import tempfile
+import time
+
+import joblib
+import numpy as np
+import pandas as pd
+
+import artifacts
+from feature_store import DEFAULT_STORE, active_filter, open_store
+from features import COACHING_FEATURES, LEAGUE_FEATURES
+from ingest import CHUNK_SIZE, iter_clan_chunks
+from train import COACHING_PARAMS, LEAGUE_PARAMS, RANDOM_STATE, TIER_ORDER, broad_tier, league_score
+
+DEFAULT_STATE = 'tier_state.sqlite'
+# 티어별로 누적하는 피처 (리그 + 코칭 기준값)
+STANDARD_FEATURES = list(dict.fromkeys(LEAGUE_FEATURES + COACHING_FEATURES))
+N_TIERS = len(TIER_ORDER) + 1  # Unranked(0) ~ Champion(6)
+HIST_BINS = 256
+DEFAULT_QUANTILES = (0.25, 0.5, 0.75)
+
+BOOST_ROUNDS = 20
+# 이어서 학습하는 라운드는 원래 학습률의 일부만 사용 (작은 스냅샷에 과적합 방지)
+LEARNING_RATE_SCALE = 0.25
+# 스냅샷 행이 이보다 적으면 모델은 건드리지 않음
+MIN_BOOST_ROWS = 1000
+VALID_SIZE = 0.2
+MAX_ACCURACY_DROP = 0.01
+# SQLite 한 쿼리의 바인딩 변수 수 제한(999) 안쪽
+SQL_BATCH = 900
+
+
+# ==========================================
+# 티어별 누적 통계
+# ==========================================
+class TierAccumulator:
+    """티어별 행 수 / 피처 합계 / 고정 구간 히스토그램 (더하기와 빼기 모두 가능)
+
+    분위수는 히스토그램 구간 안에서 선형 보간합니다 (오차 = 구간 폭 이내).
+    구간 경계 밖 값은 양 끝 구간에 넣습니다.
+    """
+
+    def __init__(self, edges):
+        self.edges = np.asarray(edges, dtype=np.float64)
+        n_features, n_bins = self.edges.shape[0], self.edges.shape[1] - 1
+        self.count = np.zeros(N_TIERS)
+        self.sums = np.zeros((N_TIERS, n_features))
+        self.hist = np.zeros((N_TIERS, n_features, n_bins))
+
+    @classmethod
+    def from_ranges(cls, lower, upper, bins=HIST_BINS):
+        upper = np.maximum(upper, np.asarray(lower) + 1)
+        return cls(np.linspace(lower, upper, bins + 1, axis=1))
+
+    def add(self, tiers, X, sign=1):
+        """tiers (N,) 중 0 이상인 행의 X (N, F)를 sign(+1 / -1)만큼 반영"""
+        keep = tiers >= 0
+        tiers, X = tiers[keep], X[keep]
+        if not len(tiers):
+            return
+        n_bins = self.hist.shape[2]
+        self.count += sign * np.bincount(tiers, minlength=N_TIERS)
+        for f in range(X.shape[1]):
+            self.sums[:, f] += sign * np.bincount(tiers, weights=X[:, f], minlength=N_TIERS)
+            bins = np.clip(np.searchsorted(self.edges[f], X[:, f], side='right') - 1, 0, n_bins - 1)
+            self.hist[:, f] += sign * np.bincount(tiers * n_bins + bins, minlength=N_TIERS * n_bins).reshape(
+                N_TIERS, n_bins)
+
+    def means(self):
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return self.sums / self.count[:, None]
+
+    def quantiles(self, qs=DEFAULT_QUANTILES):
+        """(티어, 분위수, 피처) 배열. 행이 없는 티어는 NaN"""
+        out = np.full((N_TIERS, len(qs), self.hist.shape[1]), np.nan)
+        for t in range(N_TIERS):
+            if self.count[t] <= 0:
+                continue
+            for f in range(self.hist.shape[1]):
+                cdf = np.cumsum(self.hist[t, f]) / self.count[t]
+                for i, q in enumerate(qs):
+                    b = min(int(np.searchsorted(cdf, q)), len(cdf) - 1)
+                    below = cdf[b - 1] if b > 0 else 0.0
+                    share = (q - below) / (cdf[b] - below) if cdf[b] > below else 0.0
+                    out[t, i, f] = self.edges[f, b] + share * (self.edges[f, b + 1] - self.edges[f, b])
+        return out
+
+    def to_bytes(self):
+        buffer = io.BytesIO()
+        np.savez(buffer, edges=self.edges, count=self.count, sums=self.sums, hist=self.hist)
+        return buffer.getvalue()
+
+    @classmethod
+    def from_bytes(cls, data):
+        arrays = np.load(io.BytesIO(data))
+        acc = cls(arrays['edges'])
+        acc.count, acc.sums, acc.hist = arrays['count'], arrays['sums'], arrays['hist']
+        return acc
+
+
+# ==========================================
+# 상태 파일 (SQLite)
+# ==========================================
+def snapshot_tiers(df):
+    """활성 클랜은 티어 0~6, 유령 클랜은 -1 (기준값에서 제외)"""
+    tiers = broad_tier(league_score(df['clan_war_league'])).astype(np.int64)
+    tiers[df['is_ghost'].to_numpy(dtype=bool)] = -1
+    return tiers
+
+
+class TierState:
+    """클랜별 마지막 값(clans 테이블) + 누적 통계(meta 테이블)를 한 SQLite 파일에 보관
+
+    apply()로 바꾼 내용은 commit() 전까지 같은 트랜잭션에 있어, 중간에 실패하면 이전 상태로 남습니다.
+    """
+
+    def __init__(self, path=DEFAULT_STATE):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        columns = ', '.join(f'{name} REAL' for name in STANDARD_FEATURES)
+        self.conn.execute(f'CREATE TABLE IF NOT EXISTS clans (clan_tag TEXT PRIMARY KEY, tier INTEGER, {columns})')
+        self.conn.execute('CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value BLOB)')
+        row = self.conn.execute("SELECT value FROM meta WHERE key = 'accumulator'").fetchone()
+        self.acc = TierAccumulator.from_bytes(row[0]) if row else None
+
+    @property
+    def initialized(self):
+        return self.acc is not None
+
+    def _lookup(self, tags):
+        """이미 있는 클랜의 (태그, 티어, 피처) -> dict"""
+        found = {}
+        select = f"SELECT clan_tag, tier, {', '.join(STANDARD_FEATURES)} FROM clans WHERE clan_tag IN "
+        for start in range(0, len(tags), SQL_BATCH):
+            chunk = tags[start:start + SQL_BATCH]
+            for row in self.conn.execute(select + f"({', '.join('?' * len(chunk))})", chunk):
+                found[row[0]] = row[1:]
+        return found
+
+    def apply(self, tags, tiers, X):
+        """스냅샷 행 반영: 이전 값 빼기 -> 새 값 더하기 -> clans 테이블 갱신 (같은 태그는 마지막 행 사용)"""
+        tags = np.asarray(tags, dtype=object)
+        _, last = np.unique(tags[::-1], return_index=True)
+        keep = np.sort(len(tags) - 1 - last)
+        tags, tiers, X = tags[keep], tiers[keep], np.asarray(X, dtype=np.float64)[keep]
+
+        old = self._lookup(tags.tolist())
+        if old:
+            rows = np.array(list(old.values()), dtype=np.float64)
+            self.acc.add(rows[:, 0].astype(np.int64), rows[:, 1:], sign=-1)
+        self.acc.add(tiers, X)
+
+        active = tiers >= 0
+        placeholders = ', '.join('?' * (len(STANDARD_FEATURES) + 2))
+        self.conn.executemany(f'INSERT OR REPLACE INTO clans VALUES ({placeholders})',
+                              [(tag, int(tier), *row) for tag, tier, row in
+                               zip(tags[active].tolist(), tiers[active], X[active].tolist())])
+        removed = [tag for tag in tags[~active].tolist() if tag in old]
+        self.conn.executemany('DELETE FROM clans WHERE clan_tag = ?', [(tag,) for tag in removed])
+        return {'new': int(sum(tag not in old for tag in tags[active].tolist())),
+                'updated': int(sum(tag in old for tag in tags[active].tolist())), 'removed': len(removed)}
+
+    def commit(self):
+        self.conn.execute("INSERT OR REPLACE INTO meta VALUES ('accumulator', ?)", (self.acc.to_bytes(),))
+        self.conn.execute("INSERT OR REPLACE INTO meta VALUES ('updated_at', ?)", (time.time(),))
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
+
+    def bootstrap(self, store_dir=DEFAULT_STORE, batch_size=CHUNK_SIZE):
+        """피처 스토어 전체(활성 클랜)로 상태를 처음부터 만듦"""
+        dataset = open_store(store_dir)
+        values = dataset.to_table(columns=STANDARD_FEATURES, filter=active_filter())
+        lower = [np.nanmin(values.column(name).to_numpy(zero_copy_only=False)) for name in STANDARD_FEATURES]
+        upper = [np.nanmax(values.column(name).to_numpy(zero_copy_only=False)) for name in STANDARD_FEATURES]
+        del values
+
+        self.conn.execute('DELETE FROM clans')
+        self.acc = TierAccumulator.from_ranges(np.asarray(lower, dtype=np.float64),
+                                               np.asarray(upper, dtype=np.float64))
+        columns = ['clan_tag', 'clan_war_league', 'is_ghost'] + STANDARD_FEATURES
+        for batch in dataset.scanner(columns=columns, filter=active_filter(), batch_size=batch_size).to_batches():
+            df = batch.to_pandas()
+            self.apply(df['clan_tag'].to_numpy(), snapshot_tiers(df), df[STANDARD_FEATURES].to_numpy(np.float64))
+        self.commit()
+
+    # ==========================================
+    # 기준값
+    # ==========================================
+    def tier_standards(self):
+        """리그 모델 tier_standards (train.py와 같은 모양: 6티어 x LEAGUE_FEATURES 평균)"""
+        means = pd.DataFrame(self.acc.means(), columns=STANDARD_FEATURES)
+        standards = means.iloc[1:][LEAGUE_FEATURES]
+        standards.index = TIER_ORDER
+        return standards[self.acc.count[1:] > 0]
+
+    def coaching_standards(self):
+        """app_coaching.py TIER_STANDARDS와 같은 모양: {티어 0~6: {피처: 평균}}"""
+        means = self.acc.means()
+        index = [STANDARD_FEATURES.index(name) for name in COACHING_FEATURES]
+        return {t: {name: float(means[t, i]) for name, i in zip(COACHING_FEATURES, index)}
+                for t in range(N_TIERS) if self.acc.count[t] > 0}
+
+    def tier_quantiles(self, qs=DEFAULT_QUANTILES):
+        """(티어, 분위수) x 피처 DataFrame"""
+        values = self.acc.quantiles(qs).reshape(N_TIERS * len(qs), -1)
+        index = pd.MultiIndex.from_product([['Unranked'] + TIER_ORDER, qs], names=['tier', 'quantile'])
+        return pd.DataFrame(values, index=index, columns=STANDARD_FEATURES).dropna(how='all')
+
+
+# ==========================================
+# 모델 이어서 학습
+# ==========================================
+def continue_boosting(model, X, labels, params, rounds=BOOST_ROUNDS, seed=RANDOM_STATE):
+    """기존 LightGBM 모델에 스냅샷 행으로 rounds 라운드를 더 학습
+
+    스냅샷의 VALID_SIZE만큼은 검증용으로 빼서 갱신 전/후 정확도를 비교합니다.
+    반환: (새 모델(NativeClassifier) 또는 None, {'before', 'after', 'rows'})
+    """
+    import lightgbm as lgb
+
+    from imbalance import class_sample_weight, lgb_train_params
+
+    booster = model.booster_ if hasattr(model, 'booster_') else getattr(model, 'booster', None)
+    if not isinstance(booster, lgb.Booster):
+        return None, {'skipped': 'LightGBM 모델이 아님'}
+    classes = np.asarray(model.classes_)
+    position = {c: i for i, c in enumerate(classes.tolist())}
+    known = np.array([label in position for label in labels.tolist()])
+    X, codes = np.asarray(X, dtype=np.float64)[known], np.array([position[c] for c in labels[known].tolist()])
+    if len(codes) < MIN_BOOST_ROWS:
+        return None, {'skipped': f'스냅샷 행 부족 ({len(codes)} < {MIN_BOOST_ROWS})'}
+
+    order = np.random.default_rng(seed).permutation(len(codes))
+    n_valid = int(len(codes) * VALID_SIZE)
+    valid, fit = order[:n_valid], order[n_valid:]
+    params = dict(params, learning_rate=params.get('learning_rate', 0.1) * LEARNING_RATE_SCALE)
+    train_params, _ = lgb_train_params(params, len(classes))
+    dataset = lgb.Dataset(X[fit], codes[fit], weight=class_sample_weight(codes[fit]),
+                          feature_name=booster.feature_name())
+    updated = lgb.train(train_params, dataset, num_boost_round=rounds, init_model=booster)
+
+    before = float((model.predict(X[valid].astype(np.float32)) == classes[codes[valid]]).mean())
+    after = float((updated.predict(X[valid]).argmax(axis=1) == codes[valid]).mean())
+    info = {'rows': len(fit), 'before': round(before, 4), 'after': round(after, 4)}
+    if after < before - MAX_ACCURACY_DROP:
+        return None, {**info, 'skipped': '검증 정확도 하락'}
+    return artifacts.NativeClassifier(updated, 'lightgbm', classes, booster.feature_name()), info
+
+
+def _has_native(key, model_dir):
+    stem = os.path.splitext(artifacts.artifact_path(key, model_dir))[0]
+    return os.path.exists(stem + artifacts.NATIVE_META_SUFFIX)
+
+
+def refresh(delta_csv, model_dir=None, state_path=DEFAULT_STATE, store_dir=None, boost_rounds=BOOST_ROUNDS,
+            chunksize=CHUNK_SIZE, log=print):
+    """스냅샷 CSV 반영 -> 기준값 / 모델 갱신 -> 모델 디렉토리 교체. 단계별 결과 dict 반환"""
+    model_dir = artifacts.model_dir_or_default(model_dir)
+    state = TierState(state_path)
+    report = {}
+    try:
+        if not state.initialized:
+            if store_dir is None:
+                raise FileNotFoundError(f"상태 파일({state_path})이 비어 있습니다. --store로 피처 스토어를 지정하세요.")
+            start = time.perf_counter()
+            state.bootstrap(store_dir)
+            report['bootstrap_seconds'] = round(time.perf_counter() - start, 2)
+            log(f"🧱 상태 파일 생성: {int(state.acc.count.sum()):,}개 클랜 ({report['bootstrap_seconds']}초)")
+
+        # 1) 스냅샷 반영 (모델 학습용 활성 행은 따로 모아둠)
+        start = time.perf_counter()
+        counts = {'new': 0, 'updated': 0, 'removed': 0}
+        frames = []
+        for chunk in iter_clan_chunks(delta_csv, chunksize=chunksize):
+            tiers = snapshot_tiers(chunk)
+            changes = state.apply(chunk['clan_tag'].to_numpy(), tiers, chunk[STANDARD_FEATURES].to_numpy(np.float64))
+            counts = {key: counts[key] + changes[key] for key in counts}
+            frames.append(chunk.loc[tiers >= 0, STANDARD_FEATURES].assign(tier=tiers[tiers >= 0]))
+        delta = pd.concat(frames, ignore_index=True)
+        report['standards'] = {**counts, 'seconds': round(time.perf_counter() - start, 2)}
+        log(f"📥 스냅샷 반영: 신규 {counts['new']:,} / 갱신 {counts['updated']:,} / 제외 {counts['removed']:,} "
+            f"({report['standards']['seconds']}초)")
+
+        # 2) 새 파일을 모델 디렉토리 안 임시 폴더에 만듦 (같은 파일 시스템이라 os.replace 가능)
+        staging = tempfile.mkdtemp(prefix='.staging-', dir=model_dir)
+        try:
+            joblib.dump(state.tier_standards(), artifacts.artifact_path('tier_standards', staging))
+            joblib.dump(state.coaching_standards(), artifacts.artifact_path('coaching_standards', staging))
+
+            if boost_rounds > 0:
+                report['models'] = _boost_models(delta, model_dir, staging, boost_rounds, log)
+
+            # 3) 교체 후 상태 커밋 (교체가 실패하면 상태도 이전 그대로)
+            report['release'] = artifacts.publish_artifacts(staging, model_dir, {'delta': os.path.abspath(delta_csv)})
+        finally:
+            shutil.rmtree(staging, ignore_errors=True)
+        state.commit()
+        log(f"✅ 릴리스 {report['release']}: {os.path.abspath(model_dir)}")
+    finally:
+        state.close()
+    return report
+
+
+def _boost_models(delta, model_dir, staging, rounds, log):
+    """리그 / 코칭 모델을 스냅샷으로 이어서 학습해 staging에 저장"""
+    league_encoder = artifacts.load_artifact('league_encoder', model_dir)
+    ranked = delta[delta['tier'] > 0]
+    targets = [
+        ('league_model', ranked[LEAGUE_FEATURES],
+         league_encoder.transform(np.array(TIER_ORDER)[ranked['tier'].to_numpy() - 1]), LEAGUE_PARAMS),
+        ('coaching_model', delta[COACHING_FEATURES], delta['tier'].to_numpy(), COACHING_PARAMS),
+    ]
+    results = {}
+    for key, X, labels, params in targets:
+        model = artifacts.load_model(key, model_dir)
+        updated, info = continue_boosting(model, X.to_numpy(np.float64), np.asarray(labels), params, rounds)
+        results[key] = info
+        if updated is None:
+            log(f"⏭️ {key}: 유지 ({info.get('skipped')})")
+            continue
+        joblib.dump(updated, artifacts.artifact_path(key, staging))
+        if _has_native(key, model_dir):
+            artifacts.export_native(key, staging)
+        log(f"🌲 {key}: +{rounds} 라운드 ({info['rows']:,}행), 검증 정확도 {info['before']:.2%} -> {info['after']:.2%}")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='클랜 스냅샷으로 tier_standards / 모델 증분 갱신')
+    parser.add_argument('--delta', required=True, help='새로 생기거나 바뀐 클랜만 담긴 스냅샷 CSV')
+    parser.add_argument('--model-dir', default=None, help='*.pkl 모델 디렉토리 (기본: COC_MODEL_DIR 또는 현재 디렉토리)')
+    parser.add_argument('--state', default=DEFAULT_STATE, help='누적 상태 SQLite 파일')
+    parser.add_argument('--store', default=None, help='상태 파일이 없을 때 처음 만들 피처 스토어')
+    parser.add_argument('--boost-rounds', type=int, default=BOOST_ROUNDS, help='모델에 더할 라운드 수 (0이면 기준값만 갱신)')
+    parser.add_argument('--chunksize', type=int, default=CHUNK_SIZE)
+    parser.add_argument('--quantiles', action='store_true', help='티어별 분위수(25/50/75%) 출력')
+    args = parser.parse_args()
+
+    refresh(args.delta, args.model_dir, args.state, args.store, args.boost_rounds, args.chunksize)
+    if args.quantiles:
+        state = TierState(args.state)
+        with pd.option_context('display.width', 160, 'display.max_columns', 20):
+            print(state.tier_quantiles().round(1))
+        state.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,150 @@
+"""
+📥 클랜 데이터 적재 (Clan Data Ingestion)
+coc_clans_dataset.csv(약 356만 행)를 좁은 dtype으로 청크 단위로 읽고,
+노트북에서 apply(axis=1)로 만들던 파생변수를 벡터 연산으로 계산합니다.
+
+사용 예시:
+    from ingest import load_clans
+    coc_df_active = load_clans('coc_clans_dataset.csv', active_only=True)
+"""
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+from features import activity_ratio, entry_gap, points_per_member
+
+# 읽는 시점에 버리는 컬럼 (노트북 전처리와 동일)
+DROP_COLUMNS = [
+    'clan_name',
+    'clan_description',
+    'clan_location',
+    'clan_badge_url'
+]
+
+# 반복되는 문자열 컬럼은 category로 읽기
+CATEGORY_COLUMNS = ['clan_type', 'war_frequency', 'clan_war_league', 'capital_league']
+
+# 값 범위에 맞춘 좁은 dtype (int64 기본값 대비 메모리 1/4 ~ 1/8)
+DTYPES = {
+    'clan_tag': 'object',
+    'isFamilyFriendly': 'bool',
+    'clan_level': 'int16',
+    'clan_points': 'int32',
+    'clan_builder_base_points': 'int32',
+    'clan_versus_points': 'int32',
+    'required_trophies': 'int16',
+    'war_win_streak': 'int16',
+    'war_wins': 'int32',
+    'war_ties': 'int32',
+    'war_losses': 'int32',
+    'num_members': 'int16',
+    'required_builder_base_trophies': 'int16',
+    'required_versus_trophies': 'int16',
+    'required_townhall_level': 'int16',
+    'clan_capital_hall_level': 'int16',
+    'clan_capital_points': 'int32',
+    'mean_member_level': 'int16',
+    'mean_member_trophies': 'int16',
+}
+DTYPES.update({col: 'category' for col in CATEGORY_COLUMNS})
+
+# 파생변수 목록
+DERIVED_COLUMNS = ['war_total', 'win_rate', 'is_ghost', 'activity_ratio', 'entry_gap', 'points_per_member']
+
+# 청크 크기 / 신뢰도 필터 기준 (노트북 MIN_WARS)
+CHUNK_SIZE = 500_000
+MIN_WARS = 20
+
+
+def ghost_mask(df):
+    """유령 클랜 여부 (노트북 is_ghost 함수의 벡터 버전)"""
+    # 1) 멤버 5명 미만  2) 레벨 2 이상 + 캐피탈 0  3) 전쟁 경험 없음
+    war_total = df['war_total'] if 'war_total' in df else df['war_wins'] + df['war_ties'] + df['war_losses']
+    return (
+        (df['num_members'] < 5)
+        | ((df['clan_level'] >= 2) & (df['clan_capital_points'] == 0))
+        | (war_total == 0)
+    )
+
+
+def add_derived_features(df):
+    """파생변수를 in-place로 추가하고 같은 DataFrame을 반환"""
+    war_total = (
+        df['war_wins'].to_numpy(dtype=np.int32)
+        + df['war_ties'].to_numpy(dtype=np.int32)
+        + df['war_losses'].to_numpy(dtype=np.int32)
+    )
+    df['war_total'] = war_total
+
+    # 승률 (0 division 방지: 전쟁 0판이면 0)
+    wins = df['war_wins'].to_numpy(dtype=np.float32)
+    df['win_rate'] = np.divide(wins, war_total, out=np.zeros(len(df), dtype=np.float32), where=war_total > 0)
+
+    df['is_ghost'] = ghost_mask(df).to_numpy()
+
+    trophies = df['mean_member_trophies'].to_numpy(dtype=np.float32)
+    levels = df['mean_member_level'].to_numpy(dtype=np.float32)
+    df['activity_ratio'] = activity_ratio(trophies, levels)
+    df['entry_gap'] = entry_gap(
+        df['mean_member_trophies'].to_numpy(dtype=np.int16),
+        df['required_trophies'].to_numpy(dtype=np.int16)
+    )
+
+    # 멤버 0명 클랜(유령)은 0으로 처리
+    df['points_per_member'] = points_per_member(
+        df['clan_points'].to_numpy(),
+        df['num_members'].to_numpy()
+    ).astype(np.float32)
+    return df
+
+
+def iter_clan_chunks(path, chunksize=CHUNK_SIZE, columns=None, derive=True, active_only=False):
+    """CSV를 청크 단위로 읽어 (파생변수 포함) DataFrame을 하나씩 반환
+
+    columns를 주면 해당 컬럼만 결과에 남깁니다. 파생변수 계산에 필요한
+    원본 컬럼은 내부에서 자동으로 함께 읽습니다.
+    """
+    reader = pd.read_csv(
+        path,
+        usecols=lambda col: col not in DROP_COLUMNS,
+        dtype=DTYPES,
+        chunksize=chunksize,
+    )
+    for chunk in reader:
+        if derive:
+            add_derived_features(chunk)
+        if active_only:
+            chunk = chunk[~chunk['is_ghost'].to_numpy()]
+        if columns is not None:
+            chunk = chunk[[col for col in columns if col in chunk.columns]]
+        yield chunk
+
+
+def concat_chunks(chunks):
+    """청크 리스트를 합치면서 category 컬럼의 카테고리를 통일"""
+    chunks = list(chunks)
+    if not chunks:
+        return pd.DataFrame()
+    if len(chunks) == 1:
+        return chunks[0].reset_index(drop=True)
+
+    categorical = [col for col in chunks[0].columns if isinstance(chunks[0][col].dtype, pd.CategoricalDtype)]
+    unified = {col: union_categoricals([chunk[col] for chunk in chunks]).categories for col in categorical}
+    chunks = [
+        chunk.assign(**{col: chunk[col].cat.set_categories(categories) for col, categories in unified.items()})
+        for chunk in chunks
+    ]
+    return pd.concat(chunks, ignore_index=True)
+
+
+def load_clans(path, chunksize=CHUNK_SIZE, columns=None, active_only=False):
+    """전체 데이터 적재 (coc_df_clean / active_only=True면 coc_df_active)"""
+    return concat_chunks(iter_clan_chunks(path, chunksize=chunksize, columns=columns, active_only=active_only))
+
+
+def filter_reliable(df, min_wars=MIN_WARS):
+    """전쟁 min_wars판 이상인 활성 클랜만 (노트북 coc_df_reliable)"""
+    mask = df['war_total'].to_numpy() >= min_wars
+    if 'is_ghost' in df:
+        mask &= ~df['is_ghost'].to_numpy()
+    return df[mask].reset_index(drop=True)
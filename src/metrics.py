@@ -0,0 +1,353 @@
+"""
+📏 지연시간 계측 (Latency Instrumentation)
+앱/예측 서버의 단계별(모델 로드, 피처 변환, predict_proba, 인코더, tier_standards 조회, 화면 다시 그리기)
+소요 시간을 히스토그램으로, 이벤트 수를 카운터로 모아 Prometheus 텍스트 형식으로 내보냅니다.
+
+- 켜기: 환경변수 COC_METRICS=1 (꺼져 있으면 timer()가 공용 no-op 객체를 돌려줘 함수 호출 한 번 비용만 남음)
+- 내보내기
+  - COC_METRICS_FILE=metrics.prom: flush() 때 파일로 원자적 저장 (FLUSH_INTERVAL초에 한 번)
+  - COC_METRICS_PORT=9464: 백그라운드 스레드 HTTP 서버의 GET /metrics (프로세스당 하나)
+  - serve.py: 같은 포트의 GET /metrics
+- 프로파일러: COC_PROFILE=<디렉토리>면 profile() 구간을 COC_PROFILE_RATE 비율(기본 0.01)로 뽑아
+  cProfile 결과(.prof)를 저장 (python -m pstats 또는 snakeviz로 확인)
+
+사용 예시:
+    with metrics.timer('league', 'predict_proba'):
+        proba = model.predict_proba(X)
+    metrics.count('league', 'requests')
+
+실행 방법: python src/metrics.py metrics.prom   (저장된 파일을 단계별 건수 / 평균 / p50 / p95 표로 출력)
+"""
+import argparse
+import bisect
+import os
+import random
+import re
+import threading
+import time
+
+# 히스토그램 구간 상한 (초)
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+PREFIX = 'coc'
+FLUSH_INTERVAL = 5.0
+
+enabled = os.environ.get('COC_METRICS', '') not in ('', '0')
+METRICS_FILE = os.environ.get('COC_METRICS_FILE')
+METRICS_PORT = os.environ.get('COC_METRICS_PORT')
+PROFILE_DIR = os.environ.get('COC_PROFILE')
+PROFILE_RATE = float(os.environ.get('COC_PROFILE_RATE', 0.01))
+
+
+# ==========================================
+# 히스토그램 / 레지스트리
+# ==========================================
+class Histogram:
+    """구간별 개수 + 합계 (Prometheus histogram과 같은 누적 구간으로 출력)"""
+
+    __slots__ = ('counts', 'sum')
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)  # 마지막 = +Inf
+        self.sum = 0.0
+
+    @property
+    def count(self):
+        return sum(self.counts)
+
+    def observe(self, seconds):
+        self.counts[bisect.bisect_left(BUCKETS, seconds)] += 1
+        self.sum += seconds
+
+    def quantile(self, q):
+        """구간 안 선형 보간으로 근사한 분위수 (초)"""
+        total = self.count
+        if total == 0:
+            return float('nan')
+        target, seen = q * total, 0
+        for i, n in enumerate(self.counts):
+            if n and seen + n >= target:
+                low = BUCKETS[i - 1] if i > 0 else 0.0
+                high = BUCKETS[i] if i < len(BUCKETS) else BUCKETS[-1]
+                return low + (high - low) * (target - seen) / n
+            seen += n
+        return BUCKETS[-1]
+
+
+class Registry:
+    """(흐름, 단계) -> Histogram, (흐름, 이벤트) -> 개수. Streamlit 세션 스레드끼리 공유하므로 잠금 사용"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.histograms = {}
+        self.counters = {}
+
+    def observe(self, flow, stage, seconds):
+        with self.lock:
+            histogram = self.histograms.get((flow, stage))
+            if histogram is None:
+                histogram = self.histograms[(flow, stage)] = Histogram()
+            histogram.observe(seconds)
+
+    def inc(self, flow, event, value=1):
+        with self.lock:
+            self.counters[(flow, event)] = self.counters.get((flow, event), 0) + value
+
+    def reset(self):
+        with self.lock:
+            self.histograms.clear()
+            self.counters.clear()
+
+    def render(self):
+        """Prometheus 텍스트 형식 (exposition format 0.0.4)"""
+        lines = [f'# HELP {PREFIX}_stage_seconds Time spent in each stage of a prediction flow.',
+                 f'# TYPE {PREFIX}_stage_seconds histogram']
+        with self.lock:
+            histograms = {key: (list(h.counts), h.sum) for key, h in self.histograms.items()}
+            counters = dict(self.counters)
+        for (flow, stage), (counts, total) in sorted(histograms.items()):
+            labels = f'flow="{flow}",stage="{stage}"'
+            cumulative = 0
+            for bound, n in zip(list(BUCKETS) + ['+Inf'], counts):
+                cumulative += n
+                lines.append(f'{PREFIX}_stage_seconds_bucket{{{labels},le="{bound}"}} {cumulative}')
+            lines.append(f'{PREFIX}_stage_seconds_sum{{{labels}}} {total:.6f}')
+            lines.append(f'{PREFIX}_stage_seconds_count{{{labels}}} {cumulative}')
+        lines += [f'# HELP {PREFIX}_events_total Number of events in each prediction flow.',
+                  f'# TYPE {PREFIX}_events_total counter']
+        for (flow, event), value in sorted(counters.items()):
+            lines.append(f'{PREFIX}_events_total{{flow="{flow}",event="{event}"}} {value}')
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = Registry()
+
+
+# ==========================================
+# 타이머
+# ==========================================
+class Timer:
+    """with 블록 또는 start() / stop()으로 한 구간을 재서 레지스트리에 기록"""
+
+    __slots__ = ('flow', 'stage', 'started')
+
+    def __init__(self, flow, stage):
+        self.flow, self.stage = flow, stage
+        self.started = None
+
+    def start(self):
+        self.started = time.perf_counter()
+        return self
+
+    def stop(self):
+        if self.started is not None:
+            REGISTRY.observe(self.flow, self.stage, time.perf_counter() - self.started)
+            self.started = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+class _Noop:
+    """계측이 꺼져 있을 때 timer() / profile()이 돌려주는 공용 객체 (아무것도 하지 않음)"""
+
+    __slots__ = ()
+
+    def start(self):
+        return self
+
+    def stop(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+
+_NOOP = _Noop()
+
+
+def enable(on=True):
+    global enabled
+    enabled = on
+
+
+def timer(flow, stage):
+    return Timer(flow, stage) if enabled else _NOOP
+
+
+def span(flow, stage):
+    """with로 감싸기 어려운 구간(스크립트 전체 등)용: 시작된 타이머 반환 -> 끝에서 stop()"""
+    return timer(flow, stage).start()
+
+
+def count(flow, event, value=1):
+    if enabled:
+        REGISTRY.inc(flow, event, value)
+
+
+# ==========================================
+# 표본 프로파일러
+# ==========================================
+class _Profile:
+    """Timer와 같은 사용법 (with 또는 start() / stop()), 끝나면 COC_PROFILE 디렉토리에 .prof 저장"""
+
+    __slots__ = ('flow', 'profiler')
+
+    def __init__(self, flow):
+        import cProfile
+        self.flow = flow
+        self.profiler = cProfile.Profile()
+
+    def start(self):
+        try:
+            self.profiler.enable()
+        except ValueError:  # 다른 스레드에서 프로파일러가 이미 도는 중
+            self.profiler = None
+        return self
+
+    def stop(self):
+        if self.profiler is None:
+            return
+        self.profiler.disable()
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        self.profiler.dump_stats(os.path.join(PROFILE_DIR, f'{self.flow}-{time.time_ns()}.prof'))
+        self.profiler = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def profile(flow):
+    """COC_PROFILE이 설정되어 있으면 PROFILE_RATE 확률로 구간을 cProfile로 기록"""
+    if PROFILE_DIR and random.random() < PROFILE_RATE:
+        return _Profile(flow)
+    return _NOOP
+
+
+# ==========================================
+# 내보내기
+# ==========================================
+_last_flush = 0.0
+_server = None
+_server_lock = threading.Lock()
+
+
+def render():
+    return REGISTRY.render()
+
+
+def flush(path=None, force=False):
+    """Prometheus 텍스트를 파일로 저장 (임시 파일 -> os.replace). 기본은 FLUSH_INTERVAL초에 한 번만"""
+    global _last_flush
+    path = path or METRICS_FILE
+    if not enabled or not path:
+        return
+    now = time.monotonic()
+    if not force and now - _last_flush < FLUSH_INTERVAL:
+        return
+    _last_flush = now
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(render())
+    os.replace(tmp_path, path)
+
+
+def serve_http(port, host='127.0.0.1'):
+    """GET /metrics를 응답하는 백그라운드 HTTP 서버 (프로세스당 한 번만 시작)"""
+    global _server
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split('?', 1)[0] != '/metrics':
+                self.send_error(404)
+                return
+            payload = render().encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+            self.send_header('Content-Length', str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, *args):
+            pass
+
+    with _server_lock:
+        if _server is None:
+            _server = ThreadingHTTPServer((host, int(port)), Handler)
+            threading.Thread(target=_server.serve_forever, daemon=True).start()
+    return _server
+
+
+def start_exporters():
+    """환경변수(COC_METRICS_PORT)로 지정된 내보내기 시작. Streamlit 재실행마다 불러도 한 번만 시작"""
+    if enabled and METRICS_PORT and _server is None:
+        try:
+            serve_http(METRICS_PORT)
+        except OSError:  # 같은 포트를 다른 앱 프로세스가 이미 사용
+            pass
+
+
+# ==========================================
+# 저장된 파일 요약
+# ==========================================
+_LINE = re.compile(r'^(\w+)\{(.*)\} (\S+)$')
+
+
+def parse(text):
+    """render() 결과 -> ({(흐름, 단계): Histogram}, {(흐름, 이벤트): 개수})"""
+    histograms, counters = {}, {}
+    for line in text.splitlines():
+        match = _LINE.match(line)
+        if not match:
+            continue
+        name, labels, value = match.groups()
+        labels = dict(re.findall(r'(\w+)="([^"]*)"', labels))
+        if name == f'{PREFIX}_events_total':
+            counters[(labels['flow'], labels['event'])] = int(float(value))
+            continue
+        key = (labels.get('flow'), labels.get('stage'))
+        histogram = histograms.setdefault(key, Histogram())
+        if name.endswith('_bucket'):
+            # 누적 개수 -> 구간별 개수
+            i = len(BUCKETS) if labels['le'] == '+Inf' else BUCKETS.index(float(labels['le']))
+            histogram.counts[i] = int(float(value)) - sum(histogram.counts[:i])
+        elif name.endswith('_sum'):
+            histogram.sum = float(value)
+    return histograms, counters
+
+
+def summary_lines(histograms, counters):
+    lines = [f"{'flow':<10} {'stage':<18} {'count':>7} {'mean(ms)':>9} {'p50(ms)':>8} {'p95(ms)':>8} {'합계(s)':>8}"]
+    lines.append('-' * len(lines[0]))
+    for (flow, stage), h in sorted(histograms.items(), key=lambda item: -item[1].sum):
+        n = h.count
+        lines.append(f"{flow:<10} {stage:<18} {n:>7} {h.sum / n * 1000 if n else 0:>9.2f} "
+                     f"{h.quantile(0.5) * 1000:>8.2f} {h.quantile(0.95) * 1000:>8.2f} {h.sum:>8.2f}")
+    if counters:
+        lines.append('')
+        lines += [f"{flow:<10} {event:<18} {value:>7}" for (flow, event), value in sorted(counters.items())]
+    return lines
+
+
+def main():
+    parser = argparse.ArgumentParser(description='저장된 계측 파일(Prometheus 텍스트) 요약')
+    parser.add_argument('path', nargs='?', default=METRICS_FILE or 'metrics.prom', help='COC_METRICS_FILE로 저장된 파일')
+    args = parser.parse_args()
+
+    with open(args.path, encoding='utf-8') as f:
+        histograms, counters = parse(f.read())
+    print('\n'.join(summary_lines(histograms, counters)))
+    print("\np50/p95: 히스토그램 구간 안 선형 보간 근사")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,255 @@
+"""
+👥 비슷한 클랜 인덱스 (Similar Clan Index)
+활성 클랜(약 34만 개)의 피처를 표준화한 float32 벡터로 저장하고, 티어마다 k-means로 나눈
+IVF(inverted file) 인덱스로 "목표 티어에 있는, 내 클랜과 가장 비슷한 클랜 k개"를 찾습니다.
+
+- 피처 공간 두 개: league (리그 예측 9개, app_unified.py) / coaching (성장 코칭 7개, app_coaching.py)
+- 표준화: 활성 클랜 전체 평균 / 표준편차 (z-score), 거리: 유클리드
+- 티어는 실제 리그(clan_war_league -> 0 Unranked ~ 6 Champion) -> 그 티어에 도달한 클랜만 보여줌
+- 티어마다 sqrt(클랜 수)개로 분할해 분할 순서로 벡터를 저장, 조회는 가까운 중심점 nprobe개 분할만 전수 비교
+- 결과는 similar_clans.pkl (artifacts OPTIONAL_FILES)로 게시하고, 앱은 파일이 있을 때만 표시
+
+실행 방법: python src/neighbors.py --store feature_store --model-dir . --nprobe 8
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+from features import COACHING_FEATURES, LEAGUE_FEATURES
+
+SPACES = {'league': LEAGUE_FEATURES, 'coaching': COACHING_FEATURES}
+TIER_LABELS = ['Unranked', 'Bronze', 'Silver', 'Gold', 'Crystal', 'Master', 'Champion']
+
+DEFAULT_K = 5
+DEFAULT_NPROBE = 8
+# 티어 하나의 k-means 학습 표본 상한 (분할 배정은 전체 클랜)
+KMEANS_SAMPLE = 100_000
+
+
+# ==========================================
+# IVF 인덱스 (피처 공간 하나)
+# ==========================================
+class IVFSpace:
+    """표준화 벡터 + 티어별 k-means 분할
+
+    vectors[i]는 원래 행 rows[i]의 벡터이고, (티어, 분할) 순서로 정렬되어 있습니다.
+    분할 j의 벡터는 vectors[bounds[j]:bounds[j + 1]], 티어 t의 분할은 tier_lists[t] ~ tier_lists[t + 1] - 1.
+    """
+
+    def __init__(self, features, mean, scale, vectors, rows, centroids, bounds, tier_lists):
+        self.features = list(features)
+        self.mean = mean
+        self.scale = scale
+        self.vectors = vectors
+        self.rows = rows
+        self.centroids = centroids
+        self.bounds = bounds
+        self.tier_lists = tier_lists
+
+    def __repr__(self):
+        return f"IVFSpace({len(self.features)} features, {len(self.rows):,} rows, {len(self.centroids):,} lists)"
+
+    @classmethod
+    def build(cls, features, X, tiers, n_tiers, seed=0):
+        from sklearn.cluster import MiniBatchKMeans
+
+        X = np.asarray(X, dtype=np.float64)
+        mean = X.mean(axis=0)
+        scale = X.std(axis=0)
+        scale[scale == 0] = 1.0
+        Z = ((X - mean) / scale).astype(np.float32)
+
+        rng = np.random.default_rng(seed)
+        rows, centroids, bounds, tier_lists = [], [], [0], [0]
+        for t in range(n_tiers):
+            idx = np.flatnonzero(tiers == t)
+            n_lists = max(1, int(np.sqrt(len(idx))))
+            if len(idx) == 0:
+                tier_lists.append(tier_lists[-1])
+                continue
+            if n_lists == 1:
+                assign, centers = np.zeros(len(idx), dtype=np.int64), Z[idx].mean(axis=0, keepdims=True)
+            else:
+                sample = idx if len(idx) <= KMEANS_SAMPLE else rng.choice(idx, KMEANS_SAMPLE, replace=False)
+                kmeans = MiniBatchKMeans(n_clusters=n_lists, n_init=1, batch_size=4096, random_state=seed)
+                kmeans.fit(Z[sample])
+                assign, centers = kmeans.predict(Z[idx]), kmeans.cluster_centers_
+            order = np.argsort(assign, kind='stable')
+            rows.append(idx[order])
+            centroids.append(centers.astype(np.float32))
+            bounds.extend((bounds[-1] + np.cumsum(np.bincount(assign, minlength=n_lists))).tolist())
+            tier_lists.append(tier_lists[-1] + n_lists)
+
+        rows = np.concatenate(rows).astype(np.int32)
+        return cls(features, mean.astype(np.float32), scale.astype(np.float32), Z[rows], rows,
+                   np.vstack(centroids), np.asarray(bounds, dtype=np.int64), np.asarray(tier_lists, dtype=np.int64))
+
+    def standardize(self, x):
+        return ((np.asarray(x, dtype=np.float32) - self.mean) / self.scale).astype(np.float32)
+
+    def _tier_positions(self, q, tier, nprobe):
+        """티어 t에서 q와 가까운 분할 nprobe개에 든 벡터 위치"""
+        lo, hi = self.tier_lists[tier], self.tier_lists[tier + 1]
+        if lo == hi:
+            return np.empty(0, dtype=np.int64)
+        dist = ((self.centroids[lo:hi] - q) ** 2).sum(axis=1)
+        probe = np.argsort(dist)[:nprobe] + lo if nprobe < hi - lo else np.arange(lo, hi)
+        return np.concatenate([np.arange(self.bounds[j], self.bounds[j + 1]) for j in probe])
+
+    def search(self, x, tiers, k=DEFAULT_K, nprobe=DEFAULT_NPROBE):
+        """원본 값 x (features 순서) -> (원래 행 번호, 거리) 가까운 순 k개. nprobe=None이면 전수 비교"""
+        q = self.standardize(x)
+        if nprobe is None:
+            positions = np.concatenate([np.arange(self.bounds[self.tier_lists[t]], self.bounds[self.tier_lists[t + 1]])
+                                        for t in tiers])
+        else:
+            positions = np.concatenate([self._tier_positions(q, t, nprobe) for t in tiers])
+        if len(positions) == 0:
+            return np.empty(0, dtype=np.int32), np.empty(0, dtype=np.float32)
+        dist = ((self.vectors[positions] - q) ** 2).sum(axis=1)
+        if len(dist) > k:
+            top = np.argpartition(dist, k)[:k]
+            top = top[np.argsort(dist[top])]
+        else:
+            top = np.argsort(dist)
+        return self.rows[positions[top]], np.sqrt(dist[top])
+
+
+# ==========================================
+# 비슷한 클랜 (태그 / 티어 / 원본 값 + 피처 공간별 인덱스)
+# ==========================================
+class SimilarClans:
+    """티어 필터가 있는 근접 클랜 검색기. 결과는 앱에 바로 표시할 dict 리스트"""
+
+    def __init__(self, tags, tiers, values, value_features, spaces, labels=TIER_LABELS):
+        self.tags = tags
+        self.tiers = tiers
+        self.values = values
+        self.value_features = list(value_features)
+        self.spaces = spaces
+        self.labels = list(labels)
+
+    def __repr__(self):
+        return f"SimilarClans({len(self.tags):,} clans, spaces={list(self.spaces)})"
+
+    def __len__(self):
+        return len(self.tags)
+
+    def _tier(self, tier):
+        return self.labels.index(tier) if isinstance(tier, str) else int(tier)
+
+    def count(self, tier):
+        return int(np.count_nonzero(self.tiers == self._tier(tier)))
+
+    def search(self, values, tier=None, k=DEFAULT_K, space='league', nprobe=DEFAULT_NPROBE):
+        """values(피처 -> 값 dict)와 가까운 클랜 k개 (tier: 티어 이름/번호 또는 목록, None이면 전체)"""
+        index = self.spaces[space]
+        if tier is None:
+            tiers = range(len(self.labels))
+        else:
+            tiers = [self._tier(t) for t in (tier if isinstance(tier, (list, tuple)) else [tier])]
+        rows, dist = index.search([values[name] for name in index.features], tiers, k, nprobe)
+        return [self.record(row, d) for row, d in zip(rows.tolist(), dist.tolist())]
+
+    def record(self, row, distance=None):
+        clan = {'clan_tag': '#' + self.tags[row].decode('ascii'), 'tier': self.labels[self.tiers[row]]}
+        if distance is not None:
+            clan['distance'] = distance
+        clan.update(zip(self.value_features, self.values[row].tolist()))
+        return clan
+
+
+# ==========================================
+# 빌드 (피처 스토어 활성 클랜)
+# ==========================================
+def value_features():
+    return list(dict.fromkeys(LEAGUE_FEATURES + COACHING_FEATURES))
+
+
+def build_index(store_dir=None, seed=0, log=None):
+    """피처 스토어 활성 클랜 -> SimilarClans"""
+    from clan_index import normalize_tags
+    from feature_store import DEFAULT_STORE, load_active
+    from train import broad_tier, league_score
+
+    columns = value_features()
+    df = load_active(store_dir or DEFAULT_STORE, columns=['clan_tag', 'clan_war_league'] + columns)
+    tiers = broad_tier(league_score(df['clan_war_league']))
+    values = df[columns].to_numpy(np.float32)
+    tags = normalize_tags(df['clan_tag'])
+    del df
+
+    spaces = {}
+    for name, features in SPACES.items():
+        start = time.perf_counter()
+        X = values[:, [columns.index(feature) for feature in features]]
+        spaces[name] = IVFSpace.build(features, X, tiers, len(TIER_LABELS), seed)
+        if log:
+            print(f"  {name:<9} {spaces[name]} | {time.perf_counter() - start:5.1f}초", file=log, flush=True)
+    return SimilarClans(tags, tiers, values, columns, spaces)
+
+
+# ==========================================
+# 정확도 (전수 비교 대비 recall) / 지연시간
+# ==========================================
+def evaluate(similar, space='league', k=DEFAULT_K, nprobe=DEFAULT_NPROBE, n_queries=500, seed=0):
+    """활성 클랜을 질의로 써서 한 티어 위(Champion은 같은 티어)를 검색, 전수 비교 결과와 비교"""
+    index = similar.spaces[space]
+    columns = [similar.value_features.index(feature) for feature in index.features]
+    rng = np.random.default_rng(seed)
+    hits, ivf_time, exact_time = 0, 0.0, 0.0
+    for row in rng.integers(0, len(similar), n_queries):
+        x = similar.values[row, columns]
+        tiers = [min(int(similar.tiers[row]) + 1, len(similar.labels) - 1)]
+        start = time.perf_counter()
+        found, _ = index.search(x, tiers, k, nprobe)
+        ivf_time += time.perf_counter() - start
+        start = time.perf_counter()
+        exact, _ = index.search(x, tiers, k, None)
+        exact_time += time.perf_counter() - start
+        hits += len(np.intersect1d(found, exact))
+    return {
+        'recall': hits / (n_queries * k),
+        'ivf_ms': ivf_time / n_queries * 1000,
+        'exact_ms': exact_time / n_queries * 1000,
+    }
+
+
+def main():
+    import artifacts
+    from feature_store import DEFAULT_STORE
+
+    parser = argparse.ArgumentParser(description='비슷한 클랜 검색용 IVF 인덱스 생성')
+    parser.add_argument('--store', default=DEFAULT_STORE, help='피처 스토어 디렉토리')
+    parser.add_argument('--model-dir', default=None, help='similar_clans.pkl을 게시할 디렉토리 (기본: COC_MODEL_DIR 또는 현재 디렉토리)')
+    parser.add_argument('--k', type=int, default=DEFAULT_K, help='정확도 측정용 이웃 수')
+    parser.add_argument('--nprobe', type=int, default=DEFAULT_NPROBE, help='정확도 측정용 탐색 분할 수')
+    parser.add_argument('--check', action='store_true', help='빌드 없이 게시된 인덱스의 정확도/지연시간만 보고')
+    args = parser.parse_args()
+
+    if args.check:
+        similar = artifacts.load_artifact('similar_clans', args.model_dir)
+    else:
+        start = time.perf_counter()
+        print(f"👥 비슷한 클랜 인덱스 빌드: {args.store}")
+        similar = build_index(args.store, log=sys.stdout)
+        elapsed = time.perf_counter() - start
+        counts = ', '.join(f"{label} {similar.count(label):,}" for label in similar.labels)
+        print(f"  활성 클랜 {len(similar):,}개 ({counts})")
+        release = artifacts.publish_artifact('similar_clans', similar, args.model_dir, {'similar_clans': os.path.abspath(args.store)})
+        print(f"✅ similar_clans.pkl 게시 (릴리스 {release}) | 빌드 {elapsed:.1f}초")
+
+    print(f"\n📏 전수 비교 대비 정확도 (k={args.k}, nprobe={args.nprobe}, 목표 티어 = 한 단계 위)")
+    for space in similar.spaces:
+        report = evaluate(similar, space, args.k, args.nprobe)
+        print(f"  {space:<9} recall@{args.k} {report['recall']:.3f} | "
+              f"IVF {report['ivf_ms']:.2f}ms vs 전수 비교 {report['exact_ms']:.2f}ms")
+
+
+if __name__ == '__main__':
+    # pkl에 __main__.SimilarClans가 아니라 neighbors.SimilarClans로 기록되도록 모듈로 다시 import
+    import neighbors
+    neighbors.main()
@@ -0,0 +1,320 @@
+"""
+💾 대용량 학습 (Out-of-core Training)
+노트북 B는 df_ml 전체를 pandas로 올린 뒤 copy / select_dtypes / train_test_split 복사본을 만들어 학습하므로
+원천 데이터의 몇 배 메모리가 필요합니다. 이 스크립트는 피처 스토어(Parquet)를 파일(청크) 단위로 읽어
+LightGBM 바이너리 Dataset을 만들고, 전체 pandas 복사본 없이 학습합니다.
+
+- StoreChunk(lgb.Sequence): 청크 하나에서 필요한 컬럼만 읽어 모델 입력 행렬로 변환 -> 메모리에는 청크 1개 + binning된 값
+- 학습/검증 분할: 청크 번호로 고정한 난수로 행마다 정함 (전체 인덱스 셔플 / 분할 복사본 없음)
+- 검증 Dataset은 학습 Dataset을 reference로 만들어 bin 경계(bin mapper)를 그대로 사용
+- 만든 Dataset은 .bin으로 저장 -> 피처 스토어와 설정이 같으면 다음 학습은 원천을 다시 읽지 않음
+- 생존 모델은 유령 클랜까지 포함한 전체 클랜으로 학습 (--active-only면 train.py와 같이 활성 클랜만)
+- 단계별 소요 시간과 peak RSS 출력 (노트북 방식과 비교: benchmarks/bench_out_of_core.py)
+
+실행 방법:
+    python src/feature_store.py --csv coc_clans_dataset.csv --store feature_store
+    python src/out_of_core.py --store feature_store --task survival --output ooc_models
+"""
+import argparse
+import hashlib
+import json
+import os
+import resource
+import time
+
+import joblib
+import lightgbm as lgb
+import numpy as np
+
+import artifacts
+import imbalance
+from feature_store import DEFAULT_STORE, open_store, read_manifest
+from features import COACHING_FEATURES, ENCODED_FEATURES, LEAGUE_FEATURES, SURVIVAL_FEATURES, FeatureTransform
+from train import (COACHING_PARAMS, LEAGUE_PARAMS, RANDOM_STATE, SURVIVAL_PARAMS, TEST_SIZE, TIER_ORDER,
+                   broad_tier, league_score)
+
+DEFAULT_WORK_DIR = 'ooc_work'
+# Dataset 만드는 방식이 바뀌면 올려서 기존 .bin을 무효화
+DATASET_VERSION = 1
+DATASET_PARAMS = {'max_bin': 255, 'bin_construct_sample_cnt': 200_000, 'verbose': -1}
+BALANCES = ('class_weight', 'none')
+
+# 모델 -> 피처 / 파라미터 / 라벨 원본 컬럼 / 유령 클랜 포함 여부 기본값
+TASKS = {
+    'survival': {'features': SURVIVAL_FEATURES, 'params': SURVIVAL_PARAMS,
+                 'label': 'clan_capital_points', 'all_clans': True},
+    'league': {'features': LEAGUE_FEATURES, 'params': LEAGUE_PARAMS,
+               'label': 'clan_war_league', 'all_clans': False},
+    'coaching': {'features': COACHING_FEATURES, 'params': COACHING_PARAMS,
+                 'label': 'clan_war_league', 'all_clans': False},
+}
+
+# 리그 라벨: LabelEncoder(티어 이름) 코드 (알파벳 순, train.py league_encoder와 같음), Unranked는 -1
+LEAGUE_CLASSES = np.array(sorted(TIER_ORDER))
+LEAGUE_CODES = np.array([-1] + [int(np.searchsorted(LEAGUE_CLASSES, tier)) for tier in TIER_ORDER], dtype=np.int8)
+
+
+def peak_rss_mb():
+    # Linux ru_maxrss 단위는 KB
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def task_classes(task):
+    return {'survival': np.arange(2), 'league': np.arange(len(LEAGUE_CLASSES)), 'coaching': np.arange(7)}[task]
+
+
+def task_labels(task, values):
+    """라벨 원본 컬럼 -> (사용할 행 mask, 라벨 코드)"""
+    if task == 'survival':
+        # is_retained (train.py run_features와 같은 정의)
+        y = (np.asarray(values) > 0).astype(np.int8)
+        return np.ones(len(y), dtype=bool), y
+    tier = broad_tier(league_score(values))
+    if task == 'league':
+        return tier > 0, LEAGUE_CODES[tier]
+    return np.ones(len(tier), dtype=bool), tier
+
+
+# ==========================================
+# 청크 읽기 (lgb.Sequence)
+# ==========================================
+class StoreChunks:
+    """피처 스토어 Parquet 파일 목록 + 마지막으로 읽은 청크 하나의 피처 행렬 캐시"""
+
+    def __init__(self, store_dir, features):
+        self.dataset = open_store(store_dir)
+        self.fragments = sorted(self.dataset.get_fragments(), key=lambda fragment: fragment.path)
+        self.features = list(features)
+        self.columns = list(dict.fromkeys(ENCODED_FEATURES.get(name, name) for name in self.features))
+        self.transform = FeatureTransform(self.features)
+        self._cached = (None, None)
+
+    def __len__(self):
+        return len(self.fragments)
+
+    def read(self, chunk_id, columns):
+        """청크 하나의 일부 컬럼 (pandas, 청크 크기만큼만)"""
+        return self.fragments[chunk_id].to_table(columns=columns, schema=self.dataset.schema).to_pandas()
+
+    def matrix(self, chunk_id):
+        """청크 전체 행의 모델 입력 행렬 (LightGBM 표본 추출이 double만 받으므로 float64)"""
+        if self._cached[0] != chunk_id:
+            X = self.transform.transform(self.read(chunk_id, self.columns))
+            self._cached = (chunk_id, X.astype(np.float64))
+        return self._cached[1]
+
+
+class StoreChunk(lgb.Sequence):
+    """청크 하나에서 rows(학습 또는 검증 행)만 돌려주는 lgb.Sequence (한 번에 청크 전체를 밀어 넣음)"""
+
+    def __init__(self, chunks, chunk_id, rows):
+        self.chunks = chunks
+        self.chunk_id = chunk_id
+        self.rows = rows
+        self.batch_size = len(rows)
+
+    def __len__(self):
+        return len(self.rows)
+
+    def __getitem__(self, idx):
+        return self.chunks.matrix(self.chunk_id)[self.rows[idx]]
+
+
+def scan_labels(chunks, task, all_clans):
+    """1차 스캔: 라벨/범주 컬럼만 읽어 청크별 학습/검증 행 번호, 라벨, 범주 값 수집"""
+    categorical = [ENCODED_FEATURES[name] for name in chunks.features if name in ENCODED_FEATURES]
+    columns = [TASKS[task]['label']] + categorical + ([] if all_clans else ['is_ghost'])
+    split = {'train': ([], []), 'valid': ([], [])}
+    categories = {name: set() for name in categorical}
+    for chunk_id in range(len(chunks)):
+        df = chunks.read(chunk_id, columns)
+        mask, y = task_labels(task, df[TASKS[task]['label']])
+        if not all_clans:
+            mask &= ~df['is_ghost'].to_numpy()
+        for name in categorical:
+            categories[name].update(df.loc[mask, name].astype(str).unique())
+        # 청크 번호로 고정한 난수 -> 몇 번을 읽어도 같은 분할
+        valid = np.random.default_rng([RANDOM_STATE, chunk_id]).random(len(df)) < TEST_SIZE
+        for name, part in [('train', mask & ~valid), ('valid', mask & valid)]:
+            rows = np.flatnonzero(part).astype(np.int32)
+            split[name][0].append(rows)
+            split[name][1].append(y[rows])
+    return split, {name: sorted(values) for name, values in categories.items()}
+
+
+# ==========================================
+# 바이너리 Dataset (.bin)
+# ==========================================
+def dataset_key(store_dir, task, all_clans, balance):
+    manifest = read_manifest(store_dir)
+    payload = json.dumps({
+        'version': DATASET_VERSION, 'source': manifest['source_sha256'], 'feature_version': manifest['feature_version'],
+        'task': task, 'all_clans': all_clans, 'balance': balance, 'features': TASKS[task]['features'],
+        'params': DATASET_PARAMS, 'test_size': TEST_SIZE, 'random_state': RANDOM_STATE,
+    }, sort_keys=True)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:16]
+
+
+def _work_paths(work_dir, task):
+    stem = os.path.join(work_dir, task)
+    return {'train': stem + '_train.bin', 'valid': stem + '_valid.bin',
+            'meta': stem + '_dataset.json', 'encoders': stem + '_encoders.joblib'}
+
+
+def balanced_weight(y, n_classes):
+    """class_weight='balanced'와 같은 행 가중치 (라벨 개수만으로 계산)"""
+    counts = np.bincount(y, minlength=n_classes)
+    return (len(y) / (n_classes * np.maximum(counts, 1)))[y].astype(np.float32)
+
+
+def build_datasets(store_dir, task, work_dir, all_clans, balance):
+    """피처 스토어 -> 학습/검증 바이너리 Dataset 파일 (pandas는 청크 단위로만)"""
+    features = TASKS[task]['features']
+    chunks = StoreChunks(store_dir, features)
+    split, categories = scan_labels(chunks, task, all_clans)
+
+    from sklearn.preprocessing import LabelEncoder
+    encoders = {name: LabelEncoder().fit(values) for name, values in categories.items()}
+    chunks.transform = FeatureTransform(features, encoders={
+        code: encoders[source] for code, source in ENCODED_FEATURES.items() if code in features})
+
+    n_classes = len(task_classes(task))
+    y_train, y_valid = np.concatenate(split['train'][1]), np.concatenate(split['valid'][1])
+    weight = balanced_weight(y_train, n_classes) if balance == 'class_weight' and task != 'survival' else None
+
+    def sequences(name):
+        return [StoreChunk(chunks, chunk_id, rows) for chunk_id, rows in enumerate(split[name][0]) if len(rows)]
+
+    # 학습 Dataset: 표본(bin_construct_sample_cnt)으로 bin 경계를 정하고 청크를 차례로 밀어 넣음
+    train_set = lgb.Dataset(sequences('train'), label=y_train, feature_name=features,
+                            params=DATASET_PARAMS, free_raw_data=True).construct()
+    # 검증 Dataset: 학습 bin 경계를 그대로 사용 (다시 표본 추출하지 않음)
+    valid_set = lgb.Dataset(sequences('valid'), label=y_valid, reference=train_set, feature_name=features,
+                            params=DATASET_PARAMS, free_raw_data=True).construct()
+    # 가중치는 검증 Dataset을 만든 뒤에 설정 (가중치 있는 reference로 Sequence를 만들면 검증 가중치가 0으로 채워짐)
+    if weight is not None:
+        train_set.set_weight(weight)
+
+    paths = _work_paths(work_dir, task)
+    os.makedirs(work_dir, exist_ok=True)
+    for name, dataset in [('train', train_set), ('valid', valid_set)]:
+        if os.path.exists(paths[name]):
+            os.remove(paths[name])  # save_binary는 기존 파일을 덮어쓰지 않음
+        dataset.save_binary(paths[name])
+    joblib.dump(encoders, paths['encoders'])
+    return {
+        'rows': {'train': len(y_train), 'valid': len(y_valid)},
+        'class_counts': np.bincount(y_train, minlength=n_classes).tolist(),
+    }
+
+
+def load_datasets(store_dir, task, work_dir=DEFAULT_WORK_DIR, all_clans=None, balance='class_weight',
+                  rebuild=False):
+    """(학습 Dataset, 검증 Dataset, 메타, 범주 인코더) - 저장된 .bin이 최신이면 원천을 읽지 않음"""
+    all_clans = TASKS[task]['all_clans'] if all_clans is None else all_clans
+    key = dataset_key(store_dir, task, all_clans, balance)
+    paths = _work_paths(work_dir, task)
+
+    meta = None
+    if not rebuild and all(os.path.exists(path) for path in paths.values()):
+        with open(paths['meta'], encoding='utf-8') as f:
+            meta = json.load(f)
+        if meta['key'] != key:
+            meta = None
+    built = meta is None
+    if built:
+        meta = {'key': key, 'task': task, 'all_clans': all_clans,
+                **build_datasets(store_dir, task, work_dir, all_clans, balance)}
+        with open(paths['meta'], 'w', encoding='utf-8') as f:
+            json.dump(meta, f, indent=2)
+
+    train_set = lgb.Dataset(paths['train'], params=DATASET_PARAMS)
+    valid_set = lgb.Dataset(paths['valid'], reference=train_set, params=DATASET_PARAMS)
+    meta['built'] = built
+    return train_set, valid_set, meta, joblib.load(paths['encoders'])
+
+
+# ==========================================
+# 학습
+# ==========================================
+def train_out_of_core(store_dir, task, output_dir, work_dir=DEFAULT_WORK_DIR, all_clans=None, params=None,
+                      balance='class_weight', native=False, rebuild=False, log=print):
+    """바이너리 Dataset으로 학습하고 앱이 로드하는 이름(artifacts.MODEL_FILES)으로 저장 -> 리포트 dict"""
+    if task not in TASKS:
+        raise ValueError(f"알 수 없는 모델: {task} (가능: {', '.join(TASKS)})")
+    if balance not in BALANCES:
+        raise ValueError(f"알 수 없는 불균형 보정 방식: {balance} (가능: {', '.join(BALANCES)})")
+    features = TASKS[task]['features']
+    classes = task_classes(task)
+    report = {'task': task}
+
+    start = time.perf_counter()
+    train_set, valid_set, meta, encoders = load_datasets(store_dir, task, work_dir, all_clans, balance, rebuild)
+    report['dataset_seconds'] = time.perf_counter() - start
+    report.update(rows=meta['rows'], all_clans=meta['all_clans'], dataset_built=meta['built'])
+    log(f"📦 Dataset {'생성' if meta['built'] else '재사용'}: 학습 {meta['rows']['train']:,}행 / "
+        f"검증 {meta['rows']['valid']:,}행 ({report['dataset_seconds']:.1f}초)")
+
+    train_params, n_rounds = imbalance.lgb_train_params(params or TASKS[task]['params'], len(classes))
+    if task == 'survival':
+        negative, positive = meta['class_counts']
+        train_params['scale_pos_weight'] = negative / max(positive, 1)
+        train_params['metric'] = ['auc', 'binary_error']
+    else:
+        train_params['metric'] = ['multi_error']
+
+    start = time.perf_counter()
+    # 검증 지표는 마지막 값만 쓰므로 매 라운드 평가(valid_sets) 대신 학습 후 한 번 평가
+    # (keep_training_booster: 학습 Dataset을 참조하는 검증 Dataset을 나중에 붙이려면 필요)
+    booster = lgb.train(train_params, train_set, num_boost_round=n_rounds, keep_training_booster=True)
+    booster.add_valid(valid_set, 'valid')
+    scores = {metric: round(float(value), 4) for _, metric, value, _ in booster.eval_valid()}
+    report['train_seconds'] = time.perf_counter() - start
+    if 'auc' in scores:
+        report['auc'] = scores['auc']
+    report['accuracy'] = round(1 - scores.get('binary_error', scores.get('multi_error', 1.0)), 4)
+
+    # 앱/배치 스코어링이 로드하는 이름으로 저장 (NativeClassifier, 범주 인코더 포함)
+    os.makedirs(output_dir, exist_ok=True)
+    model = artifacts.NativeClassifier(booster, 'lightgbm', classes, features)
+    objects = {f'{task}_model': model}
+    for code, source in ENCODED_FEATURES.items():
+        if code in features:
+            objects[f'{source}_encoder'] = encoders[source]
+    if task == 'league':
+        from sklearn.preprocessing import LabelEncoder
+        objects['league_encoder'] = LabelEncoder().fit(LEAGUE_CLASSES)
+    for key, obj in objects.items():
+        joblib.dump(obj, artifacts.artifact_path(key, output_dir))
+    if native:
+        artifacts.export_native(f'{task}_model', output_dir)
+
+    report['files'] = sorted(objects)
+    report['peak_rss_mb'] = peak_rss_mb()
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description='피처 스토어 -> LightGBM 바이너리 Dataset -> 청크 단위 학습')
+    parser.add_argument('--store', default=DEFAULT_STORE, help='피처 스토어 디렉토리 (feature_store.py)')
+    parser.add_argument('--task', choices=list(TASKS), default='survival', help='학습할 모델')
+    parser.add_argument('--output', default='.', help='모델 파일(*.pkl)을 저장할 디렉토리')
+    parser.add_argument('--work-dir', default=DEFAULT_WORK_DIR, help='바이너리 Dataset(.bin) 저장 디렉토리')
+    parser.add_argument('--active-only', action='store_true', help='유령 클랜 제외 (생존 모델 기본은 전체 클랜)')
+    parser.add_argument('--balance', choices=BALANCES, default='class_weight',
+                        help='리그/코칭 모델 불균형 보정 (생존 모델은 항상 scale_pos_weight)')
+    parser.add_argument('--native', action='store_true', help='네이티브 부스터 / 트리 엔진 파일도 함께 내보내기')
+    parser.add_argument('--rebuild', action='store_true', help='저장된 .bin이 최신이어도 다시 생성')
+    args = parser.parse_args()
+
+    all_clans = False if args.active_only else None
+    report = train_out_of_core(args.store, args.task, args.output, args.work_dir, all_clans,
+                               balance=args.balance, native=args.native, rebuild=args.rebuild)
+    metrics = ', '.join(f"{k}={report[k]}" for k in ('auc', 'accuracy') if k in report)
+    print(f"🌲 학습: {report['train_seconds']:.1f}초 ({metrics})")
+    print(f"📈 peak RSS: {report['peak_rss_mb']:.0f}MB")
+    print(f"✅ 저장: {', '.join(report['files'])} -> {os.path.abspath(args.output)}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,164 @@
+"""
+🗃️ 예측 캐시 (Prediction Cache)
+같은(또는 거의 같은) 입력으로 반복되는 predict_proba 호출을 LRU + TTL 캐시로 건너뜁니다.
+
+- 키: 인코딩까지 끝난 float32 입력 행 (war_frequency / clan_type은 인코더 코드 기준)
+- quantize로 연속형 컬럼을 step 단위로 반올림하면 근사 입력도 같은 키로 묶임
+  (이때 모델에는 반올림된 값이 들어가므로 같은 키는 항상 같은 결과)
+- 한 배치 안의 중복 행은 한 번만 예측하고, 캐시에 없는 행만 모아 한 번에 predict_proba
+- 스레드 안전: Streamlit의 st.cache_resource로 만들면 모든 세션이 하나의 캐시를 공유
+
+사용 예시:
+    model = PredictionCache(model, maxsize=10_000, ttl=3600,
+                            quantize={'activity_ratio': 0.01}, columns=SURVIVAL_FEATURES)
+    model.predict_proba(X)
+    model.stats()  # {'hits': ..., 'misses': ..., 'evictions': ..., 'hit_rate': ...}
+"""
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+DEFAULT_MAXSIZE = 10_000
+
+
+class PredictionCache:
+    """predict_proba / predict를 캐시하는 모델 래퍼
+
+    classes_ 등 나머지 속성은 감싼 모델의 것을 그대로 돌려주므로
+    앱/배치 스코어링에서 모델 대신 바로 쓸 수 있습니다.
+    """
+
+    def __init__(self, model, maxsize=DEFAULT_MAXSIZE, ttl=None, quantize=None, columns=None, clock=time.monotonic):
+        if maxsize < 1:
+            raise ValueError("maxsize는 1 이상이어야 합니다.")
+        self.model = model
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.clock = clock
+        self.steps = self._quantize_steps(quantize, columns)
+        self._entries = OrderedDict()  # key(bytes) -> (만료 시각, 확률 행)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expired = 0
+
+    def __getattr__(self, name):
+        # __init__ 전(언피클 등)에는 model이 없으므로 무한 재귀 방지
+        if name == 'model':
+            raise AttributeError(name)
+        return getattr(self.model, name)
+
+    def __repr__(self):
+        return f"PredictionCache({self.model!r}, size={len(self)}/{self.maxsize}, ttl={self.ttl})"
+
+    def __len__(self):
+        return len(self._entries)
+
+    @staticmethod
+    def _quantize_steps(quantize, columns):
+        """{컬럼 이름 또는 인덱스: step} -> 컬럼 순서의 step 배열 (0 = 반올림 안 함)"""
+        if not quantize:
+            return None
+        columns = list(columns or [])
+        n_features = len(columns) or max(quantize) + 1
+        steps = np.zeros(n_features, dtype=np.float64)
+        for column, step in quantize.items():
+            index = columns.index(column) if isinstance(column, str) else column
+            steps[index] = step
+        return steps
+
+    # ==========================================
+    # 키 만들기
+    # ==========================================
+    def canonicalize(self, X):
+        """모델 입력과 캐시 키로 쓸 정규화된 float32 행렬"""
+        X = np.array(X, dtype=np.float32, order='C', ndmin=2)
+        if self.steps is not None:
+            if X.shape[1] != len(self.steps):
+                raise ValueError(f"입력 컬럼 수({X.shape[1]})가 quantize 컬럼 수({len(self.steps)})와 다릅니다.")
+            cols = np.flatnonzero(self.steps)
+            step = self.steps[cols]
+            X[:, cols] = np.round(X[:, cols] / step) * step
+        X += np.float32(0)  # -0.0 -> 0.0
+        X[np.isnan(X)] = np.nan  # NaN 비트 패턴 통일
+        return X
+
+    @staticmethod
+    def _row_keys(X):
+        """행마다 바이트 키 (한 행 = 하나의 void 스칼라)"""
+        return X.view(np.dtype((np.void, X.dtype.itemsize * X.shape[1]))).ravel()
+
+    # ==========================================
+    # 캐시 조회 / 저장
+    # ==========================================
+    def _get(self, key, now):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at is not None and expires_at <= now:
+            del self._entries[key]
+            self.expired += 1
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def _put(self, key, value, now):
+        expires_at = now + self.ttl if self.ttl is not None else None
+        self._entries[key] = (expires_at, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def predict_proba(self, X):
+        X = self.canonicalize(X)
+        uniques, first, inverse = np.unique(self._row_keys(X), return_index=True, return_inverse=True)
+        keys = [key.tobytes() for key in uniques]
+
+        values = [None] * len(keys)
+        now = self.clock()
+        with self._lock:
+            for i, key in enumerate(keys):
+                values[i] = self._get(key, now)
+        missing = [i for i, value in enumerate(values) if value is None]
+
+        if missing:
+            # 캐시에 없는 고유 행만 한 번에 예측 (락 밖에서 실행)
+            proba = np.asarray(self.model.predict_proba(X[first[missing]]))
+            now = self.clock()
+            with self._lock:
+                for i, row in zip(missing, proba):
+                    values[i] = row
+                    self._put(keys[i], row, now)
+
+        with self._lock:
+            self.hits += len(X) - len(missing)
+            self.misses += len(missing)
+        return np.stack(values)[inverse.reshape(-1)]
+
+    def predict(self, X):
+        return np.asarray(self.model.classes_)[self.predict_proba(X).argmax(axis=1)]
+
+    # ==========================================
+    # 관리
+    # ==========================================
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'maxsize': self.maxsize,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'expired': self.expired,
+                'hit_rate': self.hits / total if total else 0.0,
+            }
@@ -0,0 +1,466 @@
+"""
+🛰️ 예측 서버 (Prediction Server)
+Streamlit 없이 생존 / 리그 / 성장 코칭 예측을 JSON으로 제공하는 비동기 HTTP 서버입니다.
+동시에 들어온 요청은 마이크로 배치로 묶어 모델당 한 번의 predict_proba로 처리합니다.
+외부 의존성 없이 표준 라이브러리(asyncio)만으로 동작합니다.
+
+실행 방법:
+    python src/serve.py --model-dir . --port 8000 --max-batch-size 64 --max-wait-ms 2
+    (모델은 엔드포인트별 첫 요청 때 로드, --preload로 시작 시 로드)
+    --survival-grid survival_grid.npy: 생존 예측을 모델 대신 룩업 그리드로 (survival_grid.py)
+    --clan-index clan_index.npy: 미리 스코어링한 클랜 태그 조회 (clan_index.py, 기본: <model-dir>/clan_index.npy)
+
+엔드포인트:
+    GET  /health             상태 + 배치 통계
+    GET  /metrics            단계별 지연시간 히스토그램 (Prometheus 텍스트, --metrics 또는 COC_METRICS=1일 때 수집)
+    POST /predict/survival   {"mean_member_trophies": 1500, "mean_member_level": 100, "required_trophies": 800,
+                              "war_frequency": "always", "clan_type": "inviteOnly", "isFamilyFriendly": true}
+    POST /predict/league     {"clan_level": 10, "clan_points": 20000, "war_wins": 100, ... (LEAGUE_FEATURES 9개)}
+    POST /predict/coaching   리그 입력 + (선택) "target_tier": "Gold"
+                             -> 모델이 목표 티어로 예측하게 되는 최소 변경 (counterfactual.py, 앱 성장 가이드와 같은 범위)
+                                못 찾으면 티어 평균과의 차이 ("method": "counterfactual" / "tier_average")
+    GET  /clan/<태그>         미리 스코어링한 클랜의 피처 + 생존 확률 + 예측 리그 ('#'은 생략하거나 %23)
+    * 본문에 객체 리스트를 보내면 결과도 리스트로 돌려줍니다.
+"""
+import argparse
+import asyncio
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from urllib.parse import unquote
+
+import numpy as np
+
+import metrics
+from artifacts import load_league_models, load_survival_models, load_survival_transform, predict_proba
+from clan_index import index_path, load_index
+from counterfactual import league_search
+from features import LEAGUE_FEATURES
+from survival_grid import load_grid
+
+TIER_ORDER = ['Bronze', 'Silver', 'Gold', 'Crystal', 'Master', 'Champion']
+
+DEFAULT_MAX_BATCH_SIZE = 64
+DEFAULT_MAX_WAIT_MS = 2.0
+MAX_BODY_BYTES = 1 << 20
+
+# ==========================================
+# 마이크로 배치
+# ==========================================
+class MicroBatcher:
+    """요청 한 건(1행)씩 받아 최대 max_batch_size행 / max_wait_ms까지 모아 한 번에 예측
+
+    predict_fn은 (n, k) 행렬을 받아 (n, ...) 배열을 돌려주는 함수입니다.
+    모델 호출은 전용 스레드에서 실행되어 이벤트 루프를 막지 않습니다.
+    """
+
+    def __init__(self, predict_fn, max_batch_size=DEFAULT_MAX_BATCH_SIZE, max_wait_ms=DEFAULT_MAX_WAIT_MS, name='batch'):
+        self.predict_fn = predict_fn
+        self.name = name
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_wait = max(0.0, max_wait_ms) / 1000
+        self.executor = ThreadPoolExecutor(max_workers=1)
+        self.queue = None
+        self.task = None
+        self.n_batches = 0
+        self.n_rows = 0
+
+    def start(self):
+        self.queue = asyncio.Queue()
+        self.task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self.task is not None:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+        self.executor.shutdown(wait=False)
+
+    async def submit(self, row):
+        """(1, k) 행렬 한 건 -> 해당 행의 예측 결과"""
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((row, future))
+        return await future
+
+    async def _collect(self):
+        """첫 요청을 기다린 뒤 최대 max_wait 동안 배치를 채움"""
+        items = [await self.queue.get()]
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.max_wait
+        while len(items) < self.max_batch_size:
+            if not self.queue.empty():
+                items.append(self.queue.get_nowait())
+                continue
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                items.append(await asyncio.wait_for(self.queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return items
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            items = await self._collect()
+            X = np.vstack([row for row, _ in items])
+            try:
+                with metrics.timer(self.name, 'predict_batch'):
+                    outputs = await loop.run_in_executor(self.executor, self.predict_fn, X)
+            except Exception as error:
+                for _, future in items:
+                    if not future.done():
+                        future.set_exception(error)
+                continue
+            self.n_batches += 1
+            self.n_rows += len(items)
+            metrics.count(self.name, 'batched_rows', len(items))
+            for (_, future), output in zip(items, outputs):
+                if not future.done():
+                    future.set_result(output)
+
+    def stats(self):
+        return {
+            'batches': self.n_batches,
+            'rows': self.n_rows,
+            'mean_batch_size': round(self.n_rows / self.n_batches, 2) if self.n_batches else 0.0,
+            'max_batch_size': self.max_batch_size,
+            'max_wait_ms': self.max_wait * 1000,
+        }
+
+
+# ==========================================
+# 예측 서비스
+# ==========================================
+class BadRequest(ValueError):
+    pass
+
+
+class NotFound(LookupError):
+    pass
+
+
+def improvement_gaps(current_values, target_standards, limit=5):
+    """목표 티어 평균 대비 부족한 항목 (반사실 탐색이 목표에 못 미칠 때의 폴백, app_unified.py와 같은 기준)"""
+    improvements = []
+    for feature, current in current_values.items():
+        if feature in target_standards.index:
+            target = float(target_standards[feature])
+            diff = target - float(current)
+            if diff > 0.01:
+                improvements.append({'feature': feature, 'current': float(current), 'target': target, 'diff': diff})
+    improvements.sort(key=lambda item: item['diff'], reverse=True)
+    return improvements[:limit]
+
+
+class PredictionService:
+    """모델 + 배치기 묶음. 엔드포인트마다 payload(dict) -> 응답(dict)
+
+    모델은 해당 엔드포인트에 첫 요청이 올 때 로드합니다 (preload()로 미리 로드 가능).
+    """
+
+    def __init__(self, model_dir=None, max_batch_size=DEFAULT_MAX_BATCH_SIZE, max_wait_ms=DEFAULT_MAX_WAIT_MS,
+                 survival_grid=None, clan_index=None):
+        self.model_dir = model_dir
+        self.survival_grid = survival_grid
+        self.clan_index_path = clan_index
+        self.clan_index = None
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self.batchers = {}
+        self.load_lock = None
+        self.started = time.time()
+
+    def _load_survival(self):
+        if self.survival_grid:
+            self.survival_model = load_grid(self.survival_grid, self.model_dir)
+            self.survival_features = load_survival_transform(self.model_dir)
+        else:
+            self.survival_model, self.survival_features = load_survival_models(self.model_dir)
+        return MicroBatcher(lambda X: predict_proba(self.survival_model, X)[:, 1],
+                            self.max_batch_size, self.max_wait_ms, 'survival')
+
+    def _load_league(self):
+        (self.league_model, self.league_encoder,
+         self.tier_standards, self.league_features) = load_league_models(self.model_dir)
+        self.league_classes = list(self.league_encoder.inverse_transform(np.asarray(self.league_model.classes_)))
+        self.league_search = league_search(getattr(self.league_model, 'model', self.league_model), self.tier_standards)
+        return MicroBatcher(lambda X: predict_proba(self.league_model, X),
+                            self.max_batch_size, self.max_wait_ms, 'league')
+
+    async def _batcher(self, name):
+        """name('survival' / 'league') 모델의 배치기 (처음이면 스레드에서 로드)"""
+        batcher = self.batchers.get(name)
+        if batcher is None:
+            async with self.load_lock:
+                batcher = self.batchers.get(name)
+                if batcher is None:
+                    loader = self._load_survival if name == 'survival' else self._load_league
+                    with metrics.timer(name, 'load'):
+                        batcher = await asyncio.get_running_loop().run_in_executor(None, loader)
+                    batcher.start()
+                    self.batchers[name] = batcher
+        return batcher
+
+    def start(self):
+        self.load_lock = asyncio.Lock()
+
+    async def preload(self):
+        await self._batcher('survival')
+        await self._batcher('league')
+
+    async def stop(self):
+        for batcher in self.batchers.values():
+            await batcher.stop()
+
+    @staticmethod
+    def _transform(transform, payload, flow):
+        if not isinstance(payload, dict):
+            raise BadRequest('요청 본문은 JSON 객체여야 합니다.')
+        try:
+            with metrics.timer(flow, 'transform'):
+                return transform.transform_one(**payload)
+        except (KeyError, ValueError, TypeError) as error:
+            message = error.args[0] if isinstance(error, KeyError) and error.args else error
+            raise BadRequest(f'입력 오류: {message}') from None
+
+    async def survival(self, payload):
+        batcher = await self._batcher('survival')
+        X = self._transform(self.survival_features, payload, 'survival')
+        prob = float(await batcher.submit(X))
+        status = 'safe' if prob >= 0.85 else 'normal' if prob >= 0.6 else 'danger'
+        return {'survival_prob': prob, 'status': status,
+                'activity_ratio': float(X[0, 0]), 'entry_gap': float(X[0, 1])}
+
+    async def _league(self, payload):
+        batcher = await self._batcher('league')
+        X = self._transform(self.league_features, payload, 'league')
+        proba = await batcher.submit(X)
+        predicted = self.league_classes[int(np.argmax(proba))]
+        by_tier = {name: float(p) for name, p in zip(self.league_classes, proba)}
+        probabilities = {tier: by_tier[tier] for tier in TIER_ORDER if tier in by_tier}
+        return X, predicted, probabilities
+
+    async def league(self, payload):
+        _, predicted, probabilities = await self._league(payload)
+        return {'predicted_league': predicted, 'probabilities': probabilities}
+
+    async def coaching(self, payload):
+        target_tier = payload.pop('target_tier', None) if isinstance(payload, dict) else None
+        X, predicted, probabilities = await self._league(payload)
+        current_idx = TIER_ORDER.index(predicted) if predicted in TIER_ORDER else 0
+        if target_tier is None:
+            # 자동: 예측 티어보다 1단계 위
+            target_tier = TIER_ORDER[min(current_idx + 1, len(TIER_ORDER) - 1)]
+        elif target_tier not in TIER_ORDER:
+            raise BadRequest(f'알 수 없는 target_tier: {target_tier}')
+
+        response = {'predicted_league': predicted, 'probabilities': probabilities, 'target_tier': target_tier}
+        if TIER_ORDER.index(target_tier) <= current_idx:
+            response['improvements'] = []
+            return response
+        if target_tier not in self.tier_standards.index:
+            raise BadRequest(f'티어 기준 데이터가 없습니다: {target_tier}')
+
+        # 반사실 탐색은 후보 행을 직접 predict_proba하므로 (배치기와 별개) 이벤트 루프 밖 스레드에서
+        target_class = self.league_encoder.transform([target_tier])[0]
+        with metrics.timer('coaching', 'counterfactual'):
+            result = await asyncio.get_running_loop().run_in_executor(
+                None, self.league_search.search, X[0], target_class)
+        response.update(reached=result['reached'], target_proba=result['target_proba'])
+        if result['reached']:
+            response.update(method='counterfactual', improvements=result['changes'][:5])
+        else:
+            current_values = dict(zip(LEAGUE_FEATURES, X[0].tolist()))
+            response.update(method='tier_average',
+                            improvements=improvement_gaps(current_values, self.tier_standards.loc[target_tier]))
+        return response
+
+    def clan(self, tag):
+        """미리 스코어링한 클랜 조회 (인덱스는 첫 요청 때 메모리 맵으로 열기, 모델 호출 없음)"""
+        if self.clan_index is None:
+            path = self.clan_index_path or index_path(self.model_dir)
+            try:
+                with metrics.timer('clan', 'load'):
+                    self.clan_index = load_index(path, self.model_dir)
+            except FileNotFoundError:
+                raise NotFound(f'클랜 인덱스가 없습니다: {path} (python src/clan_index.py로 빌드)') from None
+        with metrics.timer('clan', 'lookup'):
+            record = self.clan_index.get(tag)
+        if record is None:
+            raise NotFound(f'인덱스에 없는 클랜 태그: {tag}')
+        return record
+
+    def health(self):
+        return {
+            'status': 'ok',
+            'uptime_sec': round(time.time() - self.started, 1),
+            'survival': self.batchers['survival'].stats() if 'survival' in self.batchers else {'loaded': False},
+            'league': self.batchers['league'].stats() if 'league' in self.batchers else {'loaded': False},
+            'clan_index': {'clans': len(self.clan_index)} if self.clan_index is not None else {'loaded': False},
+        }
+
+
+# ==========================================
+# HTTP (asyncio 스트림 기반 최소 구현, keep-alive 지원)
+# ==========================================
+ROUTES = {
+    '/predict/survival': 'survival',
+    '/predict/league': 'league',
+    '/predict/coaching': 'coaching',
+}
+CLAN_PREFIX = '/clan/'
+
+
+def _route_name(path):
+    return 'clan' if path.startswith(CLAN_PREFIX) else ROUTES.get(path, 'http')
+
+
+def _response(status, body, keep_alive=True):
+    # 문자열 본문은 그대로 (GET /metrics의 Prometheus 텍스트), 나머지는 JSON
+    if isinstance(body, str):
+        payload, content_type = body.encode('utf-8'), 'text/plain; version=0.0.4; charset=utf-8'
+    else:
+        payload, content_type = json.dumps(body, ensure_ascii=False).encode('utf-8'), 'application/json; charset=utf-8'
+    head = (
+        f'HTTP/1.1 {status.value} {status.phrase}\r\n'
+        f'Content-Type: {content_type}\r\n'
+        f'Content-Length: {len(payload)}\r\n'
+        f'Connection: {"keep-alive" if keep_alive else "close"}\r\n\r\n'
+    )
+    return head.encode('latin-1') + payload
+
+
+async def _read_request(reader):
+    """(method, path, headers, body) / 연결 종료 시 None"""
+    request_line = await reader.readline()
+    if not request_line:
+        return None
+    try:
+        method, path, version = request_line.decode('latin-1').split()
+    except ValueError:
+        raise BadRequest('잘못된 요청 라인입니다.') from None
+
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b'\n', b''):
+            break
+        key, _, value = line.decode('latin-1').partition(':')
+        headers[key.strip().lower()] = value.strip()
+    headers['_version'] = version
+
+    length = int(headers.get('content-length', 0) or 0)
+    if length > MAX_BODY_BYTES:
+        raise BadRequest('요청 본문이 너무 큽니다.')
+    body = await reader.readexactly(length) if length else b''
+    return method, path.split('?', 1)[0], headers, body
+
+
+async def _dispatch(service, method, path, body):
+    if path == '/health' and method == 'GET':
+        return HTTPStatus.OK, service.health()
+    if path == '/metrics' and method == 'GET':
+        return HTTPStatus.OK, metrics.render()
+    if path.startswith(CLAN_PREFIX) and method == 'GET':
+        try:
+            return HTTPStatus.OK, service.clan(unquote(path[len(CLAN_PREFIX):]))
+        except NotFound as error:
+            return HTTPStatus.NOT_FOUND, {'error': str(error)}
+    if path not in ROUTES:
+        return HTTPStatus.NOT_FOUND, {'error': f'없는 경로: {path}'}
+    if method != 'POST':
+        return HTTPStatus.METHOD_NOT_ALLOWED, {'error': 'POST만 지원합니다.'}
+
+    try:
+        payload = json.loads(body or b'null')
+    except json.JSONDecodeError:
+        return HTTPStatus.BAD_REQUEST, {'error': 'JSON 파싱 실패'}
+
+    handler = getattr(service, ROUTES[path])
+    try:
+        if isinstance(payload, list):
+            # 리스트 요청도 한 건씩 배치기에 넣어 다른 요청과 함께 묶임
+            result = await asyncio.gather(*(handler(item) for item in payload))
+        else:
+            result = await handler(payload)
+    except BadRequest as error:
+        return HTTPStatus.BAD_REQUEST, {'error': str(error)}
+    return HTTPStatus.OK, result
+
+
+async def handle_connection(service, reader, writer):
+    try:
+        while True:
+            try:
+                request = await _read_request(reader)
+            except BadRequest as error:
+                writer.write(_response(HTTPStatus.BAD_REQUEST, {'error': str(error)}, keep_alive=False))
+                break
+            if request is None:
+                break
+            method, path, headers, body = request
+            keep_alive = headers.get('connection', '').lower() != 'close' and headers['_version'] != 'HTTP/1.0'
+            try:
+                with metrics.timer(_route_name(path), 'request'):
+                    status, result = await _dispatch(service, method, path, body)
+            except Exception as error:  # 모델 오류 등은 500으로 응답하고 연결 유지
+                status, result = HTTPStatus.INTERNAL_SERVER_ERROR, {'error': repr(error)}
+            writer.write(_response(status, result, keep_alive))
+            await writer.drain()
+            if not keep_alive:
+                break
+    except (ConnectionError, asyncio.IncompleteReadError):
+        pass
+    finally:
+        writer.close()
+
+
+async def serve(model_dir=None, host='127.0.0.1', port=8000,
+                max_batch_size=DEFAULT_MAX_BATCH_SIZE, max_wait_ms=DEFAULT_MAX_WAIT_MS, preload=False,
+                survival_grid=None, clan_index=None):
+    service = PredictionService(model_dir, max_batch_size, max_wait_ms, survival_grid, clan_index)
+    service.start()
+    if preload:
+        await service.preload()
+    server = await asyncio.start_server(
+        lambda reader, writer: handle_connection(service, reader, writer), host, port)
+    print(f"🛰️ 예측 서버 시작: http://{host}:{port} "
+          f"(max_batch_size={max_batch_size}, max_wait_ms={max_wait_ms})", flush=True)
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        await service.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='클랜 생존/리그/코칭 예측 HTTP 서버')
+    parser.add_argument('--model-dir', default=None, help='*.pkl 모델 디렉토리 (기본: COC_MODEL_DIR 또는 현재 디렉토리)')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--max-batch-size', type=int, default=DEFAULT_MAX_BATCH_SIZE, help='배치당 최대 요청 수')
+    parser.add_argument('--max-wait-ms', type=float, default=DEFAULT_MAX_WAIT_MS, help='배치를 채우기 위해 기다리는 최대 시간')
+    parser.add_argument('--preload', action='store_true', help='첫 요청을 기다리지 않고 시작할 때 모든 모델 로드')
+    parser.add_argument('--metrics', action='store_true', help='단계별 지연시간 수집 (GET /metrics, COC_METRICS=1과 같음)')
+    parser.add_argument('--survival-grid', default=None,
+                        help='생존 예측에 쓸 룩업 그리드(.npy) 경로 (python src/survival_grid.py로 빌드)')
+    parser.add_argument('--clan-index', default=None,
+                        help='GET /clan/<태그>에 쓸 클랜 인덱스(.npy) 경로 (기본: <model-dir>/clan_index.npy)')
+    args = parser.parse_args()
+    if args.metrics:
+        metrics.enable()
+
+    try:
+        asyncio.run(serve(args.model_dir, args.host, args.port, args.max_batch_size, args.max_wait_ms, args.preload,
+                          args.survival_grid, args.clan_index))
+    except KeyboardInterrupt:
+        print("👋 서버 종료")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,305 @@
+"""
+📐 티어별 분포 스케치 (Tier Distribution Sketches)
+티어(0~6) x 피처마다 t-digest 하나로 분포를 요약해, 평균 대신 중앙값/분위수와
+"골드 클랜 중 N번째 백분위" 같은 위치를 바로 계산합니다.
+
+- 피처 스토어를 한 번 스트리밍하며 배치 단위로 더하고, 청크/프로세스별로 만든 스케치는 merge로 합침
+- 스케치 하나 = 중심점(평균, 개수) 최대 약 compression/2개 -> 티어 하나(피처 10개)가 수 KB
+- 양 끝 분위수일수록 중심점이 작아 꼬리 쪽 백분위가 정확함 (k1 스케일 함수)
+- 결과는 tier_sketches.pkl (artifacts OPTIONAL_FILES)로 게시하고, 앱은 파일이 있을 때만 백분위를 표시
+
+실행 방법: python src/sketches.py --store feature_store --model-dir . --workers 4
+"""
+import argparse
+import os
+import struct
+import time
+
+import numpy as np
+import pandas as pd
+
+# 중심점 개수와 정확도를 정하는 값 (클수록 정확, 중심점 수 ~ compression / 2)
+COMPRESSION = 200
+# 이만큼 값이 쌓이면 중심점으로 압축
+BUFFER_SIZE = 100_000
+BATCH_SIZE = 500_000
+DEFAULT_QUANTILES = (0.1, 0.25, 0.5, 0.75, 0.9)
+
+_HEADER = struct.Struct('<dddd?')
+
+
+# ==========================================
+# t-digest
+# ==========================================
+class TDigest:
+    """한 피처의 분포 요약 (합치기 가능한 merging t-digest)
+
+    정렬한 값의 누적 위치 q를 k1 스케일(compression / 2pi * asin(2q - 1))로 바꿔
+    k가 1 늘어나는 구간마다 중심점 하나로 묶습니다. 값을 빼는 것은 지원하지 않습니다.
+    서로 다른 값이 compression / 2개 이하(레벨, 멤버 수 같은 정수 피처)면 값별 개수를 그대로 보관해 정확합니다.
+    """
+
+    def __init__(self, compression=COMPRESSION):
+        self.compression = compression
+        self.means = np.empty(0)
+        self.weights = np.empty(0)
+        self.min, self.max = np.inf, -np.inf
+        self.exact = True
+        self._buffer = []
+        self._buffered = 0
+
+    @property
+    def count(self):
+        return float(self.weights.sum()) + self._buffered
+
+    def add(self, values):
+        values = np.asarray(values, dtype=np.float64).ravel()
+        values = values[~np.isnan(values)]
+        if len(values) == 0:
+            return self
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+        self._buffer.append(values)
+        self._buffered += len(values)
+        if self._buffered >= BUFFER_SIZE:
+            self._compress()
+        return self
+
+    def merge(self, other):
+        """다른 스케치를 합침 (other는 바뀌지 않음)"""
+        other = other.compressed()
+        if other.count == 0:
+            return self
+        self.min, self.max = min(self.min, other.min), max(self.max, other.max)
+        self.exact = self.exact and other.exact
+        self._compress(other.means, other.weights)
+        return self
+
+    def compressed(self):
+        if self._buffered:
+            self._compress()
+        return self
+
+    def _compress(self, means=(), weights=()):
+        buffered = np.concatenate(self._buffer) if self._buffer else np.empty(0)
+        means = np.concatenate([self.means, np.asarray(means, dtype=np.float64), buffered])
+        weights = np.concatenate([self.weights, np.asarray(weights, dtype=np.float64), np.ones(len(buffered))])
+        self._buffer, self._buffered = [], 0
+        if len(means) == 0:
+            return
+        # 같은 값끼리 먼저 합침 -> 값 종류가 적으면 값별 개수 그대로 보관
+        means, group = np.unique(means, return_inverse=True)
+        weights = np.bincount(group, weights)
+        if self.exact and len(means) <= self.compression // 2:
+            self.means, self.weights = means, weights
+            return
+        self.exact = False
+        cumulative = np.cumsum(weights)
+        q = (cumulative - weights / 2) / cumulative[-1]
+        k = np.floor(self.compression / (2 * np.pi) * np.arcsin(2 * q - 1))
+        # q가 커지면 k도 커지므로 같은 k 구간 = 연속된 행
+        _, cluster = np.unique(k, return_inverse=True)
+        self.weights = np.bincount(cluster, weights)
+        self.means = np.bincount(cluster, weights * means) / self.weights
+
+    def _knots(self):
+        """(값, 누적 위치) 보간 점: 최솟값 -> 중심점마다 (평균, 가운데 위치) -> 최댓값"""
+        self.compressed()
+        cumulative = np.cumsum(self.weights)
+        xs = np.concatenate([[self.min], self.means, [self.max]])
+        ranks = np.concatenate([[0.0], cumulative - self.weights / 2, [cumulative[-1]]])
+        # 평균 = 최솟값/최댓값인 양 끝 중심점은 한 값에 몰린 행 (0점 클랜 등) -> 그 값이 차지하는 구간 끝까지 고정
+        if self.means[0] == self.min:
+            ranks[1] = self.weights[0]
+        if self.means[-1] == self.max:
+            ranks[-2] = cumulative[-1] - self.weights[-1]
+        return xs, ranks, cumulative[-1]
+
+    def quantile(self, q):
+        """분위수 (q: 0~1, 스칼라 또는 배열)"""
+        if self.count == 0:
+            return np.full(np.shape(q), np.nan)
+        if self.compressed().exact:
+            cumulative = np.cumsum(self.weights)
+            position = np.searchsorted(cumulative, np.asarray(q, dtype=np.float64) * cumulative[-1])
+            return self.means[np.minimum(position, len(self.means) - 1)]
+        xs, ranks, total = self._knots()
+        return np.interp(np.asarray(q, dtype=np.float64) * total, ranks, xs)
+
+    def cdf(self, x):
+        """x 이하 비율 (0~1). 같은 값이 많은 정수 피처는 그 값 구간의 가운데 위치"""
+        if self.count == 0:
+            return np.full(np.shape(x), np.nan)
+        x = np.asarray(x, dtype=np.float64)
+        if self.compressed().exact:
+            cumulative = np.concatenate([[0.0], np.cumsum(self.weights)])
+            below = cumulative[np.searchsorted(self.means, x, 'left')]
+            through = cumulative[np.searchsorted(self.means, x, 'right')]
+            return (below + through) / 2 / cumulative[-1]
+        xs, ranks, total = self._knots()
+        # 같은 값인 보간 점은 위치 평균 하나로 합침 (한 값에 몰린 행은 그 구간의 가운데 위치)
+        xs, group = np.unique(xs, return_inverse=True)
+        ranks = np.bincount(group, ranks) / np.bincount(group)
+        return np.interp(x, xs, ranks) / total
+
+    # 직렬화: 헤더(compression, 개수, 최솟값, 최댓값, 정확 여부) + 중심점(float32 평균, float32 개수)
+    def to_bytes(self):
+        self.compressed()
+        centroids = np.column_stack([self.means, self.weights]).astype('<f4')
+        return _HEADER.pack(self.compression, self.count, self.min, self.max, self.exact) + centroids.tobytes()
+
+    @classmethod
+    def from_bytes(cls, data):
+        compression, _, low, high, exact = _HEADER.unpack_from(data)
+        digest = cls(int(compression))
+        centroids = np.frombuffer(data, dtype='<f4', offset=_HEADER.size).reshape(-1, 2).astype(np.float64)
+        digest.means, digest.weights = centroids[:, 0].copy(), centroids[:, 1].copy()
+        digest.min, digest.max, digest.exact = low, high, exact
+        return digest
+
+
+# ==========================================
+# 티어 x 피처 스케치 묶음
+# ==========================================
+class TierSketches:
+    """티어(라벨 목록 순서, 0부터) x 피처별 TDigest. pkl로 저장하면 스케치마다 압축된 바이트만 남음"""
+
+    def __init__(self, features, labels, compression=COMPRESSION):
+        self.features = list(features)
+        self.labels = list(labels)
+        self.digests = [[TDigest(compression) for _ in self.features] for _ in self.labels]
+        self.rows = np.zeros(len(self.labels), dtype=np.int64)
+
+    def add(self, tiers, X):
+        """tiers: 행별 티어 번호 (음수는 무시), X: 행 x self.features 배열"""
+        tiers, X = np.asarray(tiers), np.asarray(X, dtype=np.float64)
+        self.rows += np.bincount(tiers[tiers >= 0], minlength=len(self.labels))
+        for t in np.unique(tiers[tiers >= 0]):
+            rows = X[tiers == t]
+            for digest, column in zip(self.digests[t], rows.T):
+                digest.add(column)
+        return self
+
+    def merge(self, other):
+        self.rows += other.rows
+        for mine, theirs in zip(self.digests, other.digests):
+            for digest, other_digest in zip(mine, theirs):
+                digest.merge(other_digest)
+        return self
+
+    def _tier(self, tier):
+        return self.labels.index(tier) if isinstance(tier, str) else int(tier)
+
+    def digest(self, tier, feature):
+        return self.digests[self._tier(tier)][self.features.index(feature)]
+
+    def count(self, tier):
+        return int(self.rows[self._tier(tier)])
+
+    def percentile(self, tier, feature, value):
+        """해당 티어 클랜 중 value 이하 비율(%) -> 'N번째 백분위'"""
+        return float(self.digest(tier, feature).cdf(value)) * 100
+
+    def quantile(self, tier, feature, q=0.5):
+        return float(self.digest(tier, feature).quantile(q))
+
+    def quantile_table(self, qs=DEFAULT_QUANTILES):
+        """(티어, 분위수) x 피처 DataFrame (클랜이 없는 티어는 제외)"""
+        rows, index = [], []
+        for t, label in enumerate(self.labels):
+            if self.count(t) == 0:
+                continue
+            values = np.column_stack([d.quantile(qs) for d in self.digests[t]])
+            rows.append(values)
+            index += [(label, q) for q in qs]
+        return pd.DataFrame(np.vstack(rows) if rows else np.empty((0, len(self.features))),
+                            index=pd.MultiIndex.from_tuples(index, names=['tier', 'quantile']), columns=self.features)
+
+    def nbytes(self, tier=None):
+        tiers = range(len(self.labels)) if tier is None else [self._tier(tier)]
+        return sum(len(d.to_bytes()) for t in tiers for d in self.digests[t])
+
+    def __getstate__(self):
+        return {'features': self.features, 'labels': self.labels, 'rows': self.rows,
+                'digests': [[d.to_bytes() for d in row] for row in self.digests]}
+
+    def __setstate__(self, state):
+        self.features, self.labels, self.rows = state['features'], state['labels'], state['rows']
+        self.digests = [[TDigest.from_bytes(data) for data in row] for row in state['digests']]
+
+
+# ==========================================
+# 피처 스토어 스트리밍
+# ==========================================
+def default_features():
+    from features import COACHING_FEATURES, LEAGUE_FEATURES
+    return list(dict.fromkeys(LEAGUE_FEATURES + COACHING_FEATURES))
+
+
+def _sketch_fragments(store_dir, paths, features, compression, batch_size):
+    """피처 스토어 파일 일부를 읽어 스케치 하나로 요약 (워커 프로세스에서도 실행)"""
+    from feature_store import active_filter, open_store
+    from train import TIER_ORDER, broad_tier, league_score
+
+    sketches = TierSketches(features, ['Unranked'] + TIER_ORDER, compression)
+    wanted = set(paths)
+    for fragment in open_store(store_dir).get_fragments(filter=active_filter()):
+        if fragment.path not in wanted:
+            continue
+        for batch in fragment.to_batches(columns=['clan_war_league'] + features, batch_size=batch_size):
+            df = batch.to_pandas()
+            sketches.add(broad_tier(league_score(df['clan_war_league'])), df[features].to_numpy(np.float64))
+    return sketches
+
+
+def build_sketches(store_dir=None, features=None, workers=1, compression=COMPRESSION, batch_size=BATCH_SIZE):
+    """피처 스토어 활성 클랜을 한 번 훑어 TierSketches 생성 (workers > 1이면 파일을 나눠 만든 뒤 merge)"""
+    from feature_store import DEFAULT_STORE, active_filter, open_store
+
+    store_dir = store_dir or DEFAULT_STORE
+    features = list(features or default_features())
+    paths = [fragment.path for fragment in open_store(store_dir).get_fragments(filter=active_filter())]
+    if workers <= 1:
+        return _sketch_fragments(store_dir, paths, features, compression, batch_size)
+
+    from concurrent.futures import ProcessPoolExecutor
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(_sketch_fragments, store_dir, paths[i::workers], features, compression, batch_size)
+                   for i in range(min(workers, len(paths)))]
+        parts = [future.result() for future in futures]
+    sketches = parts[0]
+    for part in parts[1:]:
+        sketches.merge(part)
+    return sketches
+
+
+def main():
+    import artifacts
+    from feature_store import DEFAULT_STORE
+
+    parser = argparse.ArgumentParser(description='티어별 피처 분포 스케치(t-digest) 생성')
+    parser.add_argument('--store', default=DEFAULT_STORE, help='피처 스토어 디렉토리')
+    parser.add_argument('--model-dir', default=None, help='tier_sketches.pkl을 게시할 디렉토리 (기본: COC_MODEL_DIR 또는 현재 디렉토리)')
+    parser.add_argument('--workers', type=int, default=1, help='워커 프로세스 수 (파일 단위로 나눠 만든 뒤 합침)')
+    parser.add_argument('--compression', type=int, default=COMPRESSION, help='t-digest compression (클수록 정확, 파일 커짐)')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    sketches = build_sketches(args.store, workers=args.workers, compression=args.compression)
+    elapsed = time.perf_counter() - start
+
+    with pd.option_context('display.width', 160, 'display.max_columns', 20):
+        print("[티어별 중앙값]")
+        print(sketches.quantile_table([0.5]).droplevel('quantile').round(1))
+    print("\n[티어별 스케치 크기]")
+    for label in sketches.labels:
+        print(f"  {label:<9} {sketches.count(label):>10,}개 클랜 | {sketches.nbytes(label) / 1024:6.1f} KB")
+
+    release = artifacts.publish_artifact('tier_sketches', sketches, args.model_dir, {'sketches': os.path.abspath(args.store)})
+    print(f"\n✅ tier_sketches.pkl 게시 (릴리스 {release}) | 스트리밍 {elapsed:.2f}초")
+
+
+if __name__ == '__main__':
+    # pkl에 __main__.TierSketches가 아니라 sketches.TierSketches로 기록되도록 모듈로 다시 import
+    import sketches
+    sketches.main()
@@ -0,0 +1,310 @@
+"""
+🗺️ 생존 확률 룩업 그리드 (Survival Probability Grid)
+생존 모델 입력은 (activity_ratio, entry_gap) 두 연속값과 작은 범주 코드 셋
+(전쟁 빈도 6종 x 가족 친화 2종 x 클랜 유형 3종)뿐이고, 트리 모델은 분할 임계값 사이에서 값이 변하지 않습니다.
+그래서 연속 축을 모델의 분할 임계값(정렬된 고유값)으로 나눈 칸마다 한 번씩 예측해
+메모리 맵 배열(uint16 확률)로 저장하고, 서빙 때는 searchsorted로 칸을 찾아 그대로 읽습니다 (보간 없음).
+
+- 칸 경계 = 모델이 그 피처를 나누는 임계값 (LightGBM: x <= t가 왼쪽, XGBoost: x < t가 왼쪽)
+  LightGBM은 |x| <= kZeroThreshold를 0으로 보므로 그 구간도 한 칸으로 분리, 각 축 마지막 칸은 NaN
+- 칸마다 그 칸에 속하는 float32 값 하나로 예측 -> 모델과의 차이는 uint16 양자화(<= 0.5 / 65535)뿐
+- 축 크기는 피처당 임계값 수(max_bin 이하) + 몇 칸이라 입력 범위와 무관
+
+실행 방법:
+    python src/survival_grid.py --model-dir .            # 빌드 + 오차 / 한 건 조회 시간 보고
+    python src/survival_grid.py --model-dir . --check    # 기존 그리드 오차만 보고
+    python src/serve.py --model-dir . --survival-grid survival_grid.npy     # 그리드로 서빙
+"""
+import argparse
+import json
+import os
+import sys
+import time
+import warnings
+from functools import partial
+
+import numpy as np
+
+import artifacts
+from features import SURVIVAL_FEATURES
+from tree_engine import ZERO_THRESHOLD, TreeEnsemble
+
+GRID_FILE = 'survival_grid.npy'
+META_SUFFIX = '.json'
+
+# 앱(st.number_input) 입력 범위 (오차 측정용 무작위 입력)
+TROPHY_RANGE = (0, 6000)
+LEVEL_RANGE = (1, 300)
+REQUIRED_RANGE = (0, 5500)
+
+# 확률은 0~1을 uint16으로 저장 (양자화 오차 <= 0.5 / 65535)
+PROB_SCALE = np.iinfo(np.uint16).max
+
+# 빌드 시 한 번에 예측할 행 수
+PREDICT_CHUNK = 1 << 20
+
+# 연속 축 (SURVIVAL_FEATURES 인덱스)
+RATIO, GAP = SURVIVAL_FEATURES.index('activity_ratio'), SURVIVAL_FEATURES.index('entry_gap')
+
+def grid_path(model_dir=None):
+    return os.path.join(artifacts.model_dir_or_default(model_dir), GRID_FILE)
+
+
+# ==========================================
+# 축 정의 (분할 임계값 -> 칸 경계)
+# ==========================================
+def axis_edges(engine, column):
+    """column의 칸 경계 (float64 오름차순)
+
+    LightGBM은 -kZeroThreshold 바로 아래 float32와 +kZeroThreshold도 경계로 넣어
+    모델이 0으로 바꾸는 구간(|x| <= kZeroThreshold)을 한 칸으로 묶습니다.
+    """
+    edges = engine.threshold[engine.feature == SURVIVAL_FEATURES.index(column)].astype(np.float64)
+    if engine.library == 'lightgbm':
+        below_zero = float(np.nextafter(np.float32(-ZERO_THRESHOLD), np.float32(-np.inf)))
+        edges = np.concatenate([edges, [below_zero, ZERO_THRESHOLD]])
+    return np.unique(edges)
+
+
+def edge_side(engine):
+    """searchsorted side: LightGBM(x <= t 왼쪽) 'left', XGBoost(x < t 왼쪽) 'right'"""
+    return 'left' if engine.library == 'lightgbm' else 'right'
+
+
+def _float32_below(values, strict=False):
+    """values 이하(strict면 미만)인 가장 큰 float32 (float64로)"""
+    f = np.asarray(values, dtype=np.float64).astype(np.float32)
+    step_down = (f >= values) if strict else (f > values)
+    return np.where(step_down, np.nextafter(f, np.float32(-np.inf)), f).astype(np.float64)
+
+
+def _float32_above(values, strict=False):
+    """values 이상(strict면 초과)인 가장 작은 float32 (float64로)"""
+    f = np.asarray(values, dtype=np.float64).astype(np.float32)
+    step_up = (f <= values) if strict else (f < values)
+    return np.where(step_up, np.nextafter(f, np.float32(np.inf)), f).astype(np.float64)
+
+
+def cell_values(edges, side):
+    """칸마다 그 칸에 속하는 float32 값 하나 (len(edges) + 1칸 + NaN칸)
+
+    'left'  칸 c = (edges[c-1], edges[c]] -> edges[c] 이하 최대 float32 (마지막 칸은 마지막 경계 초과 최소값)
+    'right' 칸 c = [edges[c-1], edges[c]) -> edges[c-1] 이상 최소 float32 (첫 칸은 첫 경계 미만 최대값)
+    float32 입력이 하나라도 들어갈 수 있는 칸이면 이 값도 그 칸에 속합니다.
+    """
+    if not len(edges):
+        return np.array([0.0, np.nan])
+    if side == 'left':
+        values = np.append(_float32_below(edges), _float32_above(edges[-1], strict=True))
+    else:
+        values = np.insert(_float32_above(edges), 0, _float32_below(edges[0], strict=True))
+    return np.append(values, np.nan)
+
+
+# ==========================================
+# 빌드 (오프라인)
+# ==========================================
+def build(model, survival_features, path, source=None, log=sys.stdout):
+    """모든 (범주 조합 x 칸)을 예측해 path(.npy, 메모리 맵)와 메타(.json)로 저장"""
+    engine = model if isinstance(model, TreeEnsemble) else TreeEnsemble.from_model(model)
+    side = edge_side(engine)
+    ratio_edges, gap_edges = axis_edges(engine, 'activity_ratio'), axis_edges(engine, 'entry_gap')
+    ratios, gaps = cell_values(ratio_edges, side), cell_values(gap_edges, side)
+    n_war = len(survival_features.encoders['war_frequency_code'].classes_)
+    n_type = len(survival_features.encoders['clan_type_code'].classes_)
+    shape = (n_war, 2, n_type, len(ratios), len(gaps))
+    print(f"🗺️ 그리드 {shape} = {np.prod(shape):,}칸 ({np.prod(shape) * 2 / 1024 ** 2:,.1f}MB)", file=log, flush=True)
+
+    start = time.perf_counter()
+    grid = np.lib.format.open_memmap(path, mode='w+', dtype=np.uint16, shape=shape)
+    # 한 조합의 (ratio, gap) 평면: SURVIVAL_FEATURES 순서의 입력 행렬
+    plane = np.empty((len(ratios) * len(gaps), 5), dtype=np.float32)
+    plane[:, RATIO] = np.repeat(ratios, len(gaps))
+    plane[:, GAP] = np.tile(gaps, len(ratios))
+    for war in range(n_war):
+        for family in range(2):
+            for clan_type in range(n_type):
+                plane[:, 2:] = (war, family, clan_type)
+                prob = np.concatenate([artifacts.predict_proba(model, plane[i:i + PREDICT_CHUNK])[:, 1]
+                                       for i in range(0, len(plane), PREDICT_CHUNK)])
+                grid[war, family, clan_type] = np.rint(prob * PROB_SCALE).reshape(len(ratios), len(gaps))
+    print(f"  {time.perf_counter() - start:6.1f}초", file=log, flush=True)
+    grid.flush()
+    del grid
+
+    meta = {
+        'side': side,
+        'ratio_edges': ratio_edges.tolist(),
+        'gap_edges': gap_edges.tolist(),
+        'source': source,
+    }
+    with open(path + META_SUFFIX, 'w', encoding='utf-8') as f:
+        json.dump(meta, f)
+    return SurvivalGrid.load(path)
+
+
+# ==========================================
+# 서빙 (칸 찾기 + 조회)
+# ==========================================
+class SurvivalGrid:
+    """생존 모델 대신 쓰는 격자 조회기 (predict_proba / predict, classes_ = [0, 1])
+
+    입력은 생존 모델과 같은 (n, 5) 행렬 (SURVIVAL_FEATURES 순서).
+    """
+
+    classes_ = np.array([0, 1])
+    n_features_in_ = 5
+
+    def __init__(self, grid, ratio_edges, gap_edges, side='left'):
+        self.grid = grid
+        self.ratio_edges = np.asarray(ratio_edges, dtype=np.float64)
+        self.gap_edges = np.asarray(gap_edges, dtype=np.float64)
+        self.side = side
+        # 평평한 인덱스 하나로 읽도록 보폭 (C 순서), memmap 서브클래스 대신 같은 메모리의 ndarray 뷰 (조회마다 래핑 비용 없음)
+        self.flat = np.asarray(grid).reshape(-1)
+        self.strides = np.array([s // grid.itemsize for s in grid.strides], dtype=np.intp)
+        # 범주 코드(war_frequency_code, isFamilyFriendly, clan_type_code) 최댓값, 범위 밖은 가장자리로
+        self.code_max = np.array(grid.shape[:3], dtype=np.float64) - 1
+
+    def __repr__(self):
+        return f"SurvivalGrid(shape={self.grid.shape}, side={self.side!r})"
+
+    @classmethod
+    def load(cls, path):
+        """메모리 맵으로 열기 (조회한 페이지만 읽음)"""
+        with open(path + META_SUFFIX, encoding='utf-8') as f:
+            meta = json.load(f)
+        grid = np.load(path, mmap_mode='r')
+        return cls(grid, meta['ratio_edges'], meta['gap_edges'], meta['side'])
+
+    def predict_survival(self, X):
+        """(n,) 생존 확률"""
+        # 모델과 같은 float32 입력을 기준으로 칸을 찾음 (한 건 조회가 잦아 열별 호출 수를 최소로)
+        X = np.asarray(X, dtype=np.float32).reshape(-1, 5).astype(np.float64)
+        codes = np.minimum(np.maximum(np.rint(X[:, 2:]), 0), self.code_max).astype(np.intp)
+        ratio = np.searchsorted(self.ratio_edges, X[:, RATIO], side=self.side)
+        gap = np.searchsorted(self.gap_edges, X[:, GAP], side=self.side)
+        nan = np.isnan(X[:, (RATIO, GAP)])
+        if nan.any():
+            # NaN은 각 축의 마지막 칸
+            ratio = np.where(nan[:, 0], len(self.ratio_edges) + 1, ratio)
+            gap = np.where(nan[:, 1], len(self.gap_edges) + 1, gap)
+        index = codes @ self.strides[:3] + ratio * self.strides[3] + gap * self.strides[4]
+        return self.flat[index] / PROB_SCALE
+
+    def predict_proba(self, X):
+        prob = self.predict_survival(X)
+        return np.column_stack([1.0 - prob, prob])
+
+    def predict(self, X):
+        return (self.predict_survival(X) >= 0.5).astype(np.int64)
+
+
+def load_grid(path=None, model_dir=None):
+    """그리드 로드 (생존 pkl이 그리드보다 최근에 바뀌었으면 경고)"""
+    path = path or grid_path(model_dir)
+    grid = SurvivalGrid.load(path)
+    with open(path + META_SUFFIX, encoding='utf-8') as f:
+        source = json.load(f).get('source')
+    model_path = artifacts.artifact_path('survival_model', model_dir)
+    if source and os.path.exists(model_path) and artifacts.source_signature(model_path) != source:
+        warnings.warn(f"{os.path.basename(model_path)}이 그리드보다 최근에 바뀌었습니다. "
+                      "python src/survival_grid.py 로 다시 빌드하세요.")
+    return grid
+
+
+# ==========================================
+# 오차 보고
+# ==========================================
+def sample_app_inputs(survival_features, n_samples, seed=0):
+    """앱 입력 범위에서 무작위 클랜 n_samples개 -> 생존 모델 입력 행렬"""
+    rng = np.random.default_rng(seed)
+    data = {
+        'mean_member_trophies': rng.integers(TROPHY_RANGE[0], TROPHY_RANGE[1] + 1, n_samples),
+        'mean_member_level': rng.integers(LEVEL_RANGE[0], LEVEL_RANGE[1] + 1, n_samples),
+        'required_trophies': rng.integers(REQUIRED_RANGE[0], REQUIRED_RANGE[1] + 1, n_samples),
+        'war_frequency': rng.choice(survival_features.encoders['war_frequency_code'].classes_, n_samples),
+        'clan_type': rng.choice(survival_features.encoders['clan_type_code'].classes_, n_samples),
+        'isFamilyFriendly': rng.integers(0, 2, n_samples),
+    }
+    return survival_features.transform(data)
+
+
+def sample_edge_inputs(grid, n_samples, seed=0):
+    """칸 경계 바로 위/아래 float32 값과 0 / NaN으로 만든 입력 (보간이 없어도 경계에서 틀리지 않는지 확인)"""
+    rng = np.random.default_rng(seed)
+    n_war, _, n_type = grid.grid.shape[:3]
+    X = np.empty((n_samples, 5), dtype=np.float32)
+    for column, edges in ((RATIO, grid.ratio_edges), (GAP, grid.gap_edges)):
+        values = np.concatenate([edges, [0.0, np.nan]]).astype(np.float32)
+        values = np.concatenate([values, np.nextafter(values, np.float32(-np.inf)),
+                                 np.nextafter(values, np.float32(np.inf))])
+        X[:, column] = rng.choice(values, n_samples)
+    X[:, 2] = rng.integers(0, n_war, n_samples)
+    X[:, 3] = rng.integers(0, 2, n_samples)
+    X[:, 4] = rng.integers(0, n_type, n_samples)
+    return X
+
+
+def evaluate(grid, model, X):
+    """실제 모델 대비 오차 / 앱 상태 구간(위험·보통·안전) 일치율"""
+    expected = artifacts.predict_proba(model, X)[:, 1]
+    actual = grid.predict_survival(X)
+    error = np.abs(actual - expected)
+    bins = [0.6, 0.85]
+    return {
+        'samples': len(X),
+        'max_error': float(error.max()),
+        'p99_error': float(np.quantile(error, 0.99)),
+        'mean_error': float(error.mean()),
+        'status_agreement': float((np.digitize(actual, bins) == np.digitize(expected, bins)).mean()),
+    }
+
+
+def single_row_ms(predict, X, n=2000):
+    start = time.perf_counter()
+    for row in X[:n]:
+        predict(row[None, :])
+    return (time.perf_counter() - start) / min(n, len(X)) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description='생존 확률 룩업 그리드 빌드 / 오차 보고')
+    parser.add_argument('--model-dir', default=None, help='*.pkl 모델 디렉토리 (기본: COC_MODEL_DIR 또는 현재 디렉토리)')
+    parser.add_argument('--output', default=None, help=f'그리드 경로 (기본: <model-dir>/{GRID_FILE})')
+    parser.add_argument('--check', action='store_true', help='빌드 없이 기존 그리드의 오차만 보고')
+    parser.add_argument('--samples', type=int, default=100_000, help='오차 측정용 무작위 입력 수')
+    args = parser.parse_args()
+
+    path = args.output or grid_path(args.model_dir)
+    model = artifacts.load_model('survival_model', args.model_dir)
+    survival_features = artifacts.load_survival_transform(args.model_dir)
+
+    if args.check:
+        grid = load_grid(path, args.model_dir)
+    else:
+        source = artifacts.source_signature(artifacts.artifact_path('survival_model', args.model_dir))
+        grid = build(model, survival_features, path, source)
+        print(f"✅ 저장: {path} ({os.path.getsize(path) / 1024 ** 2:,.1f}MB)")
+
+    X = sample_app_inputs(survival_features, args.samples)
+    print("\n📏 실제 모델 대비 오차 (uint16 양자화 한계 {:.1e})".format(0.5 / PROB_SCALE))
+    for name, inputs in (('앱 입력 범위 무작위', X), ('칸 경계 / 0 / NaN', sample_edge_inputs(grid, args.samples))):
+        report = evaluate(grid, model, inputs)
+        print(f"  {name} {report['samples']:,}건: 최대 {report['max_error']:.2e} | p99 {report['p99_error']:.2e} "
+              f"| 상태 구간 일치율 {report['status_agreement']:.2%}")
+
+    # 한 건 조회: 그리드 vs 서버/앱이 실제로 쓰는 모델 경로
+    print("\n⏱️ 한 건 조회 (ms)")
+    candidates = [('그리드', grid), ('sklearn 래퍼 (pkl)', artifacts.load_artifact('survival_model', args.model_dir)),
+                  ('네이티브 부스터 (load_native)', artifacts.load_native('survival_model', args.model_dir)),
+                  ('트리 엔진 (load_compiled)', artifacts.load_compiled('survival_model', args.model_dir))]
+    for name, predictor in candidates:
+        if predictor is None:
+            print(f"  {name:<30} 없음 (python src/artifacts.py 로 내보내기)")
+            continue
+        print(f"  {name:<30} {single_row_ms(partial(artifacts.predict_proba, predictor), X):.4f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,91 @@
+"""
+📉 what-if 민감도 스윕 (What-if Sensitivity Sweeps)
+클랜 입력 하나에서 피처 몇 개를 범위 전체로 바꾼 격자를 한 번에 만들고, 모델마다 한 번의 배치 예측으로
+반응 곡선(바꾼 값 -> 생존 확률 / 리그별 확률)을 돌려줍니다.
+
+- 격자: grid에 준 값들의 데카르트 곱 (마지막 피처가 가장 안쪽), 나머지 입력은 base 값 그대로
+- 파생 피처(activity_ratio, entry_gap 등)는 원본 피처를 바꾸면 격자마다 다시 계산
+- TreeEnsemble(tree_engine.py) 모델: 안쪽 피처 한 줄씩 행 구간을 트리에 내려보내는 predict_proba_path
+  (격자 점 수와 거의 무관, predict_proba와 같은 확률) / 그 밖의 모델: 격자 전체를 predict_proba 한 번
+
+사용 예시:
+    import sweeps
+    curve = sweeps.sweep(survival_model, survival_features, base_inputs, {
+        'war_frequency': ['always', 'never'],
+        'required_trophies': sweeps.value_range(0, 5500, integer=True),
+    })
+"""
+import numpy as np
+import pandas as pd
+
+from features import DERIVED_FEATURES
+
+DEFAULT_POINTS = 500
+
+
+def value_range(lower, upper, n=DEFAULT_POINTS, integer=False):
+    """[lower, upper]를 n개 점으로 (integer면 정수로 반올림 후 중복 제거)"""
+    values = np.linspace(lower, upper, n)
+    if integer:
+        values = np.unique(np.round(values).astype(np.int64))
+    return values
+
+
+def build_grid(base, grid):
+    """base 입력 + 격자 -> (격자 DataFrame, FeatureTransform에 넣을 컬럼 dict)
+
+    바꾸는 피처가 파생 피처의 원본이고 원본이 모두 있으면 base의 파생 값은 버리고 다시 계산하게 둡니다.
+    (리그 앱처럼 파생 값을 직접 입력하고 원본 일부가 없으면 입력한 값 그대로)
+    """
+    names = list(grid)
+    axes = [np.asarray(grid[name]) for name in names]
+    mesh = np.meshgrid(*axes, indexing='ij')
+    frame = pd.DataFrame({name: values.reshape(-1) for name, values in zip(names, mesh)})
+
+    n_rows = len(frame)
+    columns = {}
+    for name, value in base.items():
+        if name in grid:
+            continue
+        if name in DERIVED_FEATURES:
+            sources = DERIVED_FEATURES[name][0]
+            if any(src in grid for src in sources) and all(src in grid or src in base for src in sources):
+                continue
+        columns[name] = np.full(n_rows, value, dtype=object if isinstance(value, str) else None)
+    for name in names:
+        columns[name] = frame[name].to_numpy()
+    return frame, columns
+
+
+def predict_grid(model, X, block):
+    """격자 행렬 X (안쪽 피처 block개씩 한 줄) -> 확률 (PredictionCache면 감싼 모델로 바로 예측)"""
+    model = getattr(model, 'model', model)
+    if hasattr(model, 'predict_proba_path'):
+        try:
+            return np.concatenate([model.predict_proba_path(X[start:start + block])
+                                   for start in range(0, len(X), block)])
+        except ValueError:
+            pass  # 단조롭지 않은 줄 / 결측 -> 배치 예측
+    return model.predict_proba(X)
+
+
+def sweep(model, transform, base, grid, labels):
+    """반응 곡선 DataFrame: 격자 컬럼 + labels(모델 클래스 순서) 컬럼마다 확률"""
+    frame, columns = build_grid(base, grid)
+    X = transform.transform(columns)
+    proba = predict_grid(model, X, block=len(np.asarray(grid[list(grid)[-1]])))
+    for j, label in enumerate(labels):
+        frame[label] = proba[:, j]
+    return frame
+
+
+def survival_curve(model, transform, base, grid):
+    """생존 확률 곡선: 격자 컬럼 + survival_prob"""
+    curve = sweep(model, transform, base, grid, labels=['dead_prob', 'survival_prob'])
+    return curve.drop(columns='dead_prob')
+
+
+def league_curve(model, transform, league_encoder, base, grid):
+    """리그별 확률 곡선: 격자 컬럼 + 리그 이름 컬럼마다 확률"""
+    labels = list(league_encoder.inverse_transform(getattr(model, 'classes_', np.arange(len(league_encoder.classes_)))))
+    return sweep(model, transform, base, grid, labels=labels)
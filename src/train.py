@@ -0,0 +1,408 @@
+"""
+🏭 학습 파이프라인 (Training Pipeline)
+노트북(01_EDA_Model_A / 02_Modeling_Model_B)에서 셀을 직접 돌려 만들던 모델 파일을
+한 번에 다시 만드는 스크립트입니다.
+
+- 단계: ingest -> filter_ghosts -> features -> split -> train_survival / train_league / train_coaching -> export
+- 단계마다 결과를 작업 디렉토리(--work-dir)에 저장하고, 입력(원천 파일 / 파라미터 / 앞 단계)이
+  바뀌지 않은 단계는 다시 실행하지 않음
+- 세 앱이 로드하는 *.pkl 7개(artifacts.MODEL_FILES)를 모두 내보내고 단계별 소요 시간을 출력
+
+실행 방법: python src/train.py --csv coc_clans_dataset.csv --output .
+"""
+import argparse
+import hashlib
+import json
+import os
+import time
+
+import joblib
+import numpy as np
+import pandas as pd
+
+import artifacts
+import imbalance
+from feature_store import ensure_feature_store, is_fresh, load_active, read_manifest
+from features import COACHING_FEATURES, LEAGUE_FEATURES, SURVIVAL_FEATURES
+
+DEFAULT_WORK_DIR = 'train_work'
+MANIFEST_NAME = '_pipeline.json'
+# 단계 로직이 바뀌면 올려서 기존 체크포인트를 무효화
+PIPELINE_VERSION = 1
+RANDOM_STATE = 42
+TEST_SIZE = 0.2
+
+# ==========================================
+# 노트북 기준 설정
+# ==========================================
+# 리그 점수 (Unranked=0, Bronze III=1, ... Champion I=18)
+LEAGUE_MAP = {
+    'Unranked': 0,
+    'Bronze League III': 1, 'Bronze League II': 2, 'Bronze League I': 3,
+    'Silver League III': 4, 'Silver League II': 5, 'Silver League I': 6,
+    'Gold League III': 7, 'Gold League II': 8, 'Gold League I': 9,
+    'Crystal League III': 10, 'Crystal League II': 11, 'Crystal League I': 12,
+    'Master League III': 13, 'Master League II': 14, 'Master League I': 15,
+    'Champion League III': 16, 'Champion League II': 17, 'Champion League I': 18
+}
+# 6대 메이저 리그 (점수 3단계씩)
+TIER_ORDER = ['Bronze', 'Silver', 'Gold', 'Crystal', 'Master', 'Champion']
+
+# 노트북 01 Optuna 최적 파라미터 (+ scale_pos_weight는 학습 시 계산)
+SURVIVAL_PARAMS = {
+    'n_estimators': 284, 'max_depth': 8, 'learning_rate': 0.034635797945035546, 'num_leaves': 24,
+    'min_child_samples': 48, 'subsample': 0.6870293795389897, 'colsample_bytree': 0.9098475632145677,
+    'random_state': RANDOM_STATE, 'n_jobs': -1, 'verbose': -1
+}
+# 노트북 02 SMOTE + Optuna 최종 파라미터
+LEAGUE_PARAMS = {
+    'n_estimators': 566, 'max_depth': 8, 'learning_rate': 0.1385452234165401,
+    'subsample': 0.7166816400522009, 'colsample_bytree': 0.9004364146629167, 'verbose': -1
+}
+# 성장 코칭 모델 (Unranked 포함 7단계, 노트북에 최종 셀이 없어 리그 모델 설정을 그대로 사용)
+COACHING_PARAMS = dict(LEAGUE_PARAMS)
+
+
+def league_score(clan_war_league):
+    """clan_war_league 문자열 -> 리그 점수 0~18 (알 수 없는 값은 0)"""
+    return pd.Series(clan_war_league).astype(str).map(LEAGUE_MAP).fillna(0).astype(np.int8).to_numpy()
+
+
+def broad_tier(score):
+    """리그 점수 -> 0(Unranked) ~ 6(Champion) (노트북 simplify_league_broad)"""
+    return np.ceil(np.asarray(score) / 3).astype(np.int8)
+
+
+# ==========================================
+# 단계 실행 / 체크포인트
+# ==========================================
+def stage_key(name, params, upstream):
+    payload = json.dumps({'stage': name, 'version': PIPELINE_VERSION, 'params': params, 'upstream': upstream},
+                         sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:16]
+
+
+class Pipeline:
+    """단계별 체크포인트 관리
+
+    각 단계의 키 = (단계 이름, 파라미터, 앞 단계 키)의 해시.
+    매니페스트에 저장된 키가 같고 출력 파일이 모두 있으면 건너뜁니다.
+    """
+
+    def __init__(self, work_dir=DEFAULT_WORK_DIR, force=(), log=print):
+        self.work_dir = work_dir
+        self.force = set(force)
+        self.log = log
+        self.keys = {}
+        self.report = []
+        os.makedirs(work_dir, exist_ok=True)
+        self.manifest_path = os.path.join(work_dir, MANIFEST_NAME)
+        self.manifest = {}
+        if os.path.exists(self.manifest_path):
+            with open(self.manifest_path, encoding='utf-8') as f:
+                self.manifest = json.load(f)
+
+    def path(self, name):
+        return os.path.join(self.work_dir, name)
+
+    def _save_manifest(self):
+        with open(self.manifest_path, 'w', encoding='utf-8') as f:
+            json.dump(self.manifest, f, indent=2, ensure_ascii=False)
+
+    def run(self, name, func, outputs, params=None, upstream=(), fresh=None):
+        """func(*outputs) -> info dict 를 필요할 때만 실행
+
+        fresh: 출력 파일 외에 별도 최신 여부 확인이 필요한 단계용 콜백 (ingest)
+        """
+        key = stage_key(name, params, [self.keys[u] for u in upstream])
+        entry = self.manifest.get(name)
+        skip = (
+            name not in self.force
+            and all(u in self.keys and self.report_status(u) == '건너뜀' for u in upstream)
+            and entry is not None and entry['key'] == key
+            and all(os.path.exists(path) for path in outputs)
+            and (fresh is None or fresh())
+        )
+        self.keys[name] = key
+
+        if skip:
+            self.report.append({'stage': name, 'status': '건너뜀', 'seconds': 0.0, 'info': entry['info']})
+            self.log(f"⏭️ {name}: 변경 없음, 건너뜀")
+            return entry['info']
+
+        self.log(f"▶️ {name} 실행 중...")
+        start = time.perf_counter()
+        info = func(*outputs) or {}
+        seconds = time.perf_counter() - start
+        self.manifest[name] = {'key': key, 'seconds': round(seconds, 2), 'info': info,
+                               'finished_at': time.strftime('%Y-%m-%d %H:%M:%S')}
+        # 단계마다 저장 (중간에 실패해도 끝난 단계는 다음 실행에서 건너뜀)
+        self._save_manifest()
+        self.report.append({'stage': name, 'status': '실행', 'seconds': seconds, 'info': info})
+        return info
+
+    def report_status(self, name):
+        for row in self.report:
+            if row['stage'] == name:
+                return row['status']
+        return None
+
+    def print_report(self):
+        total = sum(row['seconds'] for row in self.report)
+        self.log("\n📋 단계별 소요 시간")
+        self.log(f"{'단계':<16}{'상태':<6}{'시간(초)':>10}  정보")
+        for row in self.report:
+            info = ', '.join(f"{k}={v}" for k, v in row['info'].items() if not isinstance(v, (dict, list)))
+            self.log(f"{row['stage']:<16}{row['status']:<6}{row['seconds']:>10.2f}  {info}")
+        self.log(f"{'합계':<16}{'':<6}{total:>10.2f}")
+
+
+# ==========================================
+# 단계 함수
+# ==========================================
+def run_ingest(csv_path, store_dir, chunksize=None):
+    """원천 CSV -> 파생변수 포함 Parquet 피처 스토어 (feature_store.py)"""
+    kwargs = {} if chunksize is None else {'chunksize': chunksize}
+    ensure_feature_store(csv_path, store_dir, **kwargs)
+    manifest = read_manifest(store_dir)
+    return {'rows': manifest['rows'], 'source_sha256': manifest['source_sha256'][:12]}
+
+
+def run_filter_ghosts(store_dir, out_path):
+    """유령 클랜 제외 (노트북 coc_df_active)"""
+    active = load_active(store_dir)
+    active.to_parquet(out_path, index=False)
+    return {'rows': len(active)}
+
+
+def run_features(active_path, out_path, encoder_path):
+    """타깃 / 인코딩 컬럼 생성 (노트북 01 is_retained, *_code / 노트북 02 league_score)"""
+    from sklearn.preprocessing import LabelEncoder
+
+    df = pd.read_parquet(active_path)
+    war_frequency_encoder = LabelEncoder().fit(df['war_frequency'].astype(str))
+    clan_type_encoder = LabelEncoder().fit(df['clan_type'].astype(str))
+
+    out = pd.DataFrame({
+        'war_frequency_code': war_frequency_encoder.transform(df['war_frequency'].astype(str)),
+        'clan_type_code': clan_type_encoder.transform(df['clan_type'].astype(str)),
+        'isFamilyFriendly': df['isFamilyFriendly'].astype(np.int8),
+        'is_retained': (df['clan_capital_points'] > 0).astype(np.int8),
+        'league_score': league_score(df['clan_war_league']),
+    })
+    columns = dict.fromkeys(SURVIVAL_FEATURES + LEAGUE_FEATURES + COACHING_FEATURES)
+    for name in columns:
+        if name not in out:
+            out[name] = df[name].to_numpy()
+    out = out[list(columns) + ['is_retained', 'league_score']]
+    out.to_parquet(out_path, index=False)
+    joblib.dump({'war_frequency_encoder': war_frequency_encoder, 'clan_type_encoder': clan_type_encoder},
+                encoder_path)
+    return {'rows': len(out), 'retained_rate': round(float(out['is_retained'].mean()), 4)}
+
+
+def run_split(features_path, out_path):
+    """모델별 학습/테스트 인덱스 (test_size=0.2, random_state=42, 층화)"""
+    from sklearn.model_selection import train_test_split
+
+    df = pd.read_parquet(features_path, columns=['is_retained', 'league_score'])
+    tier = broad_tier(df['league_score'].to_numpy())
+    rows = np.arange(len(df))
+    ranked = rows[tier > 0]  # 리그 모델은 Unranked 제외
+
+    splits = {}
+    for name, index, y in [
+        ('survival', rows, df['is_retained'].to_numpy()),
+        ('league', ranked, tier[ranked]),
+        ('coaching', rows, tier),
+    ]:
+        train, test = train_test_split(index, test_size=TEST_SIZE, random_state=RANDOM_STATE, stratify=y)
+        splits[f'{name}_train'] = np.sort(train)
+        splits[f'{name}_test'] = np.sort(test)
+    np.savez(out_path, **splits)
+    return {name: len(index) for name, index in splits.items() if name.endswith('_train')}
+
+
+def _load_split(features_path, split_path, name, columns):
+    df = pd.read_parquet(features_path, columns=list(dict.fromkeys(columns + ['is_retained', 'league_score'])))
+    split = np.load(split_path)
+    return df.iloc[split[f'{name}_train']], df.iloc[split[f'{name}_test']]
+
+
+def run_train_survival(features_path, split_path, model_path, params):
+    """모델 A: 클랜 생존 예측 (LightGBM + scale_pos_weight)"""
+    from lightgbm import LGBMClassifier
+    from sklearn.metrics import accuracy_score, f1_score, precision_score, recall_score, roc_auc_score
+
+    train, test = _load_split(features_path, split_path, 'survival', SURVIVAL_FEATURES)
+    y_train, y_test = train['is_retained'].to_numpy(), test['is_retained'].to_numpy()
+    pos_weight = float((y_train == 0).sum() / max((y_train == 1).sum(), 1))
+
+    model = LGBMClassifier(**params, scale_pos_weight=pos_weight)
+    model.fit(train[SURVIVAL_FEATURES], y_train)
+    joblib.dump(model, model_path)
+
+    proba = model.predict_proba(test[SURVIVAL_FEATURES])[:, 1]
+    pred = (proba >= 0.5).astype(int)
+    return {
+        'auc': round(float(roc_auc_score(y_test, proba)), 4),
+        'accuracy': round(float(accuracy_score(y_test, pred)), 4),
+        'precision': round(float(precision_score(y_test, pred, zero_division=0)), 4),
+        'recall': round(float(recall_score(y_test, pred, zero_division=0)), 4),
+        'f1': round(float(f1_score(y_test, pred, zero_division=0)), 4),
+    }
+
+
+def run_train_league(features_path, split_path, model_path, params, balance):
+    """모델 B: 6대 메이저 리그 예측 + 라벨 인코더 + 티어별 평균값(tier_standards)"""
+    from sklearn.preprocessing import LabelEncoder
+
+    train, test = _load_split(features_path, split_path, 'league', LEAGUE_FEATURES)
+    names = np.array([''] + TIER_ORDER)
+    tier_train = names[broad_tier(train['league_score'].to_numpy())]
+    tier_test = names[broad_tier(test['league_score'].to_numpy())]
+
+    label_encoder = LabelEncoder().fit(np.concatenate([tier_train, tier_test]))
+    y_train, y_test = label_encoder.transform(tier_train), label_encoder.transform(tier_test)
+    model = imbalance.fit_lightgbm(train[LEAGUE_FEATURES], y_train, params, balance, RANDOM_STATE)
+
+    # 티어 기준값은 학습/테스트 전체(노트북 df_clean) 평균
+    ranked = pd.concat([train, test])
+    tier_standards = ranked.groupby(np.concatenate([tier_train, tier_test]))[LEAGUE_FEATURES].mean()
+    joblib.dump({'model': model, 'label_encoder': label_encoder, 'tier_standards': tier_standards}, model_path)
+
+    pred = label_encoder.inverse_transform(model.predict(test[LEAGUE_FEATURES]))
+    rank = {name: i for i, name in enumerate(TIER_ORDER)}
+    gap = np.abs(np.array([rank[t] for t in pred]) - np.array([rank[t] for t in tier_test]))
+    return {
+        'balance': balance,
+        'accuracy': round(float((gap == 0).mean()), 4),
+        'within_1_tier': round(float((gap <= 1).mean()), 4),
+    }
+
+
+def run_train_coaching(features_path, split_path, model_path, params, balance):
+    """성장 코칭 모델: Unranked(0) ~ Champion(6) 7단계 예측"""
+    train, test = _load_split(features_path, split_path, 'coaching', COACHING_FEATURES)
+    y_train = broad_tier(train['league_score'].to_numpy())
+    y_test = broad_tier(test['league_score'].to_numpy())
+    model = imbalance.fit_lightgbm(train[COACHING_FEATURES], y_train, params, balance, RANDOM_STATE)
+    joblib.dump(model, model_path)
+
+    gap = np.abs(model.predict(test[COACHING_FEATURES]) - y_test)
+    return {
+        'balance': balance,
+        'accuracy': round(float((gap == 0).mean()), 4),
+        'within_1_tier': round(float((gap <= 1).mean()), 4),
+    }
+
+
+def run_export(encoder_path, survival_path, league_path, coaching_path, output_dir, native=False):
+    """앱이 로드하는 *.pkl 7개 저장 (artifacts.MODEL_FILES 이름 그대로)"""
+    os.makedirs(output_dir, exist_ok=True)
+    encoders = joblib.load(encoder_path)
+    league = joblib.load(league_path)
+    objects = {
+        'survival_model': joblib.load(survival_path),
+        'war_frequency_encoder': encoders['war_frequency_encoder'],
+        'clan_type_encoder': encoders['clan_type_encoder'],
+        'league_model': league['model'],
+        'league_encoder': league['label_encoder'],
+        'tier_standards': league['tier_standards'],
+        'coaching_model': joblib.load(coaching_path),
+    }
+    for key, obj in objects.items():
+        joblib.dump(obj, artifacts.artifact_path(key, output_dir))
+    # 네이티브 부스터 / 트리 엔진 배열도 함께 (앱은 compiled=True로 로드)
+    if native:
+        for key in artifacts.TREE_MODELS:
+            artifacts.export_native(key, output_dir)
+    return {'files': len(objects), 'native': native}
+
+
+# ==========================================
+# 파이프라인 구성
+# ==========================================
+def prepare_data(csv_path, work_dir=DEFAULT_WORK_DIR, force=(), chunksize=None, log=print):
+    """ingest ~ split 단계만 실행 (튜닝 등에서 features.parquet / split.npz를 재사용)"""
+    pipe = Pipeline(work_dir, force=force, log=log)
+    store_dir = pipe.path('feature_store')
+    active_path = pipe.path('active.parquet')
+    features_path = pipe.path('features.parquet')
+
+    pipe.run('ingest', lambda manifest: run_ingest(csv_path, store_dir, chunksize),
+             [os.path.join(store_dir, '_manifest.json')], params={'csv': os.path.abspath(csv_path)},
+             fresh=lambda: is_fresh(csv_path, store_dir))
+    pipe.run('filter_ghosts', lambda out: run_filter_ghosts(store_dir, out), [active_path], upstream=['ingest'])
+    pipe.run('features', lambda out, enc: run_features(active_path, out, enc),
+             [features_path, pipe.path('encoders.joblib')], upstream=['filter_ghosts'])
+    pipe.run('split', lambda out: run_split(features_path, out), [pipe.path('split.npz')],
+             params={'test_size': TEST_SIZE, 'random_state': RANDOM_STATE}, upstream=['features'])
+    return pipe
+
+
+def train_pipeline(csv_path, output_dir='.', work_dir=DEFAULT_WORK_DIR, balance=None, native=False,
+                   force=(), chunksize=None, league_params=None, log=print):
+    """전체 파이프라인 실행 후 Pipeline(report 포함) 반환
+
+    league_params: 리그 모델 파라미터 (기본 LEAGUE_PARAMS, tuning.py 결과를 넘길 수 있음)
+    """
+    balance = balance or imbalance.DEFAULT_STRATEGY
+    league_params = league_params or LEAGUE_PARAMS
+
+    pipe = prepare_data(csv_path, work_dir, force, chunksize, log)
+    features_path = pipe.path('features.parquet')
+    encoder_path = pipe.path('encoders.joblib')
+    split_path = pipe.path('split.npz')
+    survival_path = pipe.path('survival_model.joblib')
+    league_path = pipe.path('league_model.joblib')
+    coaching_path = pipe.path('coaching_model.joblib')
+    exported = [artifacts.artifact_path(key, output_dir) for key in artifacts.MODEL_FILES]
+
+    pipe.run('train_survival', lambda out: run_train_survival(features_path, split_path, out, SURVIVAL_PARAMS),
+             [survival_path], params=SURVIVAL_PARAMS, upstream=['split'])
+    pipe.run('train_league', lambda out: run_train_league(features_path, split_path, out, league_params, balance),
+             [league_path], params={'model': league_params, 'balance': balance}, upstream=['split'])
+    pipe.run('train_coaching',
+             lambda out: run_train_coaching(features_path, split_path, out, COACHING_PARAMS, balance),
+             [coaching_path], params={'model': COACHING_PARAMS, 'balance': balance}, upstream=['split'])
+    pipe.run('export',
+             lambda *paths: run_export(encoder_path, survival_path, league_path, coaching_path, output_dir, native),
+             exported, params={'output': os.path.abspath(output_dir), 'native': native},
+             upstream=['features', 'train_survival', 'train_league', 'train_coaching'])
+    return pipe
+
+
+STAGES = ['ingest', 'filter_ghosts', 'features', 'split', 'train_survival', 'train_league', 'train_coaching', 'export']
+
+
+def main():
+    parser = argparse.ArgumentParser(description='원천 CSV -> 앱용 모델 파일(*.pkl) 학습 파이프라인')
+    parser.add_argument('--csv', default='coc_clans_dataset.csv', help='원천 CSV 경로')
+    parser.add_argument('--output', default='.', help='*.pkl을 저장할 모델 디렉토리')
+    parser.add_argument('--work-dir', default=DEFAULT_WORK_DIR, help='단계별 체크포인트 디렉토리')
+    parser.add_argument('--balance', choices=imbalance.STRATEGIES, default=imbalance.DEFAULT_STRATEGY,
+                        help='리그/코칭 모델 불균형 보정 (imbalance.py 참고, smote는 imbalanced-learn 필요)')
+    parser.add_argument('--native', action='store_true', help='네이티브 부스터 / 트리 엔진 파일도 함께 내보내기')
+    parser.add_argument('--force', nargs='+', default=[], choices=STAGES, help='변경이 없어도 다시 실행할 단계')
+    parser.add_argument('--chunksize', type=int, default=None, help='CSV 청크 크기')
+    parser.add_argument('--league-params', default=None, help='리그 모델 파라미터 JSON (tuning.py --output 결과)')
+    args = parser.parse_args()
+
+    league_params = None
+    if args.league_params:
+        with open(args.league_params, encoding='utf-8') as f:
+            league_params = json.load(f)
+
+    pipe = train_pipeline(args.csv, args.output, args.work_dir, args.balance, args.native,
+                          args.force, args.chunksize, league_params)
+    pipe.print_report()
+
+    for name in ['train_survival', 'train_league', 'train_coaching']:
+        metrics = pipe.manifest[name]['info']
+        print(f"📈 {name}: " + ', '.join(f"{k}={v}" for k, v in metrics.items()))
+    print(f"✅ 모델 파일 저장 위치: {os.path.abspath(args.output)}")
+
+
+if __name__ == '__main__':
+    main()
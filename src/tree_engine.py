@@ -0,0 +1,465 @@
+"""
+🌲 트리 추론 엔진 (Tree Inference Engine)
+학습된 LightGBM / XGBoost 트리를 NumPy 노드 배열(feature, threshold, left, right, leaf value)로
+펼쳐 두고, 배치 전체 x 모든 트리를 한 번에 벡터 연산으로 따라 내려가며 예측합니다.
+sklearn 래퍼의 입력 검증 / Dataset(DMatrix) 생성을 거치지 않아 한 건 예측이 빠릅니다.
+
+원본 모델과 같은 결과를 내도록 각 라이브러리의 규칙을 그대로 따릅니다.
+- LightGBM: double 비교 `x <= threshold`, missing_type(None/Zero/NaN) + default_left, 트리 순서대로 double 누적
+- XGBoost:  float32 비교 `x < split_condition`, NaN은 default_left, base_margin에서 시작해 float32 누적
+
+what-if 스윕처럼 행마다 열 값이 단조롭게 변하는 입력(predict_proba_path)은 행 하나씩이 아니라
+행 구간을 트리에 내려보내, 격자 점 수와 거의 무관한 시간에 같은 확률을 계산합니다.
+
+사용 예시:
+    from tree_engine import TreeEnsemble
+    engine = TreeEnsemble.from_model(league_model)
+    proba = engine.predict_proba(X_input)
+    curve = engine.predict_proba_path(X_sweep)  # 열마다 증가 또는 감소하는 행렬
+"""
+import ctypes
+import ctypes.util
+import json
+import math
+import warnings
+
+import numpy as np
+
+# 한 번에 처리하는 (행 x 트리) 원소 수 상한 (메모리 사용량 조절)
+CHUNK_ELEMENTS = 1 << 20
+
+# LightGBM missing_type
+_MISSING_NONE, _MISSING_ZERO, _MISSING_NAN = 0, 1, 2
+_LGB_MISSING_TYPES = {'None': _MISSING_NONE, 'Zero': _MISSING_ZERO, 'NaN': _MISSING_NAN}
+# LightGBM kZeroThreshold (1e-35f, float 리터럴의 double 값)
+ZERO_THRESHOLD = float(np.float32(1e-35))
+
+# np.exp(SIMD)는 libm exp/expf와 마지막 비트가 다를 수 있어, 확률 변환은 라이브러리와 같은 libm 함수 사용
+# (LightGBM: double exp, XGBoost: float expf)
+_libm_exp = np.frompyfunc(math.exp, 1, 1)
+try:
+    _libm = ctypes.CDLL(ctypes.util.find_library('m') or 'libm.so.6')
+    _libm.expf.restype = ctypes.c_float
+    _libm.expf.argtypes = [ctypes.c_float]
+    _libm_expf = np.frompyfunc(_libm.expf, 1, 1)
+except (OSError, AttributeError):
+    _libm_expf = None  # libm이 없으면 double exp 후 float 반올림 (드물게 1ulp 차이)
+
+
+def _exp(x, dtype):
+    if dtype == np.float32 and _libm_expf is not None:
+        return _libm_expf(x.astype(np.float32)).astype(np.float32)
+    return _libm_exp(x.astype(np.float64)).astype(dtype)
+
+
+class _NodeBuilder:
+    """트리 여러 개를 하나의 평평한 배열로 모으기
+
+    분기 노드 번호는 0 이상, 리프는 LightGBM처럼 ~리프번호(음수)로 표시합니다.
+    children[2 * i], children[2 * i + 1]이 분기 노드 i의 왼쪽 / 오른쪽 자식입니다.
+    """
+
+    def __init__(self):
+        self.feature, self.threshold, self.children = [], [], []
+        self.default_left, self.missing_type, self.leaf_value = [], [], []
+        self.roots, self.max_depth = [], 0
+
+    def add_split(self, feature, threshold, default_left=False, missing_type=_MISSING_NONE):
+        index = len(self.feature)
+        self.feature.append(feature)
+        self.threshold.append(threshold)
+        self.children.extend((0, 0))
+        self.default_left.append(default_left)
+        self.missing_type.append(missing_type)
+        return index
+
+    def add_leaf(self, value):
+        self.leaf_value.append(value)
+        return ~(len(self.leaf_value) - 1)
+
+    def set_children(self, index, left, right):
+        self.children[2 * index] = left
+        self.children[2 * index + 1] = right
+
+    def arrays(self, threshold_dtype, value_dtype):
+        return {
+            'feature': np.asarray(self.feature, dtype=np.int64),
+            'threshold': np.asarray(self.threshold, dtype=threshold_dtype),
+            'children': np.asarray(self.children, dtype=np.int32),
+            'default_left': np.asarray(self.default_left, dtype=bool),
+            'missing_type': np.asarray(self.missing_type, dtype=np.uint8),
+            'leaf_value': np.asarray(self.leaf_value, dtype=value_dtype),
+            'roots': np.asarray(self.roots, dtype=np.int32),
+        }
+
+
+class TreeEnsemble:
+    """펼친 트리 앙상블 (predict_raw / predict_proba / predict)
+
+    - library: 'lightgbm' / 'xgboost' (분기 규칙과 누적 dtype이 다름)
+    - objective: 'binary' / 'multiclass' / 'regression'
+    - 트리 t는 클래스 t % n_outputs의 점수에 더해짐
+    """
+
+    def __init__(self, library, objective, n_features, n_outputs, nodes, classes=None,
+                 sigmoid=1.0, base_margin=None, max_depth=0):
+        self.library = library
+        self.objective = objective
+        self.n_features = n_features
+        self.n_outputs = n_outputs
+        self.sigmoid = sigmoid
+        self.max_depth = max_depth
+        self.classes_ = np.asarray(classes) if classes is not None else None
+        for name, array in nodes.items():
+            setattr(self, name, array)
+        self.n_trees = len(self.roots)
+        self.dtype = np.float64 if library == 'lightgbm' else np.float32
+        self.base_margin = np.zeros(n_outputs, dtype=self.dtype) if base_margin is None \
+            else np.array(base_margin, dtype=self.dtype)
+        self.has_zero_missing = bool((self.missing_type == _MISSING_ZERO).any())
+
+    def __repr__(self):
+        return (f"TreeEnsemble({self.library}, {self.objective}, trees={self.n_trees}, "
+                f"splits={len(self.feature)}, leaves={len(self.leaf_value)}, max_depth={self.max_depth})")
+
+    # ==========================================
+    # 모델 -> 노드 배열
+    # ==========================================
+    @classmethod
+    def from_model(cls, model):
+        """LGBMClassifier / lgb.Booster / XGBClassifier / xgb.Booster / artifacts.NativeClassifier"""
+        classes = getattr(model, 'classes_', None)
+        booster = getattr(model, 'booster', None) or model
+        if hasattr(model, 'booster_'):
+            booster = model.booster_
+        elif hasattr(model, 'get_booster'):
+            booster = model.get_booster()
+
+        if hasattr(booster, 'save_raw'):  # xgb.Booster (dump_model도 있으므로 먼저 확인)
+            return cls.from_xgboost(booster, classes)
+        if hasattr(booster, 'dump_model'):
+            return cls.from_lightgbm(booster, classes)
+        raise TypeError(f"지원하지 않는 모델입니다: {type(model).__name__}")
+
+    @classmethod
+    def from_lightgbm(cls, booster, classes=None):
+        dump = booster.dump_model()
+        objective = dump.get('objective', 'regression').split()
+        params = dict(item.split(':', 1) for item in objective[1:] if ':' in item)
+        name = objective[0]
+        if name == 'binary':
+            kind, sigmoid = 'binary', float(params.get('sigmoid', 1.0))
+        elif name in ('multiclass', 'softmax'):
+            kind, sigmoid = 'multiclass', 1.0
+        elif name in ('regression', 'regression_l2', 'l2', 'regression_l1', 'l1', 'huber', 'fair', 'quantile'):
+            kind, sigmoid = 'regression', 1.0
+        else:
+            raise NotImplementedError(f"지원하지 않는 LightGBM objective: {name}")
+
+        builder = _NodeBuilder()
+
+        def walk(node, depth):
+            builder.max_depth = max(builder.max_depth, depth)
+            if 'leaf_value' in node:
+                return builder.add_leaf(float(node['leaf_value']))
+            if node['decision_type'] != '<=':
+                raise NotImplementedError("범주형 분기(==)는 지원하지 않습니다.")
+            index = builder.add_split(
+                feature=int(node['split_feature']),
+                threshold=float(node['threshold']),
+                default_left=bool(node['default_left']),
+                missing_type=_LGB_MISSING_TYPES[node.get('missing_type', 'None')],
+            )
+            builder.set_children(index, walk(node['left_child'], depth + 1), walk(node['right_child'], depth + 1))
+            return index
+
+        for tree in dump['tree_info']:
+            builder.roots.append(walk(tree['tree_structure'], 0))
+
+        return cls('lightgbm', kind, dump['max_feature_idx'] + 1, dump['num_tree_per_iteration'],
+                   builder.arrays(np.float64, np.float64), classes=classes, sigmoid=sigmoid,
+                   max_depth=builder.max_depth)
+
+    @classmethod
+    def from_xgboost(cls, booster, classes=None):
+        config = json.loads(booster.save_raw('json'))['learner']
+        objective = config['objective']['name']
+        model = config['gradient_booster']['model']
+        if config['gradient_booster']['name'] != 'gbtree':
+            raise NotImplementedError("gbtree 부스터만 지원합니다.")
+
+        n_outputs = max(1, int(config['learner_model_param'].get('num_class', '0')))
+        base_score = np.atleast_1d(json.loads(config['learner_model_param']['base_score'].replace('E', 'e')))
+        base_score = np.asarray(base_score, dtype=np.float32)
+        if objective in ('binary:logistic', 'reg:logistic'):
+            kind = 'binary'
+            base_margin = -np.log(np.float32(1) / base_score - np.float32(1))  # XGBoost ProbToMargin (float32)
+        elif objective in ('multi:softprob', 'multi:softmax'):
+            kind = 'multiclass'
+            base_margin = np.broadcast_to(base_score, n_outputs)
+        elif objective.startswith('reg:'):
+            kind, base_margin = 'regression', base_score
+        else:
+            raise NotImplementedError(f"지원하지 않는 XGBoost objective: {objective}")
+
+        builder = _NodeBuilder()
+        tree_info = model['tree_info']
+        for tree in model['trees']:
+            left = tree['left_children']
+            right = tree['right_children']
+            ids = []
+            for i in range(len(left)):
+                if left[i] == -1:
+                    ids.append(builder.add_leaf(tree['split_conditions'][i]))
+                else:
+                    ids.append(builder.add_split(
+                        feature=tree['split_indices'][i],
+                        threshold=tree['split_conditions'][i],
+                        default_left=bool(tree['default_left'][i]),
+                        missing_type=_MISSING_NAN,
+                    ))
+            depth = np.zeros(len(left), dtype=np.int32)
+            for i in range(len(left)):
+                if left[i] != -1:
+                    builder.set_children(ids[i], ids[left[i]], ids[right[i]])
+                    depth[left[i]] = depth[right[i]] = depth[i] + 1
+            builder.max_depth = max(builder.max_depth, int(depth.max()))
+            builder.roots.append(ids[0])
+
+        # 트리 순서가 클래스 순서(0, 1, ..., K-1, 0, 1, ...)와 같아야 트리 t -> 클래스 t % K로 누적 가능
+        if list(tree_info) != [t % n_outputs for t in range(len(tree_info))]:
+            raise NotImplementedError("트리-클래스 배치가 표준 순서가 아닙니다.")
+
+        n_features = int(config['learner_model_param']['num_feature'])
+        ensemble = cls('xgboost', kind, n_features, n_outputs, builder.arrays(np.float32, np.float32),
+                       classes=classes, base_margin=base_margin, max_depth=builder.max_depth)
+        ensemble._match_base_margin(booster)
+        return ensemble
+
+    def _match_base_margin(self, booster, n_probe=2048, max_ulps=64):
+        """XGBoost JSON의 base_score는 유효숫자 4자리라 메모리 속 값과 마지막 비트가 다를 수 있음
+
+        검증 입력(probe_inputs)에 대한 원본 margin 예측을 그대로 재현하는 float32 값으로 base_margin을 보정합니다.
+        (표본이 적으면 1ulp 옆 값도 우연히 모두 맞을 수 있어 수천 행으로 확인)
+        """
+        probe = self.probe_inputs(n_probe)
+        target = np.asarray(booster.inplace_predict(probe, predict_type='margin'), dtype=np.float32)
+        target = target.reshape(n_probe, self.n_outputs)
+        values = self.leaf_value[~self._leaves(probe)].reshape(n_probe, -1, self.n_outputs)
+
+        for k in range(self.n_outputs):
+            below, above = [self.base_margin[k]], [self.base_margin[k]]
+            for _ in range(max_ulps):
+                below.append(np.nextafter(below[-1], np.float32(-np.inf)))
+                above.append(np.nextafter(above[-1], np.float32(np.inf)))
+            # 원래 값에서 가까운 순서로 후보 검사
+            for candidate in [value for pair in zip(below, above) for value in pair]:
+                start = np.full((n_probe, 1), candidate, dtype=np.float32)
+                total = np.cumsum(np.concatenate([start, values[:, :, k]], axis=1), axis=1, dtype=np.float32)[:, -1]
+                if np.array_equal(total, target[:, k]):
+                    self.base_margin[k] = candidate
+                    break
+            else:
+                warnings.warn(f"출력 {k}: ±{max_ulps}ulp 안에서 원본 margin을 재현하는 base_margin을 찾지 못했습니다. "
+                              "엔진 예측이 원본과 비트 단위로 같지 않을 수 있습니다.", RuntimeWarning)
+
+    def probe_inputs(self, n_rows=4096, seed=0):
+        """분기 threshold(와 바로 위/아래 값), 무작위 값, 0, NaN을 섞은 검증 입력 (n_rows, n_features) float32
+
+        학습 데이터 없이도 분기 경계 비교(<= / <, double / float32)와 결측 처리를 거치게 합니다.
+        """
+        rng = np.random.default_rng(seed)
+        X = (rng.standard_normal((n_rows, self.n_features))
+             * rng.choice([1.0, 100.0, 10000.0], (n_rows, self.n_features))).astype(np.float32)
+        for j in range(self.n_features):
+            with np.errstate(over='ignore'):
+                thresholds = self.threshold[self.feature == j].astype(np.float32)
+            edges = np.concatenate([thresholds, np.nextafter(thresholds, np.float32(-np.inf)),
+                                    np.nextafter(thresholds, np.float32(np.inf))])
+            edges = edges[np.isfinite(edges)]
+            if not len(edges):
+                continue
+            on_edge = rng.random(n_rows) < 0.7
+            X[on_edge, j] = rng.choice(edges, int(on_edge.sum()))
+        X[rng.random(X.shape) < 0.02] = 0.0
+        X[rng.random(X.shape) < 0.02] = np.nan
+        return X
+
+    # ==========================================
+    # 저장 / 로드 (.npz, 변환 없이 바로 사용)
+    # ==========================================
+    _META = ('library', 'objective', 'n_features', 'n_outputs', 'sigmoid', 'max_depth')
+    _ARRAYS = ('feature', 'threshold', 'children', 'default_left', 'missing_type', 'leaf_value', 'roots')
+
+    def save(self, path):
+        meta = {name: getattr(self, name) for name in self._META}
+        arrays = {name: getattr(self, name) for name in self._ARRAYS}
+        if self.classes_ is not None:
+            arrays['classes'] = self.classes_
+        with open(path, 'wb') as f:
+            np.savez(f, meta=np.asarray(json.dumps(meta)), base_margin=self.base_margin, **arrays)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as data:
+            meta = json.loads(str(data['meta']))
+            nodes = {name: data[name] for name in cls._ARRAYS}
+            classes = data['classes'] if 'classes' in data else None
+            base_margin = data['base_margin']
+        return cls(meta['library'], meta['objective'], meta['n_features'], meta['n_outputs'], nodes,
+                   classes=classes, sigmoid=meta['sigmoid'], base_margin=base_margin, max_depth=meta['max_depth'])
+
+    # ==========================================
+    # 추론
+    # ==========================================
+    def _leaves(self, X):
+        """(n_rows, n_trees) 도달한 리프 (~리프번호)
+
+        (행, 트리) 쌍을 평평하게 펼쳐 한 단계씩 내려가고, 리프에 도달한 쌍은 다음 단계에서 제외합니다.
+        """
+        n_rows, n_features = X.shape
+        node = np.repeat(self.roots, n_rows)  # 트리 순서로 펼쳐 같은 트리의 노드를 연달아 읽음 (캐시 효율)
+        X_flat = X.reshape(-1)
+        lightgbm = self.library == 'lightgbm'
+        check_missing = bool(np.isnan(X).any()) or (lightgbm and self.has_zero_missing)
+
+        active = np.flatnonzero(node >= 0)
+        while active.size:
+            current = node[active]
+            fval = X_flat[(active % n_rows) * n_features + self.feature[current]]
+            threshold = self.threshold[current]
+            go_left = fval <= threshold if lightgbm else fval < threshold
+            if check_missing:
+                go_left = self._missing_left(current, fval, go_left)
+            current = self.children[2 * current + ~go_left]
+            node[active] = current
+            active = active[current >= 0]
+        return node.reshape(self.n_trees, n_rows).T
+
+    def _missing_left(self, current, fval, go_left):
+        """결측값 분기 (LightGBM missing_type / XGBoost NaN -> default_left)"""
+        nan = np.isnan(fval)
+        if self.library != 'lightgbm':
+            return np.where(nan, self.default_left[current], go_left)
+        missing_type = self.missing_type[current]
+        # missing_type이 NaN이 아니면 NaN을 0으로 보고 비교
+        fval = np.where(nan & (missing_type != _MISSING_NAN), 0.0, fval)
+        is_missing = (((missing_type == _MISSING_ZERO) & (np.abs(fval) <= ZERO_THRESHOLD))
+                      | ((missing_type == _MISSING_NAN) & nan))
+        return np.where(is_missing, self.default_left[current], fval <= self.threshold[current])
+
+    def _input(self, X):
+        """(n_rows, n_features) 연속 배열 (LightGBM은 |x| <= kZeroThreshold를 0으로 바꾼 뒤 예측하므로 똑같이)"""
+        X = np.asarray(X)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        if X.shape[1] != self.n_features:
+            raise ValueError(f"피처 수가 다릅니다: 입력 {X.shape[1]}개, 모델 {self.n_features}개")
+        X = np.ascontiguousarray(X, dtype=self.dtype)
+        if self.library == 'lightgbm':
+            tiny = (np.abs(X) <= ZERO_THRESHOLD) & (X != 0)
+            if tiny.any():
+                X = np.where(tiny, 0.0, X)
+        return X
+
+    def predict_raw(self, X):
+        """트리 점수 합 (n_rows, n_outputs) - 트리 순서대로 누적해 원본과 같은 반올림"""
+        X = self._input(X)
+
+        out = np.empty((len(X), self.n_outputs), dtype=self.dtype)
+        step = max(1, CHUNK_ELEMENTS // max(self.n_trees, 1))
+        n_iterations = self.n_trees // self.n_outputs
+        for start in range(0, len(X), step):
+            chunk = X[start:start + step]
+            values = self.leaf_value[~self._leaves(chunk)].reshape(len(chunk), n_iterations, self.n_outputs)
+            # (base_margin, 트리1, 트리2, ...) 순서의 순차 누적 = 라이브러리의 out += leaf 루프
+            values = np.concatenate([np.broadcast_to(self.base_margin, (len(chunk), 1, self.n_outputs)), values], axis=1)
+            out[start:start + step] = np.cumsum(values, axis=1, dtype=self.dtype)[:, -1]
+        return out
+
+    # ==========================================
+    # 경로 추론 (열마다 단조로운 행들, what-if 스윕)
+    # ==========================================
+    def _path_leaves(self, X):
+        """행마다 각 열이 증가(또는 감소)하는 X -> 트리마다 도달하는 (트리, 리프, 행 구간 [lo, hi))
+
+        분기 하나가 가르는 행은 단조 열에서 항상 앞쪽 / 뒤쪽 구간이므로, (트리, 노드, 구간)을 한 단계씩 내려가며
+        분기 피처가 구간 안에서 바뀌는 곳에서만 구간을 둘로 나눕니다.
+        """
+        n_rows, n_features = X.shape
+        lightgbm = self.library == 'lightgbm'
+        diffs = np.diff(X, axis=0)
+        increasing = (diffs >= 0).all(axis=0)
+        if not (increasing | (diffs <= 0).all(axis=0)).all():
+            raise ValueError("열마다 값이 증가 또는 감소해야 합니다.")
+        if np.isnan(X).any() or (lightgbm and self.has_zero_missing and (np.abs(X) <= ZERO_THRESHOLD).any()):
+            raise ValueError("결측값(또는 0 결측)이 있는 입력은 predict_proba를 사용하세요.")
+        # 오름차순으로 놓은 열 (감소 열은 뒤집음) -> 왼쪽으로 가는 행 수 = searchsorted
+        columns = [X[:, j] if increasing[j] else X[::-1, j] for j in range(n_features)]
+        side = 'right' if lightgbm else 'left'
+
+        node = self.roots.astype(np.int64)
+        tree = np.arange(self.n_trees)
+        lo = np.zeros(self.n_trees, dtype=np.int64)
+        hi = np.full(self.n_trees, n_rows, dtype=np.int64)
+        found = []
+        while node.size:
+            leaf = node < 0
+            if leaf.any():
+                found.append((tree[leaf], ~node[leaf], lo[leaf], hi[leaf]))
+                node, tree, lo, hi = node[~leaf], tree[~leaf], lo[~leaf], hi[~leaf]
+            if not node.size:
+                break
+            feature = self.feature[node]
+            split = np.empty_like(lo)
+            for j in np.unique(feature):
+                mask = feature == j
+                n_left = np.searchsorted(columns[j], self.threshold[node[mask]], side=side)
+                split[mask] = n_left if increasing[j] else n_rows - n_left
+            split = np.clip(split, lo, hi)
+            # 증가 열: 왼쪽 = [lo, split), 감소 열: 왼쪽 = [split, hi)
+            up = increasing[feature]
+            node = np.concatenate([self.children[2 * node], self.children[2 * node + 1]])
+            tree = np.concatenate([tree, tree])
+            lo, hi = (np.concatenate([np.where(up, lo, split), np.where(up, split, lo)]),
+                      np.concatenate([np.where(up, split, hi), np.where(up, hi, split)]))
+            keep = lo < hi
+            node, tree, lo, hi = node[keep], tree[keep], lo[keep], hi[keep]
+        return [np.concatenate(parts) for parts in zip(*found)]
+
+    def predict_raw_path(self, X):
+        """열마다 단조로운 X의 트리 점수 합 (predict_raw와 합산 순서만 달라 LightGBM ~1e-15, XGBoost float32 1ulp 차이)"""
+        X = self._input(X)
+
+        tree, leaf, lo, hi = self._path_leaves(X)
+        output = tree % self.n_outputs
+        value = self.leaf_value[leaf].astype(np.float64)
+        # 리프 값을 행 구간에 더하기: 구간 시작에 +, 끝에 - 를 찍고 누적합
+        diff = np.zeros((len(X) + 1, self.n_outputs))
+        np.add.at(diff, (lo, output), value)
+        np.add.at(diff, (hi, output), -value)
+        return (np.cumsum(diff, axis=0)[:-1] + self.base_margin).astype(self.dtype)
+
+    def predict_proba_path(self, X):
+        return self._proba(self.predict_raw_path(X))
+
+    def predict_proba(self, X):
+        return self._proba(self.predict_raw(X))
+
+    def _proba(self, raw):
+        if self.objective == 'binary':
+            one = self.dtype(1)
+            p = one / (one + _exp(-self.dtype(self.sigmoid) * raw[:, 0], self.dtype))
+            return np.column_stack([one - p, p])
+        if self.objective == 'multiclass':
+            # 행마다 최댓값을 빼고 exp -> 클래스 순서대로 double 합 -> 나누기 (두 라이브러리 공통)
+            exp = _exp(raw - raw.max(axis=1, keepdims=True), self.dtype)
+            total = np.cumsum(exp, axis=1, dtype=np.float64)[:, -1:].astype(self.dtype)
+            return exp / total
+        raise ValueError("회귀 모델은 predict_raw를 사용하세요.")
+
+    def predict(self, X):
+        if self.objective == 'regression':
+            return self.predict_raw(X)[:, 0]
+        index = self.predict_proba(X).argmax(axis=1)
+        return self.classes_[index] if self.classes_ is not None else index
@@ -0,0 +1,342 @@
+"""
+🎛️ 리그 모델 하이퍼파라미터 튜닝 (League Model Tuning)
+노트북 02에서 전체 데이터로 한 trial씩 순서대로 돌리던 Optuna 튜닝을 병렬 + 조기 중단 방식으로 바꿉니다.
+
+- 여러 프로세스가 같은 스터디 저장소(로컬 파일)를 공유하며 trial을 나눠 실행, 중단 후 같은 명령으로 이어서 실행
+- trial마다 학습 데이터를 작은 표본부터 키움 (기본 10% -> 30% -> 100%)
+- 부스팅 라운드 중간 검증 정확도를 보고하고 median / successive halving / hyperband 프루너로 가망 없는 trial 중단
+  -> 큰 데이터까지 학습하는 건 살아남은 설정뿐
+- 목표 정확도(기본 65% / ±1 티어 98%)에 처음 도달한 시점까지의 경과 시간 보고
+
+실행 방법: python src/tuning.py --csv coc_clans_dataset.csv --workers 4 --n-trials 60 --output league_params.json
+    (결과로 학습: python src/train.py --csv coc_clans_dataset.csv --league-params league_params.json)
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from features import LEAGUE_FEATURES
+from imbalance import class_sample_weight
+from train import DEFAULT_WORK_DIR, LEAGUE_PARAMS, RANDOM_STATE, TIER_ORDER, broad_tier, prepare_data
+
+DEFAULT_STORAGE = 'league_tuning.journal'
+DEFAULT_STUDY = 'league_model'
+DEFAULT_FRACTIONS = (0.1, 0.3, 1.0)
+# 학습 데이터 중 검증용 비율 (테스트 세트는 train.py 최종 평가용으로 남겨둠)
+VALID_SIZE = 0.2
+REPORT_EVERY = 25
+# 데이터 단계마다 이 라운드 이후부터 보고 (초반 라운드는 학습률이 낮은 설정을 불리하게 평가함)
+MIN_REPORT_ROUND = 100
+# 검증 오류가 이 라운드 동안 줄지 않으면 해당 단계 학습 종료 (0이면 끄기)
+EARLY_STOPPING_ROUNDS = 50
+# n_estimators 최댓값 = 데이터 단계 하나가 차지하는 step 수
+# (프루너가 보는 step = 단계 * MAX_ROUNDS + 라운드, 단계 끝 점수는 (단계 + 1) * MAX_ROUNDS)
+MAX_ROUNDS = 600
+TARGET_ACCURACY = 0.65
+TARGET_WITHIN_1 = 0.98
+
+
+def suggest_params(trial):
+    """노트북 02 objective_final과 같은 탐색 공간"""
+    return {
+        'n_estimators': trial.suggest_int('n_estimators', 200, MAX_ROUNDS),
+        'max_depth': trial.suggest_int('max_depth', 4, 10),
+        'learning_rate': trial.suggest_float('learning_rate', 0.01, 0.2),
+        'subsample': trial.suggest_float('subsample', 0.6, 1.0),
+        'colsample_bytree': trial.suggest_float('colsample_bytree', 0.6, 1.0),
+    }
+
+
+# ==========================================
+# 데이터
+# ==========================================
+class TuningData:
+    """리그 모델 학습 세트를 (학습 / 검증)으로 나누고 크기별 표본을 만들어 둠
+
+    표본은 고정된 순열의 앞부분이라 작은 표본이 큰 표본에 포함됩니다 (단계가 올라가도 같은 행 유지).
+    """
+
+    def __init__(self, work_dir=DEFAULT_WORK_DIR, valid_size=VALID_SIZE, seed=RANDOM_STATE):
+        from sklearn.model_selection import train_test_split
+
+        features_path = os.path.join(work_dir, 'features.parquet')
+        split_path = os.path.join(work_dir, 'split.npz')
+        if not os.path.exists(split_path):
+            raise FileNotFoundError(f"{split_path}가 없습니다. --csv를 주거나 train.py를 먼저 실행하세요.")
+
+        df = pd.read_parquet(features_path, columns=LEAGUE_FEATURES + ['league_score'])
+        rows = np.load(split_path)['league_train']
+        X = df[LEAGUE_FEATURES].iloc[rows].reset_index(drop=True)
+        y = broad_tier(df['league_score'].to_numpy()[rows]) - 1  # 0=Bronze ... 5=Champion
+
+        train, valid = train_test_split(np.arange(len(y)), test_size=valid_size, random_state=seed, stratify=y)
+        self.X_valid, self.y_valid = X.iloc[valid], y[valid]
+        self.X, self.y = X.iloc[train].reset_index(drop=True), y[train]
+        self.order = np.random.default_rng(seed).permutation(len(self.y))
+
+    def __len__(self):
+        return len(self.y)
+
+    def sample(self, fraction):
+        rows = np.sort(self.order[:max(int(len(self.y) * fraction), len(TIER_ORDER) * 10)])
+        return self.X.iloc[rows], self.y[rows]
+
+
+def tier_accuracy(y_true, y_pred):
+    """(정확도, ±1 티어 정확도)"""
+    gap = np.abs(np.asarray(y_true) - np.asarray(y_pred))
+    return float((gap == 0).mean()), float((gap <= 1).mean())
+
+
+# ==========================================
+# Optuna
+# ==========================================
+def open_storage(storage):
+    """'sqlite:///...' 등 DB URL이면 RDB, 아니면 여러 프로세스가 함께 쓰는 저널 파일"""
+    import optuna
+
+    if '://' in storage:
+        engine_kwargs = {'connect_args': {'timeout': 60}} if storage.startswith('sqlite') else None
+        return optuna.storages.RDBStorage(storage, engine_kwargs=engine_kwargs)
+    return optuna.storages.JournalStorage(optuna.storages.journal.JournalFileBackend(storage))
+
+
+def make_pruner(name, fractions):
+    """보고 시점은 pruning_callback이 정하므로 프루너 쪽 warmup / interval은 두지 않음"""
+    import optuna
+
+    if name == 'median':
+        return optuna.pruners.MedianPruner(n_startup_trials=3)
+    if name == 'sha':
+        return optuna.pruners.SuccessiveHalvingPruner(min_resource=MIN_REPORT_ROUND, reduction_factor=3)
+    if name == 'hyperband':
+        return optuna.pruners.HyperbandPruner(min_resource=MIN_REPORT_ROUND, max_resource=MAX_ROUNDS * len(fractions),
+                                              reduction_factor=3)
+    return optuna.pruners.NopPruner()
+
+
+def pruning_callback(trial, offset, every=REPORT_EVERY, min_round=MIN_REPORT_ROUND):
+    """LightGBM 콜백: min_round 이후 every 라운드마다 이 단계의 최고 검증 정확도(1 - multi_error)를 보고
+
+    작은 표본에서는 라운드가 늘면 검증 정확도가 떨어지는데(과적합), 프루너는 trial의 최고값으로
+    비교하므로 현재값 대신 단계 내 최고값(= 조기 종료 시점의 정확도)을 보고합니다.
+    """
+    import optuna
+
+    best = [0.0]
+
+    def callback(env):
+        round_ = env.iteration + 1
+        for _, name, value, _ in env.evaluation_result_list:
+            if name == 'multi_error':
+                best[0] = max(best[0], 1.0 - value)
+        # 단계의 마지막 라운드는 Objective가 (stage + 1) * MAX_ROUNDS step으로 보고
+        if round_ < min_round or round_ % every or round_ >= env.end_iteration:
+            return
+        trial.report(best[0], offset + round_)
+        if trial.should_prune():
+            raise optuna.TrialPruned(f"{offset + round_} step에서 중단")
+
+    return callback
+
+
+class Objective:
+    """trial 하나: 데이터 단계마다 학습하며 중간 점수를 보고, 끝까지 가면 검증 정확도 반환"""
+
+    def __init__(self, data, fractions=DEFAULT_FRACTIONS, balance='class_weight', n_jobs=1,
+                 early_stopping_rounds=EARLY_STOPPING_ROUNDS):
+        self.data = data
+        self.fractions = tuple(fractions)
+        self.balance = balance
+        self.n_jobs = n_jobs
+        self.early_stopping_rounds = early_stopping_rounds
+
+    def __call__(self, trial):
+        import lightgbm as lgb
+        import optuna
+
+        params = suggest_params(trial)
+        for stage, fraction in enumerate(self.fractions):
+            X, y = self.data.sample(fraction)
+            # 튜닝은 조기 종료(eval_set)가 필요해 sklearn 래퍼로 학습: 행 가중치 / 노트북과 같은 SMOTE
+            sample_weight = None
+            if self.balance == 'smote':
+                from imblearn.over_sampling import SMOTE
+                X, y = SMOTE(random_state=RANDOM_STATE).fit_resample(X, y)
+            else:
+                sample_weight = class_sample_weight(y)
+            callbacks = [pruning_callback(trial, stage * MAX_ROUNDS)]
+            if self.early_stopping_rounds:
+                callbacks.append(lgb.early_stopping(self.early_stopping_rounds, verbose=False))
+            model = lgb.LGBMClassifier(**params, metric='multi_error', random_state=RANDOM_STATE,
+                                       n_jobs=self.n_jobs, verbose=-1)
+            model.fit(X, y, sample_weight=sample_weight, eval_set=[(self.data.X_valid, self.data.y_valid)], callbacks=callbacks)
+
+            # 단계 끝 점수는 모든 trial이 같은 step에 보고 (라운드 도중 조기 종료한 trial도 비교 대상)
+            # 조기 종료했다면 predict는 최고 라운드까지만 사용
+            accuracy, within_1 = tier_accuracy(self.data.y_valid, model.predict(self.data.X_valid))
+            trial.report(accuracy, (stage + 1) * MAX_ROUNDS)
+            if stage < len(self.fractions) - 1 and trial.should_prune():
+                raise optuna.TrialPruned(f"{fraction:.0%} 데이터 단계 후 중단")
+
+        trial.set_user_attr('accuracy', accuracy)
+        trial.set_user_attr('within_1_tier', within_1)
+        trial.set_user_attr('best_iteration', int(model.best_iteration_ or params['n_estimators']))
+        return accuracy
+
+
+def _run_worker(work_dir, storage, study_name, n_trials, timeout, fractions, pruner, balance, n_jobs,
+                early_stopping_rounds, seed):
+    """워커 프로세스: 저장소의 스터디를 열어 이 워커 몫의 trial n_trials개를 실행
+
+    샘플러/프루너는 저장소에 남지 않으므로 워커마다 새로 만듭니다.
+    """
+    import optuna
+
+    optuna.logging.set_verbosity(optuna.logging.WARNING)
+    study = optuna.load_study(study_name=study_name, storage=open_storage(storage),
+                              sampler=optuna.samplers.TPESampler(seed=seed), pruner=make_pruner(pruner, fractions))
+    objective = Objective(TuningData(work_dir), fractions, balance, n_jobs, early_stopping_rounds)
+    study.optimize(objective, n_trials=n_trials, timeout=timeout)
+
+
+def worker_quotas(remaining, workers):
+    """남은 trial 수를 워커별로 나눔 (합이 remaining, 0개인 워커는 빼고)
+
+    MaxTrialsCallback은 trial이 끝난 뒤에야 확인해 워커들이 동시에 상한을 넘길 수 있으므로
+    시작 전에 몫을 정해 전체 trial 수가 n_trials를 넘지 않게 합니다.
+    """
+    quotas = [remaining // workers + (i < remaining % workers) for i in range(workers)]
+    return [quota for quota in quotas if quota > 0]
+
+
+def tune(work_dir=DEFAULT_WORK_DIR, storage=DEFAULT_STORAGE, study_name=DEFAULT_STUDY, n_trials=60,
+         workers=1, timeout=None, fractions=DEFAULT_FRACTIONS, pruner='median', balance='class_weight',
+         n_jobs=None, early_stopping_rounds=EARLY_STOPPING_ROUNDS, seed=RANDOM_STATE):
+    """스터디를 만들거나(있으면 이어서) workers개 프로세스로 최적화한 뒤 study 반환
+
+    n_trials는 스터디 전체(이전 실행 포함) trial 수 상한 (이미 끝난 완료 + 중단 trial을 빼고 남은 만큼을
+    워커에 미리 나눠 실행, 실패한 trial도 몫에서 빠짐), timeout은 이번 실행의 초 단위 예산.
+    """
+    import optuna
+
+    # 워커가 여러 개면 프로세스당 스레드 1개 (코어를 나눠 씀)
+    n_jobs = n_jobs or (1 if workers > 1 else -1)
+    study = optuna.create_study(study_name=study_name, storage=open_storage(storage), direction='maximize',
+                                load_if_exists=True)
+    study.set_user_attr('fractions', list(fractions))
+    study.set_user_attr('pruner', pruner)
+
+    states = (optuna.trial.TrialState.COMPLETE, optuna.trial.TrialState.PRUNED)
+    quotas = worker_quotas(max(n_trials - len(study.get_trials(deepcopy=False, states=states)), 0), max(workers, 1))
+    args = (work_dir, storage, study_name)
+    options = (timeout, tuple(fractions), pruner, balance, n_jobs, early_stopping_rounds)
+    if len(quotas) == 1:
+        _run_worker(*args, quotas[0], *options, seed)
+    elif quotas:
+        # LightGBM(OpenMP) 상태를 물려받지 않도록 spawn
+        ctx = multiprocessing.get_context('spawn')
+        procs = [ctx.Process(target=_run_worker, args=args + (quota,) + options + (seed + i,))
+                 for i, quota in enumerate(quotas)]
+        for proc in procs:
+            proc.start()
+        for proc in procs:
+            proc.join()
+    return optuna.load_study(study_name=study_name, storage=open_storage(storage))
+
+
+# ==========================================
+# 결과 요약
+# ==========================================
+def time_to_target(study, accuracy=TARGET_ACCURACY, within_1=TARGET_WITHIN_1):
+    """스터디 시작부터 목표(정확도, ±1 티어 정확도)를 처음 넘긴 trial이 끝날 때까지 초 / 못 넘겼으면 None"""
+    trials = [t for t in study.trials if t.datetime_start is not None]
+    if not trials:
+        return None
+    start = min(t.datetime_start for t in trials)
+    for trial in sorted((t for t in trials if 'accuracy' in t.user_attrs), key=lambda t: t.datetime_complete):
+        if trial.user_attrs['accuracy'] >= accuracy and trial.user_attrs['within_1_tier'] >= within_1:
+            return (trial.datetime_complete - start).total_seconds()
+    return None
+
+
+def summarize(study, accuracy=TARGET_ACCURACY, within_1=TARGET_WITHIN_1):
+    import optuna
+
+    states = [t.state for t in study.trials]
+    finished = [t for t in study.trials if t.datetime_complete is not None]
+    summary = {
+        'trials': len(study.trials),
+        'complete': states.count(optuna.trial.TrialState.COMPLETE),
+        'pruned': states.count(optuna.trial.TrialState.PRUNED),
+        'wall_seconds': (max(t.datetime_complete for t in finished)
+                         - min(t.datetime_start for t in finished)).total_seconds() if finished else 0.0,
+        'time_to_target': time_to_target(study, accuracy, within_1),
+    }
+    if summary['complete']:
+        best = study.best_trial
+        summary.update(best_accuracy=best.user_attrs['accuracy'], best_within_1=best.user_attrs['within_1_tier'],
+                       best_params=best.params)
+    return summary
+
+
+def best_model_params(study):
+    """train.py --league-params 형식 (n_estimators는 조기 종료된 최고 라운드)"""
+    params = dict(LEAGUE_PARAMS)
+    params.update(study.best_params)
+    params['n_estimators'] = study.best_trial.user_attrs.get('best_iteration', params['n_estimators'])
+    return params
+
+
+def main():
+    parser = argparse.ArgumentParser(description='리그 모델 병렬 하이퍼파라미터 튜닝 (프루닝 + 데이터 크기 단계)')
+    parser.add_argument('--csv', default=None, help='원천 CSV (주면 train.py의 ingest ~ split 단계를 먼저 실행)')
+    parser.add_argument('--work-dir', default=DEFAULT_WORK_DIR, help='train.py 체크포인트 디렉토리')
+    parser.add_argument('--storage', default=DEFAULT_STORAGE, help="스터디 저장소 (저널 파일 경로 또는 'sqlite:///...')")
+    parser.add_argument('--study', default=DEFAULT_STUDY, help='스터디 이름 (같은 이름이면 이어서 실행)')
+    parser.add_argument('--n-trials', type=int, default=60, help='스터디 전체 trial 수 상한 (남은 수를 워커에 미리 나눠 넘지 않음)')
+    parser.add_argument('--timeout', type=float, default=None, help='이번 실행 시간 예산 (초)')
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help='trial 실행 프로세스 수')
+    parser.add_argument('--fractions', type=float, nargs='+', default=list(DEFAULT_FRACTIONS),
+                        help='trial별 학습 데이터 비율 단계')
+    parser.add_argument('--pruner', choices=['median', 'sha', 'hyperband', 'none'], default='median')
+    parser.add_argument('--balance', choices=['class_weight', 'smote'], default='class_weight',
+                        help='불균형 보정 (smote는 imbalanced-learn 필요)')
+    parser.add_argument('--target-accuracy', type=float, default=TARGET_ACCURACY)
+    parser.add_argument('--target-within-1', type=float, default=TARGET_WITHIN_1)
+    parser.add_argument('--output', default=None, help='최적 파라미터 JSON 저장 경로')
+    args = parser.parse_args()
+
+    if args.csv:
+        prepare_data(args.csv, args.work_dir)
+
+    start = time.perf_counter()
+    study = tune(args.work_dir, args.storage, args.study, args.n_trials, args.workers, args.timeout,
+                 args.fractions, args.pruner, args.balance)
+    elapsed = time.perf_counter() - start
+    summary = summarize(study, args.target_accuracy, args.target_within_1)
+
+    print(f"\n🎛️ 스터디 '{args.study}' ({args.storage}): trial {summary['trials']}개 "
+          f"(완료 {summary['complete']}, 중단 {summary['pruned']}) / 이번 실행 {elapsed:.1f}초")
+    if summary['complete']:
+        print(f"최고 검증 정확도: {summary['best_accuracy']:.2%} (±1 티어 {summary['best_within_1']:.2%})")
+        print(f"최적 파라미터: {summary['best_params']}")
+    target = f"정확도 {args.target_accuracy:.0%} / ±1 티어 {args.target_within_1:.0%}"
+    if summary['time_to_target'] is None:
+        print(f"목표({target}) 미도달")
+    else:
+        print(f"목표({target}) 도달까지: {summary['time_to_target']:.1f}초")
+
+    if args.output and summary['complete']:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(best_model_params(study), f, indent=2)
+        print(f"✅ 파라미터 저장: {args.output}")
+
+
+if __name__ == '__main__':
+    main()